@@ -8,8 +8,8 @@
 import time
 from lookout.sdk import pb
 from lookout.sdk.service_data import DataStub
-from lookout.sdk.grpc import to_grpc_address, create_channel, create_server, \
-    LogUnaryServerInterceptor, LogStreamServerInterceptor, \
+from lookout.sdk.grpc import to_grpc_address, create_server, \
+    get_channel_pool, LogUnaryServerInterceptor, LogStreamServerInterceptor, \
     LogUnaryClientInterceptor, LogStreamClientInterceptor
 
 from bblfsh import filter as filter_uast
@@ -26,45 +26,47 @@ def log_fn(log_fields, msg):
 
 class Analyzer(pb.AnalyzerServicer):
 
+    def __init__(self):
+        # client connections to DataServer, shared between the events
+        self._data_pool = get_channel_pool(data_srv_addr, interceptors=[
+            LogUnaryClientInterceptor(log_fn),
+            LogStreamClientInterceptor(log_fn),
+        ])
+
     def notify_review_event(self, request, context):
         print("got review request {}".format(request))
 
         comments = []
 
-        # client connection to DataServe
-        with create_channel(data_srv_addr, interceptors=[
-                LogUnaryClientInterceptor(log_fn),
-                LogStreamClientInterceptor(log_fn),
-        ]) as channel:
-            stub = DataStub(channel)
-
-            # Add some log fields that will be available to the data server
-            # using `context.add_log_fields`.
-            context.add_log_fields({
-                "some-string-key": "some-value",
-                "some-int-key":    1,
-            })
-
-            changes = stub.get_changes(
-                context,
-                pb.ChangesRequest(
-                    head=request.commit_revision.head,
-                    base=request.commit_revision.base,
-                    want_contents=False,
-                    want_uast=True,
-                    exclude_vendored=True))
-
-            for change in changes:
-                if not change.HasField("head"):
-                    continue
-
-                print("analyzing '{}' in {}".format(
-                    change.head.path, change.head.language))
-                fns = list(filter_uast(change.head.uast, "//*[@roleFunction]"))
-                text = "language: {}, functions: {}".format(
-                    change.head.language, len(fns))
-                comments.append(pb.Comment(
-                    file=change.head.path, line=0, text=text))
+        stub = DataStub(self._data_pool)
+
+        # Add some log fields that will be available to the data server
+        # using `context.add_log_fields`.
+        context.add_log_fields({
+            "some-string-key": "some-value",
+            "some-int-key":    1,
+        })
+
+        changes = stub.get_changes(
+            context,
+            pb.ChangesRequest(
+                head=request.commit_revision.head,
+                base=request.commit_revision.base,
+                want_contents=False,
+                want_uast=True,
+                exclude_vendored=True))
+
+        for change in changes:
+            if not change.HasField("head"):
+                continue
+
+            print("analyzing '{}' in {}".format(
+                change.head.path, change.head.language))
+            fns = list(filter_uast(change.head.uast, "//*[@roleFunction]"))
+            text = "language: {}, functions: {}".format(
+                change.head.language, len(fns))
+            comments.append(pb.Comment(
+                file=change.head.path, line=0, text=text))
 
         return pb.EventResponse(analyzer_version=version, comments=comments)
 
@@ -0,0 +1,958 @@
+// Code generated by protoc-gen-gogo. DO NOT EDIT.
+// source: lookout/sdk/service_data_chunks.proto
+
+package pb
+
+import proto "github.com/gogo/protobuf/proto"
+import fmt "fmt"
+import math "math"
+import _ "github.com/gogo/protobuf/gogoproto"
+
+import (
+	context "golang.org/x/net/context"
+	grpc "google.golang.org/grpc"
+)
+
+import io "io"
+
+// Reference imports to suppress errors if they are not otherwise used.
+var _ = proto.Marshal
+var _ = fmt.Errorf
+var _ = math.Inf
+
+// This is a compile-time assertion to ensure that this generated file
+// is compatible with the proto package it is being compiled against.
+// A compilation error at this line likely means your copy of the
+// proto package needs to be updated.
+const _ = proto.GoGoProtoPackageIsVersion2 // please upgrade the proto package
+
+// Field is the field of the File a chunk belongs to.
+type FileChunk_Field int32
+
+const (
+	FileChunk_CONTENT FileChunk_Field = 0
+	FileChunk_UAST    FileChunk_Field = 1
+)
+
+var FileChunk_Field_name = map[int32]string{
+	0: "CONTENT",
+	1: "UAST",
+}
+var FileChunk_Field_value = map[string]int32{
+	"CONTENT": 0,
+	"UAST":    1,
+}
+
+func (x FileChunk_Field) String() string {
+	return proto.EnumName(FileChunk_Field_name, int32(x))
+}
+func (FileChunk_Field) EnumDescriptor() ([]byte, []int) {
+	return fileDescriptor_service_data_chunks_d7064662955d49f3, []int{1, 0}
+}
+
+// FileChunksRequest defines a request of the chunks of a file.
+type FileChunksRequest struct {
+	// Revision of the file.
+	Revision *ReferencePointer `protobuf:"bytes,1,opt,name=revision,proto3" json:"revision,omitempty"`
+	// Path of the file.
+	Path string `protobuf:"bytes,2,opt,name=path,proto3" json:"path,omitempty"`
+	// WantContents will stream the file Content.
+	WantContents bool `protobuf:"varint,3,opt,name=want_contents,json=wantContents,proto3" json:"want_contents,omitempty"`
+	// WantUAST will stream the file UAST, serialized, and fill its Language.
+	WantUAST bool `protobuf:"varint,4,opt,name=want_uast,json=wantUast,proto3" json:"want_uast,omitempty"`
+	// WantLanguage will fill the file Language.
+	WantLanguage bool `protobuf:"varint,5,opt,name=want_language,json=wantLanguage,proto3" json:"want_language,omitempty"`
+	// ChunkSize is the maximum size of the data of each chunk. The server
+	// chooses it when zero.
+	ChunkSize uint32 `protobuf:"varint,6,opt,name=chunk_size,json=chunkSize,proto3" json:"chunk_size,omitempty"`
+}
+
+func (m *FileChunksRequest) Reset()         { *m = FileChunksRequest{} }
+func (m *FileChunksRequest) String() string { return proto.CompactTextString(m) }
+func (*FileChunksRequest) ProtoMessage()    {}
+func (*FileChunksRequest) Descriptor() ([]byte, []int) {
+	return fileDescriptor_service_data_chunks_d7064662955d49f3, []int{0}
+}
+func (m *FileChunksRequest) XXX_Unmarshal(b []byte) error {
+	return m.Unmarshal(b)
+}
+func (m *FileChunksRequest) XXX_Marshal(b []byte, deterministic bool) ([]byte, error) {
+	if deterministic {
+		return xxx_messageInfo_FileChunksRequest.Marshal(b, m, deterministic)
+	} else {
+		b = b[:cap(b)]
+		n, err := m.MarshalTo(b)
+		if err != nil {
+			return nil, err
+		}
+		return b[:n], nil
+	}
+}
+func (dst *FileChunksRequest) XXX_Merge(src proto.Message) {
+	xxx_messageInfo_FileChunksRequest.Merge(dst, src)
+}
+func (m *FileChunksRequest) XXX_Size() int {
+	return m.Size()
+}
+func (m *FileChunksRequest) XXX_DiscardUnknown() {
+	xxx_messageInfo_FileChunksRequest.DiscardUnknown(m)
+}
+
+var xxx_messageInfo_FileChunksRequest proto.InternalMessageInfo
+
+// FileChunk is a part of the contents or of the UAST of a file. The chunks
+// of each field are streamed in order, the contents first.
+type FileChunk struct {
+	// File is set only in the first chunk, with the path, mode, hash and
+	// language of the file, without contents and UAST. The first chunk may
+	// carry no data, when the file is empty.
+	File *File `protobuf:"bytes,1,opt,name=file,proto3" json:"file,omitempty"`
+	// Field the data belongs to.
+	Field FileChunk_Field `protobuf:"varint,2,opt,name=field,proto3,enum=pb.FileChunk_Field" json:"field,omitempty"`
+	// Offset of the data in the field.
+	Offset uint64 `protobuf:"varint,3,opt,name=offset,proto3" json:"offset,omitempty"`
+	// Size is the total size of the field.
+	Size uint64 `protobuf:"varint,4,opt,name=size,proto3" json:"size,omitempty"`
+	// Data of the chunk.
+	Data []byte `protobuf:"bytes,5,opt,name=data,proto3" json:"data,omitempty"`
+}
+
+func (m *FileChunk) Reset()         { *m = FileChunk{} }
+func (m *FileChunk) String() string { return proto.CompactTextString(m) }
+func (*FileChunk) ProtoMessage()    {}
+func (*FileChunk) Descriptor() ([]byte, []int) {
+	return fileDescriptor_service_data_chunks_d7064662955d49f3, []int{1}
+}
+func (m *FileChunk) XXX_Unmarshal(b []byte) error {
+	return m.Unmarshal(b)
+}
+func (m *FileChunk) XXX_Marshal(b []byte, deterministic bool) ([]byte, error) {
+	if deterministic {
+		return xxx_messageInfo_FileChunk.Marshal(b, m, deterministic)
+	} else {
+		b = b[:cap(b)]
+		n, err := m.MarshalTo(b)
+		if err != nil {
+			return nil, err
+		}
+		return b[:n], nil
+	}
+}
+func (dst *FileChunk) XXX_Merge(src proto.Message) {
+	xxx_messageInfo_FileChunk.Merge(dst, src)
+}
+func (m *FileChunk) XXX_Size() int {
+	return m.ProtoSize()
+}
+func (m *FileChunk) XXX_DiscardUnknown() {
+	xxx_messageInfo_FileChunk.DiscardUnknown(m)
+}
+
+var xxx_messageInfo_FileChunk proto.InternalMessageInfo
+
+func init() {
+	proto.RegisterType((*FileChunksRequest)(nil), "pb.FileChunksRequest")
+	proto.RegisterType((*FileChunk)(nil), "pb.FileChunk")
+	proto.RegisterEnum("pb.FileChunk_Field", FileChunk_Field_name, FileChunk_Field_value)
+}
+
+// Reference imports to suppress errors if they are not otherwise used.
+var _ context.Context
+var _ grpc.ClientConn
+
+// This is a compile-time assertion to ensure that this generated file
+// is compatible with the grpc package it is being compiled against.
+const _ = grpc.SupportPackageIsVersion4
+
+// DataChunksClient is the client API for DataChunks service.
+//
+// For semantics around ctx use and closing/ending streaming RPCs, please refer to https://godoc.org/google.golang.org/grpc#ClientConn.NewStream.
+type DataChunksClient interface {
+	// GetFileChunks returns a stream of FileChunks of a single file.
+	GetFileChunks(ctx context.Context, in *FileChunksRequest, opts ...grpc.CallOption) (DataChunks_GetFileChunksClient, error)
+}
+
+type dataChunksClient struct {
+	cc *grpc.ClientConn
+}
+
+func NewDataChunksClient(cc *grpc.ClientConn) DataChunksClient {
+	return &dataChunksClient{cc}
+}
+
+func (c *dataChunksClient) GetFileChunks(ctx context.Context, in *FileChunksRequest, opts ...grpc.CallOption) (DataChunks_GetFileChunksClient, error) {
+	stream, err := c.cc.NewStream(ctx, &_DataChunks_serviceDesc.Streams[0], "/pb.DataChunks/GetFileChunks", opts...)
+	if err != nil {
+		return nil, err
+	}
+	x := &dataChunksGetFileChunksClient{stream}
+	if err := x.ClientStream.SendMsg(in); err != nil {
+		return nil, err
+	}
+	if err := x.ClientStream.CloseSend(); err != nil {
+		return nil, err
+	}
+	return x, nil
+}
+
+type DataChunks_GetFileChunksClient interface {
+	Recv() (*FileChunk, error)
+	grpc.ClientStream
+}
+
+type dataChunksGetFileChunksClient struct {
+	grpc.ClientStream
+}
+
+func (x *dataChunksGetFileChunksClient) Recv() (*FileChunk, error) {
+	m := new(FileChunk)
+	if err := x.ClientStream.RecvMsg(m); err != nil {
+		return nil, err
+	}
+	return m, nil
+}
+
+// DataChunksServer is the server API for DataChunks service.
+type DataChunksServer interface {
+	// GetFileChunks returns a stream of FileChunks of a single file.
+	GetFileChunks(*FileChunksRequest, DataChunks_GetFileChunksServer) error
+}
+
+func RegisterDataChunksServer(s *grpc.Server, srv DataChunksServer) {
+	s.RegisterService(&_DataChunks_serviceDesc, srv)
+}
+
+func _DataChunks_GetFileChunks_Handler(srv interface{}, stream grpc.ServerStream) error {
+	m := new(FileChunksRequest)
+	if err := stream.RecvMsg(m); err != nil {
+		return err
+	}
+	return srv.(DataChunksServer).GetFileChunks(m, &dataChunksGetFileChunksServer{stream})
+}
+
+type DataChunks_GetFileChunksServer interface {
+	Send(*FileChunk) error
+	grpc.ServerStream
+}
+
+type dataChunksGetFileChunksServer struct {
+	grpc.ServerStream
+}
+
+func (x *dataChunksGetFileChunksServer) Send(m *FileChunk) error {
+	return x.ServerStream.SendMsg(m)
+}
+
+var _DataChunks_serviceDesc = grpc.ServiceDesc{
+	ServiceName: "pb.DataChunks",
+	HandlerType: (*DataChunksServer)(nil),
+	Methods:     []grpc.MethodDesc{},
+	Streams: []grpc.StreamDesc{
+		{
+			StreamName:    "GetFileChunks",
+			Handler:       _DataChunks_GetFileChunks_Handler,
+			ServerStreams: true,
+		},
+	},
+	Metadata: "lookout/sdk/service_data_chunks.proto",
+}
+
+func (m *FileChunksRequest) Marshal() (dAtA []byte, err error) {
+	size := m.Size()
+	dAtA = make([]byte, size)
+	n, err := m.MarshalTo(dAtA)
+	if err != nil {
+		return nil, err
+	}
+	return dAtA[:n], nil
+}
+
+func (m *FileChunksRequest) MarshalTo(dAtA []byte) (int, error) {
+	var i int
+	_ = i
+	var l int
+	_ = l
+	if m.Revision != nil {
+		dAtA[i] = 0xa
+		i++
+		i = encodeVarintServiceDataChunks(dAtA, i, uint64(m.Revision.Size()))
+		n1, err := m.Revision.MarshalTo(dAtA[i:])
+		if err != nil {
+			return 0, err
+		}
+		i += n1
+	}
+	if len(m.Path) > 0 {
+		dAtA[i] = 0x12
+		i++
+		i = encodeVarintServiceDataChunks(dAtA, i, uint64(len(m.Path)))
+		i += copy(dAtA[i:], m.Path)
+	}
+	if m.WantContents {
+		dAtA[i] = 0x18
+		i++
+		if m.WantContents {
+			dAtA[i] = 1
+		} else {
+			dAtA[i] = 0
+		}
+		i++
+	}
+	if m.WantUAST {
+		dAtA[i] = 0x20
+		i++
+		if m.WantUAST {
+			dAtA[i] = 1
+		} else {
+			dAtA[i] = 0
+		}
+		i++
+	}
+	if m.WantLanguage {
+		dAtA[i] = 0x28
+		i++
+		if m.WantLanguage {
+			dAtA[i] = 1
+		} else {
+			dAtA[i] = 0
+		}
+		i++
+	}
+	if m.ChunkSize != 0 {
+		dAtA[i] = 0x30
+		i++
+		i = encodeVarintServiceDataChunks(dAtA, i, uint64(m.ChunkSize))
+	}
+	return i, nil
+}
+
+func (m *FileChunk) Marshal() (dAtA []byte, err error) {
+	size := m.ProtoSize()
+	dAtA = make([]byte, size)
+	n, err := m.MarshalTo(dAtA)
+	if err != nil {
+		return nil, err
+	}
+	return dAtA[:n], nil
+}
+
+func (m *FileChunk) MarshalTo(dAtA []byte) (int, error) {
+	var i int
+	_ = i
+	var l int
+	_ = l
+	if m.File != nil {
+		dAtA[i] = 0xa
+		i++
+		i = encodeVarintServiceDataChunks(dAtA, i, uint64(m.File.ProtoSize()))
+		n2, err := m.File.MarshalTo(dAtA[i:])
+		if err != nil {
+			return 0, err
+		}
+		i += n2
+	}
+	if m.Field != 0 {
+		dAtA[i] = 0x10
+		i++
+		i = encodeVarintServiceDataChunks(dAtA, i, uint64(m.Field))
+	}
+	if m.Offset != 0 {
+		dAtA[i] = 0x18
+		i++
+		i = encodeVarintServiceDataChunks(dAtA, i, uint64(m.Offset))
+	}
+	if m.Size != 0 {
+		dAtA[i] = 0x20
+		i++
+		i = encodeVarintServiceDataChunks(dAtA, i, uint64(m.Size))
+	}
+	if len(m.Data) > 0 {
+		dAtA[i] = 0x2a
+		i++
+		i = encodeVarintServiceDataChunks(dAtA, i, uint64(len(m.Data)))
+		i += copy(dAtA[i:], m.Data)
+	}
+	return i, nil
+}
+
+func encodeVarintServiceDataChunks(dAtA []byte, offset int, v uint64) int {
+	for v >= 1<<7 {
+		dAtA[offset] = uint8(v&0x7f | 0x80)
+		v >>= 7
+		offset++
+	}
+	dAtA[offset] = uint8(v)
+	return offset + 1
+}
+func (m *FileChunksRequest) Size() (n int) {
+	if m == nil {
+		return 0
+	}
+	var l int
+	_ = l
+	if m.Revision != nil {
+		l = m.Revision.Size()
+		n += 1 + l + sovServiceDataChunks(uint64(l))
+	}
+	l = len(m.Path)
+	if l > 0 {
+		n += 1 + l + sovServiceDataChunks(uint64(l))
+	}
+	if m.WantContents {
+		n += 2
+	}
+	if m.WantUAST {
+		n += 2
+	}
+	if m.WantLanguage {
+		n += 2
+	}
+	if m.ChunkSize != 0 {
+		n += 1 + sovServiceDataChunks(uint64(m.ChunkSize))
+	}
+	return n
+}
+
+func (m *FileChunk) ProtoSize() (n int) {
+	if m == nil {
+		return 0
+	}
+	var l int
+	_ = l
+	if m.File != nil {
+		l = m.File.ProtoSize()
+		n += 1 + l + sovServiceDataChunks(uint64(l))
+	}
+	if m.Field != 0 {
+		n += 1 + sovServiceDataChunks(uint64(m.Field))
+	}
+	if m.Offset != 0 {
+		n += 1 + sovServiceDataChunks(uint64(m.Offset))
+	}
+	if m.Size != 0 {
+		n += 1 + sovServiceDataChunks(uint64(m.Size))
+	}
+	l = len(m.Data)
+	if l > 0 {
+		n += 1 + l + sovServiceDataChunks(uint64(l))
+	}
+	return n
+}
+
+func sovServiceDataChunks(x uint64) (n int) {
+	for {
+		n++
+		x >>= 7
+		if x == 0 {
+			break
+		}
+	}
+	return n
+}
+func sozServiceDataChunks(x uint64) (n int) {
+	return sovServiceDataChunks(uint64((x << 1) ^ uint64((int64(x) >> 63))))
+}
+func (m *FileChunksRequest) Unmarshal(dAtA []byte) error {
+	l := len(dAtA)
+	iNdEx := 0
+	for iNdEx < l {
+		preIndex := iNdEx
+		var wire uint64
+		for shift := uint(0); ; shift += 7 {
+			if shift >= 64 {
+				return ErrIntOverflowServiceDataChunks
+			}
+			if iNdEx >= l {
+				return io.ErrUnexpectedEOF
+			}
+			b := dAtA[iNdEx]
+			iNdEx++
+			wire |= (uint64(b) & 0x7F) << shift
+			if b < 0x80 {
+				break
+			}
+		}
+		fieldNum := int32(wire >> 3)
+		wireType := int(wire & 0x7)
+		if wireType == 4 {
+			return fmt.Errorf("proto: FileChunksRequest: wiretype end group for non-group")
+		}
+		if fieldNum <= 0 {
+			return fmt.Errorf("proto: FileChunksRequest: illegal tag %d (wire type %d)", fieldNum, wire)
+		}
+		switch fieldNum {
+		case 1:
+			if wireType != 2 {
+				return fmt.Errorf("proto: wrong wireType = %d for field Revision", wireType)
+			}
+			var msglen int
+			for shift := uint(0); ; shift += 7 {
+				if shift >= 64 {
+					return ErrIntOverflowServiceDataChunks
+				}
+				if iNdEx >= l {
+					return io.ErrUnexpectedEOF
+				}
+				b := dAtA[iNdEx]
+				iNdEx++
+				msglen |= (int(b) & 0x7F) << shift
+				if b < 0x80 {
+					break
+				}
+			}
+			if msglen < 0 {
+				return ErrInvalidLengthServiceDataChunks
+			}
+			postIndex := iNdEx + msglen
+			if postIndex > l {
+				return io.ErrUnexpectedEOF
+			}
+			if m.Revision == nil {
+				m.Revision = &ReferencePointer{}
+			}
+			if err := m.Revision.Unmarshal(dAtA[iNdEx:postIndex]); err != nil {
+				return err
+			}
+			iNdEx = postIndex
+		case 2:
+			if wireType != 2 {
+				return fmt.Errorf("proto: wrong wireType = %d for field Path", wireType)
+			}
+			var stringLen uint64
+			for shift := uint(0); ; shift += 7 {
+				if shift >= 64 {
+					return ErrIntOverflowServiceDataChunks
+				}
+				if iNdEx >= l {
+					return io.ErrUnexpectedEOF
+				}
+				b := dAtA[iNdEx]
+				iNdEx++
+				stringLen |= (uint64(b) & 0x7F) << shift
+				if b < 0x80 {
+					break
+				}
+			}
+			intStringLen := int(stringLen)
+			if intStringLen < 0 {
+				return ErrInvalidLengthServiceDataChunks
+			}
+			postIndex := iNdEx + intStringLen
+			if postIndex > l {
+				return io.ErrUnexpectedEOF
+			}
+			m.Path = string(dAtA[iNdEx:postIndex])
+			iNdEx = postIndex
+		case 3:
+			if wireType != 0 {
+				return fmt.Errorf("proto: wrong wireType = %d for field WantContents", wireType)
+			}
+			var v int
+			for shift := uint(0); ; shift += 7 {
+				if shift >= 64 {
+					return ErrIntOverflowServiceDataChunks
+				}
+				if iNdEx >= l {
+					return io.ErrUnexpectedEOF
+				}
+				b := dAtA[iNdEx]
+				iNdEx++
+				v |= (int(b) & 0x7F) << shift
+				if b < 0x80 {
+					break
+				}
+			}
+			m.WantContents = bool(v != 0)
+		case 4:
+			if wireType != 0 {
+				return fmt.Errorf("proto: wrong wireType = %d for field WantUAST", wireType)
+			}
+			var v int
+			for shift := uint(0); ; shift += 7 {
+				if shift >= 64 {
+					return ErrIntOverflowServiceDataChunks
+				}
+				if iNdEx >= l {
+					return io.ErrUnexpectedEOF
+				}
+				b := dAtA[iNdEx]
+				iNdEx++
+				v |= (int(b) & 0x7F) << shift
+				if b < 0x80 {
+					break
+				}
+			}
+			m.WantUAST = bool(v != 0)
+		case 5:
+			if wireType != 0 {
+				return fmt.Errorf("proto: wrong wireType = %d for field WantLanguage", wireType)
+			}
+			var v int
+			for shift := uint(0); ; shift += 7 {
+				if shift >= 64 {
+					return ErrIntOverflowServiceDataChunks
+				}
+				if iNdEx >= l {
+					return io.ErrUnexpectedEOF
+				}
+				b := dAtA[iNdEx]
+				iNdEx++
+				v |= (int(b) & 0x7F) << shift
+				if b < 0x80 {
+					break
+				}
+			}
+			m.WantLanguage = bool(v != 0)
+		case 6:
+			if wireType != 0 {
+				return fmt.Errorf("proto: wrong wireType = %d for field ChunkSize", wireType)
+			}
+			m.ChunkSize = 0
+			for shift := uint(0); ; shift += 7 {
+				if shift >= 64 {
+					return ErrIntOverflowServiceDataChunks
+				}
+				if iNdEx >= l {
+					return io.ErrUnexpectedEOF
+				}
+				b := dAtA[iNdEx]
+				iNdEx++
+				m.ChunkSize |= (uint32(b) & 0x7F) << shift
+				if b < 0x80 {
+					break
+				}
+			}
+		default:
+			iNdEx = preIndex
+			skippy, err := skipServiceDataChunks(dAtA[iNdEx:])
+			if err != nil {
+				return err
+			}
+			if skippy < 0 {
+				return ErrInvalidLengthServiceDataChunks
+			}
+			if (iNdEx + skippy) > l {
+				return io.ErrUnexpectedEOF
+			}
+			iNdEx += skippy
+		}
+	}
+
+	if iNdEx > l {
+		return io.ErrUnexpectedEOF
+	}
+	return nil
+}
+func (m *FileChunk) Unmarshal(dAtA []byte) error {
+	l := len(dAtA)
+	iNdEx := 0
+	for iNdEx < l {
+		preIndex := iNdEx
+		var wire uint64
+		for shift := uint(0); ; shift += 7 {
+			if shift >= 64 {
+				return ErrIntOverflowServiceDataChunks
+			}
+			if iNdEx >= l {
+				return io.ErrUnexpectedEOF
+			}
+			b := dAtA[iNdEx]
+			iNdEx++
+			wire |= (uint64(b) & 0x7F) << shift
+			if b < 0x80 {
+				break
+			}
+		}
+		fieldNum := int32(wire >> 3)
+		wireType := int(wire & 0x7)
+		if wireType == 4 {
+			return fmt.Errorf("proto: FileChunk: wiretype end group for non-group")
+		}
+		if fieldNum <= 0 {
+			return fmt.Errorf("proto: FileChunk: illegal tag %d (wire type %d)", fieldNum, wire)
+		}
+		switch fieldNum {
+		case 1:
+			if wireType != 2 {
+				return fmt.Errorf("proto: wrong wireType = %d for field File", wireType)
+			}
+			var msglen int
+			for shift := uint(0); ; shift += 7 {
+				if shift >= 64 {
+					return ErrIntOverflowServiceDataChunks
+				}
+				if iNdEx >= l {
+					return io.ErrUnexpectedEOF
+				}
+				b := dAtA[iNdEx]
+				iNdEx++
+				msglen |= (int(b) & 0x7F) << shift
+				if b < 0x80 {
+					break
+				}
+			}
+			if msglen < 0 {
+				return ErrInvalidLengthServiceDataChunks
+			}
+			postIndex := iNdEx + msglen
+			if postIndex > l {
+				return io.ErrUnexpectedEOF
+			}
+			if m.File == nil {
+				m.File = &File{}
+			}
+			if err := m.File.Unmarshal(dAtA[iNdEx:postIndex]); err != nil {
+				return err
+			}
+			iNdEx = postIndex
+		case 2:
+			if wireType != 0 {
+				return fmt.Errorf("proto: wrong wireType = %d for field Field", wireType)
+			}
+			m.Field = 0
+			for shift := uint(0); ; shift += 7 {
+				if shift >= 64 {
+					return ErrIntOverflowServiceDataChunks
+				}
+				if iNdEx >= l {
+					return io.ErrUnexpectedEOF
+				}
+				b := dAtA[iNdEx]
+				iNdEx++
+				m.Field |= (FileChunk_Field(b) & 0x7F) << shift
+				if b < 0x80 {
+					break
+				}
+			}
+		case 3:
+			if wireType != 0 {
+				return fmt.Errorf("proto: wrong wireType = %d for field Offset", wireType)
+			}
+			m.Offset = 0
+			for shift := uint(0); ; shift += 7 {
+				if shift >= 64 {
+					return ErrIntOverflowServiceDataChunks
+				}
+				if iNdEx >= l {
+					return io.ErrUnexpectedEOF
+				}
+				b := dAtA[iNdEx]
+				iNdEx++
+				m.Offset |= (uint64(b) & 0x7F) << shift
+				if b < 0x80 {
+					break
+				}
+			}
+		case 4:
+			if wireType != 0 {
+				return fmt.Errorf("proto: wrong wireType = %d for field Size", wireType)
+			}
+			m.Size = 0
+			for shift := uint(0); ; shift += 7 {
+				if shift >= 64 {
+					return ErrIntOverflowServiceDataChunks
+				}
+				if iNdEx >= l {
+					return io.ErrUnexpectedEOF
+				}
+				b := dAtA[iNdEx]
+				iNdEx++
+				m.Size |= (uint64(b) & 0x7F) << shift
+				if b < 0x80 {
+					break
+				}
+			}
+		case 5:
+			if wireType != 2 {
+				return fmt.Errorf("proto: wrong wireType = %d for field Data", wireType)
+			}
+			var byteLen int
+			for shift := uint(0); ; shift += 7 {
+				if shift >= 64 {
+					return ErrIntOverflowServiceDataChunks
+				}
+				if iNdEx >= l {
+					return io.ErrUnexpectedEOF
+				}
+				b := dAtA[iNdEx]
+				iNdEx++
+				byteLen |= (int(b) & 0x7F) << shift
+				if b < 0x80 {
+					break
+				}
+			}
+			if byteLen < 0 {
+				return ErrInvalidLengthServiceDataChunks
+			}
+			postIndex := iNdEx + byteLen
+			if postIndex > l {
+				return io.ErrUnexpectedEOF
+			}
+			m.Data = append(m.Data[:0], dAtA[iNdEx:postIndex]...)
+			if m.Data == nil {
+				m.Data = []byte{}
+			}
+			iNdEx = postIndex
+		default:
+			iNdEx = preIndex
+			skippy, err := skipServiceDataChunks(dAtA[iNdEx:])
+			if err != nil {
+				return err
+			}
+			if skippy < 0 {
+				return ErrInvalidLengthServiceDataChunks
+			}
+			if (iNdEx + skippy) > l {
+				return io.ErrUnexpectedEOF
+			}
+			iNdEx += skippy
+		}
+	}
+
+	if iNdEx > l {
+		return io.ErrUnexpectedEOF
+	}
+	return nil
+}
+func skipServiceDataChunks(dAtA []byte) (n int, err error) {
+	l := len(dAtA)
+	iNdEx := 0
+	for iNdEx < l {
+		var wire uint64
+		for shift := uint(0); ; shift += 7 {
+			if shift >= 64 {
+				return 0, ErrIntOverflowServiceDataChunks
+			}
+			if iNdEx >= l {
+				return 0, io.ErrUnexpectedEOF
+			}
+			b := dAtA[iNdEx]
+			iNdEx++
+			wire |= (uint64(b) & 0x7F) << shift
+			if b < 0x80 {
+				break
+			}
+		}
+		wireType := int(wire & 0x7)
+		switch wireType {
+		case 0:
+			for shift := uint(0); ; shift += 7 {
+				if shift >= 64 {
+					return 0, ErrIntOverflowServiceDataChunks
+				}
+				if iNdEx >= l {
+					return 0, io.ErrUnexpectedEOF
+				}
+				iNdEx++
+				if dAtA[iNdEx-1] < 0x80 {
+					break
+				}
+			}
+			return iNdEx, nil
+		case 1:
+			iNdEx += 8
+			return iNdEx, nil
+		case 2:
+			var length int
+			for shift := uint(0); ; shift += 7 {
+				if shift >= 64 {
+					return 0, ErrIntOverflowServiceDataChunks
+				}
+				if iNdEx >= l {
+					return 0, io.ErrUnexpectedEOF
+				}
+				b := dAtA[iNdEx]
+				iNdEx++
+				length |= (int(b) & 0x7F) << shift
+				if b < 0x80 {
+					break
+				}
+			}
+			iNdEx += length
+			if length < 0 {
+				return 0, ErrInvalidLengthServiceDataChunks
+			}
+			return iNdEx, nil
+		case 3:
+			for {
+				var innerWire uint64
+				var start int = iNdEx
+				for shift := uint(0); ; shift += 7 {
+					if shift >= 64 {
+						return 0, ErrIntOverflowServiceDataChunks
+					}
+					if iNdEx >= l {
+						return 0, io.ErrUnexpectedEOF
+					}
+					b := dAtA[iNdEx]
+					iNdEx++
+					innerWire |= (uint64(b) & 0x7F) << shift
+					if b < 0x80 {
+						break
+					}
+				}
+				innerWireType := int(innerWire & 0x7)
+				if innerWireType == 4 {
+					break
+				}
+				next, err := skipServiceDataChunks(dAtA[start:])
+				if err != nil {
+					return 0, err
+				}
+				iNdEx = start + next
+			}
+			return iNdEx, nil
+		case 4:
+			return iNdEx, nil
+		case 5:
+			iNdEx += 4
+			return iNdEx, nil
+		default:
+			return 0, fmt.Errorf("proto: illegal wireType %d", wireType)
+		}
+	}
+	panic("unreachable")
+}
+
+var (
+	ErrInvalidLengthServiceDataChunks = fmt.Errorf("proto: negative length found during unmarshaling")
+	ErrIntOverflowServiceDataChunks   = fmt.Errorf("proto: integer overflow")
+)
+
+func init() {
+	proto.RegisterFile("lookout/sdk/service_data_chunks.proto", fileDescriptor_service_data_chunks_d7064662955d49f3)
+}
+
+var fileDescriptor_service_data_chunks_d7064662955d49f3 = []byte{
+	// 470 bytes of a gzipped FileDescriptorProto
+	0x1f, 0x8b, 0x08, 0x00, 0x00, 0x00, 0x00, 0x00, 0x02, 0xff, 0x74, 0x92, 0xcf, 0x6e, 0xd3, 0x40,
+	0x10, 0xc6, 0xbd, 0xc5, 0x09, 0xce, 0x36, 0x41, 0x65, 0xf9, 0x67, 0x45, 0xc5, 0x89, 0x82, 0x90,
+	0xd2, 0x03, 0x49, 0x15, 0x0e, 0x48, 0xdc, 0x68, 0x68, 0xb9, 0xa0, 0x82, 0xb6, 0xa9, 0x38, 0x46,
+	0x9b, 0x64, 0xec, 0xac, 0x62, 0x76, 0x83, 0x77, 0x1d, 0xa4, 0x3e, 0x05, 0x8f, 0x40, 0x5f, 0x84,
+	0x73, 0x8f, 0x3d, 0x72, 0x42, 0x25, 0x39, 0xf3, 0x0e, 0x68, 0x27, 0x6e, 0x4a, 0x0f, 0xdc, 0x66,
+	0x7e, 0xdf, 0xec, 0x78, 0xbe, 0x19, 0xd3, 0xe7, 0xa9, 0xd6, 0x33, 0x9d, 0xdb, 0xae, 0x99, 0xcc,
+	0xba, 0x06, 0xb2, 0x85, 0x1c, 0xc3, 0x70, 0x22, 0xac, 0x18, 0x8e, 0xa7, 0xb9, 0x9a, 0x99, 0xce,
+	0x3c, 0xd3, 0x56, 0xb3, 0xad, 0xf9, 0xa8, 0xfe, 0x22, 0x91, 0x76, 0x9a, 0x8f, 0x3a, 0x63, 0xfd,
+	0xb9, 0x9b, 0xe8, 0x44, 0x77, 0x51, 0x1a, 0xe5, 0x31, 0x66, 0x98, 0x60, 0xb4, 0x7e, 0x52, 0x7f,
+	0xf2, 0x6f, 0x67, 0x58, 0x80, 0xb2, 0x85, 0x10, 0xfd, 0xef, 0x93, 0x6b, 0xbd, 0xf5, 0x87, 0xd0,
+	0xfb, 0x47, 0x32, 0x85, 0x3e, 0x0e, 0xc0, 0xe1, 0x4b, 0x0e, 0xc6, 0xb2, 0x7d, 0x1a, 0x64, 0xb0,
+	0x90, 0x46, 0x6a, 0x15, 0x92, 0x26, 0x69, 0x6f, 0xf7, 0x1e, 0x76, 0xe6, 0xa3, 0x0e, 0x87, 0x18,
+	0x32, 0x50, 0x63, 0xf8, 0xa8, 0xa5, 0xb2, 0x90, 0xf1, 0x4d, 0x15, 0x63, 0xd4, 0x9f, 0x0b, 0x3b,
+	0x0d, 0xb7, 0x9a, 0xa4, 0x5d, 0xe1, 0x18, 0xb3, 0x67, 0xb4, 0xf6, 0x55, 0x28, 0x3b, 0x1c, 0x6b,
+	0x65, 0x41, 0x59, 0x13, 0xde, 0x69, 0x92, 0x76, 0xc0, 0xab, 0x0e, 0xf6, 0x0b, 0xc6, 0xf6, 0x68,
+	0x05, 0x8b, 0x72, 0x61, 0x6c, 0xe8, 0xbb, 0x82, 0x83, 0xea, 0xf2, 0x57, 0x23, 0xf8, 0x24, 0x94,
+	0x3d, 0x7d, 0x73, 0x32, 0xe0, 0x81, 0x93, 0x4f, 0x85, 0xb1, 0x9b, 0x7e, 0xa9, 0x50, 0x49, 0x2e,
+	0x12, 0x08, 0x4b, 0x37, 0xfd, 0xde, 0x17, 0x8c, 0x3d, 0xa5, 0x14, 0x97, 0x39, 0x34, 0xf2, 0x0c,
+	0xc2, 0x72, 0x93, 0xb4, 0x6b, 0xbc, 0x82, 0xe4, 0x44, 0x9e, 0x41, 0xeb, 0x07, 0xa1, 0x95, 0x8d,
+	0x5f, 0xb6, 0x4b, 0xfd, 0x58, 0xa6, 0x50, 0x78, 0x0c, 0x9c, 0x47, 0x27, 0x72, 0xa4, 0x6c, 0x8f,
+	0x96, 0x62, 0x09, 0xe9, 0x04, 0x4d, 0xdd, 0xeb, 0x3d, 0xb8, 0x96, 0xf1, 0x6d, 0xe7, 0xc8, 0x49,
+	0x7c, 0x5d, 0xc1, 0x1e, 0xd3, 0xb2, 0x8e, 0x63, 0x03, 0x16, 0x3d, 0xfa, 0xbc, 0xc8, 0xdc, 0x5a,
+	0x70, 0x0e, 0x1f, 0x29, 0xc6, 0x8e, 0xb9, 0x03, 0xe0, 0xf4, 0x55, 0x8e, 0x71, 0x2b, 0xa2, 0x25,
+	0xec, 0xc7, 0xb6, 0xe9, 0xdd, 0xfe, 0x87, 0xe3, 0xc1, 0xe1, 0xf1, 0x60, 0xc7, 0x63, 0x01, 0xf5,
+	0xdd, 0x0a, 0x76, 0xc8, 0xeb, 0xe0, 0xfb, 0x79, 0xc3, 0xbb, 0x3a, 0x6f, 0x90, 0xde, 0x21, 0xa5,
+	0x6f, 0x85, 0x15, 0xeb, 0x7b, 0xb1, 0x57, 0xb4, 0xf6, 0x0e, 0xec, 0xcd, 0x01, 0xd9, 0xa3, 0x5b,
+	0x43, 0x5e, 0x1f, 0xb4, 0x5e, 0xbb, 0x85, 0xf7, 0xc9, 0xc1, 0xee, 0xc5, 0xef, 0xc8, 0xbb, 0x58,
+	0x46, 0xe4, 0x72, 0x19, 0x91, 0xab, 0x65, 0x44, 0xbe, 0xad, 0x22, 0xef, 0x72, 0x15, 0x79, 0x3f,
+	0x57, 0x91, 0x37, 0x2a, 0xe3, 0xcf, 0xf1, 0xf2, 0x6f, 0x00, 0x00, 0x00, 0xff, 0xff, 0xb0, 0xf2,
+	0x9e, 0xca, 0xb1, 0x02, 0x00, 0x00,
+}
@@ -0,0 +1,9 @@
+"""
+Benchmarks of the hot paths of the SDK
+
+Run them from the `python` directory, e.g.:
+
+    python3 -m benchmarks.bench_grpc --output results.json
+
+Each benchmark writes its results as JSON, see `benchmarks.harness`.
+"""
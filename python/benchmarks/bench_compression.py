@@ -0,0 +1,170 @@
+"""
+CPU and bandwidth cost of the compression of the data streams
+
+Streams synthetic changes with UASTs through a proxy counting the bytes on
+the wire, for each compression algorithm and threshold, and reports the
+bytes and the CPU time of each call along with its latency. The proxy can
+limit the bandwidth to show when the compression pays off:
+
+    python3 -m benchmarks.bench_compression --bandwidth-mbps 100
+"""
+
+import argparse
+import socket
+import sys
+import threading
+import time
+
+import grpc
+
+from lookout.sdk import pb
+from lookout.sdk.grpc import create_channel, create_server
+from lookout.sdk.grpc.compression import CompressionOptions
+from lookout.sdk.service_data import DataStub
+
+from benchmarks import harness
+from benchmarks.synthetic import SyntheticDataServicer, make_changes
+
+
+class TrafficProxy:
+    """TCP proxy counting the bytes sent by the server to the clients
+
+    When `bandwidth` is given, in bytes per second, each direction of every
+    connection is throttled to it.
+
+    """
+    def __init__(self, target: str, bandwidth: float = None):
+        host, port = target.rsplit(":", 1)
+        self._target = (host, int(port))
+        self._bandwidth = bandwidth
+        self._sock = socket.socket()
+        self._sock.bind(("127.0.0.1", 0))
+        self._sock.listen(16)
+        self.address = "127.0.0.1:%d" % self._sock.getsockname()[1]
+        self._lock = threading.Lock()
+        self.received = 0
+        self._closed = False
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def close(self):
+        self._closed = True
+        self._sock.close()
+
+    def _accept(self):
+        while not self._closed:
+            try:
+                client, _ = self._sock.accept()
+            except OSError:
+                return
+
+            upstream = socket.create_connection(self._target)
+            for src, dst, count in ((client, upstream, False),
+                                    (upstream, client, True)):
+                threading.Thread(target=self._pipe, args=(src, dst, count),
+                                 daemon=True).start()
+
+    def _pipe(self, src, dst, count):
+        try:
+            while True:
+                data = src.recv(65536)
+                if not data:
+                    break
+
+                if count:
+                    with self._lock:
+                        self.received += len(data)
+                if self._bandwidth:
+                    time.sleep(len(data) / self._bandwidth)
+                dst.sendall(data)
+        except OSError:
+            pass
+        finally:
+            for sock in (src, dst):
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+
+
+SCENARIOS = [
+    ("identity", CompressionOptions(grpc.Compression.NoCompression)),
+    ("deflate", CompressionOptions(grpc.Compression.Deflate)),
+    ("gzip", CompressionOptions(grpc.Compression.Gzip)),
+    ("gzip_min_4k", CompressionOptions(grpc.Compression.Gzip, 4096)),
+    ("gzip_min_64k", CompressionOptions(grpc.Compression.Gzip, 65536)),
+]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().split(
+        "\n")[0])
+    parser.add_argument("--changes", type=int, default=50,
+                        help="Number of changes streamed by each call.")
+    parser.add_argument("--uast-nodes", type=int, default=200,
+                        help="Number of nodes of the UAST of each file.")
+    parser.add_argument("--content-bytes", type=int, default=4096,
+                        help="Size of the content of each file.")
+    parser.add_argument("--bandwidth-mbps", type=float, default=None,
+                        help="Bandwidth of the proxy in megabits per "
+                             "second, unlimited by default.")
+    harness.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    changes = make_changes(args.changes, args.uast_nodes, args.content_bytes)
+    message_bytes = sum(change.ByteSize() for change in changes)
+    bandwidth = args.bandwidth_mbps * 1e6 / 8 if args.bandwidth_mbps \
+        else None
+
+    # the server compresses only the calls asking for it
+    server = create_server(4, compression=grpc.Compression.NoCompression)
+    pb.add_dataservicer_to_server(SyntheticDataServicer(changes), server)
+    target = "127.0.0.1:%d" % server.add_insecure_port("127.0.0.1:0")
+    server.start()
+    proxy = TrafficProxy(target, bandwidth)
+    channel = create_channel(proxy.address)
+    stub = DataStub(channel)
+    request = pb.ChangesRequest(want_contents=True, want_uast=True)
+
+    results = []
+    try:
+        for name, compression in SCENARIOS:
+            if args.only and args.only not in name:
+                continue
+
+            def fn():
+                for _ in stub.get_changes(None, request,
+                                          compression=compression):
+                    pass
+
+            fn()  # the connection is established before measuring
+            received, cpu = proxy.received, time.process_time()
+            result = harness.run_benchmark(
+                name, fn, args.iterations, warmup=args.warmup,
+                concurrency=args.concurrency,
+                units={"messages": args.changes})
+            calls = args.iterations + args.warmup
+            time.sleep(0.05)  # the proxy may still be forwarding the end
+            result["wire_bytes"] = (proxy.received - received) / calls
+            result["compression_ratio"] = \
+                message_bytes / result["wire_bytes"] \
+                if result["wire_bytes"] else 0.0
+            result["cpu_ms"] = (time.process_time() - cpu) / calls * 1000
+            results.append(result)
+            print("%-16s p50 %8.2fms  cpu %8.2fms  %10.0f bytes (x%.1f)" % (
+                name, result["p50_ms"], result["cpu_ms"],
+                result["wire_bytes"], result["compression_ratio"]),
+                file=sys.stderr)
+    finally:
+        channel.close()
+        proxy.close()
+        server.stop(0)
+
+    params = dict(changes=args.changes, uast_nodes=args.uast_nodes,
+                  content_bytes=args.content_bytes,
+                  message_bytes=message_bytes,
+                  bandwidth_mbps=args.bandwidth_mbps, warmup=args.warmup)
+    return harness.report("compression", args, params, results)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
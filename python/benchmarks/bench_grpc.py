@@ -0,0 +1,186 @@
+"""
+Cost of the SDK layers for each RPC
+
+Streams synthetic changes from an in-process data servicer, and compares
+the generated gRPC stub with `DataStub`, with each interceptor on the client
+and on the server, and a review through an `AnalyzerServicer`.
+
+    python3 -m benchmarks.bench_grpc --changes 100 --uast-nodes 200
+"""
+
+import argparse
+import functools
+import os
+import sys
+
+from lookout.sdk import pb, service_data_pb2_grpc
+from lookout.sdk.grpc import create_channel, create_server, \
+    BufferedLogSink, LogUnaryClientInterceptor, LogStreamClientInterceptor, \
+    LogUnaryServerInterceptor, LogStreamServerInterceptor, \
+    MetricsUnaryClientInterceptor, MetricsStreamClientInterceptor, \
+    MetricsUnaryServerInterceptor, MetricsStreamServerInterceptor
+from lookout.sdk.grpc.metrics import MetricsRegistry
+from lookout.sdk.service_data import DataStub
+from lookout.sdk.test.mixins import find_free_port
+
+from benchmarks import harness
+from benchmarks.synthetic import SyntheticAnalyzer, SyntheticDataServicer, \
+    make_changes
+
+
+def discard_log(log_fields, msg):
+    pass
+
+
+class Servers:
+    """In-process servers and channels, created on demand and closed
+    together"""
+
+    def __init__(self, changes, max_workers):
+        self._changes = changes
+        self._max_workers = max_workers
+        self._servers = []
+        self._channels = []
+
+    def channel(self, target, interceptors=None):
+        """Returns a new channel to a server"""
+        channel = create_channel(target, interceptors=interceptors)
+        self._channels.append(channel)
+        return channel
+
+    def data(self, interceptors=None) -> str:
+        """Starts a data server and returns its address"""
+        return self._start(interceptors, lambda server: (
+            pb.add_dataservicer_to_server(
+                SyntheticDataServicer(self._changes), server)))
+
+    def analyzer(self, data_target) -> str:
+        """Starts an analyzer reading from the data server"""
+        channel = self.channel(data_target)
+        return self._start(None, lambda server: pb.add_analyzer_to_server(
+            SyntheticAnalyzer(channel), server))
+
+    def stop(self):
+        for channel in self._channels:
+            channel.close()
+        for server in self._servers:
+            server.stop(0)
+
+    def _start(self, interceptors, add_servicer):
+        target = "127.0.0.1:%d" % find_free_port()
+        server = create_server(self._max_workers,
+                               interceptors=interceptors)
+        add_servicer(server)
+        server.add_insecure_port(target)
+        server.start()
+        self._servers.append(server)
+        return target
+
+
+def consume(stream) -> int:
+    count = 0
+    for _ in stream:
+        count += 1
+
+    return count
+
+
+def scenarios(servers, log_sink):
+    """Yields the name and the operation of each benchmark"""
+    request = pb.ChangesRequest(want_contents=True, want_uast=True)
+    target = servers.data()
+
+    channel = servers.channel(target)
+    raw_stub = service_data_pb2_grpc.DataStub(channel)
+    yield "raw_grpc", lambda: consume(raw_stub.GetChanges(request))
+
+    stub = DataStub(channel)
+    yield "data_stub", functools.partial(consume_changes, stub, request)
+    yield "data_stub_prefetch", lambda: consume(stub.get_changes(
+        None, request, prefetch_messages=16))
+
+    client_interceptors = {
+        "log": lambda: [LogUnaryClientInterceptor(discard_log),
+                        LogStreamClientInterceptor(discard_log)],
+        "log_sink": lambda: [LogUnaryClientInterceptor(log_sink),
+                             LogStreamClientInterceptor(log_sink)],
+        "metrics": lambda: [
+            MetricsUnaryClientInterceptor(MetricsRegistry()),
+            MetricsStreamClientInterceptor(MetricsRegistry())],
+    }
+    server_interceptors = {
+        "log": lambda: [LogUnaryServerInterceptor(discard_log),
+                        LogStreamServerInterceptor(discard_log)],
+        "log_sink": lambda: [LogUnaryServerInterceptor(log_sink),
+                             LogStreamServerInterceptor(log_sink)],
+        "metrics": lambda: [
+            MetricsUnaryServerInterceptor(MetricsRegistry()),
+            MetricsStreamServerInterceptor(MetricsRegistry())],
+    }
+
+    for name, build in client_interceptors.items():
+        intercepted = DataStub(servers.channel(target,
+                                               interceptors=build()))
+        yield "client_interceptor_" + name, functools.partial(
+            consume_changes, intercepted, request)
+
+    for name, build in server_interceptors.items():
+        intercepted = DataStub(servers.channel(servers.data(build())))
+        yield "server_interceptor_" + name, functools.partial(
+            consume_changes, intercepted, request)
+
+    analyzer = pb.AnalyzerStub(servers.channel(servers.analyzer(target)))
+    yield "analyzer_review", lambda: analyzer.NotifyReviewEvent(
+        pb.ReviewEvent())
+
+
+def consume_changes(stub, request):
+    return consume(stub.get_changes(None, request))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().split(
+        "\n")[0])
+    parser.add_argument("--changes", type=int, default=50,
+                        help="Number of changes streamed by each call.")
+    parser.add_argument("--uast-nodes", type=int, default=50,
+                        help="Number of nodes of the UAST of each file.")
+    parser.add_argument("--content-bytes", type=int, default=1024,
+                        help="Size of the content of each file.")
+    parser.add_argument("--max-workers", type=int, default=10,
+                        help="Size of the thread pool of the servers.")
+    harness.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    changes = make_changes(args.changes, args.uast_nodes, args.content_bytes)
+    message_bytes = sum(change.ByteSize() for change in changes)
+    units = {"messages": args.changes, "bytes": message_bytes}
+
+    servers = Servers(changes, args.max_workers)
+    results = []
+    with open(os.devnull, "w") as log_stream:
+        log_sink = BufferedLogSink(log_stream)
+        try:
+            for name, fn in scenarios(servers, log_sink):
+                if args.only and args.only not in name:
+                    continue
+
+                results.append(harness.run_benchmark(
+                    name, fn, args.iterations, warmup=args.warmup,
+                    concurrency=args.concurrency, units=units))
+                print("%-32s p50 %8.2fms  p99 %8.2fms" % (
+                    name, results[-1]["p50_ms"], results[-1]["p99_ms"]),
+                    file=sys.stderr)
+        finally:
+            servers.stop()
+            log_sink.close()
+
+    params = dict(changes=args.changes, uast_nodes=args.uast_nodes,
+                  content_bytes=args.content_bytes,
+                  message_bytes=message_bytes, max_workers=args.max_workers,
+                  warmup=args.warmup)
+    return harness.report("grpc", args, params, results)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
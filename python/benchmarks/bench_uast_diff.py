@@ -0,0 +1,77 @@
+"""
+Cost of finding the changed nodes between the base and head UASTs
+
+Hashes the subtrees of a synthetic head UAST, and diffs it against a base
+which differs by a few tokens:
+
+    python3 -m benchmarks.bench_uast_diff --uast-nodes 20000 --modified 10
+"""
+
+import argparse
+import random
+import sys
+
+from lookout.sdk.uast_diff import diff_subtrees, Node, subtree_hashes
+
+from benchmarks import harness
+from benchmarks.synthetic import make_uast
+
+
+def make_head(base: Node, modified: int, seed: int) -> Node:
+    """Returns a copy of the base UAST with the tokens of random nodes
+    modified"""
+    head = Node()
+    head.CopyFrom(base)
+    nodes = [head]
+    for node in nodes:
+        nodes.extend(node.children)
+    for i, node in enumerate(random.Random(seed).sample(
+            nodes, min(modified, len(nodes)))):
+        node.token = "modified_%d" % i
+
+    return head
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().split(
+        "\n")[0])
+    parser.add_argument("--uast-nodes", type=int, default=20000,
+                        help="Number of nodes of the UASTs.")
+    parser.add_argument("--modified", type=int, default=10,
+                        help="Number of nodes modified in the head.")
+    parser.add_argument("--seed", type=int, default=1,
+                        help="Seed of the random modifications.")
+    harness.add_arguments(parser)
+    parser.set_defaults(iterations=10, warmup=1)
+    args = parser.parse_args(argv)
+
+    base = make_uast(args.uast_nodes)
+    head = make_head(base, args.modified, args.seed)
+    changed = len(diff_subtrees(base, head).changed)
+    print("%d/%d changed nodes" % (changed, args.uast_nodes), file=sys.stderr)
+
+    scenarios = [
+        ("hash", lambda: subtree_hashes(head)),
+        ("diff", lambda: diff_subtrees(base, head)),
+    ]
+
+    results = []
+    for name, fn in scenarios:
+        if args.only and args.only not in name:
+            continue
+
+        result = harness.run_benchmark(
+            name, fn, args.iterations, warmup=args.warmup,
+            units={"nodes": args.uast_nodes})
+        results.append(result)
+        print("%-16s p50 %8.2fms  %10.0f nodes/s" % (
+            name, result["p50_ms"], result["nodes_per_second"]),
+            file=sys.stderr)
+
+    params = dict(uast_nodes=args.uast_nodes, modified=args.modified,
+                  seed=args.seed, changed=changed, warmup=args.warmup)
+    return harness.report("uast_diff", args, params, results)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""
+Cost of evaluating several XPath queries on the same UAST
+
+Compares one traversal per query, as calling `bblfsh.filter` once per query
+does, with the single traversal of `lookout.sdk.uast_query.QuerySet`. When
+libuast is available, `bblfsh.filter` itself is measured too, after
+checking that it matches the same nodes as `QuerySet`:
+
+    python3 -m benchmarks.bench_uast_query --uast-nodes 5000 --queries 8
+"""
+
+import argparse
+import sys
+
+from lookout.sdk.uast_query import QuerySet
+
+try:
+    from bblfsh import filter as bblfsh_filter
+except ImportError:  # the client is built without libuast
+    bblfsh_filter = None
+
+from benchmarks import harness
+from benchmarks.synthetic import make_uast
+
+QUERIES = [
+    "//*[@roleIdentifier]",
+    "//Identifier",
+    "//*[@roleExpression and @token]",
+    "/File/Identifier",
+    "//Identifier[@startLine>=100]",
+    "//*[@token='name_1' or @token='name_2']",
+    "//Identifier//Identifier",
+    "//*[not(@roleIdentifier)]",
+]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().split(
+        "\n")[0])
+    parser.add_argument("--uast-nodes", type=int, default=5000,
+                        help="Number of nodes of the UAST.")
+    parser.add_argument("--queries", type=int, default=len(QUERIES),
+                        help="Number of queries evaluated, at most %d." %
+                             len(QUERIES))
+    harness.add_arguments(parser)
+    parser.set_defaults(iterations=10, warmup=1)
+    args = parser.parse_args(argv)
+
+    uast = make_uast(args.uast_nodes)
+    queries = QUERIES[:args.queries]
+    separate = [QuerySet([query]) for query in queries]
+    single = QuerySet(queries)
+    expected = single.count(uast)
+
+    def one_pass_per_query():
+        counts = {}
+        for query_set in separate:
+            counts.update(query_set.count(uast))
+        return counts
+
+    scenarios = [
+        ("pass_per_query", one_pass_per_query),
+        ("single_pass", lambda: single.count(uast)),
+    ]
+    if bblfsh_filter is not None:
+        nodes = single.filter(uast)
+        if any(list(bblfsh_filter(uast, query)) != nodes[query]
+               for query in queries):
+            print("bblfsh_filter: nodes differ from QuerySet",
+                  file=sys.stderr)
+            return 1
+
+        def filter_per_query():
+            return {query: sum(1 for _ in bblfsh_filter(uast, query))
+                    for query in queries}
+
+        scenarios.insert(0, ("bblfsh_filter", filter_per_query))
+
+    results = []
+    for name, fn in scenarios:
+        if args.only and args.only not in name:
+            continue
+
+        if fn() != expected:
+            print("%s: results differ" % name, file=sys.stderr)
+            return 1
+
+        result = harness.run_benchmark(
+            name, fn, args.iterations, warmup=args.warmup,
+            units={"nodes": args.uast_nodes})
+        results.append(result)
+        print("%-16s p50 %8.2fms  %10.0f nodes/s" % (
+            name, result["p50_ms"], result["nodes_per_second"]),
+            file=sys.stderr)
+
+    params = dict(uast_nodes=args.uast_nodes, queries=queries,
+                  warmup=args.warmup, libuast=bblfsh_filter is not None)
+    return harness.report("uast_query", args, params, results)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
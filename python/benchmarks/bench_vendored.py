@@ -0,0 +1,135 @@
+"""
+Cost of the detection of the vendored paths
+
+Matches a synthetic tree of paths, with the layout of a monorepo with some
+vendored directories and bundled libraries, against the linguist patterns:
+
+    - naive: every pattern is searched in every path,
+    - combined: a single regex made of all the patterns, it's slower than
+      the naive one because `re` tries every alternative at every position,
+    - matcher: `lookout.sdk.vendored.VendoredMatcher`, compiled for each
+      pass so that its directory cache starts empty,
+    - matcher_warm: the same matcher is reused by every pass.
+
+The naive and the combined ones only match a sample of the paths, they are
+too slow for the whole tree.
+
+    python3 -m benchmarks.bench_vendored --paths 1000000
+"""
+
+import argparse
+import random
+import re
+import sys
+from typing import List
+
+from lookout.sdk.vendored import VENDOR_PATTERNS, VendoredMatcher
+
+from benchmarks import harness
+
+_DIRS = ["src", "lib", "pkg", "internal", "cmd", "app", "web", "api",
+         "core", "util", "models", "views", "services", "static", "docs",
+         "tests", "tools", "scripts", "assets", "components"]
+_VENDORED_DIRS = ["vendor", "third_party", "node_modules", "dist", "cache",
+                  "external", "Carthage"]
+_NAMES = ["main", "server", "client", "handler", "config", "index", "utils",
+          "model", "view", "routes", "store", "parser", "types", "errors"]
+_EXTENSIONS = ["go", "py", "js", "ts", "java", "rb", "css", "scss", "md",
+               "json", "yml", "c", "h", "cpp"]
+_BUNDLED = ["jquery.min.js", "bootstrap.css", "angular.js", "react.js",
+            "d3.v4.min.js", "index.d.ts", "gradlew", "configure",
+            "font-awesome.css", ".gitignore"]
+
+
+def make_paths(count: int, files_per_dir: int = 10,
+               seed: int = 0) -> List[str]:
+    """Returns a synthetic tree of `count` file paths
+
+    The directories are up to 6 levels deep, about 2% of them are vendored
+    and 1% of the files are bundled libraries.
+
+    """
+    rnd = random.Random(seed)
+    paths = []
+    while len(paths) < count:
+        parts = [rnd.choice(_DIRS) for _ in range(rnd.randint(1, 6))]
+        parts[-1] += str(len(paths) // files_per_dir)
+        if rnd.random() < 0.02:
+            parts.insert(rnd.randrange(len(parts)), rnd.choice(_VENDORED_DIRS))
+        directory = "/".join(parts)
+        for i in range(min(files_per_dir, count - len(paths))):
+            if rnd.random() < 0.01:
+                name = rnd.choice(_BUNDLED)
+            else:
+                name = "%s%d.%s" % (rnd.choice(_NAMES), i,
+                                    rnd.choice(_EXTENSIONS))
+            paths.append(directory + "/" + name)
+
+    return paths
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().split(
+        "\n")[0])
+    parser.add_argument("--paths", type=int, default=1000000,
+                        help="Number of paths of the tree.")
+    parser.add_argument("--files-per-dir", type=int, default=10,
+                        help="Number of files of each directory.")
+    parser.add_argument("--sample-paths", type=int, default=5000,
+                        help="Number of paths matched by the naive and the "
+                             "combined matchers.")
+    harness.add_arguments(parser)
+    parser.set_defaults(iterations=3, warmup=0)
+    args = parser.parse_args(argv)
+
+    paths = make_paths(args.paths, args.files_per_dir)
+    sample = paths[:args.sample_paths]
+    regexes = [re.compile(p) for p in VENDOR_PATTERNS]
+    combined = re.compile("|".join("(?:%s)" % p for p in VENDOR_PATTERNS))
+    warm = VendoredMatcher()
+
+    def naive(path):
+        return any(regex.search(path) for regex in regexes)
+
+    expected = [naive(path) for path in sample]
+    scenarios = [
+        ("naive", sample, lambda: naive),
+        ("combined", sample, lambda: lambda path: combined.search(path)
+         is not None),
+        ("matcher", paths, lambda: VendoredMatcher()),
+        ("matcher_warm", paths, lambda: warm),
+    ]
+
+    results = []
+    for name, scenario_paths, build in scenarios:
+        if args.only and args.only not in name:
+            continue
+
+        if [build()(path) for path in sample] != expected:
+            print("%s: results differ from the naive matcher" % name,
+                  file=sys.stderr)
+            return 1
+
+        def fn():
+            match = build()
+            return sum(1 for path in scenario_paths if match(path))
+
+        vendored = fn()
+        result = harness.run_benchmark(
+            name, fn, args.iterations, warmup=args.warmup,
+            units={"paths": len(scenario_paths)})
+        result["paths"] = len(scenario_paths)
+        result["vendored"] = vendored
+        results.append(result)
+        print("%-14s %10.0f paths/s  %8.2fms per pass  %d vendored" % (
+            name, result["paths_per_second"], result["p50_ms"], vendored),
+            file=sys.stderr)
+
+    params = dict(paths=args.paths, files_per_dir=args.files_per_dir,
+                  sample_paths=args.sample_paths,
+                  patterns=len(VENDOR_PATTERNS), warmup=args.warmup)
+    return harness.report("vendored", args, params, results)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+"""
+Measurement, reporting and comparison of the benchmarks
+
+The results are written as a JSON document:
+
+    {
+        "benchmark": "grpc",
+        "environment": {"python": ..., "grpcio": ..., "protobuf": ...},
+        "params": {...},
+        "results": [
+            {"name": ..., "iterations": ..., "concurrency": ...,
+             "seconds": ..., "ops_per_second": ..., "mean_ms": ...,
+             "p50_ms": ..., "p99_ms": ..., "max_ms": ..., ...},
+        ]
+    }
+
+so that they can be compared with a baseline to gate the regressions.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from lookout.sdk.loadgen import percentile
+
+
+def run_benchmark(name: str, fn: Callable[[], Any], iterations: int,
+                  warmup: int = 0, concurrency: int = 1,
+                  units: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """Runs a benchmark and returns its results
+
+    :param name: name of the benchmark.
+    :param fn: function running a single operation.
+    :param iterations: number of measured operations.
+    :param warmup: number of operations run before measuring.
+    :param concurrency: number of threads running the operations.
+    :param units: optional amount of work done by each operation, e.g.
+        `{"messages": 100}`, reported as throughput per second.
+    :returns: the results, as a JSON-serializable dict.
+
+    """
+    for _ in range(warmup):
+        fn()
+
+    def timed(_):
+        start = time.perf_counter()
+        fn()
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            latencies = list(executor.map(timed, range(iterations)))
+    else:
+        latencies = [timed(i) for i in range(iterations)]
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    result = {
+        "name": name,
+        "iterations": iterations,
+        "concurrency": concurrency,
+        "seconds": elapsed,
+        "ops_per_second": iterations / elapsed if elapsed else 0.0,
+        "mean_ms": sum(latencies) / len(latencies) * 1000,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": latencies[-1] * 1000,
+    }
+    for unit, amount in (units or {}).items():
+        result[unit + "_per_second"] = amount * iterations / elapsed \
+            if elapsed else 0.0
+
+    return result
+
+
+def environment() -> Dict[str, str]:
+    """Returns the versions of the components affecting the results"""
+    env = {"python": platform.python_version(),
+           "implementation": platform.python_implementation(),
+           "machine": platform.machine()}
+    for module in ("grpc", "google.protobuf"):
+        try:
+            mod = __import__(module, fromlist=["__version__"])
+            env[module.rsplit(".", 1)[-1]] = getattr(mod, "__version__", "")
+        except ImportError:
+            pass
+
+    try:
+        from google.protobuf.internal import api_implementation
+        env["protobuf_implementation"] = api_implementation.Type()
+    except ImportError:
+        pass
+
+    return env
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any],
+            max_regression: float, metric: str = "p50_ms") -> List[str]:
+    """Returns the benchmarks slower than in the baseline
+
+    :param baseline: the report of the baseline run.
+    :param current: the report of the current run.
+    :param max_regression: maximum allowed slowdown, e.g. 0.2 for 20%.
+    :param metric: the latency compared.
+    :returns: a description of each regression.
+
+    """
+    before = {r["name"]: r for r in baseline.get("results", [])}
+    regressions = []
+    for result in current["results"]:
+        base = before.get(result["name"])
+        if base is None or not base.get(metric):
+            continue
+
+        ratio = result[metric] / base[metric]
+        if ratio > 1 + max_regression:
+            regressions.append("%s: %s %.3f -> %.3f (+%.0f%%)" % (
+                result["name"], metric, base[metric], result[metric],
+                (ratio - 1) * 100))
+
+    return regressions
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """Adds the options shared by all the benchmarks"""
+    parser.add_argument("--iterations", type=int, default=50,
+                        help="Number of measured operations.")
+    parser.add_argument("--warmup", type=int, default=5,
+                        help="Number of operations run before measuring.")
+    parser.add_argument("--concurrency", type=int, default=1,
+                        help="Number of threads running the operations.")
+    parser.add_argument("--only", default=None,
+                        help="Run only the benchmarks containing this text.")
+    parser.add_argument("--output", default="-",
+                        help="Path of the JSON report, - for stdout.")
+    parser.add_argument("--baseline", default=None,
+                        help="JSON report to compare the results with, the "
+                             "exit code is 1 if there are regressions.")
+    parser.add_argument("--max-regression", type=float, default=0.2,
+                        help="Maximum allowed slowdown of the p50 latency "
+                             "with respect to the baseline.")
+
+
+def report(name: str, args: argparse.Namespace, params: Dict[str, Any],
+           results: List[Dict[str, Any]]) -> int:
+    """Writes the report, compares it with the baseline and returns the
+    exit code"""
+    doc = {"benchmark": name, "environment": environment(),
+           "params": params, "results": results}
+    data = json.dumps(doc, indent=2, sort_keys=True)
+    if args.output == "-":
+        print(data)
+    else:
+        with open(args.output, "w") as f:
+            f.write(data + "\n")
+
+    if args.baseline is None:
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+
+    regressions = compare(baseline, doc, args.max_regression)
+    for regression in regressions:
+        print("regression: " + regression, file=sys.stderr)
+
+    return 1 if regressions else 0
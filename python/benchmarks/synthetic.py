@@ -0,0 +1,118 @@
+"""
+Synthetic data servicer and analyzer used by the benchmarks
+
+The messages are built once, so that the data servicer only costs their
+serialization, and the measures reflect the client side of the SDK.
+"""
+
+from lookout.sdk import pb
+from lookout.sdk.service_data import DataStub
+
+
+def make_uast(nodes: int, fanout: int = 4):
+    """Returns a UAST with the given number of nodes
+
+    The nodes are laid out breadth-first, each one with up to `fanout`
+    children, with a token, roles and a position like the real ones.
+
+    """
+    f = pb.File()
+    root = f.uast
+    root.internal_type = "File"
+    queue = [root]
+    created = 1
+    while created < nodes:
+        parent = queue.pop(0)
+        for _ in range(min(fanout, nodes - created)):
+            child = parent.children.add()
+            child.internal_type = "Identifier"
+            child.token = "name_%d" % created
+            child.roles.extend([18, 1])
+            child.start_position.offset = created * 10
+            child.start_position.line = created
+            child.start_position.col = 1
+            queue.append(child)
+            created += 1
+
+    return root
+
+
+def make_file(i: int, uast_nodes: int, content_bytes: int) -> pb.File:
+    """Returns a synthetic file"""
+    line = b"print('hello world')\n"
+    content = (line * (content_bytes // len(line) + 1))[:content_bytes]
+    f = pb.File(path="src/file_%d.py" % i, hash="%040x" % i,
+                language="Python", content=content)
+    if uast_nodes:
+        f.uast.CopyFrom(make_uast(uast_nodes))
+
+    return f
+
+
+def make_changes(count: int, uast_nodes: int, content_bytes: int):
+    """Returns synthetic changes, with the same file as base and head"""
+    changes = []
+    for i in range(count):
+        f = make_file(i, uast_nodes, content_bytes)
+        changes.append(pb.Change(base=f, head=f))
+
+    return changes
+
+
+class SyntheticDataServicer(pb.DataServicer):
+    """Data servicer streaming the same pre-built changes for any request"""
+
+    def __init__(self, changes):
+        self.changes = changes
+
+    def GetChanges(self, request, context):
+        for change in self.changes:
+            yield change
+
+    def GetFiles(self, request, context):
+        for change in self.changes:
+            yield change.head
+
+
+class SyntheticAnalyzer(pb.AnalyzerServicer):
+    """Analyzer counting the UAST nodes of the changed files
+
+    It goes through the whole SDK stack: the event is received by an
+    `AnalyzerServicer`, the changes are fetched with `DataStub` and a
+    comment is returned for each file.
+
+    """
+    version = "benchmark"
+
+    def __init__(self, data_channel):
+        self.data_stub = DataStub(data_channel)
+
+    def notify_review_event(self, request, context):
+        changes = self.data_stub.get_changes(context, pb.ChangesRequest(
+            head=request.commit_revision.head,
+            base=request.commit_revision.base,
+            want_contents=True, want_uast=True))
+
+        comments = []
+        for change in changes:
+            nodes = count_nodes(change.head.uast)
+            comments.append(pb.Comment(file=change.head.path,
+                                       text="%d nodes" % nodes))
+
+        return pb.EventResponse(analyzer_version=self.version,
+                                comments=comments)
+
+    def notify_push_event(self, request, context):
+        return pb.EventResponse(analyzer_version=self.version)
+
+
+def count_nodes(node) -> int:
+    """Returns the number of nodes of a UAST"""
+    count = 0
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        count += 1
+        stack.extend(node.children)
+
+    return count
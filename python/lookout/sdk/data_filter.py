@@ -0,0 +1,132 @@
+"""
+Filters of the files requested to the data service
+
+`ChangesRequest` and `FilesRequest` select the files by their path, with
+`include_pattern`, `exclude_pattern` and `exclude_vendored`, and by their
+language, with `include_languages`. `RequestFilter` compiles them once per
+distinct combination, so that a data server only pays a few regex searches
+per file, and it splits the checks on the paths, which can be done before
+reading anything, from the ones on the languages, which may require the
+contents of the file.
+
+See `lookout.sdk.service_data.DataServicer.request_filter`.
+"""
+
+import functools
+import re
+from typing import Callable, Iterable, Optional, Union
+
+from lookout.sdk import service_data_pb2
+
+REQUEST_FILTER_CACHE_SIZE = 256
+
+DataRequest = Union[service_data_pb2.ChangesRequest,
+                    service_data_pb2.FilesRequest]
+
+
+class RequestFilter:
+    """Compiled filter of the files of a request
+
+    The filter should be used in two steps:
+
+        if not request_filter.match_path(path):
+            continue
+        language = ...  # only if needed
+        if not request_filter.match_language(language):
+            continue
+
+    `match_path` and `match_language` are replaced by constant functions
+    when the request doesn't filter the paths or the languages, and
+    `match_path` by the only check when there is a single one, so that each
+    file costs as few calls as possible.
+
+    """
+    def __init__(self, include_pattern: str = "", exclude_pattern: str = "",
+                 include_languages: Iterable[str] = (),
+                 exclude_vendored: bool = False,
+                 is_vendored: Optional[Callable[[str], bool]] = None):
+        """Compiles the filter
+
+        :param include_pattern: regular expression the paths must match.
+        :param exclude_pattern: regular expression the paths must not match.
+        :param include_languages: languages of the files, case insensitive,
+            any language if empty.
+        :param exclude_vendored: whether the vendored files are excluded.
+        :param is_vendored: function telling whether a path is vendored,
+            `exclude_vendored` is ignored without it.
+
+        :raises re.error: if a pattern is invalid.
+
+        """
+        self._path_checks = path_checks = []
+        if include_pattern:
+            include = re.compile(include_pattern).search
+            path_checks.append(lambda path: include(path) is not None)
+        if exclude_pattern:
+            exclude = re.compile(exclude_pattern).search
+            path_checks.append(lambda path: exclude(path) is None)
+        if exclude_vendored and is_vendored is not None:
+            path_checks.append(lambda path: not is_vendored(path))
+
+        if not path_checks:
+            self.match_path = _match_any
+        elif len(path_checks) == 1:
+            self.match_path = path_checks[0]
+
+        self.languages = frozenset(lang.lower() for lang in include_languages)
+        if not self.languages:
+            self.match_language = _match_any
+
+    @property
+    def match_all(self) -> bool:
+        """Returns whether every file matches"""
+        return self.match_path is _match_any and not self.languages
+
+    @property
+    def needs_language(self) -> bool:
+        """Returns whether `match_language` depends on the language"""
+        return bool(self.languages)
+
+    def match_path(self, path: str) -> bool:
+        """Returns whether the path matches the path filters"""
+        return all(check(path) for check in self._path_checks)
+
+    def match_language(self, language: str) -> bool:
+        """Returns whether the language is one of the included ones"""
+        return language.lower() in self.languages
+
+    def matches(self, path: str, language: str) -> bool:
+        """Returns whether a file matches the whole filter"""
+        return self.match_path(path) and self.match_language(language)
+
+
+def _match_any(_) -> bool:
+    return True
+
+
+@functools.lru_cache(maxsize=REQUEST_FILTER_CACHE_SIZE)
+def _compile(include_pattern, exclude_pattern, include_languages,
+             exclude_vendored, is_vendored) -> RequestFilter:
+    return RequestFilter(include_pattern, exclude_pattern, include_languages,
+                         exclude_vendored, is_vendored)
+
+
+def request_filter(request: DataRequest,
+                   is_vendored: Optional[Callable[[str], bool]] = None
+                   ) -> RequestFilter:
+    """Returns the filter of a `ChangesRequest` or of a `FilesRequest`
+
+    The filters are cached by the filtering fields of the requests, so the
+    patterns of the requests coming from the same analyzer are compiled
+    once.
+
+    :param request: the data request.
+    :param is_vendored: function telling whether a path is vendored, see
+        `RequestFilter`. It's part of the cache key, so it must be the same
+        object for every request.
+    :raises re.error: if a pattern of the request is invalid.
+
+    """
+    return _compile(request.include_pattern, request.exclude_pattern,
+                    tuple(request.include_languages),
+                    request.exclude_vendored, is_vendored)
@@ -0,0 +1,252 @@
+import hashlib
+import mmap
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Mapping, Optional, Tuple
+
+from google.protobuf.message import DecodeError
+
+from lookout.sdk import service_data_pb2
+from lookout.sdk.service_data import FileCache
+
+
+def driver_versions(client) -> Dict[str, str]:
+    """Returns the versions of the drivers of a Babelfish server
+
+    :param client: the `bblfsh.BblfshClient` of the server.
+    :returns: the mapping from a language, lowercase, to the version of its
+        driver, as expected by `DiskFileCache`.
+
+    """
+    return {driver.language.lower(): driver.version
+            for driver in client.supported_languages()}
+
+
+class DiskFileCache:
+    """Persistent cache of files, addressed by the hash of their blob
+
+    Same as `lookout.sdk.service_data.FileCache`, but the files are stored
+    serialized in a directory, so that the cache survives the restarts of
+    the analyzer: after a deploy, the UASTs of the files already seen don't
+    need to be fetched from the data server again.
+
+    Since a different version of a Babelfish driver can produce a different
+    UAST for the same blob, the version of the driver is part of the key of
+    the UASTs, see `driver_versions`. The UASTs of the languages without a
+    known version are keyed by the versions of every driver instead.
+
+    The files are read through `mmap`, and written to a temporary file that
+    is atomically renamed once complete, so that a crash never leaves a
+    truncated entry behind. The total size of the directory is bounded, the
+    least recently used files are evicted first.
+
+    An in-memory `FileCache` can be put in front of the disk, to avoid
+    decoding the most used files again.
+
+    The cache is thread-safe, and it can be passed to
+    `lookout.sdk.service_data.DataStub` in place of a `FileCache`.
+
+    """
+    SUFFIX = ".pb"
+    STALE_TMP_SECONDS = 60 * 60
+
+    def __init__(self, path: str, max_bytes: int,
+                 driver_versions: Mapping[str, str],
+                 memory_cache: Optional[FileCache] = None):
+        """Initializes the cache, loading the index of the existing entries
+
+        :param path: the directory where the files are stored, it is created
+            if it doesn't exist.
+        :param max_bytes: maximum total size of the stored files.
+        :param driver_versions: mapping from a language, lowercase, to the
+            version of the Babelfish driver used for it, see
+            `driver_versions`.
+        :param memory_cache: optional in-memory cache checked before the disk.
+
+        """
+        self._path = path
+        self._max_bytes = max_bytes
+        self._driver_versions = dict(driver_versions)
+        self._all_versions = hashlib.sha1(repr(sorted(
+            self._driver_versions.items())).encode("utf-8")).hexdigest()
+        self._memory_cache = memory_cache
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(path, exist_ok=True)
+        self._load_index()
+
+    def key(self, f: service_data_pb2.File, want_uast: bool,
+            want_contents: bool) -> Tuple[Hashable, ...]:
+        """Returns the cache key of a file for the requested data"""
+        driver_version = ""
+        if want_uast:
+            driver_version = self._driver_versions.get(
+                f.language.lower(), self._all_versions)
+
+        return f.hash, want_uast, want_contents, f.language, driver_version
+
+    @property
+    def size(self) -> int:
+        """Returns the total size in bytes of the stored files"""
+        return self._size
+
+    def __len__(self) -> int:
+        """Returns the number of stored files"""
+        return len(self._entries)
+
+    def get(self, key: Tuple[Hashable, ...]
+            ) -> Optional[service_data_pb2.File]:
+        """Returns the cached file for the key, or None if it is missing"""
+        if self._memory_cache is not None:
+            f = self._memory_cache.get(key)
+            if f is not None:
+                with self._lock:
+                    self.hits += 1
+                return f
+
+        name = self._entry_name(key)
+        with self._lock:
+            if name not in self._entries:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(name)
+
+        filepath = os.path.join(self._path, name)
+        try:
+            f = self._read(filepath)
+            # the modification time keeps the LRU order across restarts
+            os.utime(filepath)
+        except (OSError, ValueError, DecodeError):
+            # removed by another process or corrupted: treat it as a miss
+            with self._lock:
+                self._forget(name)
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+
+        if self._memory_cache is not None:
+            self._memory_cache.put(key, f)
+
+        return f
+
+    def put(self, key: Tuple[Hashable, ...], f: service_data_pb2.File):
+        """Stores a file, evicting the least recently used ones
+
+        Files bigger than the whole cache are not stored.
+
+        """
+        if self._memory_cache is not None:
+            self._memory_cache.put(key, f)
+
+        data = f.SerializeToString()
+        if len(data) > self._max_bytes:
+            return
+
+        name = self._entry_name(key)
+        filepath = os.path.join(self._path, name)
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(filepath),
+                                   suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fp:
+                fp.write(data)
+                fp.flush()
+                os.fsync(fp.fileno())
+            os.replace(tmp, filepath)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+        with self._lock:
+            self._forget(name)
+            self._entries[name] = len(data)
+            self._size += len(data)
+            self._evict()
+
+    def clear(self):
+        """Removes every stored file"""
+        with self._lock:
+            for name in list(self._entries):
+                self._forget(name)
+                try:
+                    os.unlink(os.path.join(self._path, name))
+                except OSError:
+                    pass
+
+        if self._memory_cache is not None:
+            self._memory_cache.clear()
+
+    def _entry_name(self, key):
+        digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+        return os.path.join(digest[:2], digest + self.SUFFIX)
+
+    def _forget(self, name):
+        size = self._entries.pop(name, None)
+        if size is not None:
+            self._size -= size
+
+    def _evict(self):
+        while self._size > self._max_bytes:
+            evicted = next(iter(self._entries))
+            self._forget(evicted)
+            try:
+                os.unlink(os.path.join(self._path, evicted))
+            except OSError:
+                pass
+
+    def _read(self, filepath):
+        with open(filepath, "rb") as fp:
+            if os.fstat(fp.fileno()).st_size == 0:
+                return service_data_pb2.File()
+
+            with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                try:
+                    return service_data_pb2.File.FromString(mm)
+                except DecodeError as exc:
+                    # the traceback keeps views of the map alive, which
+                    # would make closing it fail
+                    err = DecodeError(str(exc))
+
+                raise err
+
+    def _load_index(self):
+        entries = []
+        for root, _, filenames in os.walk(self._path):
+            for filename in filenames:
+                filepath = os.path.join(root, filename)
+                try:
+                    st = os.stat(filepath)
+                except OSError:
+                    continue
+
+                if filename.endswith(".tmp"):
+                    # left behind by a crash during a write, recent ones can
+                    # still be written by another process sharing the cache
+                    if st.st_mtime < time.time() - self.STALE_TMP_SECONDS:
+                        os.unlink(filepath)
+                    continue
+
+                if not filename.endswith(self.SUFFIX):
+                    continue
+
+                name = os.path.relpath(filepath, self._path)
+                entries.append((st.st_mtime, name, st.st_size))
+
+        for _, name, size in sorted(entries):
+            self._entries[name] = size
+            self._size += size
+
+        self._evict()
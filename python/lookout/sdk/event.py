@@ -0,0 +1,37 @@
+import hashlib
+from typing import Union
+
+from lookout.sdk.event_pb2 import PushEvent, ReviewEvent
+
+
+def compute_event_id(*content: str) -> str:
+    """Computes the hash identifying an event from the given strings
+
+    Python counterpart of `pb.ComputeEventID` in the Go SDK, the id is
+    returned hex encoded, as `pb.EventID.String`.
+
+    :param content: the strings identifying the event.
+    :returns: the hex encoded SHA1 of the strings joined by "|".
+
+    """
+    return hashlib.sha1("|".join(content).encode("utf-8")).hexdigest()
+
+
+def event_id(event: Union[ReviewEvent, PushEvent]) -> str:
+    """Returns the id of an event
+
+    The id is the same computed by `ReviewEvent.ID` and `PushEvent.ID` in the
+    Go SDK, so it matches the one used by lookout.
+
+    :param event: a review or push event.
+    :returns: the hex encoded id of the event.
+
+    """
+    if isinstance(event, ReviewEvent):
+        return compute_event_id(event.provider, event.internal_id,
+                                event.commit_revision.head.hash)
+
+    if isinstance(event, PushEvent):
+        return compute_event_id(event.provider, event.internal_id)
+
+    raise TypeError("unsupported event type %s" % type(event).__name__)
@@ -0,0 +1,443 @@
+import os
+import re
+import subprocess
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, \
+    Tuple
+
+import grpc
+
+from lookout.sdk import event_pb2, service_data_pb2, service_data_chunks_pb2
+from lookout.sdk.service_data import DataServicer
+from lookout.sdk.service_data_chunks import data_chunks
+
+# Languages of the most common file extensions and names, named as enry
+EXTENSION_LANGUAGES = {
+    ".bash": "Shell", ".c": "C", ".cc": "C++", ".cpp": "C++", ".cs": "C#",
+    ".css": "CSS", ".cxx": "C++", ".go": "Go", ".h": "C", ".hh": "C++",
+    ".hpp": "C++", ".html": "HTML", ".java": "Java", ".js": "JavaScript",
+    ".json": "JSON", ".jsx": "JavaScript", ".kt": "Kotlin", ".md": "Markdown",
+    ".php": "PHP", ".pl": "Perl", ".proto": "Protocol Buffer",
+    ".py": "Python", ".rb": "Ruby", ".rs": "Rust", ".scala": "Scala",
+    ".sh": "Shell", ".sql": "SQL", ".swift": "Swift", ".toml": "TOML",
+    ".ts": "TypeScript", ".tsx": "TypeScript", ".xml": "XML",
+    ".yaml": "YAML", ".yml": "YAML",
+}
+FILENAME_LANGUAGES = {
+    "Dockerfile": "Dockerfile", "Makefile": "Makefile",
+    "CMakeLists.txt": "CMake", "Gemfile": "Ruby", "Rakefile": "Ruby",
+}
+
+
+def guess_language(path: str) -> str:
+    """Returns the language of a file from its name, or an empty string
+
+    This is a small subset of what enry detects from the name only, pass a
+    better function to `GitDataServicer` when needed.
+
+    """
+    name = os.path.basename(path)
+    language = FILENAME_LANGUAGES.get(name)
+    if language is None:
+        language = EXTENSION_LANGUAGES.get(
+            os.path.splitext(name)[1].lower(), "")
+
+    return language
+
+
+class UnknownRevisionError(ValueError):
+    """Raised when a revision is not found in the repository"""
+
+
+class TreeEntry(NamedTuple):
+    """File of a git tree"""
+    path: str
+    mode: int
+    hash: str
+
+
+class GitRepository:
+    """Read-only access to a local git repository through the git binary
+
+    The trees, their index by path and the diffs are cached by commit, and
+    the blobs in an LRU cache bounded in bytes, so that the files unchanged
+    between the events are read only once. The blobs are read by a
+    long-running `git cat-file --batch` process.
+
+    Invalid reference pointers raise `ValueError`, or
+    `UnknownRevisionError` when they are not found in the repository. The
+    other failures of git, e.g. a missing repository, raise `RuntimeError`.
+
+    The repository is thread-safe.
+
+    """
+    def __init__(self, path: str, git: str = "git",
+                 tree_cache_size: int = 32,
+                 blob_cache_bytes: int = 64 * 1024 * 1024):
+        """Initializes the repository
+
+        :param path: the path of the repository, either bare or not.
+        :param git: the git binary.
+        :param tree_cache_size: maximum number of cached trees, indexes,
+            diffs and verified commits.
+        :param blob_cache_bytes: maximum total size of the cached blobs.
+
+        """
+        self.path = path
+        self._git = git
+        self._tree_cache_size = tree_cache_size
+        self._blob_cache_bytes = blob_cache_bytes
+        self._lock = threading.Lock()
+        self._commits = OrderedDict()
+        self._trees = OrderedDict()
+        self._indexes = OrderedDict()
+        self._diffs = OrderedDict()
+        self._blobs = OrderedDict()
+        self._blobs_size = 0
+        self._batch_lock = threading.Lock()
+        self._batch = None
+
+    def resolve(self, pointer: event_pb2.ReferencePointer) -> str:
+        """Returns the hash of the commit a reference pointer points to
+
+        The hash of the pointer is used if set, otherwise its reference name
+        is resolved in the repository. The existence of a hash is checked
+        once, the references are resolved every time since they can move.
+
+        :raises ValueError: if the pointer has neither hash nor reference
+            name, or if it is not a valid revision.
+        :raises UnknownRevisionError: if it is not found.
+
+        """
+        revision = pointer.hash or pointer.reference_name
+        if not revision:
+            raise ValueError("the reference pointer has neither hash nor "
+                             "reference name")
+        if revision.startswith("-"):
+            raise ValueError("invalid revision %s" % revision)
+
+        if re.fullmatch("[0-9a-f]{40}", revision):
+            return self._cached(self._commits, revision,
+                                lambda: self._rev_parse(revision))
+
+        return self._rev_parse(revision)
+
+    def tree(self, commit: str) -> List[TreeEntry]:
+        """Returns the files of a commit, sorted by path
+
+        Submodules are not included.
+
+        """
+        return self._cached(self._trees, commit, lambda: [
+            TreeEntry(path, mode, hash)
+            for path, mode, hash in self._ls_tree(commit)])
+
+    def entry(self, commit: str, path: str) -> Optional[TreeEntry]:
+        """Returns the file of a commit at a path, or None
+
+        The tree is indexed by path on the first lookup.
+
+        """
+        return self._index(commit).get(path)
+
+    def diff(self, base: str, head: str
+             ) -> List[Tuple[Optional[TreeEntry], Optional[TreeEntry]]]:
+        """Returns the files changed between two commits, sorted by path
+
+        Each change is a pair (base, head), one of them is None for added or
+        deleted files. Renames are reported as a deletion and an addition.
+
+        """
+        return self._cached(self._diffs, (base, head),
+                            lambda: self._diff_tree(base, head))
+
+    def blob(self, hash: str) -> bytes:
+        """Returns the contents of a blob"""
+        with self._lock:
+            data = self._blobs.get(hash)
+            if data is not None:
+                self._blobs.move_to_end(hash)
+                return data
+
+        data = self._cat_file(hash)
+        if len(data) <= self._blob_cache_bytes:
+            with self._lock:
+                if hash not in self._blobs:
+                    self._blobs[hash] = data
+                    self._blobs_size += len(data)
+                while self._blobs_size > self._blob_cache_bytes:
+                    _, evicted = self._blobs.popitem(last=False)
+                    self._blobs_size -= len(evicted)
+
+        return data
+
+    def close(self):
+        """Stops the git process reading the blobs"""
+        with self._batch_lock:
+            if self._batch is not None:
+                self._batch.stdin.close()
+                self._batch.wait()
+                self._batch.stdout.close()
+                self._batch = None
+
+    def __enter__(self) -> 'GitRepository':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _cached(self, cache, key, fn):
+        with self._lock:
+            value = cache.get(key)
+            if value is not None:
+                cache.move_to_end(key)
+                return value
+
+        value = fn()
+        with self._lock:
+            cache[key] = value
+            while len(cache) > self._tree_cache_size:
+                cache.popitem(last=False)
+
+        return value
+
+    def _index(self, commit: str) -> Dict[str, TreeEntry]:
+        return self._cached(self._indexes, commit, lambda: {
+            entry.path: entry for entry in self.tree(commit)})
+
+    def _run(self, *args) -> bytes:
+        proc = self._git_process(*args)
+        if proc.returncode:
+            raise RuntimeError("git %s failed: %s" % (
+                args[0], proc.stderr.decode(errors="replace").strip()))
+
+        return proc.stdout
+
+    def _git_process(self, *args) -> subprocess.CompletedProcess:
+        return subprocess.run([self._git, "-C", self.path] + list(args),
+                              stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    def _rev_parse(self, revision):
+        proc = self._git_process("rev-parse", "--verify", "-q",
+                                 revision + "^{commit}")
+        # with -q, the only silent failure is an unknown revision
+        if proc.returncode == 1 and not proc.stderr:
+            raise UnknownRevisionError("unknown revision %s" % revision)
+        if proc.returncode:
+            raise RuntimeError("git rev-parse failed: %s" %
+                               proc.stderr.decode(errors="replace").strip())
+
+        return proc.stdout.decode().strip()
+
+    def _ls_tree(self, commit):
+        out = self._run("ls-tree", "-r", "-z", "--full-tree", commit)
+        for record in out.split(b"\0"):
+            if not record:
+                continue
+
+            info, path = record.split(b"\t", 1)
+            mode, kind, hash = info.split(b" ")
+            if kind != b"blob":
+                continue
+
+            yield path.decode(), int(mode, 8), hash.decode()
+
+    def _diff_tree(self, base, head):
+        out = self._run("diff-tree", "-r", "-z", "--no-renames", base, head)
+        fields = out.split(b"\0")
+        changes = []
+        for i in range(0, len(fields) - 1, 2):
+            info, path = fields[i], fields[i + 1].decode()
+            old_mode, new_mode, old_hash, new_hash, _ = \
+                info.lstrip(b":").split(b" ")
+            old_mode, new_mode = int(old_mode, 8), int(new_mode, 8)
+            # submodules are not included, as in the trees
+            base_entry = TreeEntry(path, old_mode, old_hash.decode()) \
+                if old_mode and not _is_submodule(old_mode) else None
+            head_entry = TreeEntry(path, new_mode, new_hash.decode()) \
+                if new_mode and not _is_submodule(new_mode) else None
+            if base_entry is not None or head_entry is not None:
+                changes.append((base_entry, head_entry))
+
+        return changes
+
+    def _cat_file(self, hash):
+        with self._batch_lock:
+            if self._batch is None:
+                self._batch = subprocess.Popen(
+                    [self._git, "-C", self.path, "cat-file", "--batch"],
+                    stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+
+            batch = self._batch
+            batch.stdin.write(hash.encode() + b"\n")
+            batch.stdin.flush()
+            header = batch.stdout.readline().split()
+            if len(header) != 3:
+                raise ValueError("blob %s not found" % hash)
+
+            size = int(header[2])
+            data = batch.stdout.read(size)
+            batch.stdout.read(1)  # trailing newline
+            return data
+
+
+def _is_submodule(mode):
+    return mode & 0o170000 == 0o160000
+
+
+class GitDataServicer(DataServicer):
+    """Data servicer reading the changes and the files from a local git
+    repository
+
+    It serves the same data of the lookout data server, so that analyzers
+    can be run, tested and benchmarked without a lookout server and without
+    network. Every request is served from the same repository, regardless
+    of the url of its reference pointers.
+
+    The calls are aborted with `NOT_FOUND` for the revisions not found in
+    the repository, and with `INVALID_ARGUMENT` for invalid ones.
+
+    The include and exclude patterns, the languages and `exclude_vendored`
+    of the requests are applied, the files being filtered by path before
+    their contents is read, see `DataServicer.request_filter`.
+    The languages are guessed from the names of the files, see
+    `guess_language`. UASTs are only served if a function to parse the files
+    is provided, e.g. with a Babelfish client:
+
+        def parse(f):
+            return client.parse(f.path, contents=f.content,
+                                language=f.language).uast
+
+    """
+    def __init__(self, repository: GitRepository,
+                 language_fn: Callable[[str], str] = guess_language,
+                 uast_fn: Optional[Callable[[service_data_pb2.File],
+                                            object]] = None):
+        """Initializes the servicer
+
+        :param repository: the repository to serve.
+        :param language_fn: function returning the language of a file from
+            its path.
+        :param uast_fn: optional function returning the UAST of a file, with
+            its path, contents and language set.
+
+        """
+        self.repository = repository
+        self._language_fn = language_fn
+        self._uast_fn = uast_fn
+
+    def get_changes(self, request: service_data_pb2.ChangesRequest, context
+                    ) -> Iterator[service_data_pb2.Change]:
+        """Yields the files changed between the base and the head
+
+        Without a base, every file of the head is returned as added.
+
+        """
+        repo = self.repository
+        head = self._resolve(request.head, context)
+        if request.HasField("base") and (request.base.hash or
+                                         request.base.reference_name):
+            changes = repo.diff(self._resolve(request.base, context), head)
+        else:
+            changes = [(None, entry) for entry in repo.tree(head)]
+
+        request_filter = self.request_filter(request, context)
+        for base, head in changes:
+            # the change is filtered by the file of the head, if any
+            entry = head or base
+            if not request_filter.match_path(entry.path):
+                continue
+
+            language = self._language(entry.path, request)
+            if not request_filter.match_language(language):
+                continue
+
+            change = service_data_pb2.Change()
+            if base is not None:
+                change.base.CopyFrom(self._file(base, language, request))
+            if head is not None:
+                change.head.CopyFrom(self._file(head, language, request))
+
+            yield change
+
+    def get_files(self, request: service_data_pb2.FilesRequest, context
+                  ) -> Iterator[service_data_pb2.File]:
+        """Yields the files of the revision"""
+        repo = self.repository
+        request_filter = self.request_filter(request, context)
+        for entry in repo.tree(self._resolve(request.revision, context)):
+            if not request_filter.match_path(entry.path):
+                continue
+
+            language = self._language(entry.path, request)
+            if request_filter.match_language(language):
+                yield self._file(entry, language, request)
+
+    def get_file_chunks(
+            self, request: service_data_chunks_pb2.FileChunksRequest, context,
+    ) -> Iterator[service_data_chunks_pb2.FileChunk]:
+        """Yields the chunks of a single file of the revision
+
+        The contents and the UAST are chunked from the blob and from the
+        serialized UAST, without building the whole file.
+
+        """
+        repo = self.repository
+        entry = repo.entry(self._resolve(request.revision, context),
+                           request.path)
+        if entry is None:
+            context.abort(grpc.StatusCode.NOT_FOUND,
+                          "file not found: %s" % request.path)
+
+        want_language = request.want_language or request.want_uast
+        language = self._language_fn(entry.path) if want_language else ""
+        content = repo.blob(entry.hash) \
+            if request.want_contents or request.want_uast else b""
+        meta = service_data_pb2.File(path=entry.path, mode=entry.mode,
+                                     hash=entry.hash, language=language)
+        uast = b""
+        if request.want_uast and language and self._uast_fn is not None:
+            node = self._uast_fn(service_data_pb2.File(
+                path=entry.path, mode=entry.mode, hash=entry.hash,
+                content=content, language=language))
+            if node is not None:
+                uast = node.SerializeToString()
+
+        yield from data_chunks(
+            meta, content if request.want_contents else b"", uast,
+            request.chunk_size)
+
+    def _resolve(self, pointer, context):
+        try:
+            return self.repository.resolve(pointer)
+        except UnknownRevisionError as e:
+            context.abort(grpc.StatusCode.NOT_FOUND, str(e))
+        except ValueError as e:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+
+    def _language(self, path, request):
+        if request.want_language or request.want_uast or \
+                request.include_languages:
+            return self._language_fn(path)
+
+        return ""
+
+    def _file(self, entry, language, request):
+        f = service_data_pb2.File(path=entry.path, mode=entry.mode,
+                                  hash=entry.hash)
+        if request.want_language or request.want_uast:
+            f.language = language
+
+        if request.want_contents or request.want_uast:
+            f.content = self.repository.blob(entry.hash)
+
+        if request.want_uast and language and self._uast_fn is not None:
+            uast = self._uast_fn(f)
+            if uast is not None:
+                f.uast.CopyFrom(uast)
+
+        if not request.want_contents:
+            f.content = b""
+
+        return f
@@ -1,15 +1,32 @@
+from lookout.sdk.grpc.compression import CompressionOptions
 from lookout.sdk.grpc.connection import to_grpc_address, create_channel, \
-    create_server
+    create_server, ChannelPool, get_channel_pool
 from lookout.sdk.grpc.interceptors.logger import \
     LogUnaryServerInterceptor, LogStreamServerInterceptor, \
     LogUnaryClientInterceptor, LogStreamClientInterceptor
+from lookout.sdk.grpc.interceptors.metrics import \
+    MetricsUnaryServerInterceptor, MetricsStreamServerInterceptor, \
+    MetricsUnaryClientInterceptor, MetricsStreamClientInterceptor
+from lookout.sdk.grpc.log_sampling import LogSampler
+from lookout.sdk.grpc.log_sink import BufferedLogSink
+from lookout.sdk.grpc.metrics import start_metrics_server
 
 __all__ = [
     "to_grpc_address",
     "create_channel",
     "create_server",
+    "ChannelPool",
+    "get_channel_pool",
+    "CompressionOptions",
     "LogUnaryServerInterceptor",
     "LogStreamServerInterceptor",
     "LogUnaryClientInterceptor",
     "LogStreamClientInterceptor",
+    "LogSampler",
+    "BufferedLogSink",
+    "MetricsUnaryServerInterceptor",
+    "MetricsStreamServerInterceptor",
+    "MetricsUnaryClientInterceptor",
+    "MetricsStreamClientInterceptor",
+    "start_metrics_server",
 ]
@@ -0,0 +1,73 @@
+"""
+asyncio counterparts of the channel and server factories
+
+This module requires `grpcio>=1.32`, which provides `grpc.aio`, installed
+with `pip install lookout-sdk[aio]`.
+"""
+
+from typing import Optional, Tuple, List, Any
+
+try:
+    from grpc import aio
+except ImportError as e:
+    raise ImportError("lookout.sdk.grpc.aio requires grpcio>=1.32, install "
+                      "it with `pip install lookout-sdk[aio]`") from e
+
+from lookout.sdk.grpc.connection import with_default_options
+from lookout.sdk.grpc.interceptors.aio_logger import \
+    AsyncLogUnaryServerInterceptor, AsyncLogStreamServerInterceptor, \
+    AsyncLogUnaryClientInterceptor, AsyncLogStreamClientInterceptor
+
+
+def create_aio_channel(
+        target: str,
+        options: Optional[List[Tuple[str, Any]]] = None,
+        interceptors: Optional[List[aio.ClientInterceptor]] = None,
+) -> aio.Channel:
+    """Creates a `grpc.aio` channel
+
+    See `lookout.sdk.grpc.create_channel`, the same default options are
+    applied.
+
+    :param target: the server address.
+    :param options: optional list of key-value pairs to configure the channel.
+    :param interceptors: optional list of asyncio client interceptors.
+    :returns: a `grpc.aio` channel.
+
+    """
+    return aio.insecure_channel(target, options=with_default_options(options),
+                                interceptors=interceptors or None)
+
+
+def create_aio_server(
+        options: Optional[List[Tuple[str, Any]]] = None,
+        interceptors: Optional[List[aio.ServerInterceptor]] = None,
+        maximum_concurrent_rpcs: Optional[int] = None,
+) -> aio.Server:
+    """Creates a `grpc.aio` server
+
+    See `lookout.sdk.grpc.create_server`, the same default options are
+    applied. Differently from it, the RPC handlers run on the asyncio event
+    loop instead of a thread pool, so no `max_workers` is needed. Serve a
+    `lookout.sdk.service_analyzer.AsyncAnalyzerServicer` with it.
+
+    :param options: optional list of key-value pairs to configure the server.
+    :param interceptors: optional list of asyncio server interceptors.
+    :param maximum_concurrent_rpcs: optional maximum number of concurrent
+        RPCs, the exceeding ones are rejected with `RESOURCE_EXHAUSTED`.
+    :returns: a `grpc.aio` server.
+
+    """
+    return aio.server(options=with_default_options(options),
+                      interceptors=interceptors or None,
+                      maximum_concurrent_rpcs=maximum_concurrent_rpcs)
+
+
+__all__ = [
+    "create_aio_channel",
+    "create_aio_server",
+    "AsyncLogUnaryServerInterceptor",
+    "AsyncLogStreamServerInterceptor",
+    "AsyncLogUnaryClientInterceptor",
+    "AsyncLogStreamClientInterceptor",
+]
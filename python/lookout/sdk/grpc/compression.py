@@ -0,0 +1,238 @@
+"""
+Compression of the gRPC messages
+
+The changes and the files with their UASTs compress very well, so
+compressing the streams of the data service saves most of the bandwidth for
+some CPU. The compression of a response is chosen by the server, so a client
+asks for it in two ways at once:
+    - it compresses its request with the algorithm, and servers that answer
+      with the encoding of the request, like grpc-go ones, compress the
+      response with the same algorithm,
+    - it sends the `lookout-compression` metadata, honored by the servers
+      created by `lookout.sdk.grpc.create_server` with a `compression`.
+
+gRPC doesn't expose the level of the algorithms: the "compression level" of
+grpc-core only picks one of the algorithms accepted by the peer, so it is not
+configurable here.
+"""
+
+from collections import namedtuple
+from typing import NamedTuple, Optional, Tuple, Union
+
+import grpc
+
+from lookout.sdk.grpc.interceptors import base
+from lookout.sdk.grpc.streams import message_size
+
+COMPRESSION_METADATA_KEY = "lookout-compression"
+
+ALGORITHMS = {
+    "identity": grpc.Compression.NoCompression,
+    "deflate": grpc.Compression.Deflate,
+    "gzip": grpc.Compression.Gzip,
+}
+_NAMES = {algorithm: name for name, algorithm in ALGORITHMS.items()}
+
+
+class CompressionOptions(NamedTuple):
+    """Compression of the messages of a channel, a server or a call
+
+    :param algorithm: the compression algorithm.
+    :param min_bytes: the messages smaller than this are sent uncompressed,
+        compressing them costs more than it saves. It is only applied by
+        the servers to their responses.
+
+    """
+    algorithm: grpc.Compression = grpc.Compression.Gzip
+    min_bytes: int = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.algorithm != grpc.Compression.NoCompression
+
+    def to_metadata(self) -> Tuple[str, str]:
+        """Returns the metadata asking a server for this compression"""
+        value = _NAMES[self.algorithm]
+        if self.min_bytes:
+            value += ";min_bytes=%d" % self.min_bytes
+
+        return COMPRESSION_METADATA_KEY, value
+
+    @classmethod
+    def from_metadata(cls, value: str) -> Optional['CompressionOptions']:
+        """Parses the value of the metadata, returns None if invalid"""
+        name, *params = value.split(";")
+        algorithm = ALGORITHMS.get(name.strip().lower())
+        if algorithm is None:
+            return None
+
+        min_bytes = 0
+        for param in params:
+            key, _, param_value = param.partition("=")
+            if key.strip() == "min_bytes" and param_value.strip().isdigit():
+                min_bytes = int(param_value)
+
+        return cls(algorithm, min_bytes)
+
+
+Compression = Union[CompressionOptions, grpc.Compression, str]
+
+
+def to_compression_options(compression: Optional[Compression]
+                           ) -> Optional[CompressionOptions]:
+    """Returns the options from an algorithm, its name or the options"""
+    if compression is None or isinstance(compression, CompressionOptions):
+        return compression
+
+    if isinstance(compression, str):
+        options = CompressionOptions.from_metadata(compression)
+        if options is None:
+            raise ValueError("unknown compression %r" % compression)
+
+        return options
+
+    return CompressionOptions(compression)
+
+
+class _ClientCallDetails(
+        namedtuple("_ClientCallDetails", (
+            "method", "timeout", "metadata", "credentials", "wait_for_ready",
+            "compression")),
+        grpc.ClientCallDetails):
+    pass
+
+
+class CompressionClientInterceptor(grpc.UnaryUnaryClientInterceptor,
+                                   grpc.UnaryStreamClientInterceptor,
+                                   grpc.StreamUnaryClientInterceptor,
+                                   grpc.StreamStreamClientInterceptor):
+    """Client interceptor asking the server to compress the responses
+
+    It is installed by `lookout.sdk.grpc.create_channel` when a compression
+    is given. The calls already asking for a compression are left as is.
+
+    """
+    def __init__(self, options: CompressionOptions):
+        self._metadata = options.to_metadata()
+
+    def intercept_unary_unary(self, continuation, client_call_details,
+                              request):
+        return continuation(self._details(client_call_details), request)
+
+    intercept_unary_stream = intercept_unary_unary
+    intercept_stream_unary = intercept_unary_unary
+    intercept_stream_stream = intercept_unary_unary
+
+    def _details(self, details):
+        metadata = list(details.metadata or ())
+        if any(key == COMPRESSION_METADATA_KEY for key, _ in metadata):
+            return details
+
+        metadata.append(self._metadata)
+        return _ClientCallDetails(
+            details.method, details.timeout, metadata, details.credentials,
+            getattr(details, "wait_for_ready", None),
+            getattr(details, "compression", None))
+
+
+class CompressionServerInterceptorMixin:
+    """Server interceptor applying the compression asked by each call
+
+    It is installed by `lookout.sdk.grpc.create_server` when a compression
+    is given, so it is always wrapped by
+    `lookout.sdk.grpc.interceptors.base.ServerInterceptorWrapper`.
+
+    """
+    def __init__(self, default: CompressionOptions):
+        """Initializes the interceptor with the compression of the server"""
+        self._default = default
+
+    def intercept_service(self, continuation, handler_call_details):
+        out = continuation(handler_call_details)
+        if out is None:
+            return None
+
+        requested = None
+        for key, value in handler_call_details.invocation_metadata or ():
+            if key == COMPRESSION_METADATA_KEY:
+                requested = CompressionOptions.from_metadata(value)
+
+        options = requested or self._default
+        if not self._needs_wrapper(options):
+            return out
+
+        return out._replace(
+            unary_unary=self._build_wrapper(out.unary_unary, options,
+                                            requested is not None),
+            unary_stream=self._build_wrapper(out.unary_stream, options,
+                                             requested is not None),
+            stream_unary=self._build_wrapper(out.stream_unary, options,
+                                             requested is not None),
+            stream_stream=self._build_wrapper(out.stream_stream, options,
+                                              requested is not None),
+        )
+
+    def _needs_wrapper(self, options):
+        if not options.enabled:
+            return self._default.enabled
+
+        return options.algorithm != self._default.algorithm or \
+            options.min_bytes > 0
+
+    def _build_wrapper(self, original, options, requested):
+        raise NotImplementedError()
+
+
+def _compress(context, options, requested):
+    if requested and options.enabled:
+        context.set_compression(options.algorithm)
+
+
+def _per_message(options):
+    # asking for no compression doesn't override the algorithm of the
+    # server, the messages are sent uncompressed one by one instead
+    return not options.enabled or options.min_bytes > 0
+
+
+def _skip_compression(context, options, msg):
+    if not options.enabled or message_size(msg) < options.min_bytes:
+        context.disable_next_message_compression()
+
+
+class CompressionUnaryServerInterceptor(CompressionServerInterceptorMixin,
+                                        base.UnaryServerInterceptor):
+    """Compression interceptor for unary server"""
+
+    def _build_wrapper(self, original, options, requested):
+        if original is None:
+            return None
+
+        def wrapper(request, context):
+            _compress(context, options, requested)
+            resp = original(request, context)
+            if _per_message(options):
+                _skip_compression(context, options, resp)
+            return resp
+
+        return wrapper
+
+
+class CompressionStreamServerInterceptor(CompressionServerInterceptorMixin,
+                                         base.StreamServerInterceptor):
+    """Compression interceptor for streaming server"""
+
+    def _build_wrapper(self, original, options, requested):
+        if original is None:
+            return None
+
+        def wrapper(request, context):
+            _compress(context, options, requested)
+            if not _per_message(options):
+                yield from original(request, context)
+                return
+
+            for msg in original(request, context):
+                _skip_compression(context, options, msg)
+                yield msg
+
+        return wrapper
@@ -1,10 +1,15 @@
+import threading
 from urllib.parse import urlparse
 from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 
-from typing import Optional, Tuple, List, Any, Union
+from typing import Optional, Tuple, List, Any, Union, Dict
 
 import grpc
 
+from lookout.sdk.grpc.compression import Compression, \
+    CompressionClientInterceptor, CompressionUnaryServerInterceptor, \
+    CompressionStreamServerInterceptor, to_compression_options
 from lookout.sdk.grpc.interceptors import base
 
 grpc_max_msg_size = 100 * 1024 * 1024  # 100MB
@@ -17,10 +22,28 @@ ClientInterceptor = Union[
 ]
 
 
+def with_default_options(
+        options: Optional[List[Tuple[str, Any]]] = None,
+) -> List[Tuple[str, Any]]:
+    """Appends the default options shared by lookout channels and servers
+
+    :param options: optional list of key-value pairs provided by the user.
+    :returns: the list of options including the defaults.
+
+    """
+    # The list of possible options is available here:
+    # https://grpc.io/grpc/core/group__grpc__arg__keys.html
+    return (options or []) + [
+        ("grpc.max_send_message_length", grpc_max_msg_size),
+        ("grpc.max_receive_message_length", grpc_max_msg_size),
+    ]
+
+
 def create_channel(
         target: str,
         options: Optional[List[Tuple[str, Any]]] = None,
         interceptors: Optional[List[ClientInterceptor]] = None,
+        compression: Optional[Compression] = None,
 ) -> grpc.Channel:
     """Creates a gRPC channel
 
@@ -34,17 +57,24 @@ def create_channel(
     :param target: the server address.
     :param options: optional list of key-value pairs to configure the channel.
     :param interceptors: optional list of client interceptors.
+    :param compression: optional compression of the requests, also asked
+        to the servers for the responses, see
+        `lookout.sdk.grpc.compression`. Either a `CompressionOptions`, a
+        `grpc.Compression` or the name of an algorithm.
     :returns: a gRPC channel.
 
     """
-    # The list of possible options is available here:
-    # https://grpc.io/grpc/core/group__grpc__arg__keys.html
-    options = (options or []) + [
-        ("grpc.max_send_message_length", grpc_max_msg_size),
-        ("grpc.max_receive_message_length", grpc_max_msg_size),
-    ]
+    options = with_default_options(options)
     interceptors = interceptors or []
-    channel = grpc.insecure_channel(target, options)
+    compression = to_compression_options(compression)
+    if compression is None:
+        channel = grpc.insecure_channel(target, options)
+    else:
+        channel = grpc.insecure_channel(target, options,
+                                        compression=compression.algorithm)
+        interceptors = [CompressionClientInterceptor(compression)] + \
+            interceptors
+
     return grpc.intercept_channel(channel, *interceptors)
 
 
@@ -52,6 +82,7 @@ def create_server(
         max_workers: int,
         options: Optional[List[Tuple[str, Any]]] = None,
         interceptors: Optional[List[grpc.ServerInterceptor]] = None,
+        compression: Optional[Compression] = None,
 ) -> grpc.Server:
     """Creates a gRPC server
 
@@ -67,26 +98,259 @@ def create_server(
         handlers.
     :param options: optional list of key-value pairs to configure the channel.
     :param interceptors: optional list of server interceptors.
+    :param compression: optional default compression of the responses, see
+        `create_channel`. When given, the server also honors the compression
+        asked by each call, use `grpc.Compression.NoCompression` to only
+        compress the calls asking for it.
     :returns: a gRPC server.
 
     """
-    # The list of possible options is available here:
-    # https://grpc.io/grpc/core/group__grpc__arg__keys.html
-    options = (options or []) + [
-        ("grpc.max_send_message_length", grpc_max_msg_size),
-        ("grpc.max_receive_message_length", grpc_max_msg_size),
-    ]
-    interceptors = [base.ServerInterceptorWrapper(i)
-                    for i in (interceptors or [])]
+    options = with_default_options(options)
+    interceptors = list(interceptors or [])
+    kwargs = {}
+    compression = to_compression_options(compression)
+    if compression is not None:
+        kwargs["compression"] = compression.algorithm
+        interceptors += [CompressionUnaryServerInterceptor(compression),
+                         CompressionStreamServerInterceptor(compression)]
+
+    interceptors = [base.ServerInterceptorWrapper(i) for i in interceptors]
     server = grpc.server(ThreadPoolExecutor(max_workers=max_workers),
-                         options=options, interceptors=interceptors)
+                         options=options, interceptors=interceptors, **kwargs)
 
+    index = base.MethodHandlerIndex(server)
     for i in interceptors:
-        i.bind(server)
+        i.bind(server, index)
 
     return server
 
 
+class _PooledChannel:
+    """Channel owned by a `ChannelPool` along with its bookkeeping"""
+
+    def __init__(self, channel: grpc.Channel):
+        self.channel = channel
+        self.streams = 0
+        self.healthy = True
+
+
+class ChannelPool:
+    """Pool of gRPC channels connected to the same target
+
+    Creating a channel for every event makes each of them pay the connection
+    setup (TCP, HTTP/2 handshake and slow-start) before the first message is
+    received. The pool instead shares channels between invocations, and opens
+    a new one only when every open channel already serves
+    `max_concurrent_streams` invocations.
+
+    The health of the channels is tracked through the status of the
+    invocations, given to `release`. A channel whose invocation failed with
+    `UNAVAILABLE`, which is what a channel in `TRANSIENT_FAILURE` state
+    returns, is not handed out anymore, and it is closed as soon as the
+    invocations using it finish. A fresh channel is created lazily on the
+    next `acquire`, this way the analyzer doesn't get stuck on the
+    connection backoff after a redeployment of the data server. Subscribing
+    to the connectivity of the channels instead would cost a polling thread
+    per channel.
+
+    Channels are created through `lookout.sdk.grpc.create_channel`, so they
+    are configured with the same default options.
+
+    """
+    def __init__(
+            self,
+            target: str,
+            options: Optional[List[Tuple[str, Any]]] = None,
+            interceptors: Optional[List[ClientInterceptor]] = None,
+            max_concurrent_streams: int = 100,
+            compression: Optional[Compression] = None,
+    ):
+        """Initializes an empty pool
+
+        :param target: the server address.
+        :param options: optional list of key-value pairs to configure the
+            channels.
+        :param interceptors: optional list of client interceptors.
+        :param max_concurrent_streams: maximum number of concurrent
+            invocations sharing a single channel.
+        :param compression: optional compression, see `create_channel`.
+
+        """
+        if max_concurrent_streams < 1:
+            raise ValueError("max_concurrent_streams must be positive")
+
+        self._target = target
+        self._options = options
+        self._interceptors = interceptors
+        self._max_concurrent_streams = max_concurrent_streams
+        self._compression = compression
+        self._lock = threading.Lock()
+        self._channels = []  # type: List[_PooledChannel]
+        self._closed = False
+
+    @property
+    def target(self) -> str:
+        """Returns the server address"""
+        return self._target
+
+    def __len__(self) -> int:
+        """Returns the number of open channels"""
+        with self._lock:
+            return len(self._channels)
+
+    def acquire(self) -> grpc.Channel:
+        """Returns a channel to be used for a single invocation
+
+        The least loaded healthy channel is returned, a new one is opened if
+        all of them are at capacity. The channel must be given back using
+        `release` once the invocation is finished.
+
+        """
+        with self._lock:
+            if self._closed:
+                raise ValueError("the channel pool is closed")
+
+            pooled = None
+            for candidate in list(self._channels):
+                if not candidate.healthy:
+                    if candidate.streams == 0:
+                        self._discard(candidate)
+                    continue
+
+                if candidate.streams >= self._max_concurrent_streams:
+                    continue
+
+                if pooled is None or candidate.streams < pooled.streams:
+                    pooled = candidate
+
+            if pooled is None:
+                pooled = _PooledChannel(create_channel(
+                    self._target, options=self._options,
+                    interceptors=self._interceptors,
+                    compression=self._compression))
+                self._channels.append(pooled)
+
+            pooled.streams += 1
+            return pooled.channel
+
+    def release(self, channel: grpc.Channel,
+                code: Optional[grpc.StatusCode] = None):
+        """Gives back a channel previously returned by `acquire`
+
+        :param channel: the channel.
+        :param code: optional status code of the invocation, the channel is
+            replaced if it is `UNAVAILABLE`.
+
+        """
+        with self._lock:
+            for pooled in self._channels:
+                if pooled.channel is channel:
+                    break
+            else:
+                # the channel has been already discarded by `close`
+                return
+
+            pooled.streams -= 1
+            if code == grpc.StatusCode.UNAVAILABLE:
+                pooled.healthy = False
+            if pooled.streams == 0 and (self._closed or not pooled.healthy):
+                self._discard(pooled)
+
+    @contextmanager
+    def channel(self):
+        """Context manager acquiring a channel and releasing it on exit
+
+        The status code of a `grpc.RpcError` raised in the block is passed
+        to `release`.
+
+        """
+        channel = self.acquire()
+        try:
+            yield channel
+        except grpc.RpcError as exc:
+            self.release(channel, base.error_code(exc))
+            raise
+        except BaseException:
+            self.release(channel)
+            raise
+        else:
+            self.release(channel)
+
+    def close(self):
+        """Closes every channel of the pool
+
+        Channels still in use are closed as soon as they are released. The
+        pool is not returned by `get_channel_pool` anymore.
+
+        """
+        with self._lock:
+            self._closed = True
+            for pooled in list(self._channels):
+                if pooled.streams == 0:
+                    self._discard(pooled)
+
+        _forget_channel_pool(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _discard(self, pooled: _PooledChannel):
+        self._channels.remove(pooled)
+        pooled.channel.close()
+
+
+_channel_pools = {}  # type: Dict[Tuple, ChannelPool]
+_channel_pools_lock = threading.Lock()
+
+
+def get_channel_pool(
+        target: str,
+        options: Optional[List[Tuple[str, Any]]] = None,
+        interceptors: Optional[List[ClientInterceptor]] = None,
+        max_concurrent_streams: int = 100,
+        compression: Optional[Compression] = None,
+) -> ChannelPool:
+    """Returns the process-wide channel pool for the provided configuration
+
+    The same pool is returned for every call with the same target, options,
+    compression and interceptors (compared by identity), so that independent
+    components of an analyzer end up sharing the same connections.
+
+    :param target: the server address.
+    :param options: optional list of key-value pairs to configure the
+        channels, the values must be hashable.
+    :param interceptors: optional list of client interceptors.
+    :param max_concurrent_streams: maximum number of concurrent invocations
+        sharing a single channel, only used when the pool is created.
+    :param compression: optional compression, see `create_channel`.
+    :returns: a channel pool.
+
+    """
+    compression = to_compression_options(compression)
+    key = (target, tuple(options or ()), tuple(interceptors or ()),
+           compression)
+    with _channel_pools_lock:
+        pool = _channel_pools.get(key)
+        if pool is None or pool._closed:
+            pool = ChannelPool(target, options=options,
+                               interceptors=interceptors,
+                               max_concurrent_streams=max_concurrent_streams,
+                               compression=compression)
+            _channel_pools[key] = pool
+
+        return pool
+
+
+def _forget_channel_pool(pool: ChannelPool):
+    with _channel_pools_lock:
+        for key, registered in list(_channel_pools.items()):
+            if registered is pool:
+                del _channel_pools[key]
+
+
 def to_grpc_address(target: str) -> str:
     """Converts a standard gRPC target to one that is supported by grpcio
 
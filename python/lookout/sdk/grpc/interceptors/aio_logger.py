@@ -0,0 +1,267 @@
+import inspect
+
+import grpc
+from grpc import aio
+
+from lookout.sdk.grpc.interceptors.base import error_code
+from lookout.sdk.grpc.interceptors.logger import LogInterceptorMixin, \
+    call_start
+from lookout.sdk.grpc.streams import StreamStats
+
+
+class AsyncLogClientInterceptorMixin(LogInterceptorMixin):
+    """Logger interceptor for asyncio client"""
+
+    KIND = "client"
+    PRE_REQUEST_MESSAGE = "gRPC client call started"
+    POST_REQUEST_MESSAGE = "gRPC client call finished"
+
+    async def intercept(self, continuation, client_call_details, request):
+        call_log = self.start_call_log(client_call_details,
+                                       client_call_details.metadata)
+        if call_log is None:
+            return await continuation(client_call_details, request)
+
+        call_log.started()
+
+        start = call_start()
+        err = None
+        try:
+            call = await continuation(client_call_details, request)
+            await self.wait_for_response(call)
+        except Exception as exc:
+            err = exc
+            raise
+        finally:
+            call_log.finished(start, err)
+
+        return call
+
+    async def wait_for_response(self, call):
+        pass
+
+
+class AsyncLogUnaryClientInterceptor(AsyncLogClientInterceptorMixin,
+                                     aio.UnaryUnaryClientInterceptor,
+                                     aio.StreamUnaryClientInterceptor):
+    """Logger interceptor for asyncio unary client"""
+
+    PRE_REQUEST_MESSAGE = "gRPC unary client call started"
+    POST_REQUEST_MESSAGE = "gRPC unary client call finished"
+
+    async def intercept_unary_unary(self, continuation, client_call_details,
+                                    request):
+        return await self.intercept(continuation, client_call_details,
+                                    request)
+
+    async def intercept_stream_unary(self, continuation, client_call_details,
+                                     request_iterator):
+        return await self.intercept(continuation, client_call_details,
+                                    request_iterator)
+
+    async def wait_for_response(self, call):
+        # the call can be awaited multiple times, the caller gets the same
+        # response afterwards
+        await call
+
+
+class AsyncLogStreamClientInterceptor(AsyncLogClientInterceptorMixin,
+                                      aio.UnaryStreamClientInterceptor,
+                                      aio.StreamStreamClientInterceptor):
+    """Logger interceptor for asyncio streaming client"""
+
+    PRE_REQUEST_MESSAGE = "gRPC streaming client call started"
+    POST_REQUEST_MESSAGE = "gRPC streaming client call finished"
+
+    async def intercept(self, continuation, client_call_details, request):
+        """Intercepts the call, and logs its end once the stream is over
+
+        The response stream is replaced by an asynchronous iterator, so that
+        the time to the first message, and the number and size of the
+        messages are logged too. If the stream is never read, the call is
+        logged once it terminates.
+
+        """
+        call_log = self.start_call_log(client_call_details,
+                                       client_call_details.metadata)
+        if call_log is None:
+            return await continuation(client_call_details, request)
+
+        call_log.started()
+
+        start = call_start()
+        try:
+            call = await continuation(client_call_details, request)
+        except Exception as exc:
+            call_log.finished(start, exc)
+            raise
+
+        stats = StreamStats(start.monotonic)
+        state = {"reading": False, "done": False}
+
+        def finish(code):
+            if not state["done"]:
+                state["done"] = True
+                call_log.finished(start, None, code, stats)
+
+        def on_call_done(call):
+            # the responses still being read are accounted by the iterator
+            if not state["reading"]:
+                finish(grpc.StatusCode.CANCELLED if call.cancelled()
+                       else None)
+
+        async def responses():
+            state["reading"] = True
+            code = grpc.StatusCode.OK
+            try:
+                async for msg in call:
+                    stats.message(msg)
+                    yield msg
+            except GeneratorExit:
+                code = grpc.StatusCode.CANCELLED
+                raise
+            except BaseException as exc:
+                code = error_code(exc)
+                raise
+            finally:
+                finish(code)
+
+        call.add_done_callback(on_call_done)
+        return responses()
+
+    async def intercept_unary_stream(self, continuation, client_call_details,
+                                     request):
+        return await self.intercept(continuation, client_call_details,
+                                    request)
+
+    async def intercept_stream_stream(self, continuation,
+                                      client_call_details, request_iterator):
+        return await self.intercept(continuation, client_call_details,
+                                    request_iterator)
+
+
+class AsyncLogServerInterceptorMixin(LogInterceptorMixin):
+    """Logger interceptor for asyncio server
+
+    Differently from the threaded interceptors, `grpc.aio` exposes the
+    method handler to the interceptor, so there is no need for
+    `lookout.sdk.grpc.interceptors.base.ServerInterceptorWrapper`: calls of
+    the wrong type are skipped by checking the handler directly.
+
+    """
+    KIND = "server"
+    PRE_REQUEST_MESSAGE = "gRPC server call started"
+    POST_REQUEST_MESSAGE = "gRPC server call finished"
+
+    # Whether the interceptor handles calls whose response is a stream
+    IS_STREAMING = None
+
+    async def intercept_service(self, continuation, handler_call_details):
+        out = await continuation(handler_call_details)
+        if out is None or out.response_streaming != self.IS_STREAMING:
+            return out
+
+        call_log = self.start_call_log(
+            handler_call_details, handler_call_details.invocation_metadata)
+        if call_log is None:
+            return out
+
+        build_wrapper = (self._build_stream_wrapper if self.IS_STREAMING
+                         else self._build_unary_wrapper)
+        return out._replace(
+            unary_unary=build_wrapper(call_log, out.unary_unary),
+            unary_stream=build_wrapper(call_log, out.unary_stream),
+            stream_unary=build_wrapper(call_log, out.stream_unary),
+            stream_stream=build_wrapper(call_log, out.stream_stream),
+        )
+
+    def _build_unary_wrapper(self, call_log, original):
+        if original is None:
+            return None
+
+        async def wrapper(request, context):
+            start = call_start()
+
+            call_log.started()
+            err = None
+            try:
+                resp = original(request, context)
+                if inspect.isawaitable(resp):
+                    resp = await resp
+                return resp
+            except Exception as exc:
+                err = exc
+                raise
+            finally:
+                call_log.finished(start, err)
+
+        return wrapper
+
+    def _build_stream_wrapper(self, call_log, original):
+        if original is None:
+            return None
+
+        async def wrapper(request, context):
+            start = call_start()
+            stats = StreamStats(start.monotonic)
+
+            call_log.started()
+            err = None
+            code = None
+            try:
+                resp = original(request, _ObservedWriteContext(
+                    context, stats.message))
+                if hasattr(resp, "__aiter__"):
+                    async for msg in resp:
+                        stats.message(msg)
+                        yield msg
+                elif inspect.isawaitable(resp):
+                    # the handler writes the messages with `context.write`
+                    await resp
+                elif resp is not None:
+                    for msg in resp:
+                        stats.message(msg)
+                        yield msg
+            except GeneratorExit:
+                code = grpc.StatusCode.CANCELLED
+                raise
+            except Exception as exc:
+                err = exc
+                raise
+            finally:
+                call_log.finished(start, err, code, stats)
+
+        return wrapper
+
+
+class _ObservedWriteContext:
+    """Servicer context reporting the messages written with `write`"""
+
+    def __init__(self, context, on_message):
+        self._context = context
+        self._on_message = on_message
+
+    async def write(self, msg):
+        self._on_message(msg)
+        await self._context.write(msg)
+
+    def __getattr__(self, attr):
+        return getattr(self._context, attr)
+
+
+class AsyncLogUnaryServerInterceptor(AsyncLogServerInterceptorMixin,
+                                     aio.ServerInterceptor):
+    """Logger interceptor for asyncio unary server"""
+
+    IS_STREAMING = False
+    PRE_REQUEST_MESSAGE = "gRPC unary server call started"
+    POST_REQUEST_MESSAGE = "gRPC unary server call finished"
+
+
+class AsyncLogStreamServerInterceptor(AsyncLogServerInterceptorMixin,
+                                      aio.ServerInterceptor):
+    """Logger interceptor for asyncio streaming server"""
+
+    IS_STREAMING = True
+    PRE_REQUEST_MESSAGE = "gRPC streaming server call started"
+    POST_REQUEST_MESSAGE = "gRPC streaming server call finished"
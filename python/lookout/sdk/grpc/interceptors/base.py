@@ -1,4 +1,4 @@
-from typing import Union
+from typing import Optional, Union
 
 import grpc
 
@@ -8,6 +8,54 @@ ServerInterceptor = Union[
 ]
 
 
+def split_method(full_method: Union[str, bytes]):
+    """Splits a full gRPC method name into service and method
+
+    :param full_method: the method as "/service/method".
+    :returns: a tuple (service, method).
+
+    """
+    if isinstance(full_method, bytes):
+        # grpc.aio clients provide the method as bytes
+        full_method = full_method.decode()
+
+    service, method = full_method[1:].split("/")
+    return service, method
+
+
+def code_name(code: Optional[grpc.StatusCode]) -> str:
+    """Returns the name of a status code as written by the Go SDK
+
+    E.g. `grpc.StatusCode.INVALID_ARGUMENT` is named "InvalidArgument".
+
+    """
+    if code is None:
+        return "Unknown"
+
+    if code is grpc.StatusCode.CANCELLED:
+        return "Canceled"
+
+    if code is grpc.StatusCode.OK:
+        return "OK"
+
+    return "".join(w.capitalize() for w in code.name.split("_"))
+
+
+def error_code(err: BaseException) -> grpc.StatusCode:
+    """Returns the status code corresponding to an exception"""
+    code = getattr(err, "code", None)
+    if callable(code):
+        try:
+            code = code()
+        except Exception:
+            code = None
+
+    if isinstance(code, grpc.StatusCode):
+        return code
+
+    return grpc.StatusCode.UNKNOWN
+
+
 class ServerInterceptorWrapper(grpc.ServerInterceptor):
     """gRPC server interceptor wrapper
 
@@ -40,15 +88,25 @@ class ServerInterceptorWrapper(grpc.ServerInterceptor):
     is checked against the type of wrapped interceptor. If the types match,
     then the interceptor is called, otherwise it is skipped.
 
+    The type of the handlers is looked up in a `MethodHandlerIndex`, shared
+    by all the wrappers bound to the same server.
+
     """
     def __init__(self, wrapped: ServerInterceptor):
         """Wraps the provided server interceptor"""
         self._wrapped = wrapped
-        self._server = None
+        self._index = None
+
+    def bind(self, server: grpc.Server,
+             index: Optional['MethodHandlerIndex'] = None):
+        """Binds the provided server
 
-    def bind(self, server: grpc.Server):
-        """Binds the provided server"""
-        self._server = server
+        :param server: the server the interceptor is attached to.
+        :param index: optional index of the method handlers of the server, to
+            share it between the wrappers of the same server.
+
+        """
+        self._index = index or MethodHandlerIndex(server)
 
     def intercept_service(self, continuation, handler_call_details):
         """Intercepts incoming RPCs before handing them over to a handler
@@ -56,32 +114,91 @@ class ServerInterceptorWrapper(grpc.ServerInterceptor):
         See `grpc.ServerInterceptor.intercept_service`.
 
         """
-        rpc_method_handler = self._get_rpc_handler(handler_call_details)
-        if rpc_method_handler.response_streaming:
-            if self._wrapped.is_streaming:
-                # `self._wrapped` is a `StreamServerInterceptor`
-                return self._wrapped.intercept_service(
-                    continuation, handler_call_details)
-        else:
-            if not self._wrapped.is_streaming:
-                # `self._wrapped` is a `UnaryServerInterceptor`
-                return self._wrapped.intercept_service(
-                    continuation, handler_call_details)
-
-        # skip the interceptor due to type mismatch
+        if self._index is None:
+            raise RuntimeError("%s is not bound to a server" %
+                               self._wrapped.__class__.__name__)
+
+        response_streaming = self._index.response_streaming(
+            handler_call_details)
+        if response_streaming is not None and \
+                response_streaming == self._wrapped.is_streaming:
+            return self._wrapped.intercept_service(
+                continuation, handler_call_details)
+
+        # skip the interceptor due to type mismatch or unknown method
         return continuation(handler_call_details)
 
-    def _get_rpc_handler(self, handler_call_details):
-        method = handler_call_details.method
 
-        if not self._server:
-            raise RuntimeError("%s is not bind to a server" %
-                               self._wrapped.__class__.__name__)
+class MethodHandlerIndex:
+    """Index of the RPC method handlers registered to a server
 
-        # get the first dictionary generic handler by assuming that a single
-        # analyzer is attached to the server
-        analyzer_generic_handler = self._server._state.generic_handlers[0]
-        return analyzer_generic_handler._method_handlers[method]
+    It maps each method name to whether its response is streamed, for every
+    generic handler registered to the server, so that interceptors can be
+    dispatched in constant time however many services are served.
+
+    The index is built from the handlers registered as dictionaries (the
+    ones created by the generated `add_*_to_server` functions), and rebuilt
+    when new handlers are added to the server. Methods of other kinds of
+    generic handlers are resolved by asking the handlers themselves, as the
+    server does.
+
+    """
+    def __init__(self, server: grpc.Server):
+        """Initializes the index for the provided server"""
+        self._state = server._state
+        self._version = None
+        self._methods = {}
+        self._opaque_handlers = []
+
+    def response_streaming(self, handler_call_details) -> Optional[bool]:
+        """Returns whether the response of the method is streamed
+
+        :param handler_call_details: the details of the incoming RPC.
+        :returns: True or False, or None if the method is unknown.
+
+        """
+        if self._version != self._current_version():
+            self._build()
+
+        method = handler_call_details.method
+        response_streaming = self._methods.get(method)
+        if response_streaming is not None:
+            return response_streaming
+
+        for generic_handler in self._opaque_handlers:
+            handler = generic_handler.service(handler_call_details)
+            if handler is not None:
+                return handler.response_streaming
+
+        return None
+
+    def _current_version(self):
+        return (len(self._state.generic_handlers),
+                len(getattr(self._state, "registered_method_handlers", ())))
+
+    def _build(self):
+        version = self._current_version()
+        methods = {}
+        opaque_handlers = []
+
+        registered = getattr(self._state, "registered_method_handlers", {})
+        for method, handler in list(registered.items()):
+            methods.setdefault(method, handler.response_streaming)
+
+        for generic_handler in list(self._state.generic_handlers):
+            method_handlers = getattr(generic_handler, "_method_handlers",
+                                      None)
+            if method_handlers is None:
+                opaque_handlers.append(generic_handler)
+                continue
+
+            # the server uses the first handler matching the method
+            for method, handler in method_handlers.items():
+                methods.setdefault(method, handler.response_streaming)
+
+        self._methods = methods
+        self._opaque_handlers = opaque_handlers
+        self._version = version
 
 
 class UnaryClientInterceptor(grpc.UnaryUnaryClientInterceptor,
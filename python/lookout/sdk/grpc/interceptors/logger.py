@@ -1,11 +1,26 @@
 import functools
+import time
 from datetime import datetime
-from typing import Callable, Union
+from typing import Callable, NamedTuple, Optional, Union
 
 import grpc
 
 from lookout.sdk.grpc.log_fields import LogFields
+from lookout.sdk.grpc.log_sampling import LogSampler
+from lookout.sdk.grpc.log_sink import format_timestamp
 from lookout.sdk.grpc.interceptors import base
+from lookout.sdk.grpc.streams import ObservedStream, StreamStats
+
+
+class CallStart(NamedTuple):
+    """Start of a call, both as wall-clock and monotonic time in seconds"""
+    time: float
+    monotonic: float
+
+
+def call_start() -> CallStart:
+    """Returns the start of a call happening now"""
+    return CallStart(time.time(), time.monotonic())
 
 
 class LogInterceptorMixin:
@@ -14,9 +29,35 @@ class LogInterceptorMixin:
     # Can be either 'server' or 'client' depending on the interceptor type
     KIND = None
 
-    def __init__(self, log_fn: Callable[[LogFields, str], None]):
-        """Initializes the logger interceptor with the given log function"""
+    def __init__(self, log_fn: Callable[[LogFields, str], None],
+                 sampler: Optional[LogSampler] = None):
+        """Initializes the logger interceptor with the given log function
+
+        :param log_fn: function called with the log fields and the message
+            of each record.
+        :param sampler: optional sampler of the logged calls, every call is
+            logged by default.
+
+        """
         self._log_fn = log_fn
+        self._sampler = sampler
+
+    def start_call_log(self, call_details, metadata
+                       ) -> Optional['CallLog']:
+        """Returns the log of a new call, or None if it is not logged
+
+        :param call_details: some information regarding the call
+        :param metadata: the metadata of the call, with the log fields
+
+        """
+        sampler = self._sampler
+        sampled = sampler is None or sampler.head(call_details.method)
+        if not sampled and not sampler.tail_sampling:
+            return None
+
+        log_fields = LogFields.from_metadata(dict(metadata or {}))
+        self.add_request_log_fields(log_fields, call_details)
+        return CallLog(self, log_fields, sampled)
 
     def add_request_log_fields(
             self, log_fields: LogFields,
@@ -29,7 +70,7 @@ class LogInterceptorMixin:
         :param call_details: some information regarding the call
 
         """
-        service, method = call_details.method[1:].split("/")
+        service, method = base.split_method(call_details.method)
         log_fields.add_fields({
             "system":       "grpc",
             "span.kind":    self.KIND,
@@ -38,22 +79,117 @@ class LogInterceptorMixin:
         })
 
     def add_response_log_fields(self, log_fields: LogFields,
-                                start_time: datetime, err: Exception):
+                                start_time: Union[CallStart, datetime],
+                                err: Exception,
+                                code: Optional[grpc.StatusCode] = None):
         """Add log fields related to a response to the provided log fields
 
         :param log_fields: log fields instnace to which to add the fields
-        :param start_time: start time of the request
+        :param start_time: start of the request, as returned by `call_start`
+            or as a naive UTC datetime.
         :param err: exception raised during the handling of the request.
+        :param code: optional status code of the call, by default it is
+            deduced from the exception.
 
         """
-        code = "Unknown" if err is not None else "OK"
-        duration = (datetime.utcnow() - start_time).total_seconds() * 1000
+        if code is None:
+            code = base.error_code(err) if err is not None \
+                else grpc.StatusCode.OK
+        if isinstance(start_time, datetime):
+            duration = (datetime.utcnow() - start_time).total_seconds()
+            start = start_time.isoformat() + "Z"
+        else:
+            # the monotonic clock is not affected by the clock adjustments
+            duration = time.monotonic() - start_time.monotonic
+            start = format_timestamp(start_time.time)
+
         log_fields.add_fields({
-            "grpc.start_time": start_time.isoformat() + "Z",
-            "grpc.code":       code,
-            "duration":        "{duration}ms".format(duration=duration),
+            "grpc.start_time": start,
+            "grpc.code":       base.code_name(code),
+            "duration":        _format_ms(duration),
         })
 
+    def add_stream_log_fields(self, log_fields: LogFields,
+                              stats: StreamStats):
+        """Add log fields related to a response stream
+
+        :param log_fields: log fields instance to which to add the fields
+        :param stats: the accounting of the messages of the stream
+
+        """
+        fields = {
+            "grpc.messages": stats.messages,
+            "grpc.bytes":    stats.bytes,
+        }
+        if stats.first_message is not None:
+            fields["grpc.time_to_first_message"] = _format_ms(
+                stats.first_message)
+
+        log_fields.add_fields(fields)
+
+
+def _format_ms(seconds):
+    return "{duration}ms".format(duration=seconds * 1000)
+
+
+class CallLog:
+    """Records of a single call, emitted according to the sampling
+
+    The calls picked by the head sampling are logged as they happen. The
+    "started" record of the other ones is emitted with the "finished" one,
+    only if the tail sampling keeps the call. Their log fields are not
+    modified in between, so the record needs no copy of them.
+
+    """
+    __slots__ = ("_interceptor", "log_fields", "_sampled", "_pending")
+
+    def __init__(self, interceptor: LogInterceptorMixin,
+                 log_fields: LogFields, sampled: bool):
+        self._interceptor = interceptor
+        self.log_fields = log_fields
+        self._sampled = sampled
+        # whether the "started" record is waiting for the tail sampling
+        self._pending = False
+
+    def started(self):
+        """Logs the start of the call"""
+        if self._sampled:
+            self._interceptor._log_fn(
+                self.log_fields, self._interceptor.PRE_REQUEST_MESSAGE)
+        else:
+            self._pending = True
+
+    def finished(self, start: CallStart, err: Optional[Exception],
+                 code: Optional[grpc.StatusCode] = None,
+                 stats: Optional[StreamStats] = None):
+        """Logs the end of the call
+
+        :param start: start of the call.
+        :param err: exception raised by the call, if any.
+        :param code: optional status code of the call, by default it is
+            deduced from the exception.
+        :param stats: optional accounting of the response stream.
+
+        """
+        interceptor = self._interceptor
+        if not self._sampled:
+            failed = err is not None or \
+                (code is not None and code is not grpc.StatusCode.OK)
+            duration = time.monotonic() - start.monotonic
+            if not interceptor._sampler.tail(failed, duration):
+                return
+
+            if self._pending:
+                interceptor._log_fn(self.log_fields,
+                                    interceptor.PRE_REQUEST_MESSAGE)
+
+        interceptor.add_response_log_fields(self.log_fields, start, err,
+                                            code)
+        if stats is not None:
+            interceptor.add_stream_log_fields(self.log_fields, stats)
+
+        interceptor._log_fn(self.log_fields, interceptor.POST_REQUEST_MESSAGE)
+
 
 class LogClientInterceptorMixin(LogInterceptorMixin):
     """Logger interceptor for client"""
@@ -63,19 +199,24 @@ class LogClientInterceptorMixin(LogInterceptorMixin):
     POST_REQUEST_MESSAGE = "gRPC client call finished"
 
     def intercept(self, continuation, client_call_details, request):
-        log_fields = LogFields.from_metadata(
-            dict(client_call_details.metadata or {}))
-
-        self.add_request_log_fields(
-            log_fields, client_call_details)
+        call_log = self.start_call_log(client_call_details,
+                                       client_call_details.metadata)
+        if call_log is None:
+            return continuation(client_call_details, request)
 
-        self._log_fn(log_fields, self.PRE_REQUEST_MESSAGE)
+        call_log.started()
 
-        start = datetime.utcnow()
-        out = continuation(client_call_details, request)
-        self.add_response_log_fields(log_fields, start, None)
+        start = call_start()
+        try:
+            out = continuation(client_call_details, request)
+        except Exception as exc:
+            call_log.finished(start, exc)
+            raise
 
-        self._log_fn(log_fields, self.POST_REQUEST_MESSAGE)
+        # the continuation returns the outcome of the call instead of
+        # raising, and a future of it for the asynchronous calls
+        out.add_done_callback(
+            lambda call: call_log.finished(start, None, call.code()))
 
         return out
 
@@ -99,7 +240,30 @@ class LogStreamClientInterceptor(LogClientInterceptorMixin,
     POST_REQUEST_MESSAGE = "gRPC streaming client call finished"
 
     def intercept_stream(self, continuation, client_call_details, request):
-        return self.intercept(continuation, client_call_details, request)
+        """Intercepts the call, and logs its end once the stream is over
+
+        Besides the duration of the whole stream, the time to the first
+        message, and the number and size of the messages are logged.
+
+        """
+        call_log = self.start_call_log(client_call_details,
+                                       client_call_details.metadata)
+        if call_log is None:
+            return continuation(client_call_details, request)
+
+        call_log.started()
+
+        start = call_start()
+        try:
+            out = continuation(client_call_details, request)
+        except Exception as exc:
+            call_log.finished(start, exc)
+            raise
+
+        stats = StreamStats(start.monotonic)
+        return ObservedStream(
+            out, stats.message,
+            lambda code: call_log.finished(start, None, code, stats))
 
 
 class LogServerInterceptorMixin(LogInterceptorMixin):
@@ -115,29 +279,28 @@ class LogServerInterceptorMixin(LogInterceptorMixin):
     POST_REQUEST_MESSAGE = "gRPC server call finished"
 
     def intercept_service(self, continuation, handler_call_details):
-        log_fields = LogFields.from_metadata(
-            dict(handler_call_details.invocation_metadata or {}))
-
-        self.add_request_log_fields(
-            log_fields, handler_call_details)
+        call_log = self.start_call_log(
+            handler_call_details, handler_call_details.invocation_metadata)
 
         out = continuation(handler_call_details)
+        if call_log is None:
+            return out
 
         # wraps each gRPC method independently the type, the correct one
         # is ensured to be called by the wrapper.
         return out._replace(
-            unary_unary=self._build_wrapper(log_fields, out.unary_unary),
-            unary_stream=self._build_wrapper(log_fields, out.unary_stream),
-            stream_unary=self._build_wrapper(log_fields, out.stream_unary),
-            stream_stream=self._build_wrapper(log_fields, out.stream_stream),
+            unary_unary=self._build_wrapper(call_log, out.unary_unary),
+            unary_stream=self._build_wrapper(call_log, out.unary_stream),
+            stream_unary=self._build_wrapper(call_log, out.stream_unary),
+            stream_stream=self._build_wrapper(call_log, out.stream_stream),
         )
 
-    def _build_wrapper(self, log_fields, original):
+    def _build_wrapper(self, call_log, original):
 
         def wrapper(original, *args, **kwargs):
-            start = datetime.utcnow()
+            start = call_start()
 
-            self._log_fn(log_fields, self.PRE_REQUEST_MESSAGE)
+            call_log.started()
             err = None
             try:
                 resp = original(*args, **kwargs)
@@ -147,8 +310,7 @@ class LogServerInterceptorMixin(LogInterceptorMixin):
             else:
                 return resp
             finally:
-                self.add_response_log_fields(log_fields, start, err)
-                self._log_fn(log_fields, self.POST_REQUEST_MESSAGE)
+                call_log.finished(start, err)
 
         if original is None:
             return None
@@ -170,3 +332,32 @@ class LogStreamServerInterceptor(LogServerInterceptorMixin,
 
     PRE_REQUEST_MESSAGE = "gRPC streaming server call started"
     POST_REQUEST_MESSAGE = "gRPC streaming server call finished"
+
+    def _build_wrapper(self, call_log, original):
+        if original is None:
+            return None
+
+        # the call is over when the response stream is, not when the
+        # handler returns it
+        def wrapper(request, context):
+            start = call_start()
+            stats = StreamStats(start.monotonic)
+
+            call_log.started()
+            err = None
+            code = None
+            try:
+                for msg in original(request, context):
+                    stats.message(msg)
+                    yield msg
+            except GeneratorExit:
+                # the client went away before the end of the stream
+                code = grpc.StatusCode.CANCELLED
+                raise
+            except Exception as exc:
+                err = exc
+                raise
+            finally:
+                call_log.finished(start, err, code, stats)
+
+        return wrapper
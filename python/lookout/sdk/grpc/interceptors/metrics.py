@@ -0,0 +1,273 @@
+import time
+
+import grpc
+
+from lookout.sdk.grpc.interceptors import base
+from lookout.sdk.grpc.metrics import MetricsRegistry, REGISTRY
+from lookout.sdk.grpc.streams import ObservedStream, message_size
+
+
+class GrpcMetrics:
+    """Metrics of the gRPC calls of one kind, either 'server' or 'client'
+
+    The metrics are named as the ones of go-grpc-prometheus, so that the same
+    dashboards can be used for Go and Python analyzers:
+        - grpc_<kind>_started_total,
+        - grpc_<kind>_handled_total,
+        - grpc_<kind>_handling_seconds,
+        - grpc_<kind>_stream_first_message_seconds, only for the calls with
+          a response stream, not available in go-grpc-prometheus,
+        - grpc_<kind>_in_flight,
+        - grpc_<kind>_msg_received_total, grpc_<kind>_msg_sent_total,
+        - grpc_<kind>_msg_received_bytes_total,
+          grpc_<kind>_msg_sent_bytes_total.
+
+    """
+    LABELS = ("grpc_service", "grpc_method")
+
+    def __init__(self, registry: MetricsRegistry, kind: str):
+        self.kind = kind
+        prefix = "grpc_%s_" % kind
+        self.started = registry.counter(
+            prefix + "started_total",
+            "Total number of RPCs started.", self.LABELS)
+        self.handled = registry.counter(
+            prefix + "handled_total",
+            "Total number of RPCs completed, regardless of success or "
+            "failure.", self.LABELS + ("grpc_code",))
+        self.handling_seconds = registry.histogram(
+            prefix + "handling_seconds",
+            "Histogram of response latency (seconds) of the RPCs, until "
+            "the last message of the stream.", self.LABELS)
+        self.first_message_seconds = registry.histogram(
+            prefix + "stream_first_message_seconds",
+            "Histogram of the latency (seconds) of the first message of the "
+            "response streams.", self.LABELS)
+        self.in_flight = registry.gauge(
+            prefix + "in_flight",
+            "Number of RPCs currently in flight.", self.LABELS)
+        self.msg_received = registry.counter(
+            prefix + "msg_received_total",
+            "Total number of messages received.", self.LABELS)
+        self.msg_sent = registry.counter(
+            prefix + "msg_sent_total",
+            "Total number of messages sent.", self.LABELS)
+        self.bytes_received = registry.counter(
+            prefix + "msg_received_bytes_total",
+            "Total size in bytes of the messages received.", self.LABELS)
+        self.bytes_sent = registry.counter(
+            prefix + "msg_sent_bytes_total",
+            "Total size in bytes of the messages sent.", self.LABELS)
+
+    def start(self, full_method,
+              response_streaming: bool = False) -> '_CallMetrics':
+        """Records the start of a call, and returns its metrics"""
+        return _CallMetrics(self, base.split_method(full_method),
+                            response_streaming)
+
+
+class _CallMetrics:
+    """Metrics of a single call"""
+
+    def __init__(self, metrics: GrpcMetrics, labels,
+                 response_streaming: bool):
+        self._metrics = metrics
+        self._labels = labels
+        self._start = time.monotonic()
+        self._done = False
+        # the responses are received by clients and sent by servers
+        self._await_first = metrics.kind if response_streaming else None
+        metrics.started.labels(*labels).inc()
+        metrics.in_flight.labels(*labels).inc()
+
+    def received(self, msg):
+        if self._await_first == "client":
+            self._first_message()
+        self._metrics.msg_received.labels(*self._labels).inc()
+        self._metrics.bytes_received.labels(*self._labels).inc(
+            message_size(msg))
+
+    def sent(self, msg):
+        if self._await_first == "server":
+            self._first_message()
+        self._metrics.msg_sent.labels(*self._labels).inc()
+        self._metrics.bytes_sent.labels(*self._labels).inc(message_size(msg))
+
+    def _first_message(self):
+        self._await_first = None
+        self._metrics.first_message_seconds.labels(*self._labels).observe(
+            time.monotonic() - self._start)
+
+    def done(self, code: grpc.StatusCode):
+        if self._done:
+            return
+
+        self._done = True
+        labels = self._labels
+        self._metrics.in_flight.labels(*labels).dec()
+        self._metrics.handled.labels(*labels, base.code_name(code)).inc()
+        self._metrics.handling_seconds.labels(*labels).observe(
+            time.monotonic() - self._start)
+
+    def observe_requests(self, request_iterator):
+        for msg in request_iterator:
+            self.received(msg)
+            yield msg
+
+
+class MetricsClientInterceptorMixin:
+    """Metrics interceptor for client"""
+
+    def __init__(self, registry: MetricsRegistry = REGISTRY):
+        """Initializes the interceptor recording to the given registry"""
+        self._metrics = GrpcMetrics(registry, "client")
+
+    def _start(self, client_call_details, request,
+               response_streaming=False):
+        call = self._metrics.start(client_call_details.method,
+                                   response_streaming)
+        if hasattr(request, "ByteSize") or isinstance(request, bytes):
+            call.sent(request)
+            return call, request
+
+        return call, self._observe_sent(call, request)
+
+    @staticmethod
+    def _observe_sent(call, request_iterator):
+        for msg in request_iterator:
+            call.sent(msg)
+            yield msg
+
+
+class MetricsUnaryClientInterceptor(MetricsClientInterceptorMixin,
+                                    base.UnaryClientInterceptor):
+    """Metrics interceptor for unary client"""
+
+    def intercept_unary(self, continuation, client_call_details, request):
+        call, request = self._start(client_call_details, request)
+        out = continuation(client_call_details, request)
+
+        def done(future):
+            code = future.code()
+            if code is grpc.StatusCode.OK:
+                call.received(future.result())
+            call.done(code)
+
+        # works both for blocking invocations and for futures
+        out.add_done_callback(done)
+        return out
+
+
+class MetricsStreamClientInterceptor(MetricsClientInterceptorMixin,
+                                     base.StreamClientInterceptor):
+    """Metrics interceptor for streaming client
+
+    The call is considered finished when its response stream is over, not
+    when the invocation returns the stream.
+
+    """
+    def intercept_stream(self, continuation, client_call_details, request):
+        call, request = self._start(client_call_details, request, True)
+        try:
+            out = continuation(client_call_details, request)
+        except Exception as exc:
+            call.done(base.error_code(exc))
+            raise
+
+        return ObservedStream(out, call.received, call.done)
+
+
+class MetricsServerInterceptorMixin:
+    """Metrics interceptor for server
+
+    As the logger interceptors, it is always wrapped by
+    `lookout.sdk.interceptors.base.ServerInterceptorWrapper`.
+
+    """
+    def __init__(self, registry: MetricsRegistry = REGISTRY):
+        """Initializes the interceptor recording to the given registry"""
+        self._metrics = GrpcMetrics(registry, "server")
+
+    def intercept_service(self, continuation, handler_call_details):
+        out = continuation(handler_call_details)
+        if out is None:
+            return None
+
+        method = handler_call_details.method
+        return out._replace(
+            unary_unary=self._build_wrapper(method, out.unary_unary, False),
+            unary_stream=self._build_wrapper(method, out.unary_stream, False),
+            stream_unary=self._build_wrapper(method, out.stream_unary, True),
+            stream_stream=self._build_wrapper(method, out.stream_stream,
+                                              True),
+        )
+
+    def _start(self, method, request, request_streaming):
+        call = self._metrics.start(method, self.is_streaming)
+        if request_streaming:
+            return call, call.observe_requests(request)
+
+        call.received(request)
+        return call, request
+
+    def _build_wrapper(self, method, original, request_streaming):
+        raise NotImplementedError()
+
+
+def _context_code(context, default):
+    # `code` is available on the servicer context since grpcio 1.38
+    code_fn = getattr(context, "code", None)
+    code = code_fn() if code_fn is not None else None
+    return code if isinstance(code, grpc.StatusCode) else default
+
+
+class MetricsUnaryServerInterceptor(MetricsServerInterceptorMixin,
+                                    base.UnaryServerInterceptor):
+    """Metrics interceptor for unary server"""
+
+    def _build_wrapper(self, method, original, request_streaming):
+        if original is None:
+            return None
+
+        def wrapper(request, context):
+            call, request = self._start(method, request, request_streaming)
+            code = grpc.StatusCode.OK
+            try:
+                resp = original(request, context)
+                call.sent(resp)
+                return resp
+            except Exception:
+                code = grpc.StatusCode.UNKNOWN
+                raise
+            finally:
+                call.done(_context_code(context, code))
+
+        return wrapper
+
+
+class MetricsStreamServerInterceptor(MetricsServerInterceptorMixin,
+                                     base.StreamServerInterceptor):
+    """Metrics interceptor for streaming server"""
+
+    def _build_wrapper(self, method, original, request_streaming):
+        if original is None:
+            return None
+
+        def wrapper(request, context):
+            call, request = self._start(method, request, request_streaming)
+            code = grpc.StatusCode.OK
+            try:
+                for msg in original(request, context):
+                    call.sent(msg)
+                    yield msg
+            except GeneratorExit:
+                # the client went away before the end of the stream
+                code = grpc.StatusCode.CANCELLED
+                raise
+            except Exception:
+                code = grpc.StatusCode.UNKNOWN
+                raise
+            finally:
+                call.done(_context_code(context, code))
+
+        return wrapper
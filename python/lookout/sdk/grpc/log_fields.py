@@ -1,10 +1,15 @@
 import json
+import inspect
 import functools
+from types import MappingProxyType
 
-from typing import Optional, Tuple, List, Any, Dict
+from typing import Optional, Tuple, List, Any, Dict, Mapping
 
 LOG_FIELDS_KEY_META = "log-fields"
 
+# Maximum number of distinct serialized log fields kept parsed
+PARSED_LOG_FIELDS_CACHE_SIZE = 1024
+
 
 def wrap_context(func):
     """Wraps the provided servicer method by passing a wrapped context
@@ -22,6 +27,26 @@ def wrap_context(func):
     return wrapper
 
 
+def wrap_context_async(func):
+    """Wraps the provided asyncio servicer method by passing a wrapped context
+
+    Same as `wrap_context`, but the returned method is a coroutine function.
+    The wrapped method can be either a coroutine function or a plain one.
+
+    :param func: the servicer method to wrap_context
+    :returns: the wrapped servicer method
+
+    """
+    @functools.wraps(func)
+    async def wrapper(self, request, context):
+        resp = func(self, request, LogFieldsContext(context))
+        if inspect.isawaitable(resp):
+            resp = await resp
+        return resp
+
+    return wrapper
+
+
 class LogFieldsContext:
     """Context wrapper that exposes utilities to handle log fields"""
 
@@ -30,6 +55,8 @@ class LogFieldsContext:
         self._context = context
         self._invocation_metadata = dict(context.invocation_metadata())
         self._log_fields = LogFields.from_metadata(self._invocation_metadata)
+        self._packed_metadata = None
+        self._packed_version = None
 
     def __getattr__(self, attr: str):
         """Proxies every attr to the underlying context"""
@@ -54,13 +81,46 @@ class LogFieldsContext:
         """Packs the log fields and the invocation metadata into a new metadata
 
         The log fields are added in the new metadata with the key
-        `LOG_FIELDS_KEY_META`.
+        `LOG_FIELDS_KEY_META`. The packed metadata is computed again only
+        when the log fields change, a new list is returned every time.
 
         """
-        metadata = [(k, v) for k, v in self._invocation_metadata.items()
-                    if k != LOG_FIELDS_KEY_META]
-        metadata.append((LOG_FIELDS_KEY_META, self._log_fields.dumps()))
-        return metadata
+        version = self._log_fields.version
+        if self._packed_metadata is None or self._packed_version != version:
+            metadata = [(k, v) for k, v in self._invocation_metadata.items()
+                        if k != LOG_FIELDS_KEY_META]
+            metadata.append((LOG_FIELDS_KEY_META, self._log_fields.dumps()))
+            self._packed_metadata = tuple(metadata)
+            self._packed_version = version
+
+        return list(self._packed_metadata)
+
+
+@functools.lru_cache(maxsize=PARSED_LOG_FIELDS_CACHE_SIZE)
+def _parse_log_fields(data: str) -> Mapping[str, Any]:
+    # the returned fields are shared, they are frozen so that they can't be
+    # modified
+    return _freeze(json.loads(data))
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return {k: _thaw(v) for k, v in value.items()}
+
+    if isinstance(value, (list, tuple)):
+        return [_thaw(v) for v in value]
+
+    return value
 
 
 class LogFields:
@@ -69,9 +129,21 @@ class LogFields:
     Provides utilities for log fields serialization and deserialization, and
     to read and add them.
 
+    The log fields parsed from the metadata are shared by every instance
+    created from the same serialized fields, e.g. by the server interceptors
+    and by the context of the same call, so they are parsed only once. The
+    shared fields are copied the first time they are modified or accessed
+    through `fields`, and their serialization is kept until they change.
+
     """
     def __init__(self, fields: Optional[Dict[str, Any]] = None):
         self._fields = fields or {}
+        self._shared = False
+        # whether `fields` handed out the dict, which can then be modified
+        # without `add_fields`
+        self._exposed = False
+        self._dumped = None
+        self._version = 0
 
     @classmethod
     def from_metadata(cls, metadata: Dict[str, Any]) -> 'LogFields':
@@ -81,13 +153,34 @@ class LogFields:
         provided metadata.
 
         """
-        return cls(fields=json.loads(metadata.get(LOG_FIELDS_KEY_META, '{}')))
+        data = metadata.get(LOG_FIELDS_KEY_META)
+        if not data:
+            return cls()
+
+        log_fields = cls(fields=_parse_log_fields(data))
+        log_fields._shared = True
+        log_fields._dumped = data
+        return log_fields
 
     @property
     def fields(self) -> Dict[str, Any]:
-        """Returns the log fields"""
+        """Returns the log fields, the returned dict can be modified"""
+        self._own()
+        self._exposed = True
         return self._fields
 
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns a copy of the log fields"""
+        return _thaw(self._fields)
+
+    @property
+    def version(self) -> int:
+        """Returns a number increased every time the log fields change"""
+        if self._exposed:
+            # detects the changes made through `fields`
+            self.dumps()
+        return self._version
+
     def add_fields(self, fields):
         """Add the provided log fields
 
@@ -98,8 +191,23 @@ class LogFields:
         """
         for k, v in fields.items():
             if k not in self._fields:
+                self._own()
                 self._fields[k] = v
+                self._dumped = None
+                self._version += 1
 
     def dumps(self) -> str:
         """Dumps the log fields into a JSON string"""
-        return json.dumps(self._fields)
+        if self._dumped is None or self._exposed:
+            dumped = json.dumps(self._fields)
+            if dumped != self._dumped:
+                if self._dumped is not None:
+                    self._version += 1
+                self._dumped = dumped
+
+        return self._dumped
+
+    def _own(self):
+        if self._shared:
+            self._fields = _thaw(self._fields)
+            self._shared = False
@@ -0,0 +1,74 @@
+import random
+from typing import Dict, Optional
+
+from lookout.sdk.grpc.interceptors.base import split_method
+
+
+class LogSampler:
+    """Decides which calls are logged by the logger interceptors
+
+    Head sampling decides when a call starts whether it is logged, with a
+    probability configured for each method or service. Tail sampling keeps
+    the calls not picked by the head sampling if they failed or were slow:
+    the "started" record of those calls is buffered until their outcome is
+    known, and emitted together with the "finished" one.
+
+    """
+    def __init__(self, rate: float = 1.0,
+                 method_rates: Optional[Dict[str, float]] = None,
+                 keep_errors: bool = True,
+                 slow_threshold: Optional[float] = None,
+                 rng: Optional[random.Random] = None):
+        """Initializes the sampler
+
+        :param rate: probability, between 0 and 1, of logging a call.
+        :param method_rates: optional probability of logging a call by
+            method, either as `<service>/<method>`, e.g.
+            `pb.Data/GetChanges`, or by service, e.g. `pb.Data`.
+        :param keep_errors: whether the failed calls are always logged.
+        :param slow_threshold: optional duration in seconds above which the
+            calls are always logged.
+        :param rng: optional random number generator.
+
+        """
+        self._rate = rate
+        self._method_rates = dict(method_rates or {})
+        self._keep_errors = keep_errors
+        self._slow_threshold = slow_threshold
+        self._random = (rng or random.Random()).random
+        self._rates = {}
+
+    @property
+    def tail_sampling(self) -> bool:
+        """Returns whether some calls are kept depending on their outcome"""
+        return self._keep_errors or self._slow_threshold is not None
+
+    def rate(self, full_method) -> float:
+        """Returns the probability of logging a call of the given method"""
+        rate = self._rates.get(full_method)
+        if rate is None:
+            service, method = split_method(full_method)
+            rate = self._method_rates.get(
+                "%s/%s" % (service, method),
+                self._method_rates.get(service, self._rate))
+            self._rates[full_method] = rate
+
+        return rate
+
+    def head(self, full_method) -> bool:
+        """Returns whether a call of the given method is logged from start"""
+        rate = self.rate(full_method)
+        return rate >= 1 or (rate > 0 and self._random() < rate)
+
+    def tail(self, failed: bool, duration: float) -> bool:
+        """Returns whether a call not picked by the head sampling is logged
+
+        :param failed: whether the call failed.
+        :param duration: duration of the call in seconds.
+
+        """
+        if failed and self._keep_errors:
+            return True
+
+        return self._slow_threshold is not None and \
+            duration >= self._slow_threshold
@@ -0,0 +1,225 @@
+import atexit
+import json
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, IO, Optional
+
+from lookout.sdk.grpc.log_fields import LogFields
+from lookout.sdk.grpc.metrics import MetricsRegistry
+
+
+def format_timestamp(t: float) -> str:
+    """Formats a wall-clock time in seconds as an RFC 3339 UTC timestamp"""
+    return "%s.%06dZ" % (time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(t)),
+                         int(t % 1 * 1e6))
+
+
+class BufferedLogSink:
+    """Log function writing the records from a background thread
+
+    An instance can be passed as `log_fn` to the logger interceptors. The
+    call only takes a snapshot of the log fields and appends it to a bounded
+    queue, so a slow log destination never adds latency to the RPCs. A
+    background thread drains the queue and writes the records in batches,
+    as JSON lines with the `msg`, `time` and `level` keys used by the Go
+    analyzers, followed by the log fields.
+
+    When the queue is full, the records are either dropped, and counted in
+    `dropped`, or the caller waits for some room, depending on the policy.
+
+    """
+    DROP = "drop"
+    BLOCK = "block"
+
+    def __init__(self, stream: Optional[IO[str]] = None,
+                 max_records: int = 10000, policy: str = DROP,
+                 batch_size: int = 512, flush_interval: float = 0.1,
+                 level: str = "info",
+                 registry: Optional[MetricsRegistry] = None):
+        """Starts the writer thread
+
+        :param stream: text stream the records are written to, stderr by
+            default.
+        :param max_records: maximum number of queued records.
+        :param policy: what to do when the queue is full, either `DROP` the
+            record or `BLOCK` until there is room for it.
+        :param batch_size: maximum number of records written at once, the
+            writer is woken up as soon as as many records are queued.
+        :param flush_interval: maximum time in seconds a record waits in the
+            queue.
+        :param level: level of the records.
+        :param registry: optional metrics registry where the number of
+            dropped records is exposed.
+
+        """
+        if policy not in (self.DROP, self.BLOCK):
+            raise ValueError("unknown policy %r" % policy)
+
+        if max_records < 1 or batch_size < 1:
+            raise ValueError("max_records and batch_size must be positive")
+
+        self._stream = stream if stream is not None else sys.stderr
+        self._max_records = max_records
+        self._block = policy == self.BLOCK
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._level = level
+        self._queue = deque()
+        self._wakeup = threading.Event()
+        self._room = threading.Condition()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._writing = False
+        self._dropped = 0
+        self._written = 0
+        self._errors = 0
+        self._dropped_counter = None
+        if registry is not None:
+            self._dropped_counter = registry.counter(
+                "lookout_sdk_log_records_dropped_total",
+                "Total number of log records dropped because the queue of "
+                "the log sink was full.")
+
+        self._thread = threading.Thread(target=self._run,
+                                        name="lookout-sdk-log-sink",
+                                        daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    @property
+    def dropped(self) -> int:
+        """Returns the number of records dropped because the queue was full"""
+        return self._dropped
+
+    @property
+    def written(self) -> int:
+        """Returns the number of records written"""
+        return self._written
+
+    @property
+    def errors(self) -> int:
+        """Returns the number of batches lost because the write failed"""
+        return self._errors
+
+    def __len__(self) -> int:
+        """Returns the number of queued records"""
+        return len(self._queue)
+
+    def __call__(self, log_fields: LogFields, msg: str):
+        """Queues a record, with the same signature of the `log_fn`s"""
+        if self._closed:
+            return
+
+        record = (time.time(), msg, log_fields.to_dict())
+        queue = self._queue
+        if len(queue) >= self._max_records:
+            if not self._block:
+                self._drop()
+                return
+
+            with self._room:
+                self._wakeup.set()
+                while len(queue) >= self._max_records and not self._closed:
+                    self._room.wait(self._flush_interval)
+
+        # appending to a deque is atomic, no lock is needed
+        queue.append(record)
+        if len(queue) >= self._batch_size:
+            self._wakeup.set()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Waits until the queued records are written
+
+        :param timeout: optional maximum time to wait, in seconds.
+        :returns: whether every record was written.
+
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._room:
+            while (self._queue or self._writing) and \
+                    self._thread.is_alive():
+                self._wakeup.set()
+                remaining = None if deadline is None else \
+                    deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._room.wait(remaining if remaining is not None
+                                else self._flush_interval)
+
+        return not self._queue and not self._writing
+
+    def close(self, timeout: Optional[float] = None):
+        """Writes the queued records and stops the writer thread
+
+        The records logged after closing are ignored.
+
+        """
+        if self._closed:
+            return
+
+        self._closed = True
+        atexit.unregister(self.close)
+        self._wakeup.set()
+        self._thread.join(timeout)
+
+    def __enter__(self) -> 'BufferedLogSink':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def format_record(self, t: float, msg: str,
+                      fields: Dict[str, Any]) -> str:
+        """Formats a record as a JSON line"""
+        record = {"msg": msg, "time": format_timestamp(t),
+                  "level": self._level}
+        for k, v in fields.items():
+            record.setdefault(k, v)
+
+        return json.dumps(record, default=str)
+
+    def _drop(self):
+        with self._lock:
+            self._dropped += 1
+
+        if self._dropped_counter is not None:
+            self._dropped_counter.inc()
+
+    def _run(self):
+        queue = self._queue
+        while True:
+            self._wakeup.wait(self._flush_interval)
+            self._wakeup.clear()
+            closed = self._closed
+
+            while queue:
+                self._writing = True
+                batch = []
+                while queue and len(batch) < self._batch_size:
+                    batch.append(queue.popleft())
+
+                with self._room:
+                    self._room.notify_all()
+
+                self._write(batch)
+
+            with self._room:
+                self._writing = False
+                self._room.notify_all()
+
+            if closed:
+                return
+
+    def _write(self, batch):
+        try:
+            lines = [self.format_record(*record) for record in batch]
+            self._stream.write("\n".join(lines) + "\n")
+            self._stream.flush()
+        except Exception:
+            # the destination is not available, never fail the RPCs for it
+            self._errors += 1
+            return
+
+        self._written += len(batch)
@@ -0,0 +1,320 @@
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Buckets of the latency histograms, in seconds
+DEFAULT_BUCKETS = (.005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10, 30, 60,
+                   120, 300)
+
+
+class _Shards:
+    """Values updated without locks, by keeping a slot for each thread
+
+    Each thread only writes to its own slot, and the slots are summed when
+    the value is read, so that the hot path of the interceptors never waits
+    for a lock. The slots of the threads which are over are folded into a
+    base value, when a new thread gets its slot or the value is read, so
+    that the short-lived threads of the streams don't accumulate slots.
+
+    """
+    def __init__(self, size: int):
+        self._size = size
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._base = [0] * size
+        self._slots = []
+
+    def slot(self) -> List[float]:
+        slot = getattr(self._local, "slot", None)
+        if slot is None:
+            slot = [0] * self._size
+            self._local.slot = slot
+            with self._lock:
+                self._fold()
+                self._slots.append((threading.current_thread(), slot))
+
+        return slot
+
+    def sum(self) -> List[float]:
+        with self._lock:
+            self._fold()
+            slots = [slot for _, slot in self._slots]
+            slots.append(list(self._base))
+
+        return [sum(values) for values in zip(*slots)]
+
+    def _fold(self):
+        # a thread which is over doesn't write to its slot anymore
+        alive = []
+        for thread, slot in self._slots:
+            if thread.is_alive():
+                alive.append((thread, slot))
+            else:
+                for i, value in enumerate(slot):
+                    self._base[i] += value
+
+        self._slots = alive
+
+
+class _Metric:
+    """Base class of the metrics, with a child for each set of labels"""
+
+    TYPE = None
+
+    def __init__(self, name: str, documentation: str,
+                 labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children = {}
+
+    def labels(self, *labelvalues: str):
+        """Returns the child of the metric for the provided label values"""
+        child = self._children.get(labelvalues)
+        if child is None:
+            if len(labelvalues) != len(self.labelnames):
+                raise ValueError("expected labels %s" % (self.labelnames,))
+
+            with self._lock:
+                child = self._children.setdefault(labelvalues,
+                                                  self._new_child())
+
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError()
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        """Returns the current samples as (name, labels, value) tuples"""
+        with self._lock:
+            children = list(self._children.items())
+
+        samples = []
+        for labelvalues, child in sorted(children):
+            labels = dict(zip(self.labelnames, labelvalues))
+            samples.extend(self._child_samples(labels, child))
+
+        return samples
+
+    def _child_samples(self, labels, child):
+        return [(self.name, labels, child.value)]
+
+
+class _Value:
+
+    def __init__(self):
+        self._shards = _Shards(1)
+
+    def inc(self, amount: float = 1):
+        self._shards.slot()[0] += amount
+
+    def dec(self, amount: float = 1):
+        self._shards.slot()[0] -= amount
+
+    @property
+    def value(self) -> float:
+        return self._shards.sum()[0]
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter"""
+
+    TYPE = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1):
+        """Increments the counter without labels"""
+        self.labels().inc(amount)
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, e.g. the number of in-flight calls"""
+
+    TYPE = "gauge"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1):
+        """Increments the gauge without labels"""
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1):
+        """Decrements the gauge without labels"""
+        self.labels().dec(amount)
+
+
+class _HistogramValue:
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        # one slot for each bucket, plus +Inf, plus the sum
+        self._shards = _Shards(len(buckets) + 2)
+
+    def observe(self, value: float):
+        slot = self._shards.slot()
+        slot[bisect.bisect_left(self.buckets, value)] += 1
+        slot[-1] += value
+
+    def snapshot(self) -> Tuple[List[float], float]:
+        values = self._shards.sum()
+        return values[:-1], values[-1]
+
+
+class Histogram(_Metric):
+    """Distribution of the observed values in buckets"""
+
+    TYPE = "histogram"
+
+    def __init__(self, name: str, documentation: str,
+                 labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float):
+        """Observes a value without labels"""
+        self.labels().observe(value)
+
+    def _child_samples(self, labels, child):
+        counts, total = child.snapshot()
+        samples = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            bucket_labels = dict(labels, le=_format_value(bound))
+            samples.append((self.name + "_bucket", bucket_labels, cumulative))
+
+        samples.append((self.name + "_count", labels, cumulative))
+        samples.append((self.name + "_sum", labels, total))
+        return samples
+
+
+class MetricsRegistry:
+    """Collection of metrics exposed together"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def counter(self, name: str, documentation: str,
+                labelnames: Sequence[str] = ()) -> Counter:
+        """Returns the counter with the given name, creating it if needed"""
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str,
+              labelnames: Sequence[str] = ()) -> Gauge:
+        """Returns the gauge with the given name, creating it if needed"""
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str,
+                  labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        """Returns the histogram with the given name, creating it if needed"""
+        return self._get_or_create(Histogram, name, documentation,
+                                   labelnames, buckets=buckets)
+
+    def get(self, name: str) -> Optional[_Metric]:
+        """Returns the metric with the given name, if any"""
+        return self._metrics.get(name)
+
+    def _get_or_create(self, cls, name, documentation, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = cls(name, documentation, labelnames, **kwargs)
+                self._metrics[name] = metric
+            elif not isinstance(metric, cls) or \
+                    metric.labelnames != tuple(labelnames):
+                raise ValueError("metric %s already registered with a "
+                                 "different type or labels" % name)
+
+            return metric
+
+    def exposition(self) -> str:
+        """Returns the metrics in the Prometheus text exposition format"""
+        with self._lock:
+            metrics = sorted(self._metrics.items())
+
+        lines = []
+        for name, metric in metrics:
+            lines.append("# HELP %s %s" % (name, _escape(
+                metric.documentation)))
+            lines.append("# TYPE %s %s" % (name, metric.TYPE))
+            for sample_name, labels, value in metric.samples():
+                lines.append("%s%s %s" % (sample_name, _format_labels(labels),
+                                          _format_value(value)))
+
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+def start_metrics_server(port: int, addr: str = "",
+                         registry: MetricsRegistry = REGISTRY
+                         ) -> HTTPServer:
+    """Serves the metrics over HTTP from a background thread
+
+    The metrics are exposed at every path in the Prometheus text format, so
+    that they can be scraped as `http://<addr>:<port>/metrics`.
+
+    :param port: the port to listen on, 0 to pick a free one.
+    :param addr: the address to listen on, all the interfaces by default.
+    :param registry: the registry of the metrics to expose.
+    :returns: the HTTP server, stop it with `shutdown`.
+
+    """
+    class Handler(BaseHTTPRequestHandler):
+
+        def do_GET(self):
+            body = registry.exposition().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type",
+                             "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = _ThreadingHTTPServer((addr, port), Handler)
+    threading.Thread(target=server.serve_forever, name="lookout-sdk-metrics",
+                     daemon=True).start()
+    return server
+
+
+def _escape(s):
+    return s.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+
+    return "{%s}" % ",".join(
+        '%s="%s"' % (k, _escape(str(v)).replace('"', '\\"'))
+        for k, v in labels.items())
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+
+    if float(value).is_integer():
+        return str(int(value)) if abs(value) < 1e15 else repr(float(value))
+
+    return repr(float(value))
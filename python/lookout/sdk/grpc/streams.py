@@ -0,0 +1,485 @@
+import functools
+import threading
+import time
+from collections import Counter, deque
+from typing import Any, Callable, Iterator, Optional
+
+import grpc
+
+from lookout.sdk.grpc.interceptors.base import error_code
+
+
+def message_size(msg: Any) -> int:
+    """Returns the size in bytes of a protobuf message or of a raw buffer"""
+    if isinstance(msg, (bytes, bytearray, memoryview)):
+        return len(msg)
+
+    return msg.ByteSize()
+
+
+class StreamStats:
+    """Accounting of the messages of a stream
+
+    Records the number and the total size of the messages, and the time from
+    the start of the call to the first message, using the monotonic clock.
+
+    """
+    __slots__ = ("start", "messages", "bytes", "first_message")
+
+    def __init__(self, start: Optional[float] = None):
+        """Initializes the stats of a stream started at the given time
+
+        :param start: start of the call as `time.monotonic()`, now by default.
+
+        """
+        self.start = time.monotonic() if start is None else start
+        self.messages = 0
+        self.bytes = 0
+        self.first_message = None
+
+    def message(self, msg: Any):
+        """Accounts a message of the stream"""
+        if self.first_message is None:
+            self.first_message = time.monotonic() - self.start
+
+        self.messages += 1
+        self.bytes += message_size(msg)
+
+
+class ObservedStream:
+    """Stream reporting each message and its end to the provided callbacks
+
+    `on_message` is called with each message received, and `on_done` with
+    the final status code once the stream is exhausted, fails or is
+    cancelled. Every other attribute is proxied to the wrapped stream.
+
+    """
+    def __init__(self, stream: Iterator,
+                 on_message: Callable[[Any], None],
+                 on_done: Callable[[grpc.StatusCode], None]):
+        self._stream = stream
+        self._on_message = on_message
+        self._on_done = on_done
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            msg = next(self._stream)
+        except StopIteration:
+            self._done(grpc.StatusCode.OK)
+            raise
+        except BaseException as exc:
+            self._done(error_code(exc))
+            raise
+
+        self._on_message(msg)
+        return msg
+
+    def __getattr__(self, attr):
+        return getattr(self._stream, attr)
+
+    def cancel(self) -> bool:
+        cancelled = self._stream.cancel()
+        self._done(grpc.StatusCode.CANCELLED)
+        return cancelled
+
+    def __del__(self):
+        if "_stream" in self.__dict__:
+            # an abandoned gRPC stream is cancelled by its destructor
+            self._done(grpc.StatusCode.CANCELLED)
+
+    def _done(self, code: grpc.StatusCode):
+        on_done, self._on_done = self._on_done, None
+        if on_done is not None:
+            on_done(code)
+
+
+class _PrefetchBuffer:
+    """Bounded buffer shared between the prefetching thread and the consumer"""
+
+    def __init__(self, max_messages: int, max_bytes: Optional[int]):
+        self.max_messages = max_messages
+        self.max_bytes = max_bytes
+        self.cond = threading.Condition()
+        self.items = deque()
+        self.size = 0
+        self.done = False
+        self.closed = False
+        self.error = None
+
+    def is_full(self, size: int) -> bool:
+        if not self.items:
+            # a message bigger than `max_bytes` is still let through alone
+            return False
+
+        if len(self.items) >= self.max_messages:
+            return True
+
+        return self.max_bytes is not None and \
+            self.size + size > self.max_bytes
+
+    def fill(self, stream: Iterator, size_fn: Callable[[Any], int]):
+        try:
+            for msg in stream:
+                size = size_fn(msg)
+                with self.cond:
+                    while not self.closed and self.is_full(size):
+                        self.cond.wait()
+
+                    if self.closed:
+                        return
+
+                    self.items.append((msg, size))
+                    self.size += size
+                    self.cond.notify_all()
+        except BaseException as exc:
+            self.error = exc
+        finally:
+            with self.cond:
+                self.done = True
+                self.cond.notify_all()
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.items.clear()
+            self.size = 0
+            self.cond.notify_all()
+
+
+class PrefetchIterator:
+    """Iterator draining a stream on a background thread
+
+    Reading the response stream of a gRPC call only when the consumer asks
+    for the next message makes the consumer alternate between waiting on the
+    network and processing. This iterator instead reads the stream ahead on
+    a background thread, so that network transfer and deserialization
+    overlap with the processing of the previous messages.
+
+    The read-ahead is bounded both in number of messages and in total bytes,
+    to keep the memory usage under control with big UASTs. A single message
+    bigger than `max_bytes` is still buffered alone.
+
+    Errors raised by the stream are re-raised to the consumer once the
+    messages received before them have been consumed. Closing or cancelling
+    the iterator cancels the underlying call, and stops the thread.
+
+    Every other attribute is proxied to the wrapped stream, so that the
+    `grpc.Call` api (`code`, `details`, ...) is still available.
+
+    """
+    def __init__(self, stream: Iterator, max_messages: int = 16,
+                 max_bytes: Optional[int] = None,
+                 size_fn: Callable[[Any], int] = message_size):
+        """Starts prefetching the provided stream
+
+        :param stream: the stream to prefetch, usually a gRPC response
+            iterator.
+        :param max_messages: maximum number of buffered messages.
+        :param max_bytes: optional maximum size in bytes of the buffered
+            messages.
+        :param size_fn: function returning the size in bytes of a message.
+
+        """
+        if max_messages < 1:
+            raise ValueError("max_messages must be positive")
+
+        self._stream = stream
+        self._buffer = _PrefetchBuffer(max_messages, max_bytes)
+        # the thread must not reference `self`, so that an abandoned
+        # iterator can be garbage collected and closed
+        self._thread = threading.Thread(
+            target=self._buffer.fill, args=(stream, size_fn),
+            name="lookout-sdk-prefetch", daemon=True)
+        self._thread.start()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        buf = self._buffer
+        with buf.cond:
+            while not buf.items and not buf.done:
+                buf.cond.wait()
+
+            if buf.items:
+                msg, size = buf.items.popleft()
+                buf.size -= size
+                buf.cond.notify_all()
+                return msg
+
+        if buf.error is not None:
+            raise buf.error
+
+        raise StopIteration()
+
+    def __getattr__(self, attr):
+        return getattr(self._stream, attr)
+
+    def cancel(self) -> bool:
+        """Cancels the underlying call and stops prefetching"""
+        self._buffer.close()
+        cancel = getattr(self._stream, "cancel", None)
+        return cancel() if cancel is not None else False
+
+    close = cancel
+
+    def __del__(self):
+        buf = self.__dict__.get("_buffer")
+        if buf is not None and not buf.done:
+            self.cancel()
+
+
+class _SharedStream:
+    """Upstream stream read by a background thread for several consumers
+
+    The messages are buffered until every consumer has read them. The
+    reading thread waits while `max_messages` messages are buffered, so
+    that the memory usage is bounded by the slowest consumer.
+
+    """
+    def __init__(self, max_messages: int):
+        self.cond = threading.Condition()
+        self.max_messages = max_messages
+        # `messages[0]` is the message number `base` of the stream
+        self.messages = deque()
+        self.base = 0
+        # number of consumers at each position of the stream
+        self.cursors = Counter()
+        self.done = False
+        self.closed = False
+        self.error = None
+        self.consumers = 0
+        self.stream = None
+
+    def start(self, start_fn: Callable[[], Iterator], on_done: Callable):
+        try:
+            self.stream = start_fn()
+        except BaseException as exc:
+            self.finish(exc, on_done)
+            raise
+
+        threading.Thread(target=self.fill, args=(on_done,),
+                         name="lookout-sdk-coalesce", daemon=True).start()
+
+    def fill(self, on_done: Callable):
+        err = None
+        try:
+            for msg in self.stream:
+                with self.cond:
+                    while not self.closed and \
+                            len(self.messages) >= self.max_messages:
+                        self.cond.wait()
+
+                    if self.closed:
+                        return
+
+                    self.messages.append(msg)
+                    self.cond.notify_all()
+        except BaseException as exc:
+            err = exc
+        finally:
+            self.finish(err, on_done)
+
+    def finish(self, err: Optional[BaseException], on_done: Callable):
+        on_done(self)
+        with self.cond:
+            self.error = err
+            self.done = True
+            self.cond.notify_all()
+
+    def join(self) -> bool:
+        """Adds a consumer reading from the first message, if it's still
+        buffered"""
+        with self.cond:
+            if self.base > 0:
+                return False
+
+            self.cursors[0] += 1
+            return True
+
+    def move(self, pos: int, new_pos: Optional[int]):
+        """Moves the cursor of a consumer, None removing it, and drops the
+        messages read by every consumer
+
+        Must be called with `cond` held.
+
+        """
+        self.cursors[pos] -= 1
+        if not self.cursors[pos]:
+            del self.cursors[pos]
+        if new_pos is not None:
+            self.cursors[new_pos] += 1
+
+        end = min(self.cursors) if self.cursors \
+            else self.base + len(self.messages)
+        if end > self.base:
+            for _ in range(end - self.base):
+                self.messages.popleft()
+            self.base = end
+            self.cond.notify_all()
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.messages.clear()
+            self.cond.notify_all()
+
+
+class CoalescedStream:
+    """Consumer view of a stream shared through `StreamCoalescer`
+
+    Each consumer reads all the messages of the shared stream from the
+    beginning, at its own pace. Every other attribute is proxied to the
+    upstream stream.
+
+    """
+    def __init__(self, coalescer: 'StreamCoalescer', shared: _SharedStream):
+        self._coalescer = coalescer
+        self._shared = shared
+        self._pos = 0
+        self._cancelled = False
+        self._detached = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._cancelled:
+            raise StopIteration()
+
+        shared = self._shared
+        with shared.cond:
+            while self._pos >= shared.base + len(shared.messages) and \
+                    not shared.done:
+                shared.cond.wait()
+
+            if self._pos < shared.base + len(shared.messages):
+                msg = shared.messages[self._pos - shared.base]
+                shared.move(self._pos, self._pos + 1)
+                self._pos += 1
+                return msg
+
+        self._detach()
+        if shared.error is not None:
+            raise shared.error
+
+        raise StopIteration()
+
+    def __getattr__(self, attr):
+        return getattr(self._shared.stream, attr)
+
+    def cancel(self) -> bool:
+        """Stops consuming the stream
+
+        The upstream call is cancelled only when no other consumer is left.
+
+        """
+        self._cancelled = True
+        return self._detach()
+
+    def __del__(self):
+        if "_shared" in self.__dict__:
+            self._detach()
+
+    def _detach(self) -> bool:
+        if self._detached:
+            return False
+
+        self._detached = True
+        shared = self._shared
+        with shared.cond:
+            shared.move(self._pos, None)
+        return self._coalescer._detach(shared)
+
+
+class StreamCoalescer:
+    """Shares identical in-flight streams between their consumers
+
+    When the same request is issued several times concurrently (e.g. a
+    redelivered event, or several analyzers of the same process reviewing
+    the same revisions), only the first one reaches the server. The
+    following ones attach to it and receive all its messages, as long as
+    its first message is still buffered, i.e. until every consumer has read
+    it. Later requests start a new stream.
+
+    The upstream stream is read on a background thread into a buffer shared
+    by the consumers. A message is dropped once every consumer has read it,
+    and the reading waits while `max_messages` messages are buffered: the
+    consumers of a stream may be `max_messages` messages apart at most, so
+    they must be read concurrently. The upstream stream is cancelled once
+    every consumer cancelled. Errors are propagated to all the consumers.
+
+    The same message instances are shared by the consumers, so they must be
+    treated as read-only.
+
+    """
+    def __init__(self, max_messages: int = 16):
+        """Initializes the coalescer
+
+        :param max_messages: maximum number of buffered messages of each
+            upstream stream.
+
+        """
+        if max_messages < 1:
+            raise ValueError("max_messages must be positive")
+
+        self.max_messages = max_messages
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self.started = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        """Returns the number of in-flight upstream streams"""
+        return len(self._inflight)
+
+    def subscribe(self, key: Any,
+                  start_fn: Callable[[], Iterator]) -> CoalescedStream:
+        """Returns a consumer of the in-flight stream identified by the key
+
+        :param key: hashable identifier of the stream, usually built from
+            the method and the serialized request.
+        :param start_fn: function starting the upstream stream, called only
+            when no stream with the same key is in flight.
+        :returns: an iterator over the messages of the stream.
+
+        """
+        with self._lock:
+            shared = self._inflight.get(key)
+            is_new = shared is None or not shared.join()
+            if is_new:
+                shared = _SharedStream(self.max_messages)
+                shared.join()
+                self._inflight[key] = shared
+                self.started += 1
+            else:
+                self.coalesced += 1
+
+            shared.consumers += 1
+
+        if is_new:
+            shared.start(start_fn, functools.partial(self._done, key))
+
+        return CoalescedStream(self, shared)
+
+    def _done(self, key: Any, shared: _SharedStream):
+        with self._lock:
+            if self._inflight.get(key) is shared:
+                del self._inflight[key]
+
+    def _detach(self, shared: _SharedStream) -> bool:
+        with self._lock:
+            shared.consumers -= 1
+            if shared.consumers > 0 or shared.done:
+                return False
+
+            for key, inflight in list(self._inflight.items()):
+                if inflight is shared:
+                    del self._inflight[key]
+
+        shared.close()
+        cancel = getattr(shared.stream, "cancel", None)
+        return cancel() if cancel is not None else False
@@ -0,0 +1,350 @@
+"""
+Load generator driving an analyzer with review and push events
+
+    lookout-sdk-loadgen ipv4://localhost:9930 --template review.json \\
+        --rate 20 --duration 60 --concurrency 32
+
+The events are built from templates, JSON files of objects
+`{"review": <ReviewEvent>}` or `{"push": <PushEvent>}` in the protobuf JSON
+mapping, one per line or a single one per file, or from the requests of a
+recording of the data service, see `lookout.sdk.recording`: each recorded
+`GetChanges` becomes a review event and each `GetFiles` a push event.
+
+With `--rate`, the events are sent open-loop at the given arrival rate,
+whether the analyzer keeps up or not, and the latency of each event is
+measured from the time it was due, so that queuing is not hidden. Without
+it, `--concurrency` events are sent back to back.
+
+`--concurrency` caps the events in flight in both modes: with `--rate`, the
+events arriving while the cap is reached wait for a free slot, and that
+wait counts in their latency. Size it above the rate times the expected
+latency so that the load generator is not the bottleneck.
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+import grpc
+from google.protobuf import json_format
+
+from lookout.sdk import event_pb2, service_analyzer_pb2_grpc, \
+    service_data_pb2
+from lookout.sdk.grpc import create_channel, to_grpc_address
+from lookout.sdk.grpc.interceptors.base import error_code
+
+Event = Union[event_pb2.ReviewEvent, event_pb2.PushEvent]
+
+
+def load_templates(path: str) -> List[Event]:
+    """Returns the events of a template file"""
+    with open(path) as f:
+        data = f.read()
+
+    try:
+        docs = [json.loads(data)]
+    except ValueError:
+        docs = [json.loads(line) for line in data.splitlines()
+                if line.strip()]
+
+    events = []
+    for doc in docs:
+        if "review" in doc:
+            events.append(json_format.ParseDict(doc["review"],
+                                                event_pb2.ReviewEvent()))
+        elif "push" in doc:
+            events.append(json_format.ParseDict(doc["push"],
+                                                event_pb2.PushEvent()))
+        else:
+            raise ValueError("%s: expected a review or a push event" % path)
+
+    return events
+
+
+def events_from_recording(path: str) -> List[Event]:
+    """Returns the events matching the requests of a recording"""
+    # imported here since mmap is not needed by the templates
+    from lookout.sdk.recording import Recording
+
+    events = []
+    with Recording(path) as recording:
+        for stream in recording.streams:
+            if stream.method == "/pb.Data/GetChanges":
+                request = service_data_pb2.ChangesRequest.FromString(
+                    stream.request)
+                event = event_pb2.ReviewEvent()
+                event.commit_revision.base.CopyFrom(request.base)
+                event.commit_revision.head.CopyFrom(request.head)
+            elif stream.method == "/pb.Data/GetFiles":
+                request = service_data_pb2.FilesRequest.FromString(
+                    stream.request)
+                event = event_pb2.PushEvent()
+                event.commit_revision.head.CopyFrom(request.revision)
+            else:
+                continue
+
+            event.provider = "loadgen"
+            events.append(event)
+
+    return events
+
+
+class LoadReport:
+    """Results of a load run, thread-safe"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = []
+        self.codes = Counter()
+        self.comments = 0
+        self.start = time.monotonic()
+        self.end = None
+
+    def add(self, latency: float, code: grpc.StatusCode, comments: int = 0):
+        """Records the result of an event"""
+        with self._lock:
+            self.latencies.append(latency)
+            self.codes[code.name] += 1
+            self.comments += comments
+
+    def finish(self):
+        self.end = time.monotonic()
+
+    def summary(self) -> Dict[str, Any]:
+        """Returns the results as a JSON-serializable dict"""
+        latencies = sorted(self.latencies)
+        count = len(latencies)
+        ok = self.codes.get(grpc.StatusCode.OK.name, 0)
+        seconds = (self.end or time.monotonic()) - self.start
+        result = {
+            "events": count,
+            "seconds": seconds,
+            "events_per_second": count / seconds if seconds else 0.0,
+            "errors": count - ok,
+            "error_rate": (count - ok) / count if count else 0.0,
+            "codes": dict(self.codes),
+            "comments": self.comments,
+            "comments_per_event": self.comments / ok if ok else 0.0,
+            "mean_ms": sum(latencies) / count * 1000 if count else 0.0,
+            "max_ms": latencies[-1] * 1000 if count else 0.0,
+        }
+        for q in (50, 90, 99, 99.9):
+            result["p%s_ms" % q] = percentile(latencies, q) * 1000
+
+        return result
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Returns the q-th percentile, by nearest rank, of the sorted values
+
+    The nearest rank is the smallest value such that at least q% of the
+    values are lower or equal.
+
+    """
+    if not sorted_values:
+        return 0.0
+
+    # q * n / 100 is exact for the usual q, e.g. 99.9 / 100 * 1000 isn't
+    rank = max(math.ceil(q * len(sorted_values) / 100) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+class LoadGenerator:
+    """Sends events to an analyzer and measures its responses"""
+
+    def __init__(self, channel: grpc.Channel, events: List[Event],
+                 concurrency: int = 1, rate: Optional[float] = None,
+                 poisson: bool = False, timeout: Optional[float] = None,
+                 unique_ids: bool = True, seed: Optional[int] = None):
+        """Initializes the generator
+
+        :param channel: the channel to the analyzer.
+        :param events: the events sent, in a round-robin.
+        :param concurrency: maximum number of events in flight. With a
+            rate, the events due while it is reached wait for a free slot,
+            and the wait is included in their latency.
+        :param rate: optional arrival rate, in events per second. The events
+            are sent back to back without it.
+        :param poisson: whether the arrivals follow a Poisson process,
+            instead of being evenly spaced.
+        :param timeout: optional deadline of each event, in seconds.
+        :param unique_ids: whether each event gets a distinct internal id,
+            so that it is not answered from the event cache of the analyzer.
+        :param seed: optional seed of the Poisson arrivals.
+
+        """
+        if not events:
+            raise ValueError("no events to send")
+
+        self._stub = service_analyzer_pb2_grpc.AnalyzerStub(channel)
+        self._events = events
+        self._concurrency = concurrency
+        self._rate = rate
+        self._poisson = poisson
+        self._timeout = timeout
+        self._unique_ids = unique_ids
+        self._rng = random.Random(seed)
+
+    def run(self, count: Optional[int] = None,
+            duration: Optional[float] = None) -> LoadReport:
+        """Sends events until `count` are sent or `duration` seconds elapsed
+
+        :returns: the results of the run, once every event is answered.
+
+        """
+        if count is None and duration is None:
+            raise ValueError("either count or duration is required")
+
+        report = LoadReport()
+        slots = threading.Semaphore(self._concurrency)
+        with ThreadPoolExecutor(max_workers=self._concurrency) as executor:
+            for i, due in self._schedule(report.start, count, duration):
+                if self._rate:
+                    delay = due - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+                else:
+                    slots.acquire()
+                    due = time.monotonic()
+
+                executor.submit(self._send, self._event(i), due, report,
+                                slots)
+
+        report.finish()
+        return report
+
+    def _schedule(self, start, count, duration) -> Iterator:
+        due = start
+        i = 0
+        while count is None or i < count:
+            if duration is not None and \
+                    max(due, time.monotonic()) - start >= duration:
+                break
+
+            yield i, due
+            i += 1
+            if self._rate:
+                due += self._rng.expovariate(self._rate) if self._poisson \
+                    else 1 / self._rate
+
+    def _event(self, i):
+        template = self._events[i % len(self._events)]
+        if not self._unique_ids:
+            return template
+
+        event = type(template)()
+        event.CopyFrom(template)
+        event.internal_id = "%s-%d" % (template.internal_id or "loadgen", i)
+        return event
+
+    def _send(self, event, due, report, slots):
+        if isinstance(event, event_pb2.ReviewEvent):
+            method = self._stub.NotifyReviewEvent
+        else:
+            method = self._stub.NotifyPushEvent
+
+        comments = 0
+        try:
+            response = method(event, timeout=self._timeout)
+            code = grpc.StatusCode.OK
+            comments = len(response.comments)
+        except Exception as exc:
+            code = error_code(exc)
+        finally:
+            if not self._rate:
+                slots.release()
+
+        report.add(time.monotonic() - due, code, comments)
+
+
+def format_summary(summary: Dict[str, Any]) -> str:
+    """Returns the results as text"""
+    lines = [
+        "events      %d in %.1fs (%.1f/s)" % (
+            summary["events"], summary["seconds"],
+            summary["events_per_second"]),
+        "errors      %d (%.2f%%) %s" % (
+            summary["errors"], summary["error_rate"] * 100, " ".join(
+                "%s=%d" % item for item in sorted(summary["codes"].items()))),
+        "comments    %d (%.1f per event)" % (
+            summary["comments"], summary["comments_per_event"]),
+        "latency ms  mean %.1f  p50 %.1f  p90 %.1f  p99 %.1f  p99.9 %.1f  "
+        "max %.1f" % (summary["mean_ms"], summary["p50_ms"],
+                      summary["p90_ms"], summary["p99_ms"],
+                      summary["p99.9_ms"], summary["max_ms"]),
+    ]
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    """Entry point of `lookout-sdk-loadgen`"""
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().split("\n")[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="\n".join(__doc__.strip().split("\n")[1:]))
+    parser.add_argument("target",
+                        help="Address of the analyzer, e.g. "
+                             "ipv4://localhost:9930.")
+    parser.add_argument("--template", action="append", default=[],
+                        help="JSON file of events, can be repeated.")
+    parser.add_argument("--recording", action="append", default=[],
+                        help="Recording of the data service to build the "
+                             "events from, can be repeated.")
+    parser.add_argument("--count", type=int, default=None,
+                        help="Number of events sent.")
+    parser.add_argument("--duration", type=float, default=None,
+                        help="Duration of the run in seconds.")
+    parser.add_argument("--rate", type=float, default=None,
+                        help="Open-loop arrival rate in events per second, "
+                             "events are sent back to back by default.")
+    parser.add_argument("--poisson", action="store_true",
+                        help="Poisson arrivals instead of evenly spaced.")
+    parser.add_argument("--concurrency", type=int, default=8,
+                        help="Maximum number of events in flight, also "
+                             "with --rate where the events due beyond it "
+                             "wait, and the wait counts in the latency.")
+    parser.add_argument("--timeout", type=float, default=None,
+                        help="Deadline of each event in seconds.")
+    parser.add_argument("--reuse-ids", action="store_true",
+                        help="Keep the internal ids of the events, so that "
+                             "the analyzer may answer from its event cache.")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="Seed of the Poisson arrivals.")
+    parser.add_argument("--json", action="store_true",
+                        help="Print the results as JSON.")
+    args = parser.parse_args(argv)
+
+    events = []
+    for path in args.template:
+        events.extend(load_templates(path))
+    for path in args.recording:
+        events.extend(events_from_recording(path))
+    if not events:
+        parser.error("no events, use --template or --recording")
+    if args.count is None and args.duration is None:
+        args.count = 100
+
+    with create_channel(to_grpc_address(args.target)) as channel:
+        generator = LoadGenerator(
+            channel, events, concurrency=args.concurrency, rate=args.rate,
+            poisson=args.poisson, timeout=args.timeout,
+            unique_ids=not args.reuse_ids, seed=args.seed)
+        summary = generator.run(args.count, args.duration).summary()
+
+    if args.json:
+        print(json.dumps(summary, indent=2, sort_keys=True))
+    else:
+        print(format_summary(summary))
+
+    return 1 if summary["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""
+Helpers to run CPU-bound analysis over multiple processes
+"""
+
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Callable, Iterable, List, Optional, Type
+
+from google.protobuf.message import Message
+
+from lookout.sdk.service_analyzer_pb2 import Comment
+from lookout.sdk.service_data_pb2 import Change
+
+
+def analyze_in_processes(
+        buffers: Iterable[bytes],
+        analyze_fn: Callable[[Message], Iterable[Comment]],
+        message_type: Type[Message] = Change,
+        executor: Optional[Executor] = None,
+        max_workers: Optional[int] = None,
+) -> List[List[Comment]]:
+    """Decodes and analyzes serialized messages in a pool of processes
+
+    The analysis of each message runs in a worker process, so that CPU-bound
+    analyzers are not limited by the GIL. The messages travel to the workers
+    still serialized, as yielded by `lookout.sdk.service_data.DataStub` with
+    `raw=True`, and the comments come back serialized as well: no protobuf
+    object is ever pickled.
+
+    The biggest messages are scheduled first, so that a single huge file
+    doesn't end up being analyzed alone at the end.
+
+    :param buffers: the serialized messages, e.g. `Change` or `File`.
+    :param analyze_fn: function analyzing a decoded message and returning
+        its comments. It is called in the worker processes, so it must be
+        picklable (e.g. defined at module level).
+    :param message_type: the protobuf message class of the buffers.
+    :param executor: optional executor to run the analysis, usually a
+        `ProcessPoolExecutor` shared between the events to not pay the
+        processes startup for each of them. It is not shut down.
+    :param max_workers: the number of processes of the executor created when
+        none is provided.
+    :returns: the list of comments of each message, in the order of
+        `buffers`.
+
+    """
+    buffers = list(buffers)
+    order = sorted(range(len(buffers)), key=lambda i: len(buffers[i]),
+                   reverse=True)
+
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=max_workers)
+
+    try:
+        futures = [None] * len(buffers)
+        for i in order:
+            futures[i] = executor.submit(
+                _analyze_serialized, analyze_fn, message_type, buffers[i])
+
+        return [[Comment.FromString(c) for c in f.result()] for f in futures]
+    finally:
+        if own_executor:
+            executor.shutdown()
+
+
+def _analyze_serialized(analyze_fn, message_type, buf):
+    comments = analyze_fn(message_type.FromString(buf)) or []
+    return [c.SerializeToString() for c in comments]
@@ -11,7 +11,12 @@ from lookout.sdk.service_data_pb2_grpc import DataServicer, DataStub, \
     add_DataServicer_to_server as add_dataservicer_to_server
 from lookout.sdk.service_data_pb2 import Change, ChangesRequest, File, \
     FilesRequest
-from lookout.sdk.service_analyzer import AnalyzerServicer
+from lookout.sdk.service_data_chunks_pb2_grpc import DataChunksServicer, \
+    DataChunksStub, \
+    add_DataChunksServicer_to_server as add_datachunksservicer_to_server
+from lookout.sdk.service_data_chunks_pb2 import FileChunk, FileChunksRequest
+from lookout.sdk.service_analyzer import AnalyzerServicer, \
+    AsyncAnalyzerServicer
 
 __all__ = [
     'CommitRevision',
@@ -19,6 +24,7 @@ __all__ = [
     'ReferencePointer',
     'ReviewEvent',
     'AnalyzerServicer',
+    'AsyncAnalyzerServicer',
     'AnalyzerStub',
     'Comment',
     'EventResponse',
@@ -28,6 +34,11 @@ __all__ = [
     'ChangesRequest',
     'File',
     'FilesRequest',
+    'DataChunksStub',
+    'DataChunksServicer',
+    'FileChunk',
+    'FileChunksRequest',
     'add_analyzer_to_server',
     'add_dataservicer_to_server',
+    'add_datachunksservicer_to_server',
 ]
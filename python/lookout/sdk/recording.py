@@ -0,0 +1,324 @@
+"""
+Recording and replay of the streams of the data service
+
+The streams are recorded to a single append-only file:
+
+    magic (8 bytes) record*
+
+where every record is a header followed by its payload:
+
+    kind (uint8) stream (uint32) offset (float64) size (uint32) payload
+
+little-endian. `stream` identifies the recorded call, `offset` is the time
+in seconds since the start of the call, and the kind is one of:
+    - START: the payload is the method, a NUL byte and the serialized
+      request,
+    - MESSAGE: the payload is a serialized response message,
+    - END: the payload is the name of the final status code.
+The `COMPRESSED` bit of the kind is set when the payload is compressed with
+zlib.
+"""
+
+import mmap
+import struct
+import threading
+import time
+import zlib
+from typing import Any, List, NamedTuple, Optional
+
+import grpc
+
+from lookout.sdk import service_data_pb2
+from lookout.sdk.grpc.interceptors import base
+from lookout.sdk.grpc.streams import ObservedStream
+
+MAGIC = b"LKREC\x00\x00\x01"
+START = 1
+MESSAGE = 2
+END = 3
+COMPRESSED = 0x80
+
+_HEADER = struct.Struct("<BIdI")
+
+_REQUESTS = {
+    "/pb.Data/GetChanges": service_data_pb2.ChangesRequest,
+    "/pb.Data/GetFiles": service_data_pb2.FilesRequest,
+}
+
+
+def _serialize(msg) -> bytes:
+    if isinstance(msg, bytes):
+        return msg
+
+    return msg.SerializeToString(deterministic=True)
+
+
+class StreamRecorder:
+    """Writer of a recording file
+
+    The recorder is thread-safe, several calls can be recorded at the same
+    time. The records are appended to the file, so it can be reused across
+    runs.
+
+    """
+    def __init__(self, path: str, compress: bool = False,
+                 compress_level: int = 6, compress_min_bytes: int = 1024):
+        """Opens the recording file
+
+        :param path: the path of the file, created if it doesn't exist.
+        :param compress: whether the messages are compressed.
+        :param compress_level: the zlib compression level.
+        :param compress_min_bytes: messages smaller than this are never
+            compressed.
+
+        """
+        self._compress = compress
+        self._compress_level = compress_level
+        self._compress_min_bytes = compress_min_bytes
+        self._lock = threading.Lock()
+        self._file = open(path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(MAGIC)
+        self._next_stream = 0
+
+    def start(self, method: str, request: Any) -> '_RecordedStream':
+        """Records the start of a call, and returns its recorder"""
+        with self._lock:
+            stream_id = self._next_stream
+            self._next_stream += 1
+
+        recorded = _RecordedStream(self, stream_id)
+        payload = method.encode() + b"\0" + _serialize(request)
+        self._write(START, stream_id, 0.0, payload, compress=False)
+        return recorded
+
+    def close(self):
+        """Closes the file"""
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self) -> 'StreamRecorder':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _write(self, kind, stream_id, offset, payload, compress=None,
+               flush=False):
+        if compress is None:
+            compress = self._compress and \
+                len(payload) >= self._compress_min_bytes
+        if compress:
+            kind |= COMPRESSED
+            payload = zlib.compress(payload, self._compress_level)
+
+        header = _HEADER.pack(kind, stream_id, offset, len(payload))
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(header)
+            self._file.write(payload)
+            if flush:
+                self._file.flush()
+
+
+class _RecordedStream:
+    """Recorder of the messages of a single call"""
+
+    def __init__(self, recorder: StreamRecorder, stream_id: int):
+        self._recorder = recorder
+        self._id = stream_id
+        self._start = time.monotonic()
+
+    def message(self, msg):
+        self._recorder._write(MESSAGE, self._id,
+                              time.monotonic() - self._start, _serialize(msg))
+
+    def end(self, code: grpc.StatusCode):
+        self._recorder._write(END, self._id, time.monotonic() - self._start,
+                              code.name.encode(), compress=False, flush=True)
+
+
+class RecordingStreamClientInterceptor(base.StreamClientInterceptor):
+    """Client interceptor recording the response streams
+
+    Every call with a response stream, usually `GetChanges` and `GetFiles`,
+    is recorded with its request by the `StreamRecorder`, the messages being
+    written as they are received.
+
+    """
+    def __init__(self, recorder: StreamRecorder):
+        self._recorder = recorder
+
+    def intercept_stream(self, continuation, client_call_details, request):
+        out = continuation(client_call_details, request)
+        recorded = self._recorder.start(client_call_details.method, request)
+        return ObservedStream(out, recorded.message, recorded.end)
+
+
+class RecordedMessage(NamedTuple):
+    """Position of a recorded message in the file"""
+    offset: float
+    start: int
+    size: int
+    compressed: bool
+
+
+class RecordedStream(NamedTuple):
+    """Recorded call"""
+    method: str
+    request: bytes
+    messages: List[RecordedMessage]
+    code: Optional[grpc.StatusCode]
+
+
+class Recording:
+    """Read-only view of a recording file
+
+    The file is memory-mapped, and only the headers of the records are read
+    to build the index of the streams, the messages are sliced from the map
+    when they are replayed.
+
+    """
+    def __init__(self, path: str):
+        """Opens and indexes the recording file"""
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        if self._view[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError("%s is not a recording file" % path)
+
+        self.streams = self._index()
+        self._by_key = {}
+        for stream in self.streams:
+            # the last recording of the same request wins
+            self._by_key[(stream.method, stream.request)] = stream
+
+    def find(self, method: str, request: Any) -> Optional[RecordedStream]:
+        """Returns the last recorded stream of a request, if any"""
+        return self._by_key.get((method, _serialize(request)))
+
+    def payload(self, msg: RecordedMessage) -> memoryview:
+        """Returns the serialized message, without copying it if possible"""
+        data = self._view[msg.start:msg.start + msg.size]
+        if msg.compressed:
+            return memoryview(zlib.decompress(data))
+
+        return data
+
+    def close(self):
+        """Releases the file, the slices must not be used afterwards"""
+        self._view.release()
+        self._mmap.close()
+
+    def __enter__(self) -> 'Recording':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _index(self) -> List[RecordedStream]:
+        view = self._view
+        pos = len(MAGIC)
+        # position in `recorded` of the streams not ended yet, by id
+        streams = {}
+        recorded = []
+        while pos + _HEADER.size <= len(view):
+            kind, stream_id, offset, size = _HEADER.unpack_from(view, pos)
+            start = pos + _HEADER.size
+            if start + size > len(view):
+                # truncated by a crash while recording
+                break
+
+            pos = start + size
+            compressed = bool(kind & COMPRESSED)
+            kind &= ~COMPRESSED
+            if kind == START:
+                method, _, request = bytes(view[start:pos]).partition(b"\0")
+                streams[stream_id] = len(recorded)
+                recorded.append(
+                    RecordedStream(method.decode(), request, [], None))
+            elif kind == MESSAGE and stream_id in streams:
+                recorded[streams[stream_id]].messages.append(
+                    RecordedMessage(offset, start, size, compressed))
+            elif kind == END and stream_id in streams:
+                i = streams.pop(stream_id)
+                code = getattr(grpc.StatusCode,
+                               bytes(view[start:pos]).decode(), None)
+                recorded[i] = recorded[i]._replace(code=code)
+
+        return recorded
+
+
+class ReplayDataServicer:
+    """Data servicer replaying the recorded streams
+
+    The responses are sent as they were recorded, without decoding and
+    encoding them again. The calls whose request was not recorded fail with
+    `NOT_FOUND`, and the calls recorded with an error fail with the same
+    status code once their messages are sent.
+
+    Register it with `add_replay_to_server`, not with the generated
+    functions, since the responses are already serialized.
+
+    """
+    def __init__(self, recording: Recording, speed: Optional[float] = None):
+        """Initializes the servicer
+
+        :param recording: the recording to replay.
+        :param speed: optional pacing, 1 to send the messages at the
+            recorded pace, 2 twice as fast, etc. By default the messages are
+            sent as fast as possible.
+
+        """
+        self._recording = recording
+        self._speed = speed
+
+    def GetChanges(self, request, context):
+        return self._replay("/pb.Data/GetChanges", request, context)
+
+    def GetFiles(self, request, context):
+        return self._replay("/pb.Data/GetFiles", request, context)
+
+    def _replay(self, method, request, context):
+        stream = self._recording.find(method, request)
+        if stream is None:
+            context.abort(grpc.StatusCode.NOT_FOUND,
+                          "the request was not recorded")
+
+        start = time.monotonic()
+        for msg in stream.messages:
+            if self._speed:
+                delay = start + msg.offset / self._speed - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+
+            yield self._recording.payload(msg)
+
+        if stream.code not in (None, grpc.StatusCode.OK):
+            context.abort(stream.code, "replayed error")
+
+
+def add_replay_to_server(servicer: ReplayDataServicer, server: grpc.Server):
+    """Registers the replay servicer to a server, as the data service"""
+    handlers = {}
+    for full_method, request_type in _REQUESTS.items():
+        name = full_method.rsplit("/", 1)[1]
+        handlers[name] = grpc.unary_stream_rpc_method_handler(
+            getattr(servicer, name),
+            request_deserializer=request_type.FromString,
+            response_serializer=bytes)
+
+    server.add_generic_rpc_handlers((grpc.method_handlers_generic_handler(
+        "pb.Data", handlers),))
+
+
+__all__ = [
+    "StreamRecorder",
+    "RecordingStreamClientInterceptor",
+    "Recording",
+    "RecordedStream",
+    "ReplayDataServicer",
+    "add_replay_to_server",
+]
@@ -1,7 +1,191 @@
 import re
+import time
+import asyncio
 import inspect
+import functools
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Hashable, Tuple
+
 from lookout.sdk import service_analyzer_pb2_grpc
-from lookout.sdk.grpc.log_fields import wrap_context
+from lookout.sdk.event import event_id
+from lookout.sdk.grpc.log_fields import wrap_context, wrap_context_async
+
+
+class EventCache:
+    """Cache of the responses to the events handled by an analyzer
+
+    Lookout can deliver the same event more than once, e.g. on retries. When
+    an `AnalyzerServicer` has an `event_cache`, an event identical to one
+    being handled waits for its response instead of running the analysis
+    again, and an event identical to one already handled gets the same
+    response back.
+
+    Two events are identical when they have the same id (see
+    `lookout.sdk.event.event_id`), and the same configuration, and they are
+    handled by the same version of the analyzer.
+
+    Only successful responses are cached, for at most `ttl` seconds. The
+    number of cached responses is bounded by `max_size`, the least recently
+    used ones are evicted first.
+
+    """
+    def __init__(self, max_size: int = 1024, ttl: float = 60 * 60):
+        """Initializes an empty cache
+
+        :param max_size: maximum number of cached responses.
+        :param ttl: number of seconds a response is kept.
+
+        """
+        self._max_size = max_size
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._responses = OrderedDict()
+        self._inflight = {}
+        self.hits = 0
+        self.coalesced = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        """Returns the number of cached responses"""
+        return len(self._responses)
+
+    @staticmethod
+    def key(method: str, event: Any, version: str) -> Tuple[Hashable, ...]:
+        """Returns the cache key of an event for the given analyzer version"""
+        configuration = event.configuration.SerializeToString(
+            deterministic=True)
+        return method, event_id(event), version, configuration
+
+    def run(self, key: Tuple[Hashable, ...], fn: Callable[[], Any]) -> Any:
+        """Returns the response for the key, calling `fn` only if needed"""
+        with self._lock:
+            resp = self._get(key)
+            if resp is not None:
+                return resp
+
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not owner:
+            return future.result()
+
+        try:
+            resp = fn()
+        except BaseException as exc:
+            self._done(key, None)
+            future.set_exception(exc)
+            raise
+
+        self._done(key, resp)
+        future.set_result(resp)
+        return resp
+
+    async def run_async(self, key: Tuple[Hashable, ...],
+                        fn: Callable[[], Any]) -> Any:
+        """Same as `run`, but `fn` returns an awaitable"""
+        with self._lock:
+            resp = self._get(key)
+            if resp is not None:
+                return resp
+
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = asyncio.get_event_loop().create_future()
+                self._inflight[key] = future
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not owner:
+            return await asyncio.shield(future)
+
+        try:
+            resp = await fn()
+        except BaseException as exc:
+            self._done(key, None)
+            future.set_exception(exc)
+            # the exception is re-raised here, avoid warnings when there is
+            # no duplicate waiting for it
+            future.exception()
+            raise
+
+        self._done(key, resp)
+        future.set_result(resp)
+        return resp
+
+    def clear(self):
+        """Removes every cached response"""
+        with self._lock:
+            self._responses.clear()
+
+    def _get(self, key):
+        entry = self._responses.get(key)
+        if entry is None:
+            return None
+
+        resp, expiration = entry
+        if expiration < time.monotonic():
+            del self._responses[key]
+            return None
+
+        self._responses.move_to_end(key)
+        self.hits += 1
+        return resp
+
+    def _done(self, key, resp):
+        with self._lock:
+            self._inflight.pop(key, None)
+            if resp is None:
+                return
+
+            self._responses[key] = (resp, time.monotonic() + self._ttl)
+            self._responses.move_to_end(key)
+            while len(self._responses) > self._max_size:
+                self._responses.popitem(last=False)
+
+
+def wrap_event_cache(method, func):
+    """Wraps the provided servicer method with the `event_cache` of the servicer
+
+    :param method: the name of the gRPC method, part of the cache key.
+    :param func: the servicer method to wrap.
+    :returns: the wrapped servicer method.
+
+    """
+    @functools.wraps(func)
+    def wrapper(self, request, context):
+        cache = self.event_cache
+        if cache is None:
+            return func(self, request, context)
+
+        key = cache.key(method, request, self.version)
+        return cache.run(key, lambda: func(self, request, context))
+
+    return wrapper
+
+
+def wrap_event_cache_async(method, func):
+    """Same as `wrap_event_cache`, for coroutine functions"""
+    @functools.wraps(func)
+    async def wrapper(self, request, context):
+        cache = self.event_cache
+        if cache is None:
+            return await func(self, request, context)
+
+        key = cache.key(method, request, self.version)
+        return await cache.run_async(
+            key, lambda: func(self, request, context))
+
+    return wrapper
 
 
 class AnalyzerServicerMetaclass(type):
@@ -14,6 +198,8 @@ class AnalyzerServicerMetaclass(type):
 
     """
     servicer = service_analyzer_pb2_grpc.AnalyzerServicer
+    wrap_context = staticmethod(wrap_context)
+    wrap_event_cache = staticmethod(wrap_event_cache)
 
     def __new__(cls, clsname, bases, dct):
         new_attrs = dct.copy()
@@ -26,7 +212,8 @@ class AnalyzerServicerMetaclass(type):
             default_func = dct.get(name, func)
             snake_case_name = cls._to_snake_case(name)
             new_attrs[snake_case_name] = dct.get(snake_case_name, default_func)
-            new_attrs[name] = wrap_context(new_attrs[snake_case_name])
+            new_attrs[name] = cls.wrap_event_cache(
+                name, cls.wrap_context(new_attrs[snake_case_name]))
 
         return super(AnalyzerServicerMetaclass, cls).__new__(
             cls, clsname, bases, new_attrs)
@@ -60,5 +247,51 @@ class AnalyzerServicer(object, metaclass=AnalyzerServicerMetaclass):
         passing the gRPC original context, they pass a wrapped one using
         `lookout.sdk.grpc.log_fields.WrappedContext`.
 
+    Redelivered events:
+        set `event_cache` to a `lookout.sdk.service_analyzer.EventCache` to
+        handle each event only once, and `version` to the version of the
+        analyzer, so that a new version doesn't get the responses cached by
+        the previous one.
+
+    """
+    # Version of the analyzer, part of the key of the cached responses
+    version = ""
+    # Optional `EventCache` for redelivered events
+    event_cache = None
+
+
+class AsyncAnalyzerServicerMetaclass(AnalyzerServicerMetaclass):
+    """Metaclass for asyncio analyzer servicer
+
+    Same as `AnalyzerServicerMetaclass`, but the generated gRPC methods are
+    coroutine functions, as expected by `grpc.aio` servers.
+
+    See `lookout.sdk.service_analyzer.AsyncAnalyzerServicer`.
+
+    """
+    wrap_context = staticmethod(wrap_context_async)
+    wrap_event_cache = staticmethod(wrap_event_cache_async)
+
+
+class AsyncAnalyzerServicer(object, metaclass=AsyncAnalyzerServicerMetaclass):
+    """Base asyncio analyzer servicer to be extended by the user
+
+    This is the `grpc.aio` counterpart of `AnalyzerServicer`, to be served by
+    `lookout.sdk.grpc.aio.create_aio_server`. The user has to implement the
+    same methods:
+        - notify_review_event,
+        - notify_push_event.
+
+    but they can be defined with `async def`:
+
+        async def method(self, request, context)
+
+    so that waiting for the data server doesn't hold an OS thread, and a
+    single process can handle many concurrent events. The data server can be
+    queried with `lookout.sdk.service_data.AsyncDataStub`.
+
+    See `AnalyzerServicer` for `version` and `event_cache`.
+
     """
-    pass
+    version = ""
+    event_cache = None
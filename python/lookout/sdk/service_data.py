@@ -1,4 +1,25 @@
-from lookout.sdk import service_data_pb2_grpc
+import functools
+import itertools
+import re
+import threading
+from collections import OrderedDict
+from typing import AsyncIterator, Hashable, Iterable, Iterator, List, \
+    Optional, Tuple, Union
+
+from lookout.sdk import event_pb2, service_data_pb2, \
+    service_data_pb2_grpc, service_data_chunks_pb2, \
+    service_data_chunks_pb2_grpc
+from lookout.sdk.grpc.compression import Compression, \
+    to_compression_options
+from lookout.sdk.data_filter import DataRequest, RequestFilter, \
+    request_filter
+from lookout.sdk.grpc.connection import ChannelPool
+from lookout.sdk.grpc.interceptors.base import error_code
+from lookout.sdk.service_analyzer import AnalyzerServicerMetaclass
+from lookout.sdk.service_data_chunks import ChunkedFile, \
+    DEFAULT_MAX_MEMORY_BYTES
+from lookout.sdk.vendored import is_vendored
+from lookout.sdk.grpc.streams import PrefetchIterator, StreamCoalescer
 
 import grpc
 
@@ -9,32 +30,306 @@ class DataStub:
     This client wraps the one generated by gRPC by providing a more pythonic
     api, and by enforcing to pass the context of the invocation.
 
+    The client can be initialized either with a channel or with a
+    `lookout.sdk.grpc.ChannelPool`. In the latter case every invocation
+    acquires a channel from the pool, and gives it back once the returned
+    stream is exhausted, fails or is cancelled.
+
+    When a `FileCache` (or a `lookout.sdk.disk_cache.DiskFileCache`) is
+    provided, the requests asking for contents or UASTs only download the
+    files that are not cached, see `FileCache`.
+
+    When a `lookout.sdk.grpc.streams.StreamCoalescer` is provided, identical
+    requests issued while the first one is still in flight share its stream
+    instead of reaching the server again. The shared stream uses the
+    metadata, timeout and credentials of the first request.
+
+    Files too large for a single message can be transferred in chunks, see
+    `get_file_chunks`.
+
     See `lookout.sdk.service_data_pb2_grpc.DataStub`.
 
     """
-    def __init__(self, channel: grpc.Channel):
+    def __init__(self, channel: Union[grpc.Channel, ChannelPool],
+                 file_cache: Optional['FileCache'] = None,
+                 coalescer: Optional[StreamCoalescer] = None):
         """Initializes the client
 
-        :param channel: the channel for connecting to the data servicer
+        :param channel: the channel, or the pool of channels, for connecting
+            to the data servicer
+        :param file_cache: optional cache of the files, shared between the
+            requests
+        :param coalescer: optional coalescer of identical concurrent
+            requests, usually shared by all the clients of the process
 
         """
-        self._data_stub = service_data_pb2_grpc.DataStub(channel)
+        self._file_cache = file_cache
+        self._coalescer = coalescer
+        if isinstance(channel, ChannelPool):
+            self._pool = channel
+            self._stubs = None
+        else:
+            self._pool = None
+            self._stubs = _Stubs(channel)
 
     def get_changes(self, context, request, timeout=None, metadata=None,
-                    credentials=None, wait_for_ready=None):
-        metadata = self._build_metadata(context, metadata)
-        return self._data_stub.GetChanges(
-            request, timeout=timeout, metadata=metadata,
-            credentials=credentials, wait_for_ready=wait_for_ready
-        )
+                    credentials=None, wait_for_ready=None,
+                    prefetch_messages=None, prefetch_bytes=None, raw=False,
+                    compression: Optional[Compression] = None):
+        """Returns the stream of changes matching the request
+
+        When `prefetch_messages` or `prefetch_bytes` are provided the stream
+        is read ahead on a background thread, up to the given number of
+        messages and bytes, see `lookout.sdk.grpc.streams.PrefetchIterator`.
+
+        When `raw` is true the stream yields the serialized `Change` messages
+        as bytes, without decoding them. This is useful to hand the decoding
+        over to other processes, see `lookout.sdk.parallel`.
+
+        `compression` asks the server to compress the stream, overriding the
+        compression of the channel, see `lookout.sdk.grpc.compression`.
+
+        """
+        _check_prefetch(prefetch_messages, prefetch_bytes)
+        kwargs = self._build_kwargs(context, timeout, metadata, credentials,
+                                    wait_for_ready, compression)
+        if not raw and self._uses_file_cache(request):
+            stream = self._cached_changes(request, kwargs)
+        else:
+            stream = self._invoke("GetChanges", request, raw=raw, **kwargs)
+
+        return self._prefetch(stream, prefetch_messages, prefetch_bytes)
 
     def get_files(self, context, request, timeout=None, metadata=None,
-                  credentials=None, wait_for_ready=None):
+                  credentials=None, wait_for_ready=None,
+                  prefetch_messages=None, prefetch_bytes=None, raw=False,
+                  compression: Optional[Compression] = None):
+        """Returns the stream of files matching the request
+
+        See `get_changes` for the prefetching, raw and compression options.
+
+        """
+        _check_prefetch(prefetch_messages, prefetch_bytes)
+        kwargs = self._build_kwargs(context, timeout, metadata, credentials,
+                                    wait_for_ready, compression)
+        if not raw and self._uses_file_cache(request):
+            stream = self._cached_files(request, kwargs)
+        else:
+            stream = self._invoke("GetFiles", request, raw=raw, **kwargs)
+
+        return self._prefetch(stream, prefetch_messages, prefetch_bytes)
+
+    def get_file_chunks(self, context,
+                        request: service_data_chunks_pb2.FileChunksRequest,
+                        timeout=None, metadata=None, credentials=None,
+                        wait_for_ready=None,
+                        max_memory_bytes: int = DEFAULT_MAX_MEMORY_BYTES,
+                        compression: Optional[Compression] = None
+                        ) -> ChunkedFile:
+        """Returns a file transferred in chunks by the `DataChunks` service
+
+        The contents and the UAST of the file are reassembled in memory up
+        to `max_memory_bytes` each, and in a temporary file above it, see
+        `lookout.sdk.service_data_chunks.ChunkedFile`. The returned file
+        must be closed.
+
+        """
+        kwargs = self._build_kwargs(context, timeout, metadata, credentials,
+                                    wait_for_ready, compression)
+        return ChunkedFile.read(
+            self._call("GetFileChunks", request, **kwargs), max_memory_bytes)
+
+    def get_chunked_files(self, context,
+                          request: service_data_pb2.FilesRequest,
+                          timeout=None, metadata=None, credentials=None,
+                          wait_for_ready=None, chunk_size: int = 0,
+                          max_memory_bytes: int = DEFAULT_MAX_MEMORY_BYTES,
+                          compression: Optional[Compression] = None
+                          ) -> Iterator[ChunkedFile]:
+        """Yields the files matching the request, transferred in chunks
+
+        The files are listed by `GetFiles` without contents and UAST, and
+        each of them is transferred by `get_file_chunks`, so that the memory
+        used is bounded whatever the size of the files. Each file should be
+        closed once used.
+
+        """
+        kwargs = self._build_kwargs(context, timeout, metadata, credentials,
+                                    wait_for_ready, compression)
+        for meta in self._invoke("GetFiles", _meta_request(request),
+                                 **kwargs):
+            yield self._chunked_file(request, request.revision, meta.path,
+                                     chunk_size, max_memory_bytes, kwargs)
+
+    def get_chunked_changes(self, context,
+                            request: service_data_pb2.ChangesRequest,
+                            timeout=None, metadata=None, credentials=None,
+                            wait_for_ready=None, chunk_size: int = 0,
+                            max_memory_bytes: int = DEFAULT_MAX_MEMORY_BYTES,
+                            compression: Optional[Compression] = None
+                            ) -> Iterator[Tuple[Optional[ChunkedFile],
+                                                Optional[ChunkedFile]]]:
+        """Yields the base and the head of the changes, transferred in
+        chunks
+
+        Same as `get_chunked_files`, the base is None for the added files
+        and the head for the deleted ones.
+
+        """
+        kwargs = self._build_kwargs(context, timeout, metadata, credentials,
+                                    wait_for_ready, compression)
+        for change in self._invoke("GetChanges", _meta_request(request),
+                                   **kwargs):
+            base = head = None
+            if change.HasField("base"):
+                base = self._chunked_file(
+                    request, request.base, change.base.path, chunk_size,
+                    max_memory_bytes, kwargs)
+            if change.HasField("head"):
+                head = self._chunked_file(
+                    request, request.head, change.head.path, chunk_size,
+                    max_memory_bytes, kwargs)
+            yield base, head
+
+    def _chunked_file(self, request, revision, path, chunk_size,
+                      max_memory_bytes, kwargs):
+        return ChunkedFile.read(self._call(
+            "GetFileChunks",
+            _chunks_request(request, revision, path, chunk_size), **kwargs),
+            max_memory_bytes)
+
+    def _prefetch(self, stream, max_messages, max_bytes):
+        if max_messages is None and max_bytes is None:
+            return stream
+
+        if max_messages is None:
+            max_messages = 16
+
+        return PrefetchIterator(stream, max_messages=max_messages,
+                                max_bytes=max_bytes)
+
+    def _invoke(self, method, request, raw=False, **kwargs):
+        if self._coalescer is None:
+            return self._call(method, request, raw=raw, **kwargs)
+
+        key = (method, raw, request.SerializeToString(deterministic=True))
+        return self._coalescer.subscribe(key, functools.partial(
+            self._call, method, request, raw=raw, **kwargs))
+
+    def _call(self, method, request, raw=False, **kwargs):
+        if self._pool is None:
+            return self._stubs.get(method, raw)(request, **kwargs)
+
+        channel = self._pool.acquire()
+        try:
+            stream = _Stubs(channel).get(method, raw)(request, **kwargs)
+        except BaseException:
+            self._pool.release(channel)
+            raise
+
+        return _ReleasingStream(
+            stream, functools.partial(self._pool.release, channel))
+
+    def _uses_file_cache(self, request):
+        return self._file_cache is not None and \
+            (request.want_contents or request.want_uast)
+
+    def _cached_changes(self, request, kwargs):
+        meta_request = service_data_pb2.ChangesRequest()
+        meta_request.CopyFrom(request)
+        meta_request.want_contents = False
+        meta_request.want_uast = False
+        changes = self._invoke("GetChanges", meta_request, **kwargs)
+
+        for batch in _batches(changes, _RESOLVE_BATCH_SIZE):
+            bases = iter(self._resolve_files(
+                request.base, request,
+                [c.base for c in batch if c.HasField("base")], kwargs))
+            heads = iter(self._resolve_files(
+                request.head, request,
+                [c.head for c in batch if c.HasField("head")], kwargs))
+
+            for meta in batch:
+                change = service_data_pb2.Change()
+                if meta.HasField("base"):
+                    change.base.CopyFrom(next(bases))
+                if meta.HasField("head"):
+                    change.head.CopyFrom(next(heads))
+
+                yield change
+
+    def _cached_files(self, request, kwargs):
+        meta_request = service_data_pb2.FilesRequest()
+        meta_request.CopyFrom(request)
+        meta_request.want_contents = False
+        meta_request.want_uast = False
+        files = self._invoke("GetFiles", meta_request, **kwargs)
+
+        for batch in _batches(files, _RESOLVE_BATCH_SIZE):
+            yield from self._resolve_files(request.revision, request, batch,
+                                           kwargs)
+
+    def _resolve_files(self, revision, request, metas, kwargs):
+        """Returns the complete files for the provided metadata-only files
+
+        The files are taken from the cache when possible, the others are
+        requested to the data server with a single `GetFiles`, selecting them
+        by path.
+
+        """
+        cache = self._file_cache
+        files = [None] * len(metas)
+        missing = OrderedDict()
+        for i, meta in enumerate(metas):
+            cached = None
+            if meta.hash:
+                cached = cache.get(cache.key(
+                    meta, request.want_uast, request.want_contents))
+
+            if cached is None:
+                missing.setdefault(meta.path, []).append(i)
+            else:
+                files[i] = _relocate(cached, meta)
+
+        if missing:
+            files_request = service_data_pb2.FilesRequest(
+                revision=revision,
+                include_pattern=_paths_pattern(list(missing)),
+                want_contents=request.want_contents,
+                want_uast=request.want_uast,
+                want_language=request.want_language,
+            )
+            for f in self._invoke("GetFiles", files_request, **kwargs):
+                indices = missing.pop(f.path, None)
+                if indices is None:
+                    continue
+
+                if f.hash:
+                    cache.put(cache.key(
+                        f, request.want_uast, request.want_contents), f)
+
+                for i in indices:
+                    files[i] = _relocate(f, metas[i])
+
+        # files not returned by the server are kept without contents and UAST
+        for indices in missing.values():
+            for i in indices:
+                files[i] = metas[i]
+
+        return files
+
+    def _build_kwargs(self, context, timeout, metadata, credentials,
+                      wait_for_ready, compression):
         metadata = self._build_metadata(context, metadata)
-        return self._data_stub.GetFiles(
-            request, timeout=timeout, metadata=metadata,
-            credentials=credentials, wait_for_ready=wait_for_ready
-        )
+        kwargs = dict(timeout=timeout, metadata=metadata,
+                      credentials=credentials, wait_for_ready=wait_for_ready)
+        compression = to_compression_options(compression)
+        if compression is not None:
+            kwargs["metadata"] = list(metadata or ()) + [
+                compression.to_metadata()]
+            kwargs["compression"] = compression.algorithm
+
+        return kwargs
 
     def _build_metadata(self, context, metadata):
         if context is None:
@@ -45,3 +340,423 @@ class DataStub:
             new_metadata.extend(metadata)
 
         return new_metadata
+
+
+class FileCache:
+    """In-memory LRU cache of files, addressed by the hash of their blob
+
+    Every `File` carries the hash of its blob, so an unchanged file can be
+    reused across events (e.g. each update of a pull request) instead of
+    downloading and decoding its contents and UAST again. The cache is keyed
+    by the blob hash, the requested data and the language, see `key`.
+
+    The size of the cache is bounded by the total size in bytes of the
+    cached files, the least recently used ones are evicted first.
+
+    The same `File` instances are returned for every hit, so they must be
+    treated as read-only.
+
+    The cache is thread-safe, so it can be shared between the events served
+    by an analyzer, passing it to `DataStub`.
+
+    """
+    def __init__(self, max_bytes: int):
+        """Initializes an empty cache
+
+        :param max_bytes: maximum total size of the cached files.
+
+        """
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._files = OrderedDict()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(f: service_data_pb2.File, want_uast: bool,
+            want_contents: bool) -> Tuple[Hashable, ...]:
+        """Returns the cache key of a file for the requested data"""
+        return f.hash, want_uast, want_contents, f.language
+
+    @property
+    def size(self) -> int:
+        """Returns the total size in bytes of the cached files"""
+        return self._size
+
+    def __len__(self) -> int:
+        """Returns the number of cached files"""
+        return len(self._files)
+
+    def get(self, key: Tuple[Hashable, ...]
+            ) -> Optional[service_data_pb2.File]:
+        """Returns the cached file for the key, or None if it is missing"""
+        with self._lock:
+            entry = self._files.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._files.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Tuple[Hashable, ...], f: service_data_pb2.File):
+        """Adds a file to the cache, evicting the least recently used ones
+
+        Files bigger than the whole cache are not cached.
+
+        """
+        size = f.ByteSize()
+        if size > self._max_bytes:
+            return
+
+        with self._lock:
+            old = self._files.pop(key, None)
+            if old is not None:
+                self._size -= old[1]
+
+            self._files[key] = (f, size)
+            self._size += size
+            while self._size > self._max_bytes:
+                _, (_, evicted_size) = self._files.popitem(last=False)
+                self._size -= evicted_size
+
+    def clear(self):
+        """Removes every file from the cache"""
+        with self._lock:
+            self._files.clear()
+            self._size = 0
+
+
+# number of files, or changes, of the metadata stream resolved together
+# against the cache. The files missing from each batch are requested by a
+# single GetFiles, the batch bounds the size of its regular expression and
+# the number of messages held while the stream flows.
+_RESOLVE_BATCH_SIZE = 256
+
+# characters with a special meaning in RE2, the syntax used by the server
+_RE2_SPECIAL_CHARS = set("\\.+*?()|[]{}^$")
+
+
+def _check_prefetch(max_messages: Optional[int], max_bytes: Optional[int]):
+    """Raises ValueError if a read-ahead bound is set but below 1"""
+    if max_messages is not None and max_messages < 1:
+        raise ValueError("prefetch_messages must be positive")
+    if max_bytes is not None and max_bytes < 1:
+        raise ValueError("prefetch_bytes must be positive")
+
+
+def _batches(iterable: Iterable, size: int) -> Iterator[list]:
+    """Yields the items of an iterable in lists of `size` items at most"""
+    it = iter(iterable)
+    while True:
+        batch = list(itertools.islice(it, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _paths_pattern(paths: List[str]) -> str:
+    """Returns a regular expression matching exactly the provided paths"""
+    escaped = ("".join("\\" + c if c in _RE2_SPECIAL_CHARS else c
+                       for c in path) for path in paths)
+    return "^(?:" + "|".join(escaped) + ")$"
+
+
+def _meta_request(request: DataRequest) -> DataRequest:
+    """Returns a copy of the request listing the files without their
+    contents, UAST and language"""
+    meta_request = type(request)()
+    meta_request.CopyFrom(request)
+    meta_request.want_contents = False
+    meta_request.want_uast = False
+    meta_request.want_language = False
+    return meta_request
+
+
+def _chunks_request(request: DataRequest,
+                    revision: event_pb2.ReferencePointer, path: str,
+                    chunk_size: int
+                    ) -> service_data_chunks_pb2.FileChunksRequest:
+    """Returns the request of the chunks of a file listed by `request`"""
+    return service_data_chunks_pb2.FileChunksRequest(
+        revision=revision, path=path, want_contents=request.want_contents,
+        want_uast=request.want_uast, want_language=request.want_language,
+        chunk_size=chunk_size)
+
+
+def _relocate(f: service_data_pb2.File,
+              meta: service_data_pb2.File) -> service_data_pb2.File:
+    """Returns the file with the path and mode of `meta`
+
+    The same blob can be found at different paths, the file is copied only
+    in that case.
+
+    """
+    if f.path == meta.path and f.mode == meta.mode:
+        return f
+
+    relocated = service_data_pb2.File()
+    relocated.CopyFrom(f)
+    relocated.path = meta.path
+    relocated.mode = meta.mode
+    return relocated
+
+
+class AsyncDataStub(DataStub):
+    """Asyncio client to invoke data servicer RPC methods
+
+    Same as `DataStub`, but it must be initialized with a `grpc.aio` channel,
+    see `lookout.sdk.grpc.aio.create_aio_channel`. The returned streams are
+    async iterators:
+
+        async for change in stub.get_changes(context, request):
+            ...
+
+    Likewise `get_file_chunks` is a coroutine, and `get_chunked_files` and
+    `get_chunked_changes` are async generators.
+
+    """
+    def __init__(self, channel: grpc.Channel):
+        """Initializes the client
+
+        :param channel: the `grpc.aio` channel for connecting to the data
+            servicer
+
+        """
+        if isinstance(channel, ChannelPool):
+            raise TypeError("AsyncDataStub doesn't support channel pools, "
+                            "grpc.aio channels can be shared directly")
+
+        super().__init__(channel)
+
+    def _prefetch(self, stream, max_messages, max_bytes):
+        if max_messages is not None or max_bytes is not None:
+            raise ValueError("prefetching is not supported by AsyncDataStub")
+
+        return stream
+
+    async def get_file_chunks(
+            self, context,
+            request: service_data_chunks_pb2.FileChunksRequest,
+            timeout=None, metadata=None, credentials=None,
+            wait_for_ready=None,
+            max_memory_bytes: int = DEFAULT_MAX_MEMORY_BYTES,
+            compression: Optional[Compression] = None) -> ChunkedFile:
+        """Returns a file transferred in chunks by the `DataChunks` service
+
+        See `DataStub.get_file_chunks`.
+
+        """
+        kwargs = self._build_kwargs(context, timeout, metadata, credentials,
+                                    wait_for_ready, compression)
+        return await ChunkedFile.read_async(
+            self._call("GetFileChunks", request, **kwargs), max_memory_bytes)
+
+    async def get_chunked_files(
+            self, context, request: service_data_pb2.FilesRequest,
+            timeout=None, metadata=None, credentials=None,
+            wait_for_ready=None, chunk_size: int = 0,
+            max_memory_bytes: int = DEFAULT_MAX_MEMORY_BYTES,
+            compression: Optional[Compression] = None
+            ) -> AsyncIterator[ChunkedFile]:
+        """Yields the files matching the request, transferred in chunks
+
+        See `DataStub.get_chunked_files`.
+
+        """
+        kwargs = self._build_kwargs(context, timeout, metadata, credentials,
+                                    wait_for_ready, compression)
+        async for meta in self._call("GetFiles", _meta_request(request),
+                                     **kwargs):
+            yield await self._chunked_file(
+                request, request.revision, meta.path, chunk_size,
+                max_memory_bytes, kwargs)
+
+    async def get_chunked_changes(
+            self, context, request: service_data_pb2.ChangesRequest,
+            timeout=None, metadata=None, credentials=None,
+            wait_for_ready=None, chunk_size: int = 0,
+            max_memory_bytes: int = DEFAULT_MAX_MEMORY_BYTES,
+            compression: Optional[Compression] = None
+            ) -> AsyncIterator[Tuple[Optional[ChunkedFile],
+                                     Optional[ChunkedFile]]]:
+        """Yields the base and the head of the changes, transferred in
+        chunks
+
+        See `DataStub.get_chunked_changes`.
+
+        """
+        kwargs = self._build_kwargs(context, timeout, metadata, credentials,
+                                    wait_for_ready, compression)
+        async for change in self._call("GetChanges", _meta_request(request),
+                                       **kwargs):
+            base = head = None
+            if change.HasField("base"):
+                base = await self._chunked_file(
+                    request, request.base, change.base.path, chunk_size,
+                    max_memory_bytes, kwargs)
+            if change.HasField("head"):
+                head = await self._chunked_file(
+                    request, request.head, change.head.path, chunk_size,
+                    max_memory_bytes, kwargs)
+            yield base, head
+
+    async def _chunked_file(self, request, revision, path, chunk_size,
+                            max_memory_bytes, kwargs):
+        return await ChunkedFile.read_async(self._call(
+            "GetFileChunks",
+            _chunks_request(request, revision, path, chunk_size), **kwargs),
+            max_memory_bytes)
+
+
+class _GeneratedDataServicer(service_data_pb2_grpc.DataServicer,
+                             service_data_chunks_pb2_grpc.DataChunksServicer):
+    """Generated methods of both the data services"""
+
+
+class DataServicerMetaclass(AnalyzerServicerMetaclass):
+    """Metaclass for data servicer
+
+    Same as `lookout.sdk.service_analyzer.AnalyzerServicerMetaclass`, for
+    the methods of the data service. The data requests are never cached.
+
+    See `lookout.sdk.service_data.DataServicer`.
+
+    """
+    servicer = _GeneratedDataServicer
+    wrap_event_cache = staticmethod(lambda method, func: func)
+
+
+class DataServicer(object, metaclass=DataServicerMetaclass):
+    """Base data servicer to be extended by the user
+
+    The user that wants to serve the data of the repositories has to extend
+    this class and to implement the following methods:
+        - get_changes,
+        - get_files.
+
+    Both methods have the following signature:
+
+        method(self, request, context)
+
+    and return an iterator over the `Change`s or the `File`s, usually they
+    are generators. As for `lookout.sdk.service_analyzer.AnalyzerServicer`,
+    the context is wrapped by `lookout.sdk.grpc.log_fields.LogFieldsContext`.
+
+    Register it with `lookout.sdk.pb.add_dataservicer_to_server`.
+
+    The servicer may also implement `get_file_chunks`, returning an iterator
+    over the `FileChunk`s of a single file, see
+    `lookout.sdk.service_data_chunks.file_chunks`. In this case, register it
+    with `lookout.sdk.pb.add_datachunksservicer_to_server` too.
+
+    The filters of the requests are compiled and cached by `request_filter`,
+    the paths should be checked before loading the contents of the files:
+
+        def get_files(self, request, context):
+            request_filter = self.request_filter(request, context)
+            for path in self.list_files(request.revision):
+                if not request_filter.match_path(path):
+                    continue
+                f = self.load_file(path, request)
+                if request_filter.match_language(f.language):
+                    yield f
+
+    """
+    # callable telling whether a path is vendored, to apply
+    # `exclude_vendored`, by default the patterns of linguist, see
+    # `lookout.sdk.vendored`. The filter is ignored if None. A plain
+    # function must be set on the instance, or wrapped in a staticmethod.
+    vendored_matcher = staticmethod(is_vendored)
+
+    def request_filter(self, request: DataRequest, context) -> RequestFilter:
+        """Returns the compiled filter of a request
+
+        The call is aborted with `INVALID_ARGUMENT` if a pattern of the
+        request is invalid.
+
+        :param request: the `ChangesRequest` or the `FilesRequest`.
+        :param context: the context of the call.
+
+        """
+        try:
+            return request_filter(request, self.vendored_matcher)
+        except re.error as e:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT,
+                          "invalid pattern: %s" % e)
+
+
+class _Stubs:
+    """Generated stubs of the data services over the same channel"""
+
+    def __init__(self, channel):
+        self.data = service_data_pb2_grpc.DataStub(channel)
+        self.raw_data = _RawDataStub(channel)
+        self.chunks = service_data_chunks_pb2_grpc.DataChunksStub(channel)
+
+    def get(self, method, raw=False):
+        if method == "GetFileChunks":
+            return self.chunks.GetFileChunks
+
+        return getattr(self.raw_data if raw else self.data, method)
+
+
+class _RawDataStub:
+    """Same as the generated DataStub, but the responses are not decoded"""
+
+    def __init__(self, channel):
+        self.GetChanges = channel.unary_stream(
+            '/pb.Data/GetChanges',
+            request_serializer=service_data_pb2.ChangesRequest.SerializeToString,
+        )
+        self.GetFiles = channel.unary_stream(
+            '/pb.Data/GetFiles',
+            request_serializer=service_data_pb2.FilesRequest.SerializeToString,
+        )
+
+
+class _ReleasingStream:
+    """Response stream calling `release` once it is over
+
+    `release` is passed the status code of the call when it failed, so that
+    the pool can replace an unavailable channel.
+
+    Every other attribute is proxied to the wrapped stream, so that the
+    `grpc.Call` api (`cancel`, `code`, ...) is still available.
+
+    """
+    def __init__(self, stream, release):
+        self._stream = stream
+        self._release = release
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self._stream)
+        except grpc.RpcError as exc:
+            self._done(error_code(exc))
+            raise
+        except BaseException:
+            self._done()
+            raise
+
+    def __getattr__(self, attr):
+        return getattr(self._stream, attr)
+
+    def cancel(self):
+        try:
+            return self._stream.cancel()
+        finally:
+            self._done()
+
+    def __del__(self):
+        self._done()
+
+    def _done(self, code=None):
+        release, self._release = self._release, None
+        if release is not None:
+            release(code)
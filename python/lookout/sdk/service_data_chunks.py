@@ -0,0 +1,232 @@
+"""
+Chunked transfer of the contents and the UASTs of the files
+
+A `File` must fit in a single gRPC message, so a large generated file can
+exceed the maximum message size, or at least force the analyzer to allocate
+it at once. The `DataChunks` service streams the contents and the serialized
+UAST of a single file as ordered `FileChunk`s instead, and the client
+reassembles them in a `ChunkedFile`, in memory up to a limit and in a
+temporary file above it.
+
+See `lookout.sdk.service_data.DataStub.get_file_chunks`.
+"""
+
+import importlib
+import mmap
+import tempfile
+from typing import AsyncIterator, Iterator, Optional
+
+from lookout.sdk import service_data_pb2
+from lookout.sdk.service_data_chunks_pb2 import FileChunk
+
+# "in" is a keyword, the module can't be imported with an import statement
+Node = importlib.import_module(
+    "bblfsh.gopkg.in.bblfsh.sdk.v1.uast.generated_pb2").Node
+
+# default maximum size of the data of each chunk
+DEFAULT_CHUNK_SIZE = 1024 * 1024  # 1MB
+
+# default maximum size of a field kept in memory by `ChunkedFile`
+DEFAULT_MAX_MEMORY_BYTES = 16 * 1024 * 1024  # 16MB
+
+
+def file_chunks(f: service_data_pb2.File,
+                chunk_size: int = 0) -> Iterator[FileChunk]:
+    """Yields the chunks of a file, to be returned by `GetFileChunks`
+
+    :param f: the file, with its contents and UAST if requested.
+    :param chunk_size: the maximum size of the data of each chunk, the
+        default one if zero.
+
+    """
+    meta = service_data_pb2.File(path=f.path, mode=f.mode, hash=f.hash,
+                                 language=f.language)
+    uast = f.uast.SerializeToString() if f.HasField("uast") else b""
+    return data_chunks(meta, f.content, uast, chunk_size)
+
+
+def data_chunks(meta: service_data_pb2.File, content: bytes, uast: bytes,
+                chunk_size: int = 0) -> Iterator[FileChunk]:
+    """Yields the chunks of the contents and of the serialized UAST of a file
+
+    Unlike `file_chunks`, the whole `File` doesn't need to be built, which
+    would copy the contents and the UAST once more.
+
+    :param meta: the file set in the first chunk, without contents and UAST.
+    :param content: the contents of the file.
+    :param uast: the serialized UAST of the file.
+    :param chunk_size: the maximum size of the data of each chunk, the
+        default one if zero.
+
+    """
+    chunk_size = chunk_size or DEFAULT_CHUNK_SIZE
+    first = True
+    for field, data in ((FileChunk.CONTENT, memoryview(content)),
+                        (FileChunk.UAST, memoryview(uast))):
+        for offset in range(0, len(data), chunk_size):
+            chunk = FileChunk(field=field, offset=offset, size=len(data),
+                              data=bytes(data[offset:offset + chunk_size]))
+            if first:
+                chunk.file.CopyFrom(meta)
+                first = False
+            yield chunk
+
+    if first:
+        yield FileChunk(file=meta)
+
+
+class _FieldBuffer:
+    """Buffer of a field, allocated once with the size of the field"""
+
+    def __init__(self, size: int, max_memory_bytes: int):
+        self.size = size
+        self.written = 0
+        self._file = None
+        if size <= max_memory_bytes:
+            self._buffer = bytearray(size)
+        else:
+            self._file = tempfile.TemporaryFile()
+            self._file.truncate(size)
+            self._buffer = mmap.mmap(self._file.fileno(), size)
+        self.view = memoryview(self._buffer)
+
+    def write(self, chunk: FileChunk):
+        end = chunk.offset + len(chunk.data)
+        if chunk.size != self.size or chunk.offset != self.written or \
+                end > self.size:
+            raise ValueError("unexpected chunk at offset %d of %d bytes" % (
+                chunk.offset, chunk.size))
+
+        self.view[chunk.offset:end] = chunk.data
+        self.written = end
+
+    def close(self):
+        self.view.release()
+        if self._file is not None:
+            self._buffer.close()
+            self._file.close()
+
+
+class ChunkedFile:
+    """File reassembled from its chunks
+
+    Its `content` and its serialized UAST are exposed as memoryviews, either
+    over memory or, when larger than `max_memory_bytes`, over a memory-mapped
+    temporary file. They must not be used after `close`.
+
+    """
+    def __init__(self, max_memory_bytes: int = DEFAULT_MAX_MEMORY_BYTES):
+        """Initializes an empty file
+
+        :param max_memory_bytes: maximum size of the contents, and of the
+            UAST, kept in memory.
+
+        """
+        self.file = None  # type: Optional[service_data_pb2.File]
+        self._max_memory_bytes = max_memory_bytes
+        self._fields = {}
+
+    @classmethod
+    def read(cls, chunks: Iterator[FileChunk],
+             max_memory_bytes: int = DEFAULT_MAX_MEMORY_BYTES
+             ) -> 'ChunkedFile':
+        """Returns the file reassembled from a stream of chunks
+
+        :raises ValueError: if the chunks are out of order or incomplete.
+
+        """
+        f = cls(max_memory_bytes)
+        try:
+            for chunk in chunks:
+                f.add(chunk)
+            f.check()
+        except BaseException:
+            f.close()
+            raise
+
+        return f
+
+    @classmethod
+    async def read_async(cls, chunks: AsyncIterator[FileChunk],
+                         max_memory_bytes: int = DEFAULT_MAX_MEMORY_BYTES
+                         ) -> 'ChunkedFile':
+        """Same as `read`, for an async stream such as a `grpc.aio` call"""
+        f = cls(max_memory_bytes)
+        try:
+            async for chunk in chunks:
+                f.add(chunk)
+            f.check()
+        except BaseException:
+            f.close()
+            raise
+
+        return f
+
+    def add(self, chunk: FileChunk):
+        """Writes a chunk, the chunks must be added in order"""
+        if chunk.HasField("file"):
+            self.file = chunk.file
+        elif self.file is None:
+            raise ValueError("the first chunk has no file")
+
+        if not chunk.size:
+            return
+
+        buffer = self._fields.get(chunk.field)
+        if buffer is None:
+            buffer = _FieldBuffer(chunk.size, self._max_memory_bytes)
+            self._fields[chunk.field] = buffer
+
+        buffer.write(chunk)
+
+    def check(self):
+        """Raises ValueError if some chunks are missing"""
+        if self.file is None:
+            raise ValueError("no chunks received")
+
+        for buffer in self._fields.values():
+            if buffer.written != buffer.size:
+                raise ValueError("incomplete file %s: %d of %d bytes" % (
+                    self.file.path, buffer.written, buffer.size))
+
+    @property
+    def content(self) -> memoryview:
+        """Returns the contents of the file"""
+        return self._view(FileChunk.CONTENT)
+
+    @property
+    def uast_data(self) -> memoryview:
+        """Returns the serialized UAST of the file"""
+        return self._view(FileChunk.UAST)
+
+    def uast(self) -> Optional[Node]:
+        """Returns the parsed UAST, if any"""
+        data = self.uast_data
+        return Node.FromString(data) if data else None
+
+    def to_file(self) -> service_data_pb2.File:
+        """Returns the whole file as a single message"""
+        f = service_data_pb2.File()
+        f.CopyFrom(self.file)
+        f.content = bytes(self.content)
+        uast = self.uast()
+        if uast is not None:
+            f.uast.CopyFrom(uast)
+
+        return f
+
+    def close(self):
+        """Releases the buffers"""
+        for buffer in self._fields.values():
+            buffer.close()
+        self._fields.clear()
+
+    def __enter__(self) -> 'ChunkedFile':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _view(self, field):
+        buffer = self._fields.get(field)
+        return buffer.view if buffer is not None else memoryview(b"")
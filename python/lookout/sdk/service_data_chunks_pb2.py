@@ -0,0 +1,232 @@
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# source: lookout/sdk/service_data_chunks.proto
+
+import sys
+_b=sys.version_info[0]<3 and (lambda x:x) or (lambda x:x.encode('latin1'))
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import message as _message
+from google.protobuf import reflection as _reflection
+from google.protobuf import symbol_database as _symbol_database
+from google.protobuf import descriptor_pb2
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+from bblfsh.github.com.gogo.protobuf.gogoproto import gogo_pb2 as github_dot_com_dot_gogo_dot_protobuf_dot_gogoproto_dot_gogo__pb2
+from lookout.sdk import event_pb2 as lookout_dot_sdk_dot_event__pb2
+from lookout.sdk import service_data_pb2 as lookout_dot_sdk_dot_service__data__pb2
+
+
+DESCRIPTOR = _descriptor.FileDescriptor(
+  name='lookout/sdk/service_data_chunks.proto',
+  package='pb',
+  syntax='proto3',
+  serialized_pb=_b('\n%lookout/sdk/service_data_chunks.proto\x12\x02pb\x1a-github.com/gogo/protobuf/gogoproto/gogo.proto\x1a\x17lookout/sdk/event.proto\x1a\x1elookout/sdk/service_data.proto\"\xac\x01\n\x11\x46ileChunksRequest\x12&\n\x08revision\x18\x01 \x01(\x0b\x32\x14.pb.ReferencePointer\x12\x0c\n\x04path\x18\x02 \x01(\t\x12\x15\n\rwant_contents\x18\x03 \x01(\x08\x12\x1f\n\twant_uast\x18\x04 \x01(\x08\x42\x0c\xe2\xde\x1f\x08WantUAST\x12\x15\n\rwant_language\x18\x05 \x01(\x08\x12\x12\n\nchunk_size\x18\x06 \x01(\r\"\x9d\x01\n\tFileChunk\x12\x16\n\x04\x66ile\x18\x01 \x01(\x0b\x32\x08.pb.File\x12\"\n\x05\x66ield\x18\x02 \x01(\x0e\x32\x13.pb.FileChunk.Field\x12\x0e\n\x06offset\x18\x03 \x01(\x04\x12\x0c\n\x04size\x18\x04 \x01(\x04\x12\x0c\n\x04\x64\x61ta\x18\x05 \x01(\x0c\"\x1e\n\x05\x46ield\x12\x0b\n\x07\x43ONTENT\x10\x00\x12\x08\n\x04UAST\x10\x01:\x08\xa0\xa1\x1f\x00\xe0\xa1\x1f\x01\x32\x45\n\nDataChunks\x12\x37\n\rGetFileChunks\x12\x15.pb.FileChunksRequest\x1a\r.pb.FileChunk0\x01\x42\x04\xc8\xe1\x1e\x00\x62\x06proto3')
+  ,
+  dependencies=[github_dot_com_dot_gogo_dot_protobuf_dot_gogoproto_dot_gogo__pb2.DESCRIPTOR,lookout_dot_sdk_dot_event__pb2.DESCRIPTOR,lookout_dot_sdk_dot_service__data__pb2.DESCRIPTOR,])
+
+
+
+_FILECHUNK_FIELD = _descriptor.EnumDescriptor(
+  name='Field',
+  full_name='pb.FileChunk.Field',
+  filename=None,
+  file=DESCRIPTOR,
+  values=[
+    _descriptor.EnumValueDescriptor(
+      name='CONTENT', index=0, number=0,
+      options=None,
+      type=None),
+    _descriptor.EnumValueDescriptor(
+      name='UAST', index=1, number=1,
+      options=None,
+      type=None),
+  ],
+  containing_type=None,
+  options=None,
+  serialized_start=442,
+  serialized_end=472,
+)
+_sym_db.RegisterEnumDescriptor(_FILECHUNK_FIELD)
+
+
+_FILECHUNKSREQUEST = _descriptor.Descriptor(
+  name='FileChunksRequest',
+  full_name='pb.FileChunksRequest',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='revision', full_name='pb.FileChunksRequest.revision', index=0,
+      number=1, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='path', full_name='pb.FileChunksRequest.path', index=1,
+      number=2, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='want_contents', full_name='pb.FileChunksRequest.want_contents', index=2,
+      number=3, type=8, cpp_type=7, label=1,
+      has_default_value=False, default_value=False,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='want_uast', full_name='pb.FileChunksRequest.want_uast', index=3,
+      number=4, type=8, cpp_type=7, label=1,
+      has_default_value=False, default_value=False,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=_descriptor._ParseOptions(descriptor_pb2.FieldOptions(), _b('\342\336\037\010WantUAST')), file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='want_language', full_name='pb.FileChunksRequest.want_language', index=4,
+      number=5, type=8, cpp_type=7, label=1,
+      has_default_value=False, default_value=False,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='chunk_size', full_name='pb.FileChunksRequest.chunk_size', index=5,
+      number=6, type=13, cpp_type=3, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=150,
+  serialized_end=322,
+)
+
+
+_FILECHUNK = _descriptor.Descriptor(
+  name='FileChunk',
+  full_name='pb.FileChunk',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='file', full_name='pb.FileChunk.file', index=0,
+      number=1, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='field', full_name='pb.FileChunk.field', index=1,
+      number=2, type=14, cpp_type=8, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='offset', full_name='pb.FileChunk.offset', index=2,
+      number=3, type=4, cpp_type=4, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='size', full_name='pb.FileChunk.size', index=3,
+      number=4, type=4, cpp_type=4, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='data', full_name='pb.FileChunk.data', index=4,
+      number=5, type=12, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b(""),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+    _FILECHUNK_FIELD,
+  ],
+  options=_descriptor._ParseOptions(descriptor_pb2.MessageOptions(), _b('\240\241\037\000\340\241\037\001')),
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=325,
+  serialized_end=482,
+)
+
+_FILECHUNKSREQUEST.fields_by_name['revision'].message_type = lookout_dot_sdk_dot_event__pb2._REFERENCEPOINTER
+_FILECHUNK.fields_by_name['file'].message_type = lookout_dot_sdk_dot_service__data__pb2._FILE
+_FILECHUNK.fields_by_name['field'].enum_type = _FILECHUNK_FIELD
+_FILECHUNK_FIELD.containing_type = _FILECHUNK
+DESCRIPTOR.message_types_by_name['FileChunksRequest'] = _FILECHUNKSREQUEST
+DESCRIPTOR.message_types_by_name['FileChunk'] = _FILECHUNK
+_sym_db.RegisterFileDescriptor(DESCRIPTOR)
+
+FileChunksRequest = _reflection.GeneratedProtocolMessageType('FileChunksRequest', (_message.Message,), dict(
+  DESCRIPTOR = _FILECHUNKSREQUEST,
+  __module__ = 'lookout.sdk.service_data_chunks_pb2'
+  # @@protoc_insertion_point(class_scope:pb.FileChunksRequest)
+  ))
+_sym_db.RegisterMessage(FileChunksRequest)
+
+FileChunk = _reflection.GeneratedProtocolMessageType('FileChunk', (_message.Message,), dict(
+  DESCRIPTOR = _FILECHUNK,
+  __module__ = 'lookout.sdk.service_data_chunks_pb2'
+  # @@protoc_insertion_point(class_scope:pb.FileChunk)
+  ))
+_sym_db.RegisterMessage(FileChunk)
+
+
+DESCRIPTOR.has_options = True
+DESCRIPTOR._options = _descriptor._ParseOptions(descriptor_pb2.FileOptions(), _b('\310\341\036\000'))
+_FILECHUNKSREQUEST.fields_by_name['want_uast'].has_options = True
+_FILECHUNKSREQUEST.fields_by_name['want_uast']._options = _descriptor._ParseOptions(descriptor_pb2.FieldOptions(), _b('\342\336\037\010WantUAST'))
+_FILECHUNK.has_options = True
+_FILECHUNK._options = _descriptor._ParseOptions(descriptor_pb2.MessageOptions(), _b('\240\241\037\000\340\241\037\001'))
+
+_DATACHUNKS = _descriptor.ServiceDescriptor(
+  name='DataChunks',
+  full_name='pb.DataChunks',
+  file=DESCRIPTOR,
+  index=0,
+  options=None,
+  serialized_start=484,
+  serialized_end=553,
+  methods=[
+  _descriptor.MethodDescriptor(
+    name='GetFileChunks',
+    full_name='pb.DataChunks.GetFileChunks',
+    index=0,
+    containing_service=None,
+    input_type=_FILECHUNKSREQUEST,
+    output_type=_FILECHUNK,
+    options=None,
+  ),
+])
+_sym_db.RegisterServiceDescriptor(_DATACHUNKS)
+
+DESCRIPTOR.services_by_name['DataChunks'] = _DATACHUNKS
+
+# @@protoc_insertion_point(module_scope)
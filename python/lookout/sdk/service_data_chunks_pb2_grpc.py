@@ -0,0 +1,50 @@
+# Generated by the gRPC Python protocol compiler plugin. DO NOT EDIT!
+import grpc
+
+from lookout.sdk import service_data_chunks_pb2 as lookout_dot_sdk_dot_service__data__chunks__pb2
+
+
+class DataChunksStub(object):
+  """DataChunks streams the contents and the UASTs of the files in chunks, so
+  that files of any size can be transferred without allocating them in a
+  single message.
+  """
+
+  def __init__(self, channel):
+    """Constructor.
+
+    Args:
+      channel: A grpc.Channel.
+    """
+    self.GetFileChunks = channel.unary_stream(
+        '/pb.DataChunks/GetFileChunks',
+        request_serializer=lookout_dot_sdk_dot_service__data__chunks__pb2.FileChunksRequest.SerializeToString,
+        response_deserializer=lookout_dot_sdk_dot_service__data__chunks__pb2.FileChunk.FromString,
+        )
+
+
+class DataChunksServicer(object):
+  """DataChunks streams the contents and the UASTs of the files in chunks, so
+  that files of any size can be transferred without allocating them in a
+  single message.
+  """
+
+  def GetFileChunks(self, request, context):
+    """GetFileChunks returns a stream of FileChunks of a single file.
+    """
+    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+    context.set_details('Method not implemented!')
+    raise NotImplementedError('Method not implemented!')
+
+
+def add_DataChunksServicer_to_server(servicer, server):
+  rpc_method_handlers = {
+      'GetFileChunks': grpc.unary_stream_rpc_method_handler(
+          servicer.GetFileChunks,
+          request_deserializer=lookout_dot_sdk_dot_service__data__chunks__pb2.FileChunksRequest.FromString,
+          response_serializer=lookout_dot_sdk_dot_service__data__chunks__pb2.FileChunk.SerializeToString,
+      ),
+  }
+  generic_handler = grpc.method_handlers_generic_handler(
+      'pb.DataChunks', rpc_method_handlers)
+  server.add_generic_rpc_handlers((generic_handler,))
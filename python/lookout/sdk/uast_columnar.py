@@ -0,0 +1,276 @@
+"""
+Columnar representation of the UASTs backed by NumPy arrays
+
+Walking a `Node` tree in Python allocates a wrapper object for every node
+it touches, which is slow on files with 100k+ nodes. `ColumnarUAST`
+converts a UAST once into one array per field, so that the features of the
+nodes can be computed with vectorized operations:
+
+    uast = ColumnarUAST.from_uast(change.head.uast)
+    functions = uast.select(roles=["FUNCTION"])
+    sizes = uast.end_offset[functions] - uast.start_offset[functions]
+
+The nodes are numbered in breadth-first order, the root being 0, so that
+the children of each node are contiguous: `uast.children(i)` is the range
+`child_start[i]:child_end[i]`.
+
+It can be saved to a single file, and loaded back memory-mapped, without
+reading the arrays.
+
+Requires NumPy, installed with `pip install lookout-sdk[columnar]`.
+"""
+
+import importlib
+import json
+import mmap
+from typing import Dict, Iterable, List, Optional, Union
+
+try:
+    import numpy as np
+except ImportError as e:
+    raise ImportError("lookout.sdk.uast_columnar requires numpy, install it "
+                      "with `pip install lookout-sdk[columnar]`") from e
+
+# "in" is a keyword, the module can't be imported with an import statement
+_uast = importlib.import_module("bblfsh.gopkg.in.bblfsh.sdk.v1.uast."
+                                "generated_pb2")
+Node = _uast.Node
+
+MAGIC = b"LKUAST\x00\x01"
+
+# number of 64 bits words of the role bitmasks
+ROLE_WORDS = max(_uast.Role.values()) // 64 + 1
+
+# the integer columns, in the order they are saved
+COLUMNS = {
+    "internal_type": np.int32,  # index in `internal_types`
+    "token": np.int32,  # index in the token table, 0 is the empty token
+    "start_offset": np.uint32,
+    "end_offset": np.uint32,
+    "start_line": np.uint32,
+    "end_line": np.uint32,
+    "start_col": np.uint32,
+    "end_col": np.uint32,
+    "parent": np.int32,  # -1 for the root
+    "child_start": np.int32,
+    "child_end": np.int32,
+}
+
+_ALIGNMENT = 64
+
+Role = Union[int, str]
+
+
+class ColumnarUAST:
+    """UAST stored as one array per field
+
+    Each column of `COLUMNS` is an array with one element per node, the
+    roles are an array of `ROLE_WORDS` bitmasks per node. The internal
+    types are interned in `internal_types`, and the tokens in a table read
+    through `get_token` and `get_tokens`.
+
+    """
+    def __init__(self, columns: Dict[str, np.ndarray], roles: np.ndarray,
+                 internal_types: List[str], token_data: np.ndarray,
+                 token_offsets: np.ndarray):
+        """Initializes the UAST from its arrays
+
+        Use `from_uast` or `load` instead.
+
+        """
+        for name in COLUMNS:
+            setattr(self, name, columns[name])
+        self.roles = roles
+        self.internal_types = internal_types
+        self._type_ids = {t: i for i, t in enumerate(internal_types)}
+        self._token_data = token_data
+        self._token_offsets = token_offsets
+
+    @classmethod
+    def from_uast(cls, uast: Optional[Node]) -> 'ColumnarUAST':
+        """Converts a UAST
+
+        :param uast: the root of the UAST, e.g. `File.uast`. None or an
+            empty node are converted to an empty UAST.
+
+        """
+        values = {name: [] for name in COLUMNS}
+        role_masks = []
+        type_ids = {}
+        token_ids = {"": 0}
+        tokens = [b""]
+        # ListFields doesn't walk the tree, unlike ByteSize
+        queue = [(uast, -1)] if uast is not None and uast.ListFields() \
+            else []
+        for i, (node, parent) in enumerate(queue):
+            children = node.children
+            values["internal_type"].append(type_ids.setdefault(
+                node.internal_type, len(type_ids)))
+            token = node.token
+            token_id = token_ids.get(token)
+            if token_id is None:
+                token_id = token_ids[token] = len(tokens)
+                tokens.append(token.encode("utf-8"))
+            values["token"].append(token_id)
+            for prefix in ("start", "end"):
+                position = getattr(node, prefix + "_position")
+                values[prefix + "_offset"].append(position.offset)
+                values[prefix + "_line"].append(position.line)
+                values[prefix + "_col"].append(position.col)
+            values["parent"].append(parent)
+            values["child_start"].append(len(queue))
+            queue.extend((child, i) for child in children)
+            values["child_end"].append(len(queue))
+
+            mask = 0
+            for role in node.roles:
+                mask |= 1 << role
+            role_masks.append(mask)
+
+        columns = {name: np.array(values[name], dtype=dtype)
+                   for name, dtype in COLUMNS.items()}
+        roles = np.zeros((len(queue), ROLE_WORDS), dtype=np.uint64)
+        for word in range(ROLE_WORDS):
+            shift = 64 * word
+            roles[:, word] = [(mask >> shift) & 0xFFFFFFFFFFFFFFFF
+                              for mask in role_masks]
+
+        token_offsets = np.zeros(len(tokens) + 1, dtype=np.int64)
+        np.cumsum([len(t) for t in tokens], out=token_offsets[1:])
+        token_data = np.frombuffer(b"".join(tokens), dtype=np.uint8)
+        return cls(columns, roles, list(type_ids), token_data, token_offsets)
+
+    def __len__(self) -> int:
+        """Returns the number of nodes"""
+        return len(self.parent)
+
+    def children(self, i: int) -> range:
+        """Returns the indices of the children of a node"""
+        return range(self.child_start[i], self.child_end[i])
+
+    def get_token(self, i: int) -> str:
+        """Returns the token of a node"""
+        start, end = self._token_offsets[self.token[i]:self.token[i] + 2]
+        return self._token_data[start:end].tobytes().decode("utf-8")
+
+    def get_tokens(self, indices: Optional[Iterable[int]] = None
+                   ) -> List[str]:
+        """Returns the tokens of the nodes, of all of them by default"""
+        token_ids = self.token if indices is None else self.token[indices]
+        offsets = self._token_offsets
+        data = self._token_data
+        return [data[offsets[t]:offsets[t + 1]].tobytes().decode("utf-8")
+                for t in token_ids]
+
+    def has_role(self, role: Role) -> np.ndarray:
+        """Returns the boolean mask of the nodes with a role
+
+        :param role: the role, by value or by name, e.g. "FUNCTION".
+
+        """
+        role = _role_value(role)
+        word, bit = divmod(role, 64)
+        return (self.roles[:, word] & np.uint64(1 << bit)) != 0
+
+    def has_type(self, internal_type: str) -> np.ndarray:
+        """Returns the boolean mask of the nodes with an internal type"""
+        type_id = self._type_ids.get(internal_type)
+        if type_id is None:
+            return np.zeros(len(self), dtype=bool)
+
+        return self.internal_type == type_id
+
+    def select(self, internal_types: Optional[Iterable[str]] = None,
+               roles: Optional[Iterable[Role]] = None) -> np.ndarray:
+        """Returns the indices of the nodes matching all the criteria
+
+        :param internal_types: the node must have one of these internal
+            types, any if None.
+        :param roles: the node must have all these roles.
+
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if internal_types is not None:
+            type_ids = [self._type_ids[t] for t in internal_types
+                        if t in self._type_ids]
+            mask &= np.isin(self.internal_type, type_ids)
+
+        required = np.zeros(ROLE_WORDS, dtype=np.uint64)
+        for role in roles or ():
+            word, bit = divmod(_role_value(role), 64)
+            required[word] |= np.uint64(1 << bit)
+        if required.any():
+            mask &= ((self.roles & required) == required).all(axis=1)
+
+        return np.flatnonzero(mask)
+
+    def save(self, path: str):
+        """Writes the UAST to a file, see `load`"""
+        arrays = [(name, getattr(self, name)) for name in COLUMNS] + [
+            ("roles", self.roles), ("token_data", self._token_data),
+            ("token_offsets", self._token_offsets)]
+        header = {"internal_types": self.internal_types, "arrays": []}
+        offset = 0
+        for name, array in arrays:
+            header["arrays"].append({
+                "name": name, "dtype": array.dtype.str,
+                "shape": list(array.shape), "offset": offset})
+            offset = _align(offset + array.nbytes)
+
+        data = json.dumps(header).encode("utf-8")
+        start = _align(len(MAGIC) + 8 + len(data))
+        with open(path, "wb") as f:
+            f.write(MAGIC)
+            f.write(len(data).to_bytes(8, "little"))
+            f.write(data)
+            for (name, array), meta in zip(arrays, header["arrays"]):
+                f.seek(start + meta["offset"])
+                f.write(np.ascontiguousarray(array).tobytes())
+            f.truncate(start + offset)
+
+    @classmethod
+    def load(cls, path: str, mmap_mode: bool = True) -> 'ColumnarUAST':
+        """Reads a UAST written by `save`
+
+        :param path: the path of the file.
+        :param mmap_mode: whether the arrays are memory-mapped, read-only,
+            instead of being read. The mapping is released once none of
+            the arrays is referenced anymore.
+        :raises ValueError: if the file is not a columnar UAST.
+
+        """
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError("%s is not a columnar UAST" % path)
+
+            size = int.from_bytes(f.read(8), "little")
+            header = json.loads(f.read(size).decode("utf-8"))
+            start = _align(len(MAGIC) + 8 + size)
+            if mmap_mode:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                f.seek(0)
+                buffer = f.read()
+
+        arrays = {}
+        for meta in header["arrays"]:
+            dtype = np.dtype(meta["dtype"])
+            count = int(np.prod(meta["shape"]))
+            arrays[meta["name"]] = np.frombuffer(
+                buffer, dtype=dtype, count=count,
+                offset=start + meta["offset"]).reshape(meta["shape"])
+
+        return cls({name: arrays[name] for name in COLUMNS}, arrays["roles"],
+                   header["internal_types"], arrays["token_data"],
+                   arrays["token_offsets"])
+
+
+def _role_value(role: Role) -> int:
+    if isinstance(role, str):
+        return _uast.Role.Value(role)
+
+    return role
+
+
+def _align(offset: int) -> int:
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
@@ -0,0 +1,144 @@
+"""
+Structural diff of the base and head UASTs of a change
+
+A `Change` carries the UASTs of both versions of a file, but analyzing the
+whole head makes the cost of a review proportional to the size of the
+files instead of the size of the diff. `diff_subtrees` hashes every subtree
+of both UASTs, Merkle style, and returns the head nodes whose subtree
+doesn't exist in the base:
+
+    diff = diff_subtrees(change.base.uast, change.head.uast)
+    for node in diff.changed:
+        if FUNCTION in node.roles:
+            ... analyze the function ...
+
+The hash of a subtree covers the internal types, tokens, roles and
+properties of its nodes and their order, but not the positions, so code
+that only moved, e.g. below an inserted function, is unchanged.
+"""
+
+import hashlib
+import importlib
+from collections import Counter
+from typing import List, NamedTuple, Optional
+
+# "in" is a keyword, the module can't be imported with an import statement
+Node = importlib.import_module(
+    "bblfsh.gopkg.in.bblfsh.sdk.v1.uast.generated_pb2").Node
+
+DIGEST_SIZE = 16
+
+
+class SubtreeDiff(NamedTuple):
+    """Result of `diff_subtrees`"""
+    # head nodes whose subtree doesn't exist in the base, in document order.
+    # The ancestors of a changed node are changed too.
+    changed: List[Node]
+    # roots of the largest head subtrees identical to a base subtree
+    unchanged: List[Node]
+
+
+class SubtreeHashes(NamedTuple):
+    """Result of `subtree_hashes`
+
+    The nodes are numbered in document (pre-)order, the root being 0, so
+    that the subtree of node i is the range `i:i + sizes[i]`.
+
+    """
+    digests: List[bytes]
+    sizes: List[int]
+
+
+def subtree_hashes(uast: Optional[Node]) -> SubtreeHashes:
+    """Returns the hash of every subtree of a UAST
+
+    The tree is traversed once, the children being hashed before their
+    parent. The hashes are identified by the position of the nodes rather
+    than by the nodes, since the C++ and upb backends of protobuf return a
+    new wrapper of the same node on each access.
+
+    :param uast: the root of the UAST, None or an empty node have no
+        subtrees.
+
+    """
+    digests = []
+    sizes = []
+    # ListFields doesn't walk the tree, unlike ByteSize
+    if uast is None or not uast.ListFields():
+        return SubtreeHashes(digests, sizes)
+
+    stack = [(uast, -1)]
+    while stack:
+        node, index = stack.pop()
+        if index < 0:
+            index = len(digests)
+            digests.append(None)
+            sizes.append(1)
+            stack.append((node, index))
+            stack.extend((child, -1) for child in reversed(node.children))
+            continue
+
+        h = hashlib.blake2b(digest_size=DIGEST_SIZE)
+        for field in (node.internal_type, node.token):
+            _update(h, field)
+        _update(h, ",".join(map(str, sorted(node.roles))))
+        for key, value in sorted(node.properties.items()):
+            _update(h, key)
+            _update(h, value)
+        # the children are the subtrees which follow the node
+        children = []
+        child = index + 1
+        end = len(digests)
+        while child < end:
+            children.append(digests[child])
+            child += sizes[child]
+        _update(h, str(len(children)))
+        for digest in children:
+            h.update(digest)
+        digests[index] = h.digest()
+        sizes[index] = end - index
+
+    return SubtreeHashes(digests, sizes)
+
+
+def diff_subtrees(base: Optional[Node], head: Optional[Node]) -> SubtreeDiff:
+    """Returns the head nodes that are new or modified with respect to the
+    base
+
+    Each subtree of the base, nested ones included, matches at most one
+    head subtree, so that the copies of existing code are reported as new.
+    The unchanged head subtrees are not traversed.
+
+    :param base: the UAST of the base, None for an added file.
+    :param head: the UAST of the head.
+
+    """
+    available = Counter(subtree_hashes(base).digests)
+    digests, sizes = subtree_hashes(head)
+    changed = []
+    unchanged = []
+    stack = [(head, 0)] if digests else []
+    while stack:
+        node, index = stack.pop()
+        end = index + sizes[index]
+        if available[digests[index]] > 0:
+            # the identical base subtree and its descendants are used up
+            available.subtract(digests[index:end])
+            unchanged.append(node)
+            continue
+
+        changed.append(node)
+        child = index + 1
+        positioned = []
+        for child_node in node.children:
+            positioned.append((child_node, child))
+            child += sizes[child]
+        stack.extend(reversed(positioned))
+
+    return SubtreeDiff(changed, unchanged)
+
+
+def _update(h, text: str):
+    data = text.encode("utf-8")
+    h.update(len(data).to_bytes(4, "little"))
+    h.update(data)
@@ -0,0 +1,369 @@
+"""
+Evaluation of several XPath queries in a single traversal of a UAST
+
+Filtering a UAST once per query, e.g. with `bblfsh.filter`, parses the
+query and walks the whole tree every time. `QuerySet` compiles its queries
+once per process and evaluates all of them together, each node being
+visited once whatever the number of queries:
+
+    QUERIES = QuerySet({"functions": "//*[@roleFunction]",
+                        "identifiers": "//*[@roleIdentifier]"})
+
+    for change in changes:
+        counts = QUERIES.count(change.head.uast)
+        ... counts["functions"] ...
+
+The supported subset of XPath 1.0 is the one used on the UASTs:
+
+    - absolute location paths, with the child, "/", and the
+      descendant-or-self, "//", axes, and their unions, "|";
+    - node tests on the internal type, "Identifier", or any node, "*";
+    - predicates on the attributes, combined with "and", "or" and "not()":
+      "@roleFunction", "@token", "@token='x'", "@internalRole='body'",
+      "@startLine>=10", and any property of the nodes by its name.
+
+Queries outside of it raise `ValueError` when they are compiled.
+"""
+
+import functools
+import importlib
+import operator
+import re
+from typing import Callable, Dict, FrozenSet, Hashable, Iterable, List, \
+    Mapping, NamedTuple, Optional, Tuple, Union
+
+# "in" is a keyword, the module can't be imported with an import statement
+_uast = importlib.import_module("bblfsh.gopkg.in.bblfsh.sdk.v1.uast."
+                                "generated_pb2")
+Node = _uast.Node
+
+QUERY_CACHE_SIZE = 1024
+
+_TOKENS = re.compile(r"""\s*(?:
+    (?P<string>'[^']*'|"[^"]*")
+    |(?P<number>-?\d+(?:\.\d+)?)
+    |(?P<op>//|!=|<=|>=|[/|\[\]()@=<>*])
+    |(?P<name>[A-Za-z_][\w.\-]*)
+)""", re.VERBOSE)
+
+_COMPARISONS = {"=": operator.eq, "!=": operator.ne, "<": operator.lt,
+                "<=": operator.le, ">": operator.gt, ">=": operator.ge}
+
+_POSITIONS = {"start": "start_position", "end": "end_position"}
+
+
+# the fields of a node read once per visit, shared by the tests of all the
+# queries: (internal_type, roles, token, node)
+_Fields = Tuple[str, FrozenSet[int], str, Node]
+
+
+class _Step(NamedTuple):
+    """Location step matching the nodes that pass `test`"""
+    descendant: bool
+    test: Callable[[_Fields], bool]
+
+
+class Query:
+    """Compiled XPath query
+
+    Use `compile_query` to share the compiled queries in the process.
+
+    """
+    def __init__(self, text: str):
+        """Compiles the query
+
+        :param text: the XPath query.
+        :raises ValueError: if the query is invalid or not supported.
+
+        """
+        self.text = text
+        self.paths = _Parser(text).parse()  # type: List[List[_Step]]
+
+    def __repr__(self) -> str:
+        return "Query(%r)" % self.text
+
+
+@functools.lru_cache(maxsize=QUERY_CACHE_SIZE)
+def compile_query(text: str) -> Query:
+    """Returns the compiled query, cached by its text
+
+    :raises ValueError: if the query is invalid or not supported.
+
+    """
+    return Query(text)
+
+
+class QuerySet:
+    """Queries evaluated in a single traversal of each UAST
+
+    The results are keyed by the names of the queries, or by the queries
+    themselves when they are given as a list. The nodes matching each query
+    are returned in document order, as `bblfsh.filter` does.
+
+    """
+    def __init__(self, queries: Union[Iterable[str], Mapping[Hashable, str]]):
+        """Compiles the queries
+
+        :param queries: the XPath queries, or a mapping from their names to
+            them.
+        :raises ValueError: if a query is invalid or not supported.
+
+        """
+        if not isinstance(queries, Mapping):
+            queries = {query: query for query in queries}
+
+        self.queries = {name: compile_query(query)
+                        for name, query in queries.items()}
+        self._names = list(self.queries)
+        # each path of each query is matched independently, the state of the
+        # traversal is the set of (path, step) the current node can match
+        self._paths = [(i, path) for i, query in enumerate(
+            self.queries.values()) for path in query.paths]
+
+    def filter(self, uast: Optional[Node]) -> Dict[Hashable, List[Node]]:
+        """Returns the nodes matching each query
+
+        :param uast: the root of the UAST, e.g. `File.uast`. None or an
+            empty node match nothing.
+
+        """
+        results = [[] for _ in self._names]
+        self._evaluate(uast, lambda i, node: results[i].append(node))
+        return dict(zip(self._names, results))
+
+    def count(self, uast: Optional[Node]) -> Dict[Hashable, int]:
+        """Returns the number of nodes matching each query
+
+        Same as `filter`, without keeping the nodes.
+
+        """
+        counts = [0] * len(self._names)
+
+        def add(i, _):
+            counts[i] += 1
+
+        self._evaluate(uast, add)
+        return dict(zip(self._names, counts))
+
+    def _evaluate(self, uast, on_match):
+        # ListFields doesn't walk the tree, unlike ByteSize
+        if uast is None or not uast.ListFields():
+            return
+
+        paths = self._paths
+        stack = [(uast, tuple((p, 0) for p in range(len(paths))))]
+        while stack:
+            node, states = stack.pop()
+            fields = (node.internal_type, frozenset(node.roles), node.token,
+                      node)
+            matched = []
+            next_states = []
+            for state in states:
+                p, s = state
+                query, steps = paths[p]
+                step = steps[s]
+                if step.descendant:
+                    next_states.append(state)
+
+                if step.test(fields):
+                    if s + 1 < len(steps):
+                        next_states.append((p, s + 1))
+                    elif query not in matched:
+                        matched.append(query)
+
+            # a node matched by several paths of a query is reported once
+            for query in matched:
+                on_match(query, node)
+
+            if next_states:
+                next_states = tuple(dict.fromkeys(next_states))
+                stack.extend((child, next_states)
+                             for child in reversed(node.children))
+
+
+def filter_uast(uast: Optional[Node], query: str) -> List[Node]:
+    """Returns the nodes matching a single query, see `QuerySet`"""
+    return QuerySet([query]).filter(uast)[query]
+
+
+class _Parser:
+    """Recursive descent parser of the supported XPath subset"""
+
+    def __init__(self, text: str):
+        self._text = text
+        self._tokens = []
+        pos = 0
+        text = text.rstrip()
+        while pos < len(text):
+            match = _TOKENS.match(text, pos)
+            if match is None:
+                self._error("unexpected character at %d" % pos)
+
+            self._tokens.append((match.lastgroup, match.group(
+                match.lastgroup)))
+            pos = match.end()
+        self._pos = 0
+
+    def parse(self) -> List[List[_Step]]:
+        paths = [self._path()]
+        while self._accept("op", "|"):
+            paths.append(self._path())
+        if self._pos != len(self._tokens):
+            self._error("unexpected %r" % self._tokens[self._pos][1])
+
+        return paths
+
+    def _path(self):
+        steps = []
+        while True:
+            if self._accept("op", "//"):
+                descendant = True
+            elif self._accept("op", "/"):
+                descendant = False
+            elif not steps:
+                self._error("only absolute paths are supported")
+            else:
+                return steps
+
+            steps.append(self._step(descendant))
+
+    def _step(self, descendant):
+        if self._accept("op", "*"):
+            tests = []
+        else:
+            internal_type = self._expect("name")
+            tests = [lambda fields: fields[0] == internal_type]
+
+        while self._accept("op", "["):
+            tests.append(self._or())
+            self._expect("op", "]")
+
+        return _Step(descendant, _all(tests))
+
+    def _or(self):
+        tests = [self._and()]
+        while self._accept("name", "or"):
+            tests.append(self._and())
+
+        return tests[0] if len(tests) == 1 else \
+            lambda fields: any(test(fields) for test in tests)
+
+    def _and(self):
+        tests = [self._unary()]
+        while self._accept("name", "and"):
+            tests.append(self._unary())
+
+        return _all(tests)
+
+    def _unary(self):
+        if self._accept("name", "not"):
+            self._expect("op", "(")
+            test = self._or()
+            self._expect("op", ")")
+            return lambda fields: not test(fields)
+
+        if self._accept("op", "("):
+            test = self._or()
+            self._expect("op", ")")
+            return test
+
+        self._expect("op", "@")
+        return self._attribute(self._expect("name"))
+
+    def _attribute(self, name):
+        if name.startswith("role") and len(name) > 4:
+            role_name = re.sub(r"(?<=[a-z0-9])([A-Z])", r"_\1",
+                               name[4:]).upper()
+            try:
+                role = _uast.Role.Value(role_name)
+            except ValueError:
+                self._error("unknown role %s" % name)
+            return lambda fields: role in fields[1]
+
+        get = _getter(name)
+        kind, op = self._peek()
+        if kind != "op" or op not in _COMPARISONS:
+            return lambda fields: get(fields) is not None
+
+        self._pos += 1
+        compare = _COMPARISONS[op]
+        kind, literal = self._peek()
+        self._pos += 1
+        if kind == "string":
+            value = literal[1:-1]
+            return lambda fields: _compare(compare, get(fields), value)
+
+        if kind == "number":
+            value = float(literal)
+            return lambda fields: _compare(compare, _number(get(fields)),
+                                           value)
+
+        self._error("expected a literal after @%s%s" % (name, op))
+
+    def _peek(self):
+        if self._pos < len(self._tokens):
+            return self._tokens[self._pos]
+
+        return None, None
+
+    def _accept(self, kind, value):
+        if self._peek() == (kind, value):
+            self._pos += 1
+            return True
+
+        return False
+
+    def _expect(self, kind, value=None):
+        token_kind, token = self._peek()
+        if token_kind != kind or (value is not None and token != value):
+            self._error("expected %s" % (value or kind))
+
+        self._pos += 1
+        return token
+
+    def _error(self, message):
+        raise ValueError("invalid query %r: %s" % (self._text, message))
+
+
+def _all(tests):
+    if not tests:
+        return lambda fields: True
+
+    if len(tests) == 1:
+        return tests[0]
+
+    return lambda fields: all(test(fields) for test in tests)
+
+
+def _getter(name) -> Callable[[_Fields], Optional[str]]:
+    if name == "token":
+        return lambda fields: fields[2] or None
+
+    for prefix, field in _POSITIONS.items():
+        if name.startswith(prefix) and \
+                name[len(prefix):] in ("Offset", "Line", "Col"):
+            attr = name[len(prefix):].lower()
+
+            def get(fields, field=field, attr=attr):
+                node = fields[3]
+                if not node.HasField(field):
+                    return None
+                return str(getattr(getattr(node, field), attr))
+
+            return get
+
+    return lambda fields: fields[3].properties.get(name)
+
+
+def _number(value):
+    if value is None:
+        return None
+
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def _compare(compare, value, literal):
+    return value is not None and compare(value, literal)
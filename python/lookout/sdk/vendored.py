@@ -0,0 +1,496 @@
+"""
+Detection of the vendored files
+
+`exclude_vendored` excludes the paths matching any of the regular
+expressions of linguist's `vendor.yml`, also used by enry on the lookout
+server. Running each of them on every path costs hundreds of regex searches
+per file, so `VendoredMatcher` splits them in two groups:
+
+    - the patterns ending with "/" can only match the directories, they are
+      checked once per directory and the results are cached, so that the
+      files of a vendored directory, or of a clean one, cost a dict lookup;
+    - the other patterns are grouped by the extension they require, e.g.
+      "\\.min\\.(js|css)$", so that each file is only checked against the
+      patterns that can match its extension and the ones that don't
+      require any.
+
+Within each group the literal patterns are looked up in sets, and the
+others are combined by their anchor, see `_PatternGroup`.
+
+Analyzers receiving unfiltered streams can use it directly:
+
+    changes = [c for c in changes if not is_vendored(c.head.path)]
+"""
+
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Pattern
+
+# https://github.com/github/linguist/blob/master/lib/linguist/vendor.yml
+VENDOR_PATTERNS = (
+    # Caches
+    r"(^|/)cache/",
+    # Dependencies
+    r"^[Dd]ependencies/",
+    # Distributions
+    r"(^|/)dist/",
+    # C deps
+    r"^deps/",
+    r"(^|/)configure$",
+    r"(^|/)config\.guess$",
+    r"(^|/)config\.sub$",
+    # stuff autogenerated by autoconf - still C deps
+    r"(^|/)aclocal\.m4",
+    r"(^|/)libtool\.m4",
+    r"(^|/)ltoptions\.m4",
+    r"(^|/)ltsugar\.m4",
+    r"(^|/)ltversion\.m4",
+    r"(^|/)lt~obsolete\.m4",
+    # Linters
+    r"\.indent\.pro",
+    # Minified JavaScript and CSS
+    r"(\.|-)min\.(js|css)$",
+    # Stylesheets imported from packages
+    r"([^\s]*)import\.(css|less|scss|styl)$",
+    # Bootstrap css and js
+    r"(^|/)bootstrap([^/.]*)(\..*)?\.(js|css|less|scss|styl)$",
+    r"(^|/)custom\.bootstrap([^\s]*)(js|css|less|scss|styl)$",
+    # Font Awesome
+    r"(^|/)font-?awesome\.(css|less|scss|styl)$",
+    r"(^|/)font-?awesome/.*\.(css|less|scss|styl)$",
+    # Foundation css
+    r"(^|/)foundation\.(css|less|scss|styl)$",
+    # Normalize.css
+    r"(^|/)normalize\.(css|less|scss|styl)$",
+    # Skeleton.css
+    r"(^|/)skeleton\.(css|less|scss|styl)$",
+    # Bourbon css
+    r"(^|/)[Bb]ourbon/.*\.(css|less|scss|styl)$",
+    # Animate.css
+    r"(^|/)animate\.(css|less|scss|styl)$",
+    # Materialize.css
+    r"(^|/)materialize\.(css|less|scss|styl|js)$",
+    # Select2
+    r"(^|/)select2/.*\.(css|scss|js)$",
+    # Bulma css
+    r"(^|/)bulma\.(css|sass|scss)$",
+    # Vendored dependencies
+    r"(3rd|[Tt]hird)[-_]?[Pp]arty/",
+    r"(^|/)vendors?/",
+    r"(^|/)extern(al)?/",
+    r"(^|/)[Vv]+endor/",
+    # Debian packaging
+    r"^debian/",
+    # Haxelib projects often contain a neko bytecode file named run.n
+    r"(^|/)run\.n$",
+    # Bootstrap Datepicker
+    r"(^|/)bootstrap-datepicker/",
+    # jQuery
+    r"(^|/)jquery([^.]*)\.js$",
+    r"(^|/)jquery\-\d\.\d+(\.\d+)?\.js$",
+    # jQuery UI
+    r"(^|/)jquery\-ui(\-\d\.\d+(\.\d+)?)?(\.\w+)?\.(js|css)$",
+    r"(^|/)jquery\.(ui|effects)\.([^.]*)\.(js|css)$",
+    # jQuery Gantt
+    r"(^|/)jquery\.fn\.gantt\.js",
+    # jQuery fancyBox
+    r"(^|/)jquery\.fancybox\.(js|css)",
+    # Fuel UX
+    r"(^|/)fuelux\.js",
+    # jQuery File Upload
+    r"(^|/)jquery\.fileupload(-\w+)?\.js$",
+    # jQuery dataTables
+    r"(^|/)jquery\.dataTables\.js",
+    # bootboxjs
+    r"(^|/)bootbox\.js",
+    # pdf-worker
+    r"(^|/)pdf\.worker\.js",
+    # Slick
+    r"(^|/)slick\.\w+.js$",
+    # Leaflet plugins
+    r"(^|/)Leaflet\.Coordinates-\d+\.\d+\.\d+\.src\.js$",
+    r"(^|/)leaflet\.draw-src\.js",
+    r"(^|/)leaflet\.draw\.css",
+    r"(^|/)Control\.FullScreen\.css",
+    r"(^|/)Control\.FullScreen\.js",
+    r"(^|/)leaflet\.spin\.js",
+    r"(^|/)wicket-leaflet\.js",
+    # Sublime Text workspace files
+    r"(^|/)\.sublime-project",
+    r"(^|/)\.sublime-workspace",
+    # VS Code workspace files
+    r"(^|/)\.vscode/",
+    # Prototype
+    r"(^|/)prototype(.*)\.js$",
+    r"(^|/)effects\.js$",
+    r"(^|/)controls\.js$",
+    r"(^|/)dragdrop\.js$",
+    # Typescript definition files
+    r"(.*?)\.d\.ts$",
+    # MooTools
+    r"(^|/)mootools([^.]*)\d+\.\d+.\d+([^.]*)\.js$",
+    # Dojo
+    r"(^|/)dojo\.js$",
+    # MochiKit
+    r"(^|/)MochiKit\.js$",
+    # YUI
+    r"(^|/)yahoo-([^.]*)\.js$",
+    r"(^|/)yui([^.]*)\.js$",
+    # WYS editors
+    r"(^|/)ckeditor\.js$",
+    r"(^|/)tiny_mce([^.]*)\.js$",
+    r"(^|/)tiny_mce/(langs|plugins|themes|utils)",
+    # Ace Editor
+    r"(^|/)ace-builds/",
+    # Fontello CSS files
+    r"(^|/)fontello(.*?)\.css$",
+    # MathJax
+    r"(^|/)MathJax/",
+    # Chart.js
+    r"(^|/)Chart\.js$",
+    # CodeMirror
+    r"(^|/)[Cc]ode[Mm]irror/(\d+\.\d+/)?(lib|mode|theme|addon|keymap|demo)",
+    # SyntaxHighlighter
+    r"(^|/)shBrush([^.]*)\.js$",
+    r"(^|/)shCore\.js$",
+    r"(^|/)shLegacy\.js$",
+    # AngularJS
+    r"(^|/)angular([^.]*)\.js$",
+    # D3.js
+    r"(^|\/)d3(\.v\d+)?([^.]*)\.js$",
+    # React
+    r"(^|/)react(-[^.]*)?\.js$",
+    # flow-typed
+    r"(^|/)flow-typed/.*\.js$",
+    # Modernizr
+    r"(^|/)modernizr\-\d\.\d+(\.\d+)?\.js$",
+    r"(^|/)modernizr\.custom\.\d+\.js$",
+    # Knockout
+    r"(^|/)knockout-(\d+\.){3}(debug\.)?js$",
+    # Sphinx
+    r"(^|/)docs?/_?(build|themes?|templates?|static)/",
+    # django
+    r"(^|/)admin_media/",
+    r"(^|/)env/",
+    # Fabric
+    r"^fabfile\.py$",
+    # WAF
+    r"^waf$",
+    # .osx
+    r"^.osx$",
+    # Xcode
+    r"\.xctemplate/",
+    r"\.imageset/",
+    # Carthage
+    r"(^|/)Carthage/",
+    # Sparkle
+    r"(^|/)Sparkle/",
+    # Crashlytics
+    r"Crashlytics.framework/",
+    # Fabric
+    r"Fabric.framework/",
+    # BuddyBuild
+    r"BuddyBuildSDK.framework/",
+    # Realm
+    r"Realm.framework",
+    # RealmSwift
+    r"RealmSwift.framework",
+    # git config files
+    r"gitattributes$",
+    r"gitignore$",
+    r"gitmodules$",
+    # Gradle
+    r"(^|/)gradlew$",
+    r"(^|/)gradlew\.bat$",
+    r"(^|/)gradle/wrapper/",
+    # Maven
+    r"(^|/)mvnw$",
+    r"(^|/)mvnw\.cmd$",
+    r"(^|/)\.mvn/wrapper/",
+    # Visual Studio IntelliSense
+    r"-vsdoc\.js$",
+    r"\.intellisense\.js$",
+    # jQuery validation plugin (MS bundles this with asp.net mvc)
+    r"(^|/)jquery([^.]*)\.validate(\.unobtrusive)?\.js$",
+    r"(^|/)jquery([^.]*)\.unobtrusive\-ajax\.js$",
+    # Microsoft Ajax
+    r"(^|/)[Mm]icrosoft([Mm]vc)?([Aa]jax|[Vv]alidation)(\.debug)?\.js$",
+    # NuGet
+    r"^[Pp]ackages\/.+\.\d+\/",
+    # ExtJS
+    r"(^|/)extjs/.*?\.js$",
+    r"(^|/)extjs/.*?\.xml$",
+    r"(^|/)extjs/.*?\.txt$",
+    r"(^|/)extjs/.*?\.html$",
+    r"(^|/)extjs/.*?\.properties$",
+    r"(^|/)extjs/.sencha/",
+    r"(^|/)extjs/docs/",
+    r"(^|/)extjs/builds/",
+    r"(^|/)extjs/cmd/",
+    r"(^|/)extjs/examples/",
+    r"(^|/)extjs/locale/",
+    r"(^|/)extjs/packages/",
+    r"(^|/)extjs/plugins/",
+    r"(^|/)extjs/resources/",
+    r"(^|/)extjs/src/",
+    r"(^|/)extjs/welcome/",
+    # Html5shiv
+    r"(^|/)html5shiv\.js$",
+    # Test fixtures
+    r"^[Tt]ests?/fixtures/",
+    r"^[Ss]pecs?/fixtures/",
+    # PhoneGap/Cordova
+    r"(^|/)cordova([^.]*)\.js$",
+    r"(^|/)cordova\-\d\.\d(\.\d)?\.js$",
+    # Foundation js
+    r"foundation(\..*)?\.js$",
+    # Vagrant
+    r"^Vagrantfile$",
+    # .DS_Stores
+    r"\.[Dd][Ss]_[Ss]tore$",
+    # R packages
+    r"^vignettes/",
+    r"^inst/extdata/",
+    # Octicons
+    r"(^|/)octicons\.css",
+    r"(^|/)sprockets-octicons\.scss",
+    # Typesafe Activator
+    r"(^|/)activator$",
+    r"(^|/)activator\.bat$",
+    # ProGuard
+    r"proguard\.pro$",
+    r"proguard-rules\.pro$",
+    # PuPHPet
+    r"^puphpet/",
+    # Android Google APIs
+    r"(^|/)\.google_apis/",
+    # Jenkins Pipeline
+    r"^Jenkinsfile$",
+)
+
+# maximum number of directories whose result is cached by each matcher
+DEFAULT_MAX_CACHED_DIRS = 100000
+
+# the pattern ends with a literal extension, or with a group of them
+_EXTENSION_SUFFIX = re.compile(r"\\\.(?:(\w+)|\(((?:\w+\|)*\w+)\))\$$")
+
+# the pattern matches at the start of a path component
+_COMPONENT_PREFIXES = ("(^|/)", r"(^|\/)")
+
+
+class VendoredMatcher:
+    """Compiled matcher of the vendored paths
+
+    It's equivalent to searching every pattern in the path, see the
+    module documentation for how the patterns are combined. It's thread
+    safe.
+
+    """
+    def __init__(self, patterns: Iterable[str] = VENDOR_PATTERNS,
+                 max_cached_dirs: int = DEFAULT_MAX_CACHED_DIRS):
+        """Compiles the matcher
+
+        :param patterns: the regular expressions of the vendored paths.
+        :param max_cached_dirs: maximum number of cached directories, the
+            cache is cleared when full.
+        :raises re.error: if a pattern is invalid.
+
+        """
+        dir_patterns = []
+        any_extension = []
+        by_extension = {}  # type: Dict[str, List[str]]
+        for pattern in patterns:
+            re.compile(pattern)  # fails on the culprit pattern
+            if _at_top_level(pattern, "|"):
+                any_extension.append(pattern)
+                continue
+
+            if pattern.endswith("/") and "$" not in pattern and \
+                    "(?" not in pattern:
+                dir_patterns.append(pattern)
+                continue
+
+            match = _EXTENSION_SUFFIX.search(pattern)
+            if match is None:
+                any_extension.append(pattern)
+                continue
+
+            for extension in (match.group(1) or match.group(2)).split("|"):
+                by_extension.setdefault(extension, []).append(pattern)
+
+        self._dirs = _PatternGroup(dir_patterns)
+        self._any_extension = _PatternGroup(any_extension)
+        self._by_extension = {
+            extension: _PatternGroup(extension_patterns + any_extension)
+            for extension, extension_patterns in by_extension.items()}
+        self._max_cached_dirs = max_cached_dirs
+        self._cached_dirs = {}  # type: Dict[str, bool]
+        self._lock = threading.Lock()
+
+    def __call__(self, path: str) -> bool:
+        """Returns whether the path is vendored"""
+        return self.is_vendored(path)
+
+    def is_vendored(self, path: str) -> bool:
+        """Returns whether the path is vendored"""
+        directory, _, name = path.rpartition("/")
+        if directory and self.is_vendored_dir(directory):
+            return True
+
+        _, dot, extension = name.rpartition(".")
+        group = self._by_extension.get(extension, self._any_extension) \
+            if dot else self._any_extension
+        return group.search(path)
+
+    def is_vendored_dir(self, directory: str) -> bool:
+        """Returns whether all the files of a directory are vendored
+
+        :param directory: the path of the directory, without trailing "/".
+
+        """
+        vendored = self._cached_dirs.get(directory)
+        if vendored is None:
+            vendored = self._dirs.search(directory + "/")
+            with self._lock:
+                if len(self._cached_dirs) >= self._max_cached_dirs:
+                    self._cached_dirs.clear()
+                self._cached_dirs[directory] = vendored
+
+        return vendored
+
+
+class _PatternGroup:
+    """Patterns searched together
+
+    A regex made of many alternatives loses the literal prefix scan of
+    `re`, and tries every alternative at every position of the path. The
+    patterns are instead split by how they are anchored:
+
+        - the literal ones are looked up by the name of the file, "(^|/)x$",
+          by the whole path, "^x$", by its suffix, "x$", or as substrings,
+        - the patterns anchored to the start of the path, "^x", are only
+          matched at the start, and the ones anchored to a path component,
+          "(^|/)x", at the start and after each "/",
+        - the other ones are searched one at a time.
+
+    """
+    def __init__(self, patterns: List[str]):
+        self._names, self._paths = set(), set()
+        suffixes, self._substrings = [], []
+        start, component, self._floating = [], [], []
+        for pattern in patterns:
+            prefix = next((p for p in _COMPONENT_PREFIXES
+                           if pattern.startswith(p)), None)
+            if _at_top_level(pattern, "|"):
+                self._floating.append(re.compile(pattern))
+            elif prefix is not None:
+                rest = pattern[len(prefix):]
+                name = _literal(rest[:-1]) if rest.endswith("$") else None
+                if name is not None and "/" not in name:
+                    self._names.add(name)
+                else:
+                    component.append(rest)
+            elif pattern.startswith("^"):
+                rest = pattern[1:]
+                path = _literal(rest[:-1]) if rest.endswith("$") else None
+                if path is not None:
+                    self._paths.add(path)
+                else:
+                    start.append(rest)
+            elif pattern.endswith("$") and _literal(pattern[:-1]):
+                suffixes.append(_literal(pattern[:-1]))
+            elif _literal(pattern):
+                self._substrings.append(_literal(pattern))
+            else:
+                self._floating.append(re.compile(pattern))
+
+        self._suffixes = tuple(suffixes)
+        self._start = _combine(start + component)
+        self._component = _combine(component, prefix="/")
+
+    def search(self, path: str) -> bool:
+        if path.rpartition("/")[2] in self._names or path in self._paths or \
+                path.endswith(self._suffixes):
+            return True
+
+        for substring in self._substrings:
+            if substring in path:
+                return True
+
+        if self._start is not None and self._start.match(path):
+            return True
+
+        if self._component is not None and self._component.search(path):
+            return True
+
+        for regex in self._floating:
+            if regex.search(path):
+                return True
+
+        return False
+
+
+def _literal(pattern: str) -> Optional[str]:
+    """Returns the text matched by a pattern, None if not literal"""
+    chars = []
+    escaped = False
+    for c in pattern:
+        if escaped:
+            if c.isalnum():
+                return None
+            chars.append(c)
+            escaped = False
+        elif c == "\\":
+            escaped = True
+        elif c in ".^$*+?{}[]|()":
+            return None
+        else:
+            chars.append(c)
+
+    return "".join(chars) if not escaped else None
+
+
+def _at_top_level(pattern: str, char: str) -> bool:
+    depth = 0
+    escaped = in_class = False
+    for c in pattern:
+        if escaped:
+            escaped = False
+        elif c == "\\":
+            escaped = True
+        elif in_class:
+            in_class = c != "]"
+        elif c == "[":
+            in_class = True
+        elif c == "(":
+            depth += 1
+        elif c == ")":
+            depth -= 1
+        elif c == char and depth == 0:
+            return True
+
+    return False
+
+
+def _combine(patterns: List[str], prefix: str = "") -> Optional[Pattern]:
+    if not patterns:
+        return None
+
+    return re.compile(prefix + "(?:%s)" % "|".join(
+        "(?:%s)" % p for p in patterns))
+
+
+_default_matcher = None  # type: Optional[VendoredMatcher]
+
+
+def is_vendored(path: str) -> bool:
+    """Returns whether the path is vendored according to `VENDOR_PATTERNS`
+
+    The shared matcher is compiled on the first call.
+
+    """
+    global _default_matcher
+    if _default_matcher is None:
+        _default_matcher = VendoredMatcher()
+
+    return _default_matcher.is_vendored(path)
@@ -25,11 +25,21 @@ setup(
     author_email="applications@sourced.tech",
     url="https://github.com/src-d/lookout-sdk",
     download_url="https://github.com/src-d/lookout-sdk",
-    packages=find_packages(),
+    packages=find_packages(exclude=["benchmarks", "benchmarks.*"]),
     namespace_packages=["lookout"],
     keywords=["analyzer", "code-reivew"],
-    install_requires=["grpcio>=1.13.0,<2.0",
+    python_requires=">=3.6",
+    install_requires=["grpcio>=1.23.0,<2.0",
                       "protobuf>=3.5.0,<4.0", "bblfsh>=2.12.7,<3.0"],
+    extras_require={
+        "aio": ["grpcio>=1.32.0,<2.0"],
+        "columnar": ["numpy>=1.14"],
+    },
+    entry_points={
+        "console_scripts": [
+            "lookout-sdk-loadgen=lookout.sdk.loadgen:main",
+        ],
+    },
     package_data={"": ["../LICENSE.md", "../MAINTAINERS", README]},
     classifiers=[
             "Development Status :: 3 - Alpha",
@@ -37,10 +47,13 @@ setup(
             "Intended Audience :: Developers",
             "License :: OSI Approved :: Apache Software License",
             "Operating System :: POSIX",
-            "Programming Language :: Python :: 3.4",
-            "Programming Language :: Python :: 3.5",
+            "Programming Language :: Python :: 3 :: Only",
             "Programming Language :: Python :: 3.6",
             "Programming Language :: Python :: 3.7",
+            "Programming Language :: Python :: 3.8",
+            "Programming Language :: Python :: 3.9",
+            "Programming Language :: Python :: 3.10",
+            "Programming Language :: Python :: 3.11",
             "Topic :: Software Development :: Libraries"
     ],
 )
@@ -0,0 +1,126 @@
+import asyncio
+import unittest
+
+from lookout.sdk import pb
+from lookout.sdk.service_data import AsyncDataStub
+from lookout.sdk.service_data_chunks import file_chunks
+from lookout.sdk.test.mixins import LogFnTracker, find_free_port
+
+try:
+    from lookout.sdk.grpc.aio import create_aio_channel, \
+        create_aio_server, AsyncLogUnaryServerInterceptor, \
+        AsyncLogStreamServerInterceptor, AsyncLogUnaryClientInterceptor, \
+        AsyncLogStreamClientInterceptor
+except ImportError as e:
+    raise unittest.SkipTest(str(e))
+
+if not hasattr(unittest, "IsolatedAsyncioTestCase"):
+    raise unittest.SkipTest("IsolatedAsyncioTestCase requires Python 3.8")
+
+
+class DummyAsyncAnalyzer(pb.AsyncAnalyzerServicer):
+
+    async def notify_review_event(self, request, context):
+        await asyncio.sleep(0)
+        context.add_log_fields({"k": "v"})
+        return pb.EventResponse(comments=[pb.Comment(
+            text="review " + context.log_fields["k"])])
+
+    def notify_push_event(self, request, context):
+        return pb.EventResponse(comments=[pb.Comment(text="push")])
+
+
+class DummyAsyncDataServicer(pb.DataServicer):
+
+    async def GetChanges(self, request, context):
+        for i in range(3):
+            yield pb.Change(head=pb.File(path=str(i)))
+
+    async def GetFiles(self, request, context):
+        for i in range(2):
+            await context.write(pb.File(path=str(i)))
+
+    async def GetFileChunks(self, request, context):
+        f = pb.File(path=request.path, content=request.path.encode() * 1000)
+        for chunk in file_chunks(f, request.chunk_size):
+            yield chunk
+
+
+class TestAsyncServicers(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self._tracker = LogFnTracker()
+        self._target = "0.0.0.0:{}".format(find_free_port())
+        self._server = create_aio_server(interceptors=[
+            AsyncLogUnaryServerInterceptor(self._tracker.unary),
+            AsyncLogStreamServerInterceptor(self._tracker.stream),
+        ])
+        pb.add_analyzer_to_server(DummyAsyncAnalyzer(), self._server)
+        servicer = DummyAsyncDataServicer()
+        pb.add_dataservicer_to_server(servicer, self._server)
+        pb.add_datachunksservicer_to_server(servicer, self._server)
+        self._server.add_insecure_port(self._target)
+        await self._server.start()
+
+    async def asyncTearDown(self):
+        await self._server.stop(0)
+
+    async def test_analyzer(self):
+        async with create_aio_channel(self._target) as channel:
+            stub = pb.AnalyzerStub(channel)
+            review = await stub.NotifyReviewEvent(pb.ReviewEvent())
+            push = await stub.NotifyPushEvent(pb.PushEvent())
+
+        self.assertEqual([c.text for c in review.comments], ["review v"])
+        self.assertEqual([c.text for c in push.comments], ["push"])
+        self.assertEqual(self._tracker.counter, {"unary": 4, "stream": 0})
+        self.assertEqual(self._tracker.logs[0][1],
+                         "gRPC unary server call started")
+        self.assertEqual(self._tracker.logs[1][0]["grpc.code"], "OK")
+
+    async def test_data_stub(self):
+        client_tracker = LogFnTracker()
+        async with create_aio_channel(self._target, interceptors=[
+                AsyncLogUnaryClientInterceptor(client_tracker.unary),
+                AsyncLogStreamClientInterceptor(client_tracker.stream),
+        ]) as channel:
+            stub = AsyncDataStub(channel)
+            changes = [c.head.path async for c in stub.get_changes(
+                None, pb.ChangesRequest())]
+            files = [f.path async for f in stub.get_files(
+                None, pb.FilesRequest())]
+
+        self.assertEqual(changes, ["0", "1", "2"])
+        self.assertEqual(files, ["0", "1"])
+        self.assertEqual(self._tracker.counter, {"unary": 0, "stream": 4})
+        self.assertEqual(client_tracker.counter, {"unary": 0, "stream": 4})
+        self.assertEqual([fields["grpc.messages"] for fields, msg
+                          in client_tracker.logs if "finished" in msg],
+                         [3, 2])
+        self.assertEqual([fields["grpc.messages"] for fields, msg
+                          in self._tracker.logs if "finished" in msg],
+                         [3, 2])
+        self.assertEqual(client_tracker.logs[0][0]["grpc.method"],
+                         "GetChanges")
+        self.assertEqual(client_tracker.logs[0][0]["span.kind"], "client")
+
+    async def test_chunks(self):
+        async with create_aio_channel(self._target) as channel:
+            stub = AsyncDataStub(channel)
+            request = pb.FileChunksRequest(path="a", chunk_size=100)
+            with await stub.get_file_chunks(None, request,
+                                            max_memory_bytes=500) as f:
+                self.assertEqual(f.file.path, "a")
+                self.assertEqual(bytes(f.content), b"a" * 1000)
+
+            files = [f async for f in stub.get_chunked_files(
+                None, pb.FilesRequest(want_contents=True), chunk_size=100)]
+            changes = [c async for c in stub.get_chunked_changes(
+                None, pb.ChangesRequest(want_contents=True))]
+
+        self.assertEqual([bytes(f.content) for f in files],
+                         [b"0" * 1000, b"1" * 1000])
+        self.assertEqual([(base, bytes(head.content)) for base, head in changes],
+                         [(None, str(i).encode() * 1000) for i in range(3)])
+        for f in files + [head for _, head in changes]:
+            f.close()
@@ -0,0 +1,128 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from lookout.sdk.uast_query import QuerySet
+
+from benchmarks import bench_compression, bench_grpc, bench_uast_diff, \
+    bench_uast_query, bench_vendored, harness
+from benchmarks.synthetic import count_nodes, make_changes
+
+
+class TestHarness(unittest.TestCase):
+
+    def test_percentile(self):
+        values = [float(i) for i in range(1, 101)]
+        self.assertEqual(harness.percentile(values, 50), 50)
+        self.assertEqual(harness.percentile(values, 99), 99)
+        self.assertEqual(harness.percentile(values, 100), 100)
+        self.assertEqual(harness.percentile([], 50), 0)
+        # odd sizes, where rounding half to even would pick a lower rank
+        self.assertEqual(harness.percentile([1, 2, 3, 4, 5], 50), 3)
+        self.assertEqual(harness.percentile([1, 2, 3, 4, 5], 90), 5)
+
+    def test_run_benchmark(self):
+        calls = []
+        result = harness.run_benchmark("noop", lambda: calls.append(1), 10,
+                                       warmup=2, concurrency=2,
+                                       units={"messages": 3})
+        self.assertEqual(len(calls), 12)
+        self.assertEqual(result["iterations"], 10)
+        self.assertLessEqual(result["p50_ms"], result["p99_ms"])
+        self.assertIn("messages_per_second", result)
+
+    def test_compare(self):
+        baseline = {"results": [{"name": "a", "p50_ms": 10},
+                                {"name": "b", "p50_ms": 10}]}
+        current = {"results": [{"name": "a", "p50_ms": 11},
+                               {"name": "b", "p50_ms": 13},
+                               {"name": "c", "p50_ms": 100}]}
+        regressions = harness.compare(baseline, current, 0.2)
+        self.assertEqual(len(regressions), 1)
+        self.assertTrue(regressions[0].startswith("b: "))
+
+
+class TestSynthetic(unittest.TestCase):
+
+    def test_make_changes(self):
+        changes = make_changes(3, 25, 100)
+        self.assertEqual(len(changes), 3)
+        self.assertEqual(len(changes[0].head.content), 100)
+        self.assertEqual(count_nodes(changes[0].head.uast), 25)
+
+
+def run_main(benchmark, argv):
+    """Runs the main of a benchmark, and returns its exit code and report"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        output = os.path.join(tmpdir, "report.json")
+        code = benchmark.main(argv + ["--output", output])
+        with open(output) as f:
+            return code, json.load(f)
+
+
+class TestBenchmarks(unittest.TestCase):
+    """Smoke tests of the main of every benchmark"""
+
+    def test_compression(self):
+        code, report = run_main(bench_compression, [
+            "--changes", "2", "--uast-nodes", "10", "--iterations", "2",
+            "--warmup", "0", "--only", "gzip"])
+        self.assertEqual(code, 0)
+        self.assertEqual([r["name"] for r in report["results"]],
+                         ["gzip", "gzip_min_4k", "gzip_min_64k"])
+        self.assertGreater(report["results"][0]["compression_ratio"], 1)
+
+    def test_grpc(self):
+        code, report = run_main(bench_grpc, [
+            "--changes", "2", "--uast-nodes", "10", "--content-bytes", "10",
+            "--max-workers", "2", "--iterations", "1", "--warmup", "0"])
+        self.assertEqual(code, 0)
+        names = [r["name"] for r in report["results"]]
+        self.assertEqual(names[:3],
+                         ["raw_grpc", "data_stub", "data_stub_prefetch"])
+        self.assertIn("server_interceptor_log_sink", names)
+        self.assertEqual(names[-1], "analyzer_review")
+
+    def test_vendored(self):
+        code, report = run_main(bench_vendored, [
+            "--paths", "2000", "--sample-paths", "200", "--iterations", "1"])
+        self.assertEqual(code, 0)
+        self.assertEqual([r["name"] for r in report["results"]],
+                         ["naive", "combined", "matcher", "matcher_warm"])
+        self.assertEqual(report["results"][2]["paths"], 2000)
+
+    def test_uast_query(self):
+        code, report = run_main(bench_uast_query, [
+            "--uast-nodes", "50", "--iterations", "1", "--warmup", "0"])
+        self.assertEqual(code, 0)
+        names = ["pass_per_query", "single_pass"]
+        if bench_uast_query.bblfsh_filter is not None:
+            names.insert(0, "bblfsh_filter")
+        self.assertEqual([r["name"] for r in report["results"]], names)
+        self.assertEqual(report["params"]["libuast"],
+                         bench_uast_query.bblfsh_filter is not None)
+
+    def test_uast_query_bblfsh_filter(self):
+        def fake_filter(uast, query):
+            return iter(QuerySet([query]).filter(uast)[query])
+
+        argv = ["--uast-nodes", "50", "--iterations", "1", "--warmup", "0"]
+        with mock.patch.object(bench_uast_query, "bblfsh_filter", fake_filter):
+            code, report = run_main(bench_uast_query, argv)
+        self.assertEqual(code, 0)
+        self.assertEqual([r["name"] for r in report["results"]],
+                         ["bblfsh_filter", "pass_per_query", "single_pass"])
+
+        with mock.patch.object(bench_uast_query, "bblfsh_filter",
+                               lambda uast, query: iter([uast])):
+            self.assertEqual(bench_uast_query.main(argv), 1)
+
+    def test_uast_diff(self):
+        code, report = run_main(bench_uast_diff, [
+            "--uast-nodes", "50", "--modified", "2", "--iterations", "1",
+            "--warmup", "0"])
+        self.assertEqual(code, 0)
+        self.assertEqual([r["name"] for r in report["results"]], ["hash", "diff"])
+        self.assertLess(report["params"]["changed"], 50)
@@ -0,0 +1,106 @@
+import time
+import unittest
+
+import grpc
+
+from lookout.sdk import pb
+from lookout.sdk.grpc import create_channel, create_server, ChannelPool
+from lookout.sdk.grpc.compression import CompressionOptions, \
+    to_compression_options
+from lookout.sdk.service_data import DataStub
+
+from benchmarks.bench_compression import TrafficProxy
+
+
+class DummyDataServicer(pb.DataServicer):
+
+    def GetChanges(self, request, context):
+        for i in range(3):
+            yield pb.Change(head=pb.File(path=str(i), content=b"x" * 10000))
+
+    def GetFiles(self, request, context):
+        for i in range(3):
+            yield pb.File(path=str(i), content=b"x" * 10000)
+
+
+class TestCompressionOptions(unittest.TestCase):
+
+    def test_metadata(self):
+        options = CompressionOptions(grpc.Compression.Deflate, 1024)
+        key, value = options.to_metadata()
+        self.assertEqual(value, "deflate;min_bytes=1024")
+        self.assertEqual(CompressionOptions.from_metadata(value), options)
+        self.assertEqual(CompressionOptions.from_metadata("gzip"),
+                         CompressionOptions(grpc.Compression.Gzip))
+        self.assertIsNone(CompressionOptions.from_metadata("zstd"))
+
+    def test_to_compression_options(self):
+        self.assertIsNone(to_compression_options(None))
+        self.assertEqual(to_compression_options(grpc.Compression.Gzip),
+                         CompressionOptions(grpc.Compression.Gzip))
+        self.assertEqual(to_compression_options("identity"),
+                         CompressionOptions(grpc.Compression.NoCompression))
+        options = CompressionOptions(min_bytes=10)
+        self.assertIs(to_compression_options(options), options)
+        with self.assertRaises(ValueError):
+            to_compression_options("zstd")
+
+
+class TestCompression(unittest.TestCase):
+
+    def start(self, compression):
+        server = create_server(4, compression=compression)
+        pb.add_dataservicer_to_server(DummyDataServicer(), server)
+        target = "127.0.0.1:%d" % server.add_insecure_port("127.0.0.1:0")
+        server.start()
+        self.addCleanup(server.stop, 0)
+        proxy = TrafficProxy(target)
+        self.addCleanup(proxy.close)
+        return proxy
+
+    def received(self, proxy, fn):
+        channel = create_channel(proxy.address)
+        fn(DataStub(channel))  # connects the channel
+        before = proxy.received
+        self.assertEqual(len(list(fn(DataStub(channel)))), 3)
+        time.sleep(0.05)
+        channel.close()
+        return proxy.received - before
+
+    def test_per_call(self):
+        proxy = self.start(grpc.Compression.NoCompression)
+
+        def get_changes(compression):
+            return lambda stub: list(stub.get_changes(
+                None, pb.ChangesRequest(), compression=compression))
+
+        plain = self.received(proxy, get_changes(None))
+        self.assertGreater(plain, 30000)
+        self.assertLess(self.received(proxy, get_changes("gzip")), 3000)
+        self.assertGreater(self.received(proxy, get_changes(
+            CompressionOptions(min_bytes=20000))), 30000)
+        self.assertLess(self.received(proxy, lambda stub: list(
+            stub.get_files(None, pb.FilesRequest(),
+                           compression=grpc.Compression.Deflate))), 3000)
+
+    def test_server_default(self):
+        proxy = self.start(CompressionOptions(min_bytes=5000))
+        self.assertLess(self.received(proxy, lambda stub: list(
+            stub.get_changes(None, pb.ChangesRequest()))), 3000)
+        # the call overrides the compression of the server
+        self.assertGreater(self.received(proxy, lambda stub: list(
+            stub.get_changes(None, pb.ChangesRequest(),
+                             compression="identity"))), 30000)
+
+    def test_channel(self):
+        proxy = self.start(grpc.Compression.NoCompression)
+        with create_channel(proxy.address, compression="gzip") as channel:
+            self.assertEqual(len(list(DataStub(channel).get_changes(
+                None, pb.ChangesRequest()))), 3)
+
+        with ChannelPool(proxy.address, compression="gzip") as pool:
+            before = proxy.received
+            self.assertEqual(len(list(DataStub(pool).get_files(
+                None, pb.FilesRequest()))), 3)
+            time.sleep(0.05)
+            self.assertLess(proxy.received - before, 3000)
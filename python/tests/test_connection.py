@@ -1,11 +1,15 @@
 import unittest
 from unittest import mock
 
+import grpc
+
 from lookout.sdk.grpc import \
     LogUnaryServerInterceptor, LogStreamServerInterceptor, \
     LogUnaryClientInterceptor, LogStreamClientInterceptor
 from lookout.sdk.grpc.interceptors import base
-from lookout.sdk.grpc import create_channel, create_server
+from lookout.sdk.grpc import create_channel, create_server, ChannelPool, \
+    get_channel_pool
+from lookout.sdk.grpc import connection
 from lookout.sdk.grpc.connection import grpc_max_msg_size
 from tests.spy import spy_func
 
@@ -102,3 +106,85 @@ class TestServerCreation(unittest.TestCase):
             for actual, expected_wrapped in zip(actual_interceptors, [i1, i2]):
                 self.assertIsInstance(actual, base.ServerInterceptorWrapper)
                 self.assertEqual(actual._wrapped, expected_wrapped)
+
+
+class TestChannelPool(unittest.TestCase):
+
+    target = "localhost:10301"
+
+    def test_acquire_shares_channel(self):
+        with ChannelPool(self.target, max_concurrent_streams=2) as pool:
+            c1 = pool.acquire()
+            c2 = pool.acquire()
+            self.assertIs(c1, c2)
+            self.assertEqual(len(pool), 1)
+
+    def test_acquire_over_capacity(self):
+        with ChannelPool(self.target, max_concurrent_streams=1) as pool:
+            c1 = pool.acquire()
+            c2 = pool.acquire()
+            self.assertIsNot(c1, c2)
+            self.assertEqual(len(pool), 2)
+
+            pool.release(c2)
+            self.assertIs(pool.acquire(), c2)
+
+    def test_channel_context_manager(self):
+        with ChannelPool(self.target, max_concurrent_streams=1) as pool:
+            with pool.channel() as c1:
+                pass
+            with pool.channel() as c2:
+                self.assertIs(c1, c2)
+
+    def test_unhealthy_channel_replaced(self):
+        with ChannelPool(self.target) as pool:
+            c1 = pool.acquire()
+            self.assertIs(pool.acquire(), c1)
+            pool.release(c1, grpc.StatusCode.NOT_FOUND)
+            self.assertIs(pool.acquire(), c1)
+            pool.release(c1, grpc.StatusCode.UNAVAILABLE)
+
+            # the broken channel is still in use, so it is kept open
+            c2 = pool.acquire()
+            self.assertIsNot(c1, c2)
+            self.assertEqual(len(pool), 2)
+
+            pool.release(c1)
+            self.assertEqual(len(pool), 1)
+            self.assertIs(pool.acquire(), c2)
+
+    def test_channel_context_manager_failure(self):
+        error = grpc.RpcError()
+        error.code = lambda: grpc.StatusCode.UNAVAILABLE
+        with ChannelPool(self.target) as pool:
+            with self.assertRaises(grpc.RpcError):
+                with pool.channel() as c1:
+                    raise error
+
+            self.assertEqual(len(pool), 0)
+            with pool.channel() as c2:
+                self.assertIsNot(c1, c2)
+
+    def test_closed_pool(self):
+        pool = ChannelPool(self.target)
+        channel = pool.acquire()
+        pool.close()
+        self.assertEqual(len(pool), 1)
+        pool.release(channel)
+        self.assertEqual(len(pool), 0)
+
+        with self.assertRaises(ValueError):
+            pool.acquire()
+
+    def test_get_channel_pool(self):
+        i1 = LogUnaryClientInterceptor(lambda: None)
+
+        p1 = get_channel_pool(self.target, interceptors=[i1])
+        p2 = get_channel_pool(self.target, interceptors=[i1])
+        p3 = get_channel_pool(self.target)
+        self.assertIs(p1, p2)
+        self.assertIsNot(p1, p3)
+
+        p1.close()
+        self.assertNotIn(p1, connection._channel_pools.values())
+        self.assertIsNot(get_channel_pool(self.target, interceptors=[i1]), p1)
@@ -0,0 +1,66 @@
+import re
+import unittest
+
+from lookout.sdk import pb
+from lookout.sdk.data_filter import RequestFilter, request_filter
+from lookout.sdk.service_data import DataServicer
+
+
+class TestRequestFilter(unittest.TestCase):
+
+    def test_match_all(self):
+        f = RequestFilter()
+        self.assertTrue(f.match_all)
+        self.assertFalse(f.needs_language)
+        self.assertTrue(f.matches("any/path.go", ""))
+
+    def test_paths(self):
+        f = RequestFilter(include_pattern=r"\.py$", exclude_pattern="^test/",
+                          exclude_vendored=True,
+                          is_vendored=lambda path: "vendor/" in path)
+        self.assertFalse(f.match_all)
+        self.assertTrue(f.match_path("lib/a.py"))
+        self.assertFalse(f.match_path("lib/a.go"))
+        self.assertFalse(f.match_path("test/a.py"))
+        self.assertFalse(f.match_path("vendor/a.py"))
+        self.assertTrue(RequestFilter(exclude_vendored=True).match_all)
+        self.assertFalse(RequestFilter(
+            exclude_pattern="x").match_path("a/x"))
+
+    def test_languages(self):
+        f = RequestFilter(include_languages=["Python", "go"])
+        self.assertTrue(f.needs_language)
+        self.assertTrue(f.match_path("anything"))
+        self.assertTrue(f.match_language("python"))
+        self.assertTrue(f.match_language("Go"))
+        self.assertFalse(f.match_language(""))
+        self.assertFalse(f.matches("a.py", "Java"))
+
+    def test_invalid(self):
+        with self.assertRaises(re.error):
+            RequestFilter(include_pattern="(")
+
+    def test_cache(self):
+        request = pb.FilesRequest(include_pattern="a", include_languages=["go"])
+        f = request_filter(request)
+        self.assertIs(request_filter(pb.ChangesRequest(
+            include_pattern="a", include_languages=["go"])), f)
+        self.assertIsNot(request_filter(pb.FilesRequest(include_pattern="b")), f)
+        self.assertIsNot(request_filter(request, is_vendored=len), f)
+
+
+class TestDataServicerFilter(unittest.TestCase):
+
+    def test_exclude_vendored(self):
+        servicer = DataServicer()
+        f = servicer.request_filter(pb.FilesRequest(exclude_vendored=True), None)
+        self.assertFalse(f.match_path("vendor/a.go"))
+        self.assertTrue(f.match_path("a.go"))
+
+        servicer.vendored_matcher = None
+        f = servicer.request_filter(pb.FilesRequest(exclude_vendored=True), None)
+        self.assertTrue(f.match_all)
+
+
+if __name__ == "__main__":
+    unittest.main()
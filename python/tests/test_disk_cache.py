@@ -0,0 +1,117 @@
+import importlib
+import os
+import tempfile
+import unittest
+
+from lookout.sdk import pb
+from lookout.sdk.disk_cache import DiskFileCache, driver_versions
+from lookout.sdk.service_data import FileCache
+
+# "in" is a keyword, the module can't be imported with an import statement
+DriverManifest = importlib.import_module(
+    "bblfsh.gopkg.in.bblfsh.sdk.v1.protocol.generated_pb2").DriverManifest
+
+VERSIONS = {"go": "v1"}
+
+
+class BblfshClient:
+
+    def supported_languages(self):
+        return [DriverManifest(name="Go", language="go", version="v2.1.0"),
+                DriverManifest(name="C#", language="CSharp", version="v1.0.0")]
+
+
+class TestDiskFileCache(unittest.TestCase):
+
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.path = self._dir.name
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def test_survives_restart(self):
+        f = pb.File(path="a.go", hash="h1", language="Go", content=b"package a")
+        cache = DiskFileCache(self.path, 1024, VERSIONS)
+        key = cache.key(f, False, True)
+        self.assertIsNone(cache.get(key))
+        cache.put(key, f)
+
+        cache = DiskFileCache(self.path, 1024, VERSIONS)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.size, f.ByteSize())
+        self.assertEqual(cache.get(key), f)
+        self.assertEqual((cache.hits, cache.misses), (1, 0))
+
+    def test_driver_version_in_key(self):
+        f = pb.File(hash="h1", language="Go")
+        v1 = DiskFileCache(self.path, 1024, driver_versions={"go": "v1"})
+        v2 = DiskFileCache(self.path, 1024, driver_versions={"go": "v2"})
+        self.assertNotEqual(v1.key(f, True, False), v2.key(f, True, False))
+        self.assertEqual(v1.key(f, False, True), v2.key(f, False, True))
+
+        # the other languages are keyed by every version
+        f = pb.File(hash="h1", language="Python")
+        self.assertNotEqual(v1.key(f, True, False), v2.key(f, True, False))
+        py = DiskFileCache(self.path, 1024,
+                           driver_versions={"go": "v1", "python": "v3"})
+        self.assertEqual(py.key(f, True, False)[-1], "v3")
+        self.assertNotEqual(py.key(f, True, False), v1.key(f, True, False))
+
+    def test_driver_versions(self):
+        self.assertEqual(driver_versions(BblfshClient()),
+                         {"go": "v2.1.0", "csharp": "v1.0.0"})
+
+    def test_eviction(self):
+        files = [pb.File(hash=str(i), content=b"x" * 10) for i in range(3)]
+        size = files[0].ByteSize()
+        cache = DiskFileCache(self.path, 2 * size, VERSIONS)
+        keys = [cache.key(f, False, True) for f in files]
+
+        cache.put(keys[0], files[0])
+        cache.put(keys[1], files[1])
+        self.assertIsNotNone(cache.get(keys[0]))
+        cache.put(keys[2], files[2])
+
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get(keys[1]))
+        self.assertEqual(cache.get(keys[0]), files[0])
+
+        # a smaller budget on restart evicts the exceeding files
+        cache = DiskFileCache(self.path, size, VERSIONS)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.size, size)
+
+    def test_corrupted_and_partial_entries(self):
+        f = pb.File(hash="h", content=b"abc")
+        cache = DiskFileCache(self.path, 1024, VERSIONS)
+        key = cache.key(f, False, True)
+        cache.put(key, f)
+
+        entry = os.path.join(self.path, cache._entry_name(key))
+        with open(entry, "wb") as fp:
+            fp.write(b"\xff\xff\xff")
+        tmp = os.path.join(self.path, "00", "partial.tmp")
+        os.makedirs(os.path.dirname(tmp), exist_ok=True)
+        with open(tmp, "wb") as fp:
+            fp.write(b"\x00")
+        os.utime(tmp, (0, 0))
+
+        cache = DiskFileCache(self.path, 1024, VERSIONS)
+        self.assertFalse(os.path.exists(tmp))
+        self.assertIsNone(cache.get(key))
+        self.assertEqual(len(cache), 0)
+
+    def test_memory_cache(self):
+        f = pb.File(hash="h", content=b"abc")
+        memory = FileCache(max_bytes=1024)
+        cache = DiskFileCache(self.path, 1024, VERSIONS, memory_cache=memory)
+        key = cache.key(f, False, True)
+        cache.put(key, f)
+
+        self.assertIs(cache.get(key), f)
+        self.assertEqual(memory.hits, 1)
+
+        memory.clear()
+        self.assertEqual(cache.get(key), f)
+        self.assertEqual(len(memory), 1)
@@ -0,0 +1,33 @@
+import hashlib
+import unittest
+
+from lookout.sdk import pb
+from lookout.sdk.event import compute_event_id, event_id
+
+
+class TestEventID(unittest.TestCase):
+
+    def test_compute_event_id(self):
+        self.assertEqual(compute_event_id("a", "b"),
+                         hashlib.sha1(b"a|b").hexdigest())
+
+    def test_review_event(self):
+        event = pb.ReviewEvent(provider="github", internal_id="42")
+        event.commit_revision.head.hash = "h"
+        event.commit_revision.base.hash = "b"
+        self.assertEqual(event_id(event),
+                         compute_event_id("github", "42", "h"))
+
+        # the base is not part of the id
+        event.commit_revision.base.hash = "other"
+        self.assertEqual(event_id(event),
+                         compute_event_id("github", "42", "h"))
+
+    def test_push_event(self):
+        event = pb.PushEvent(provider="github", internal_id="42")
+        event.commit_revision.head.hash = "h"
+        self.assertEqual(event_id(event), compute_event_id("github", "42"))
+
+    def test_unsupported(self):
+        with self.assertRaises(TypeError):
+            event_id(pb.Comment())
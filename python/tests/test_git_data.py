@@ -0,0 +1,194 @@
+import os
+import subprocess
+import tempfile
+import unittest
+
+import grpc
+
+from lookout.sdk import pb
+from lookout.sdk.git_data import GitDataServicer, GitRepository, \
+    UnknownRevisionError, guess_language
+from lookout.sdk.grpc import create_channel, create_server
+from lookout.sdk.service_data import DataStub
+from lookout.sdk.test import mixins
+
+
+def git(path, *args):
+    return subprocess.run(
+        ["git", "-C", path, "-c", "user.name=test",
+         "-c", "user.email=test@example.com"] + list(args),
+        stdout=subprocess.PIPE, check=True).stdout.decode().strip()
+
+
+def commit(path, files, message):
+    for name, content in files.items():
+        filepath = os.path.join(path, name)
+        if content is None:
+            os.unlink(filepath)
+            continue
+
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        with open(filepath, "wb") as f:
+            f.write(content)
+
+    git(path, "add", "-A")
+    git(path, "commit", "-q", "-m", message)
+    return git(path, "rev-parse", "HEAD")
+
+
+class GitRepoMixin:
+
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.path = self._dir.name
+        git(self.path, "init", "-q")
+        self.base = commit(self.path, {
+            "main.go": b"package main\n",
+            "lib/util.py": b"x = 1\n",
+            "README.md": b"# readme\n",
+        }, "base")
+        self.head = commit(self.path, {
+            "lib/util.py": b"x = 2\n",
+            "README.md": None,
+            "lib/new.py": b"y = 1\n",
+        }, "head")
+        self.repo = GitRepository(self.path)
+        super().setUp()
+
+    def tearDown(self):
+        super().tearDown()
+        self.repo.close()
+        self._dir.cleanup()
+
+
+class TestGitRepository(GitRepoMixin, unittest.TestCase):
+
+    def test_resolve(self):
+        self.assertEqual(self.repo.resolve(pb.ReferencePointer(
+            reference_name="HEAD")), self.head)
+        self.assertEqual(self.repo.resolve(pb.ReferencePointer(
+            hash=self.base)), self.base)
+        with self.assertRaises(UnknownRevisionError):
+            self.repo.resolve(pb.ReferencePointer(reference_name="nope"))
+        with self.assertRaises(UnknownRevisionError):
+            self.repo.resolve(pb.ReferencePointer(hash="1" * 40))
+        with self.assertRaises(ValueError):
+            self.repo.resolve(pb.ReferencePointer())
+        with self.assertRaises(ValueError):
+            self.repo.resolve(pb.ReferencePointer(reference_name="--all"))
+
+        missing = GitRepository(os.path.join(self.path, "missing"))
+        with self.assertRaises(RuntimeError):
+            missing.resolve(pb.ReferencePointer(reference_name="HEAD"))
+
+    def test_tree_and_diff(self):
+        tree = self.repo.tree(self.head)
+        self.assertEqual([e.path for e in tree],
+                         ["lib/new.py", "lib/util.py", "main.go"])
+        self.assertEqual(tree[0].mode, 0o100644)
+        self.assertIs(self.repo.tree(self.head), tree)
+
+        diff = self.repo.diff(self.base, self.head)
+        self.assertEqual(
+            [(b and b.path, h and h.path) for b, h in diff],
+            [("README.md", None), (None, "lib/new.py"),
+             ("lib/util.py", "lib/util.py")])
+
+    def test_entry(self):
+        entry = self.repo.entry(self.head, "lib/util.py")
+        self.assertIn(entry, self.repo.tree(self.head))
+        self.assertIsNone(self.repo.entry(self.head, "README.md"))
+        self.assertIsNone(self.repo.entry(self.head, "lib"))
+        self.assertEqual(self.repo.entry(self.base, "README.md").path,
+                         "README.md")
+
+    def test_blob(self):
+        entry = self.repo.tree(self.base)[-1]
+        self.assertEqual(entry.path, "main.go")
+        self.assertEqual(self.repo.blob(entry.hash), b"package main\n")
+        self.assertEqual(self.repo.blob(entry.hash), b"package main\n")
+        with self.assertRaises(ValueError):
+            self.repo.blob("0" * 40)
+
+    def test_guess_language(self):
+        self.assertEqual(guess_language("a/b.py"), "Python")
+        self.assertEqual(guess_language("Dockerfile"), "Dockerfile")
+        self.assertEqual(guess_language("a.unknown"), "")
+
+
+class TestGitDataServicer(GitRepoMixin, mixins.TestWithRunningServicerMixin,
+                          unittest.TestCase):
+
+    def build_server(self):
+        server = create_server(10)
+        pb.add_dataservicer_to_server(GitDataServicer(self.repo), server)
+
+        return server
+
+    def test_get_changes(self):
+        with create_channel(self._target) as channel:
+            changes = list(DataStub(channel).get_changes(
+                None, pb.ChangesRequest(
+                    base=pb.ReferencePointer(hash=self.base),
+                    head=pb.ReferencePointer(hash=self.head),
+                    want_contents=True, want_language=True,
+                    exclude_pattern="README")))
+
+        self.assertEqual(len(changes), 2)
+        added, modified = changes
+        self.assertFalse(added.HasField("base"))
+        self.assertEqual(added.head.path, "lib/new.py")
+        self.assertEqual(added.head.language, "Python")
+        self.assertEqual(modified.base.content, b"x = 1\n")
+        self.assertEqual(modified.head.content, b"x = 2\n")
+
+    def test_get_changes_without_base(self):
+        with create_channel(self._target) as channel:
+            changes = list(DataStub(channel).get_changes(
+                None, pb.ChangesRequest(
+                    head=pb.ReferencePointer(reference_name="HEAD"),
+                    include_languages=["go"])))
+
+        self.assertEqual([c.head.path for c in changes], ["main.go"])
+        self.assertEqual(changes[0].head.content, b"")
+        self.assertEqual(changes[0].head.language, "")
+
+    def test_get_files(self):
+        with create_channel(self._target) as channel:
+            files = list(DataStub(channel).get_files(
+                None, pb.FilesRequest(
+                    revision=pb.ReferencePointer(hash=self.base),
+                    include_pattern=r"\.(go|md)$", want_contents=True)))
+
+        self.assertEqual([(f.path, f.content) for f in files], [
+            ("README.md", b"# readme\n"), ("main.go", b"package main\n")])
+
+    def test_invalid_pattern(self):
+        with create_channel(self._target) as channel:
+            with self.assertRaises(grpc.RpcError) as cm:
+                list(DataStub(channel).get_files(None, pb.FilesRequest(
+                    revision=pb.ReferencePointer(hash=self.base),
+                    include_pattern="(")))
+
+        self.assertEqual(cm.exception.code(),
+                         grpc.StatusCode.INVALID_ARGUMENT)
+
+    def test_invalid_revision(self):
+        unknown = pb.ReferencePointer(hash="1" * 40)
+        head = pb.ReferencePointer(hash=self.head)
+        requests = [
+            ("get_files", pb.FilesRequest(revision=unknown),
+             grpc.StatusCode.NOT_FOUND),
+            ("get_changes", pb.ChangesRequest(head=unknown),
+             grpc.StatusCode.NOT_FOUND),
+            ("get_changes", pb.ChangesRequest(
+                base=pb.ReferencePointer(reference_name="nope"), head=head),
+             grpc.StatusCode.NOT_FOUND),
+            ("get_files", pb.FilesRequest(), grpc.StatusCode.INVALID_ARGUMENT),
+        ]
+        with create_channel(self._target) as channel:
+            stub = DataStub(channel)
+            for method, request, code in requests:
+                with self.assertRaises(grpc.RpcError) as cm:
+                    list(getattr(stub, method)(None, request))
+                self.assertEqual(cm.exception.code(), code, method)
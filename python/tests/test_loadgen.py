@@ -0,0 +1,139 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+import grpc
+
+from lookout.sdk import pb
+from lookout.sdk.grpc import create_channel, create_server
+from lookout.sdk.loadgen import LoadGenerator, events_from_recording, \
+    load_templates, main, percentile
+from lookout.sdk.recording import StreamRecorder
+from lookout.sdk.test import mixins
+
+
+class Analyzer(pb.AnalyzerServicer):
+
+    def __init__(self):
+        self.ids = []
+        self.lock = threading.Lock()
+
+    def notify_review_event(self, request, context):
+        with self.lock:
+            self.ids.append(request.internal_id)
+        return pb.EventResponse(comments=[pb.Comment(text="a"),
+                                          pb.Comment(text="b")])
+
+    def notify_push_event(self, request, context):
+        context.abort(grpc.StatusCode.UNAVAILABLE, "down")
+
+
+class TestPercentile(unittest.TestCase):
+
+    def test_nearest_rank(self):
+        values = list(range(1, 1001))
+        self.assertEqual(percentile(values, 50), 500)
+        self.assertEqual(percentile(values, 99), 990)
+        self.assertEqual(percentile(values, 99.9), 999)
+        self.assertEqual(percentile(values, 100), 1000)
+        self.assertEqual(percentile(values, 0), 1)
+        # round() would pick the 3rd and the 2nd values
+        self.assertEqual(percentile([1, 2, 3, 4, 5], 61), 4)
+        self.assertEqual(percentile([1, 2, 3, 4], 62.5), 3)
+        self.assertEqual(percentile([1, 2, 3], 50), 2)
+        self.assertEqual(percentile([1, 2, 3, 4], 50), 2)
+        self.assertEqual(percentile([7], 99.9), 7)
+        self.assertEqual(percentile([], 50), 0.0)
+
+
+class TestLoadgen(mixins.TestWithRunningServicerMixin, unittest.TestCase):
+
+    def build_server(self):
+        server = create_server(10)
+        self.analyzer = Analyzer()
+        pb.add_analyzer_to_server(self.analyzer, server)
+
+        return server
+
+    def setUp(self):
+        super().setUp()
+        self._dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self._dir.cleanup()
+        super().tearDown()
+
+    def write(self, name, data):
+        path = os.path.join(self._dir.name, name)
+        with open(path, "w") as f:
+            f.write(data)
+
+        return path
+
+    def test_load_templates(self):
+        path = self.write("one.json", json.dumps(
+            {"review": {"provider": "github", "internalId": "1"}}))
+        events = load_templates(path)
+        self.assertEqual(events, [pb.ReviewEvent(provider="github",
+                                                 internal_id="1")])
+
+        path = self.write("lines.json", '{"review": {}}\n\n{"push": {}}\n')
+        self.assertEqual(load_templates(path),
+                         [pb.ReviewEvent(), pb.PushEvent()])
+
+        path = self.write("bad.json", '{"other": {}}')
+        with self.assertRaises(ValueError):
+            load_templates(path)
+
+    def test_events_from_recording(self):
+        path = os.path.join(self._dir.name, "data.rec")
+        head = pb.ReferencePointer(hash="1" * 40)
+        with StreamRecorder(path) as recorder:
+            recorder.start("/pb.Data/GetChanges",
+                           pb.ChangesRequest(head=head)).end(grpc.StatusCode.OK)
+            recorder.start("/pb.Data/GetFiles", pb.FilesRequest(revision=head))
+
+        review, push = events_from_recording(path)
+        self.assertEqual(review.commit_revision.head, head)
+        self.assertEqual(push.commit_revision.head, head)
+        self.assertIsInstance(push, pb.PushEvent)
+
+    def test_closed_loop(self):
+        with create_channel(self._target) as channel:
+            report = LoadGenerator(channel, [pb.ReviewEvent()],
+                                   concurrency=4).run(count=20)
+
+        summary = report.summary()
+        self.assertEqual(summary["events"], 20)
+        self.assertEqual(summary["errors"], 0)
+        self.assertEqual(summary["comments"], 40)
+        self.assertEqual(summary["comments_per_event"], 2)
+        self.assertLessEqual(summary["p50_ms"], summary["p99_ms"])
+        self.assertEqual(len(set(self.analyzer.ids)), 20)
+
+    def test_open_loop(self):
+        with create_channel(self._target) as channel:
+            report = LoadGenerator(channel, [pb.ReviewEvent(), pb.PushEvent()],
+                                   concurrency=2, rate=100, poisson=True,
+                                   unique_ids=False, seed=1
+                                   ).run(duration=0.2)
+
+        summary = report.summary()
+        self.assertGreater(summary["events"], 5)
+        self.assertEqual(summary["codes"]["UNAVAILABLE"], summary["errors"])
+        self.assertAlmostEqual(summary["error_rate"], 0.5, delta=0.1)
+        self.assertEqual(set(self.analyzer.ids), {""})
+
+    def test_main(self):
+        path = self.write("review.json", '{"review": {}}')
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            code = main(["ipv4://" + self._target, "--template", path,
+                         "--count", "5", "--json"])
+
+        self.assertEqual(code, 0)
+        self.assertEqual(json.loads(out.getvalue())["events"], 5)
@@ -40,6 +40,24 @@ class TestLogFieldsContext(unittest.TestCase):
 
         self.assertCountEqual(actual, expected)
 
+    def test_pack_metadata_cached(self):
+        lfc = LogFieldsContext(ContextMock(self.sample_metadata))
+        first = lfc.pack_metadata()
+        first.append(("extra", "x"))
+        second = lfc.pack_metadata()
+        self.assertNotIn(("extra", "x"), second)
+        self.assertIs(dict(first)[LOG_FIELDS_KEY_META],
+                      dict(second)[LOG_FIELDS_KEY_META])
+
+        lfc.add_log_fields({"k1": "other"})
+        self.assertIs(dict(lfc.pack_metadata())[LOG_FIELDS_KEY_META],
+                      dict(second)[LOG_FIELDS_KEY_META])
+
+        lfc.add_log_fields({"w": 3})
+        self.assertEqual(
+            json.loads(dict(lfc.pack_metadata())[LOG_FIELDS_KEY_META]),
+            {"k1": "v1", "k2": 2, "k3": True, "w": 3})
+
 
 class TestLogFields(unittest.TestCase):
 
@@ -88,3 +106,56 @@ class TestLogFields(unittest.TestCase):
         lf = LogFields(fields=fields)
         self.assertEqual(json.loads(lf.dumps()),
                          {"k1": "v1", "k2": 2, "k3": True})
+
+    def test_shared_parsing(self):
+        metadata = {LOG_FIELDS_KEY_META: '{"k1": "v1"}'}
+        lf1 = LogFields.from_metadata(metadata)
+        lf2 = LogFields.from_metadata(metadata)
+        self.assertIs(lf1._fields, lf2._fields)
+        self.assertEqual(lf1.dumps(), '{"k1": "v1"}')
+
+        lf1.add_fields({"k2": 2})
+        self.assertEqual(lf1.fields, {"k1": "v1", "k2": 2})
+        self.assertEqual(lf2.fields, {"k1": "v1"})
+        self.assertEqual(LogFields.from_metadata(metadata).fields,
+                         {"k1": "v1"})
+
+        lf2.fields["k3"] = 3
+        self.assertEqual(json.loads(lf2.dumps()), {"k1": "v1", "k3": 3})
+        self.assertEqual(LogFields.from_metadata(metadata).fields,
+                         {"k1": "v1"})
+
+    def test_shared_nested_values(self):
+        metadata = {LOG_FIELDS_KEY_META: '{"k1": {"n": [1, {"m": 2}]}}'}
+        lf1 = LogFields.from_metadata(metadata)
+        self.assertEqual(json.dumps(lf1.fields), metadata[LOG_FIELDS_KEY_META])
+
+        fields = lf1.to_dict()
+        fields["k1"]["n"][1]["m"] = 3
+        lf1.add_fields({"k2": 2})
+        self.assertEqual(json.loads(lf1.dumps()),
+                         {"k1": {"n": [1, {"m": 2}]}, "k2": 2})
+
+        lf1.fields["k1"]["n"][1]["m"] = 4
+        self.assertEqual(json.loads(lf1.dumps()),
+                         {"k1": {"n": [1, {"m": 4}]}, "k2": 2})
+        self.assertEqual(LogFields.from_metadata(metadata).to_dict(),
+                         {"k1": {"n": [1, {"m": 2}]}})
+
+    def test_read_keeps_serialization(self):
+        lfc = LogFieldsContext(ContextMock(
+            TestLogFieldsContext.sample_metadata))
+        packed = lfc.pack_metadata()
+        version = lfc._log_fields.version
+        self.assertEqual(lfc.log_fields["k1"], "v1")
+        self.assertEqual(lfc._log_fields.fields["k2"], 2)
+        self.assertEqual(lfc._log_fields.version, version)
+        self.assertIs(dict(lfc.pack_metadata())[LOG_FIELDS_KEY_META],
+                      dict(packed)[LOG_FIELDS_KEY_META])
+
+        # changes made through the returned dict are packed too
+        lfc.log_fields["k3"] = "v3"
+        self.assertGreater(lfc._log_fields.version, version)
+        self.assertEqual(
+            json.loads(dict(lfc.pack_metadata())[LOG_FIELDS_KEY_META])["k3"],
+            "v3")
@@ -0,0 +1,151 @@
+import io
+import json
+import threading
+import time
+import unittest
+
+from lookout.sdk import pb
+from lookout.sdk.grpc import BufferedLogSink, create_channel, create_server, \
+    LogUnaryServerInterceptor, LogStreamServerInterceptor
+from lookout.sdk.grpc.log_fields import LogFields
+from lookout.sdk.grpc.log_sink import format_timestamp
+from lookout.sdk.grpc.metrics import MetricsRegistry
+from lookout.sdk.test import mixins
+
+
+class SlowStream(io.StringIO):
+
+    def __init__(self, delay=0):
+        super().__init__()
+        self.delay = delay
+        self.release = threading.Event()
+        self.release.set()
+
+    def write(self, s):
+        self.release.wait()
+        time.sleep(self.delay)
+        return super().write(s)
+
+    def lines(self):
+        return [json.loads(line) for line in self.getvalue().splitlines()]
+
+
+class DummyAnalyzer(pb.AnalyzerServicer):
+
+    def notify_review_event(self, request, context):
+        return pb.EventResponse()
+
+
+class TestBufferedLogSink(unittest.TestCase):
+
+    def test_format(self):
+        stream = SlowStream()
+        with BufferedLogSink(stream) as sink:
+            sink(LogFields({"k": "v", "msg": "ignored"}), "message")
+
+        self.assertEqual(sink.written, 1)
+        record, = stream.lines()
+        self.assertEqual(record["msg"], "message")
+        self.assertEqual(record["level"], "info")
+        self.assertEqual(record["k"], "v")
+        self.assertRegex(record["time"],
+                         r"^\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d\.\d{6}Z$")
+        self.assertEqual(format_timestamp(1.5), "1970-01-01T00:00:01.500000Z")
+
+    def test_snapshot(self):
+        stream = SlowStream()
+        with BufferedLogSink(stream) as sink:
+            fields = LogFields({"k": 1})
+            sink(fields, "first")
+            fields.add_fields({"w": 2})
+            sink(fields, "second")
+
+        self.assertEqual([sorted(r) for r in stream.lines()], [
+            ["k", "level", "msg", "time"],
+            ["k", "level", "msg", "time", "w"],
+        ])
+
+    def test_drop(self):
+        stream = SlowStream()
+        stream.release.clear()
+        registry = MetricsRegistry()
+        sink = BufferedLogSink(stream, max_records=10, batch_size=5,
+                               registry=registry)
+        try:
+            start = time.monotonic()
+            for i in range(100):
+                sink(LogFields({"i": i}), "msg")
+            self.assertLess(time.monotonic() - start, 1)
+
+            stream.release.set()
+            self.assertTrue(sink.flush(5))
+        finally:
+            sink.close()
+
+        self.assertGreater(sink.dropped, 0)
+        self.assertEqual(sink.written + sink.dropped, 100)
+        self.assertEqual(registry.get(
+            "lookout_sdk_log_records_dropped_total").labels().value,
+            sink.dropped)
+
+    def test_block(self):
+        stream = SlowStream(delay=0.001)
+        with BufferedLogSink(stream, max_records=5, batch_size=2,
+                             policy=BufferedLogSink.BLOCK) as sink:
+            for i in range(50):
+                sink(LogFields({"i": i}), "msg")
+
+        self.assertEqual(sink.dropped, 0)
+        self.assertEqual([r["i"] for r in stream.lines()], list(range(50)))
+
+    def test_write_errors(self):
+        class BrokenStream:
+            def write(self, s):
+                raise OSError("broken")
+
+        with BufferedLogSink(BrokenStream()) as sink:
+            sink(LogFields(), "msg")
+            sink.flush(5)
+
+        self.assertEqual(sink.written, 0)
+        self.assertEqual(sink.errors, 1)
+
+    def test_closed(self):
+        stream = SlowStream()
+        sink = BufferedLogSink(stream)
+        sink.close()
+        sink(LogFields(), "msg")
+        self.assertEqual(len(sink), 0)
+        self.assertEqual(stream.getvalue(), "")
+
+    def test_invalid_policy(self):
+        with self.assertRaises(ValueError):
+            BufferedLogSink(policy="wait")
+
+
+class TestBufferedLogSinkInterceptors(mixins.TestWithRunningServicerMixin,
+                                      unittest.TestCase):
+
+    def build_server(self):
+        self._stream = SlowStream()
+        self._sink = BufferedLogSink(self._stream)
+        server = create_server(10, interceptors=[
+            LogUnaryServerInterceptor(self._sink),
+            LogStreamServerInterceptor(self._sink),
+        ])
+        pb.add_analyzer_to_server(DummyAnalyzer(), server)
+
+        return server
+
+    def test_interceptors(self):
+        with create_channel(self._target) as channel:
+            pb.AnalyzerStub(channel).NotifyReviewEvent(pb.ReviewEvent())
+
+        self._sink.close()
+        started, finished = self._stream.lines()
+        self.assertEqual(started["msg"], "gRPC unary server call started")
+        self.assertEqual(finished["msg"], "gRPC unary server call finished")
+        self.assertEqual(finished["grpc.method"], "NotifyReviewEvent")
+        self.assertEqual(finished["grpc.code"], "OK")
+        self.assertTrue(finished["duration"].endswith("ms"))
+        self.assertTrue(finished["grpc.start_time"].endswith("Z"))
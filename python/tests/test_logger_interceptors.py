@@ -1,17 +1,21 @@
 from concurrent.futures import ThreadPoolExecutor
 
+import random
+import time
 import unittest
+from unittest import mock
 
 import grpc
 
 from lookout.sdk import pb
 from lookout.sdk.service_data import DataStub
-from lookout.sdk.grpc import create_channel, create_server, \
+from lookout.sdk.grpc import create_channel, create_server, LogSampler, \
     LogUnaryServerInterceptor, \
     LogStreamServerInterceptor, \
     LogUnaryClientInterceptor, \
     LogStreamClientInterceptor
 from lookout.sdk import event_pb2
+from lookout.sdk.grpc.log_fields import LogFields
 from lookout.sdk.test import mixins
 
 
@@ -27,10 +31,13 @@ class DummyAnalyzer(pb.AnalyzerServicer):
 class DummyDataServicer(pb.DataServicer):
 
     def GetChanges(self, request, context):
-        return pb.Change()
+        for i in range(3):
+            yield pb.Change(head=pb.File(path=str(i)))
 
     def GetFiles(self, request, context):
-        return pb.File()
+        for i in range(100):
+            yield pb.File(path=str(i))
+            time.sleep(0.01)
 
 
 class TestServerLoggerInterceptors(mixins.TestWithRunningServicerMixin,
@@ -80,6 +87,45 @@ class TestServerLoggerInterceptors(mixins.TestWithRunningServicerMixin,
         self.assertEqual(second_unary[1], "gRPC unary server call finished")
 
 
+class TestServerStreamLoggerInterceptors(mixins.TestWithRunningServicerMixin,
+                                         unittest.TestCase):
+
+    def build_server(self):
+        server = create_server(10, interceptors=[
+            LogUnaryServerInterceptor(self._tracker.unary),
+            LogStreamServerInterceptor(self._tracker.stream),
+        ])
+        pb.add_dataservicer_to_server(DummyDataServicer(), server)
+
+        return server
+
+    def test_stream_accounting(self):
+        with create_channel(self._target) as channel:
+            changes = DataStub(channel).get_changes(None, pb.ChangesRequest())
+            self.assertEqual(len(list(changes)), 3)
+
+        self.assertEqual(self._tracker.counter, {"unary": 0, "stream": 2})
+        fields, msg = self._tracker.logs[1]
+        self.assertEqual(msg, "gRPC streaming server call finished")
+        self.assertEqual(fields["grpc.code"], "OK")
+        self.assertEqual(fields["grpc.messages"], 3)
+        self.assertGreater(fields["grpc.bytes"], 0)
+        self.assertTrue(fields["grpc.time_to_first_message"].endswith("ms"))
+
+    def test_cancelled(self):
+        with create_channel(self._target) as channel:
+            files = DataStub(channel).get_files(None, pb.FilesRequest())
+            next(files)
+            files.cancel()
+
+        deadline = time.monotonic() + 5
+        while len(self._tracker.logs) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        fields, msg = self._tracker.logs[1]
+        self.assertEqual(fields["grpc.code"], "Canceled")
+
+
 class TestClientLoggerInterceptors(mixins.TestWithRunningServicerMixin,
                                    unittest.TestCase):
 
@@ -95,7 +141,11 @@ class TestClientLoggerInterceptors(mixins.TestWithRunningServicerMixin,
                 LogStreamClientInterceptor(self._tracker.stream),
         ]) as channel:
             stub = DataStub(channel)
-            stub.get_changes(None, pb.ChangesRequest())
+            changes = stub.get_changes(None, pb.ChangesRequest())
+            # the call is logged as finished when the stream is over
+            self.assertEqual(self._tracker.counter,
+                             {"unary": 0, "stream": 1})
+            self.assertEqual(len(list(changes)), 3)
 
         self.assertEqual(self._tracker.counter, {"unary": 0, "stream": 2})
 
@@ -114,16 +164,125 @@ class TestClientLoggerInterceptors(mixins.TestWithRunningServicerMixin,
         second_log_fields = second_streaming[0]
         self.assertEqual(set(second_log_fields.keys()),
                          {"system", "span.kind", "grpc.service", "grpc.method",
-                          "grpc.code", "grpc.start_time", "duration"})
+                          "grpc.code", "grpc.start_time", "duration",
+                          "grpc.time_to_first_message", "grpc.messages",
+                          "grpc.bytes"})
 
         second_log_fields.pop("grpc.start_time")
         second_log_fields.pop("duration")
+        second_log_fields.pop("grpc.time_to_first_message")
+        self.assertGreater(second_log_fields.pop("grpc.bytes"), 0)
         self.assertEqual(second_log_fields, {
             "system": "grpc",
             "span.kind": "client",
             "grpc.service": "pb.Data",
             "grpc.method": "GetChanges",
-            "grpc.code": "OK"
+            "grpc.code": "OK",
+            "grpc.messages": 3,
         })
         self.assertEqual(second_streaming[1],
                          "gRPC streaming client call finished")
+
+
+class SampledAnalyzer(pb.AnalyzerServicer):
+
+    def notify_review_event(self, request, context):
+        if request.commit_revision.head.hash == "slow":
+            time.sleep(0.05)
+        return pb.EventResponse()
+
+    def notify_push_event(self, request, context):
+        raise RuntimeError("push")
+
+
+class TestLogSampler(unittest.TestCase):
+
+    def test_rates(self):
+        sampler = LogSampler(rate=0.5, method_rates={
+            "pb.Data/GetFiles": 1, "pb.Data": 0})
+        self.assertEqual(sampler.rate("/pb.Data/GetFiles"), 1)
+        self.assertEqual(sampler.rate("/pb.Data/GetChanges"), 0)
+        self.assertEqual(sampler.rate("/pb.Analyzer/NotifyReviewEvent"), 0.5)
+        self.assertTrue(sampler.head("/pb.Data/GetFiles"))
+        self.assertFalse(sampler.head("/pb.Data/GetChanges"))
+
+        sampler = LogSampler(rate=0.1, rng=random.Random(42))
+        sampled = sum(sampler.head("/pb.Data/GetFiles")
+                      for _ in range(10000))
+        self.assertAlmostEqual(sampled / 10000, 0.1, delta=0.02)
+
+    def test_tail(self):
+        sampler = LogSampler(rate=0, slow_threshold=1)
+        self.assertTrue(sampler.tail_sampling)
+        self.assertTrue(sampler.tail(True, 0))
+        self.assertTrue(sampler.tail(False, 1))
+        self.assertFalse(sampler.tail(False, 0.5))
+
+        sampler = LogSampler(rate=0, keep_errors=False)
+        self.assertFalse(sampler.tail_sampling)
+        self.assertFalse(sampler.tail(True, 0))
+
+
+class TestSampledLoggerInterceptors(mixins.TestWithRunningServicerMixin,
+                                    unittest.TestCase):
+
+    def build_server(self):
+        sampler = LogSampler(rate=0, slow_threshold=0.04)
+        server = create_server(10, interceptors=[
+            LogUnaryServerInterceptor(self._tracker.unary, sampler),
+            LogStreamServerInterceptor(self._tracker.stream, sampler),
+        ])
+        pb.add_analyzer_to_server(SampledAnalyzer(), server)
+
+        return server
+
+    def test_tail_sampling(self):
+        with create_channel(self._target) as channel:
+            stub = pb.AnalyzerStub(channel)
+            # the log fields of the calls that are not logged aren't copied
+            with mock.patch.object(LogFields, "to_dict") as to_dict:
+                stub.NotifyReviewEvent(event_pb2.ReviewEvent())
+            to_dict.assert_not_called()
+            self.assertEqual(self._tracker.logs, [])
+
+            with self.assertRaises(grpc.RpcError):
+                stub.NotifyPushEvent(event_pb2.PushEvent())
+
+            slow = event_pb2.ReviewEvent()
+            slow.commit_revision.head.hash = "slow"
+            stub.NotifyReviewEvent(slow)
+
+        self.assertEqual([msg for _, msg in self._tracker.logs], [
+            "gRPC unary server call started",
+            "gRPC unary server call finished",
+            "gRPC unary server call started",
+            "gRPC unary server call finished",
+        ])
+        started, failed, _, slow = [f for f, _ in self._tracker.logs]
+        self.assertEqual(started["grpc.method"], "NotifyPushEvent")
+        self.assertNotIn("grpc.code", started)
+        self.assertEqual(failed["grpc.code"], "Unknown")
+        self.assertEqual(slow["grpc.code"], "OK")
+
+    def test_client_head_sampling(self):
+        tracker = mixins.LogFnTracker()
+        sampler = LogSampler(method_rates={"pb.Analyzer/NotifyPushEvent": 0})
+        with create_channel(self._target, interceptors=[
+                LogUnaryClientInterceptor(tracker.unary, sampler),
+                LogStreamClientInterceptor(tracker.stream, sampler),
+        ]) as channel:
+            stub = pb.AnalyzerStub(channel)
+            stub.NotifyReviewEvent(event_pb2.ReviewEvent())
+            self.assertEqual(tracker.counter, {"unary": 2, "stream": 0})
+            # not picked by the head sampling, but kept since it failed
+            with self.assertRaises(grpc.RpcError):
+                stub.NotifyPushEvent(event_pb2.PushEvent())
+
+        self.assertEqual(tracker.counter, {"unary": 4, "stream": 0})
+        self.assertEqual([(f["grpc.method"], f.get("grpc.code"), msg)
+                          for f, msg in tracker.logs], [
+            ("NotifyReviewEvent", None, "gRPC unary client call started"),
+            ("NotifyReviewEvent", "OK", "gRPC unary client call finished"),
+            ("NotifyPushEvent", None, "gRPC unary client call started"),
+            ("NotifyPushEvent", "Unknown", "gRPC unary client call finished"),
+        ])
@@ -0,0 +1,206 @@
+import threading
+import unittest
+import urllib.request
+
+import grpc
+
+from lookout.sdk import pb
+from lookout.sdk.service_data import DataStub
+from lookout.sdk.grpc import create_channel, create_server, \
+    MetricsUnaryServerInterceptor, MetricsStreamServerInterceptor, \
+    MetricsUnaryClientInterceptor, MetricsStreamClientInterceptor, \
+    start_metrics_server
+from lookout.sdk.grpc.metrics import MetricsRegistry
+from lookout.sdk.test import mixins
+
+
+class DummyAnalyzer(pb.AnalyzerServicer):
+
+    def notify_review_event(self, request, context):
+        return pb.EventResponse(comments=[pb.Comment(text="review")])
+
+    def notify_push_event(self, request, context):
+        raise RuntimeError("push")
+
+
+class DummyDataServicer(pb.DataServicer):
+
+    def GetChanges(self, request, context):
+        for i in range(3):
+            yield pb.Change(head=pb.File(path=str(i)))
+
+
+def value(registry, name, **labels):
+    metric = registry.get(name) or registry.get(name.rsplit("_", 1)[0])
+    for sample_name, sample_labels, v in metric.samples():
+        if sample_name == name and sample_labels == labels:
+            return v
+    return None
+
+
+class TestMetricsRegistry(unittest.TestCase):
+
+    def test_counter_across_threads(self):
+        registry = MetricsRegistry()
+        counter = registry.counter("c_total", "help", ("l",))
+
+        def work():
+            for _ in range(1000):
+                counter.labels("a").inc()
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(counter.labels("a").value, 4000)
+        self.assertIs(registry.counter("c_total", "help", ("l",)), counter)
+        with self.assertRaises(ValueError):
+            registry.gauge("c_total", "help")
+
+    def test_threads_over_folded(self):
+        registry = MetricsRegistry()
+        gauge = registry.gauge("g", "help")
+        histogram = registry.histogram("h_seconds", "help")
+
+        def work():
+            gauge.inc(2)
+            gauge.dec()
+            histogram.observe(0.1)
+
+        for _ in range(50):
+            t = threading.Thread(target=work)
+            t.start()
+            t.join()
+
+        gauge.inc()
+        self.assertEqual(gauge.labels().value, 51)
+        self.assertEqual(value(registry, "h_seconds_count"), 50)
+        # only the slot of the current thread is left
+        self.assertEqual(len(gauge.labels()._shards._slots), 1)
+        self.assertEqual(len(histogram.labels()._shards._slots), 0)
+
+    def test_exposition(self):
+        registry = MetricsRegistry()
+        registry.gauge("g", "a gauge").inc(2)
+        h = registry.histogram("h_seconds", "a histogram", ("m",),
+                               buckets=(0.1, 1))
+        h.labels("x").observe(0.05)
+        h.labels("x").observe(0.1)
+        h.labels("x").observe(5)
+
+        self.assertEqual(registry.exposition(), "\n".join([
+            "# HELP g a gauge",
+            "# TYPE g gauge",
+            "g 2",
+            "# HELP h_seconds a histogram",
+            "# TYPE h_seconds histogram",
+            'h_seconds_bucket{m="x",le="0.1"} 2',
+            'h_seconds_bucket{m="x",le="1"} 2',
+            'h_seconds_bucket{m="x",le="+Inf"} 3',
+            'h_seconds_count{m="x"} 3',
+            'h_seconds_sum{m="x"} 5.15',
+        ]) + "\n")
+
+    def test_http_endpoint(self):
+        registry = MetricsRegistry()
+        registry.counter("c_total", "help").inc()
+        server = start_metrics_server(0, addr="127.0.0.1", registry=registry)
+        try:
+            url = "http://127.0.0.1:%d/metrics" % server.server_address[1]
+            with urllib.request.urlopen(url) as resp:
+                body = resp.read().decode("utf-8")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        self.assertIn("c_total 1\n", body)
+
+
+class TestMetricsServerInterceptors(mixins.TestWithRunningServicerMixin,
+                                    unittest.TestCase):
+
+    def build_server(self):
+        self._registry = MetricsRegistry()
+        server = create_server(10, interceptors=[
+            MetricsUnaryServerInterceptor(self._registry),
+            MetricsStreamServerInterceptor(self._registry),
+        ])
+        # both services on the same server
+        pb.add_analyzer_to_server(DummyAnalyzer(), server)
+        pb.add_dataservicer_to_server(DummyDataServicer(), server)
+
+        return server
+
+    def test_unary(self):
+        with create_channel(self._target) as channel:
+            stub = pb.AnalyzerStub(channel)
+            stub.NotifyReviewEvent(pb.ReviewEvent())
+            with self.assertRaises(Exception):
+                stub.NotifyPushEvent(pb.PushEvent())
+
+        r = self._registry
+        review = dict(grpc_service="pb.Analyzer",
+                      grpc_method="NotifyReviewEvent")
+        push = dict(grpc_service="pb.Analyzer", grpc_method="NotifyPushEvent")
+        self.assertEqual(value(r, "grpc_server_handled_total",
+                               grpc_code="OK", **review), 1)
+        self.assertEqual(value(r, "grpc_server_handled_total",
+                               grpc_code="Unknown", **push), 1)
+        self.assertEqual(value(r, "grpc_server_msg_sent_total", **review), 1)
+        self.assertEqual(value(r, "grpc_server_in_flight", **review), 0)
+        self.assertEqual(value(r, "grpc_server_handling_seconds_count",
+                               **review), 1)
+
+    def test_stream(self):
+        with create_channel(self._target) as channel:
+            list(DataStub(channel).get_changes(None, pb.ChangesRequest()))
+
+        r = self._registry
+        changes = dict(grpc_service="pb.Data", grpc_method="GetChanges")
+        self.assertEqual(value(r, "grpc_server_handled_total",
+                               grpc_code="OK", **changes), 1)
+        self.assertEqual(value(r, "grpc_server_msg_sent_total", **changes), 3)
+        self.assertEqual(value(r, "grpc_server_msg_received_total",
+                               **changes), 1)
+        self.assertEqual(value(r, "grpc_server_in_flight", **changes), 0)
+        self.assertEqual(value(r, "grpc_server_stream_first_message_seconds"
+                               "_count", **changes), 1)
+
+    def test_unknown_method(self):
+        with create_channel(self._target) as channel:
+            call = channel.unary_unary("/pb.Analyzer/Unknown")
+            with self.assertRaises(grpc.RpcError) as ctx:
+                call(b"")
+
+        self.assertEqual(ctx.exception.code(), grpc.StatusCode.UNIMPLEMENTED)
+        self.assertIsNone(value(self._registry, "grpc_server_started_total",
+                                grpc_service="pb.Analyzer",
+                                grpc_method="Unknown"))
+
+    def test_client(self):
+        registry = MetricsRegistry()
+        with create_channel(self._target, interceptors=[
+                MetricsUnaryClientInterceptor(registry),
+                MetricsStreamClientInterceptor(registry),
+        ]) as channel:
+            changes = DataStub(channel).get_changes(None, pb.ChangesRequest())
+
+            labels = dict(grpc_service="pb.Data", grpc_method="GetChanges")
+            self.assertEqual(value(registry, "grpc_client_in_flight",
+                                   **labels), 1)
+            list(changes)
+
+        self.assertEqual(value(registry, "grpc_client_in_flight", **labels),
+                         0)
+        self.assertEqual(value(registry, "grpc_client_msg_received_total",
+                               **labels), 3)
+        self.assertGreater(value(
+            registry, "grpc_client_msg_received_bytes_total", **labels), 0)
+        self.assertEqual(value(registry, "grpc_client_handled_total",
+                               grpc_code="OK", **labels), 1)
+        self.assertEqual(value(registry, "grpc_client_handling_seconds_count",
+                               **labels), 1)
+        self.assertEqual(value(registry, "grpc_client_stream_first_message_"
+                               "seconds_count", **labels), 1)
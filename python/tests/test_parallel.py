@@ -0,0 +1,46 @@
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+from lookout.sdk import pb
+from lookout.sdk.parallel import analyze_in_processes
+
+
+def count_lines(change):
+    if not change.head.content:
+        return []
+
+    lines = change.head.content.count(b"\n")
+    return [pb.Comment(file=change.head.path, text=str(lines))]
+
+
+def path_of(f):
+    return [pb.Comment(file=f.path, line=i) for i in range(2)]
+
+
+class TestAnalyzeInProcesses(unittest.TestCase):
+
+    def test_stable_order(self):
+        changes = [pb.Change(head=pb.File(path=str(i), content=b"\n" * i))
+                   for i in range(5)]
+        buffers = [c.SerializeToString() for c in changes]
+
+        results = analyze_in_processes(buffers, count_lines, max_workers=2)
+
+        self.assertEqual(len(results), 5)
+        self.assertEqual(results[0], [])
+        for i, comments in enumerate(results[1:], 1):
+            self.assertEqual(len(comments), 1)
+            self.assertEqual(comments[0].file, str(i))
+            self.assertEqual(comments[0].text, str(i))
+
+    def test_shared_executor(self):
+        buffers = [pb.File(path=p).SerializeToString() for p in "ab"]
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            results = analyze_in_processes(buffers, path_of,
+                                           message_type=pb.File,
+                                           executor=executor)
+            # the executor is still usable
+            self.assertEqual(executor.submit(len, "abc").result(), 3)
+
+        self.assertEqual([[(c.file, c.line) for c in r] for r in results],
+                         [[("a", 0), ("a", 1)], [("b", 0), ("b", 1)]])
@@ -0,0 +1,139 @@
+import os
+import tempfile
+import time
+import unittest
+
+import grpc
+
+from lookout.sdk import pb
+from lookout.sdk.grpc import create_channel, create_server
+from lookout.sdk.recording import Recording, \
+    RecordingStreamClientInterceptor, ReplayDataServicer, StreamRecorder, \
+    add_replay_to_server
+from lookout.sdk.service_data import DataStub
+from lookout.sdk.test import mixins
+
+
+class DummyDataServicer(pb.DataServicer):
+
+    def GetChanges(self, request, context):
+        for i in range(3):
+            time.sleep(0.01)
+            yield pb.Change(head=pb.File(path=str(i), content=b"x" * 2000))
+
+    def GetFiles(self, request, context):
+        yield pb.File(path="a")
+        context.abort(grpc.StatusCode.INTERNAL, "failed")
+
+
+class TestRecording(mixins.TestWithRunningServicerMixin, unittest.TestCase):
+
+    def build_server(self):
+        server = create_server(10)
+        pb.add_dataservicer_to_server(DummyDataServicer(), server)
+
+        return server
+
+    def setUp(self):
+        super().setUp()
+        self._dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._dir.name, "data.rec")
+        self.changes_request = pb.ChangesRequest(
+            head=pb.ReferencePointer(hash="1" * 40), want_contents=True)
+
+    def tearDown(self):
+        self._dir.cleanup()
+        super().tearDown()
+
+    def record(self, compress=False):
+        with StreamRecorder(self.path, compress=compress) as recorder:
+            interceptor = RecordingStreamClientInterceptor(recorder)
+            with create_channel(self._target,
+                                interceptors=[interceptor]) as channel:
+                stub = DataStub(channel)
+                changes = list(stub.get_changes(None, self.changes_request))
+                with self.assertRaises(grpc.RpcError):
+                    list(stub.get_files(None, pb.FilesRequest()))
+
+        return changes
+
+    def replay(self, recording, speed=None):
+        server = create_server(10)
+        add_replay_to_server(ReplayDataServicer(recording, speed), server)
+        target = "127.0.0.1:%d" % mixins.find_free_port()
+        server.add_insecure_port(target)
+        server.start()
+        self.addCleanup(server.stop, 0)
+        channel = create_channel(target)
+        self.addCleanup(channel.close)
+        return DataStub(channel)
+
+    def test_index(self):
+        self.record()
+        self.record(compress=True)
+        with Recording(self.path) as recording:
+            self.assertEqual(len(recording.streams), 4)
+            stream = recording.find("/pb.Data/GetChanges",
+                                    self.changes_request)
+            self.assertIs(stream, recording.streams[2])
+            self.assertEqual(stream.code, grpc.StatusCode.OK)
+            self.assertEqual(len(stream.messages), 3)
+            self.assertTrue(stream.messages[0].compressed)
+            self.assertEqual(recording.streams[3].code,
+                             grpc.StatusCode.INTERNAL)
+            self.assertIsNone(recording.find("/pb.Data/GetChanges",
+                                             pb.ChangesRequest()))
+
+    def test_interleaved_same_request(self):
+        with StreamRecorder(self.path) as recorder:
+            a = recorder.start("/pb.Data/GetChanges", self.changes_request)
+            b = recorder.start("/pb.Data/GetChanges", self.changes_request)
+            b.end(grpc.StatusCode.NOT_FOUND)
+            a.end(grpc.StatusCode.OK)
+
+        with Recording(self.path) as recording:
+            self.assertEqual([s.code for s in recording.streams],
+                             [grpc.StatusCode.OK, grpc.StatusCode.NOT_FOUND])
+
+    def test_truncated(self):
+        self.record()
+        with open(self.path, "r+b") as f:
+            f.truncate(os.path.getsize(self.path) - 10)
+
+        with Recording(self.path) as recording:
+            self.assertEqual(len(recording.streams), 2)
+            self.assertIsNone(recording.streams[1].code)
+
+    def test_invalid_file(self):
+        with open(self.path, "wb") as f:
+            f.write(b"not a recording")
+
+        with self.assertRaises(ValueError):
+            Recording(self.path)
+
+    def test_replay(self):
+        for compress in (False, True):
+            changes = self.record(compress)
+            with Recording(self.path) as recording:
+                stub = self.replay(recording)
+                self.assertEqual(list(stub.get_changes(
+                    None, self.changes_request)), changes)
+
+                with self.assertRaises(grpc.RpcError) as cm:
+                    list(stub.get_files(None, pb.FilesRequest()))
+                self.assertEqual(cm.exception.code(),
+                                 grpc.StatusCode.INTERNAL)
+
+                with self.assertRaises(grpc.RpcError) as cm:
+                    list(stub.get_changes(None, pb.ChangesRequest()))
+                self.assertEqual(cm.exception.code(),
+                                 grpc.StatusCode.NOT_FOUND)
+
+    def test_replay_pacing(self):
+        self.record()
+        with Recording(self.path) as recording:
+            stub = self.replay(recording, speed=1)
+            start = time.monotonic()
+            self.assertEqual(len(list(stub.get_changes(
+                None, self.changes_request))), 3)
+            self.assertGreaterEqual(time.monotonic() - start, 0.02)
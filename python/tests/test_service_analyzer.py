@@ -0,0 +1,171 @@
+import asyncio
+import threading
+import unittest
+
+from lookout.sdk import pb
+from lookout.sdk.service_analyzer import EventCache
+
+
+class ContextMock:
+
+    def invocation_metadata(self):
+        return ()
+
+
+def run(coro):
+    """Runs the coroutine in a new event loop, as asyncio.run in Python 3.7"""
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+class CountingAnalyzer(pb.AnalyzerServicer):
+
+    version = "1"
+
+    def __init__(self, event_cache=None):
+        self.event_cache = event_cache
+        self.calls = 0
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def notify_review_event(self, request, context):
+        self.calls += 1
+        self.gate.wait(5)
+        return pb.EventResponse(analyzer_version=self.version,
+                                comments=[pb.Comment(text=str(self.calls))])
+
+    def notify_push_event(self, request, context):
+        raise RuntimeError("push")
+
+
+class AsyncCountingAnalyzer(pb.AsyncAnalyzerServicer):
+
+    def __init__(self, event_cache=None):
+        self.event_cache = event_cache
+        self.calls = 0
+
+    async def notify_review_event(self, request, context):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return pb.EventResponse(comments=[pb.Comment(text=str(self.calls))])
+
+
+class NotifyingLock:
+    """Lock notifying its condition on each release, to wait for a change
+    of the state it protects"""
+
+    def __init__(self):
+        self.cond = threading.Condition()
+
+    def __enter__(self):
+        self.cond.acquire()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.cond.notify_all()
+        self.cond.release()
+
+
+def review_event(head="h", config=None):
+    event = pb.ReviewEvent(provider="github", internal_id="1")
+    event.commit_revision.head.hash = head
+    if config:
+        event.configuration.update(config)
+    return event
+
+
+class TestEventCache(unittest.TestCase):
+
+    def test_disabled_by_default(self):
+        analyzer = CountingAnalyzer()
+        analyzer.NotifyReviewEvent(review_event(), ContextMock())
+        analyzer.NotifyReviewEvent(review_event(), ContextMock())
+        self.assertEqual(analyzer.calls, 2)
+
+    def test_completed_event(self):
+        cache = EventCache()
+        analyzer = CountingAnalyzer(cache)
+        r1 = analyzer.NotifyReviewEvent(review_event(), ContextMock())
+        r2 = analyzer.NotifyReviewEvent(review_event(), ContextMock())
+        self.assertEqual(analyzer.calls, 1)
+        self.assertEqual(r1, r2)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+        analyzer.NotifyReviewEvent(review_event(head="h2"), ContextMock())
+        analyzer.NotifyReviewEvent(review_event(config={"k": 1}),
+                                   ContextMock())
+        self.assertEqual(analyzer.calls, 3)
+
+        # a new version of the analyzer doesn't reuse the responses
+        analyzer.version = "2"
+        analyzer.NotifyReviewEvent(review_event(), ContextMock())
+        self.assertEqual(analyzer.calls, 4)
+
+    def test_inflight_event(self):
+        cache = EventCache()
+        cache._lock = lock = NotifyingLock()
+        analyzer = CountingAnalyzer(cache)
+        analyzer.gate.clear()
+        results = []
+
+        def notify():
+            results.append(analyzer.NotifyReviewEvent(review_event(),
+                                                      ContextMock()))
+
+        threads = [threading.Thread(target=notify) for _ in range(3)]
+        for t in threads:
+            t.start()
+        with lock.cond:
+            self.assertTrue(lock.cond.wait_for(lambda: cache.coalesced >= 2,
+                                               timeout=5))
+        analyzer.gate.set()
+        for t in threads:
+            t.join(5)
+
+        self.assertEqual(analyzer.calls, 1)
+        self.assertEqual(len(results), 3)
+        self.assertTrue(all(r is results[0] for r in results))
+
+    def test_errors_not_cached(self):
+        cache = EventCache()
+        analyzer = CountingAnalyzer(cache)
+        event = pb.PushEvent(provider="github", internal_id="1")
+        for _ in range(2):
+            with self.assertRaises(RuntimeError):
+                analyzer.NotifyPushEvent(event, ContextMock())
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.misses, 2)
+
+    def test_size_and_ttl(self):
+        cache = EventCache(max_size=1)
+        analyzer = CountingAnalyzer(cache)
+        for head in ("a", "b", "a"):
+            analyzer.NotifyReviewEvent(review_event(head=head), ContextMock())
+        self.assertEqual(analyzer.calls, 3)
+        self.assertEqual(len(cache), 1)
+
+        cache = EventCache(ttl=-1)
+        analyzer = CountingAnalyzer(cache)
+        for _ in range(2):
+            analyzer.NotifyReviewEvent(review_event(), ContextMock())
+        self.assertEqual(analyzer.calls, 2)
+
+    def test_async(self):
+        cache = EventCache()
+        analyzer = AsyncCountingAnalyzer(cache)
+
+        async def notify_all():
+            return await asyncio.gather(*[
+                analyzer.NotifyReviewEvent(review_event(), ContextMock())
+                for _ in range(3)])
+
+        responses = run(notify_all())
+        self.assertEqual(analyzer.calls, 1)
+        self.assertEqual(cache.coalesced, 2)
+        self.assertEqual([r.comments[0].text for r in responses],
+                         ["1", "1", "1"])
+
+        run(analyzer.NotifyReviewEvent(review_event(), ContextMock()))
+        self.assertEqual(cache.hits, 1)
@@ -0,0 +1,286 @@
+import re
+import threading
+import unittest
+from unittest import mock
+
+import grpc
+
+from lookout.sdk import pb, service_data
+from lookout.sdk.service_data import DataStub, FileCache
+from lookout.sdk.grpc import create_channel, create_server, ChannelPool
+from lookout.sdk.grpc.streams import StreamCoalescer
+from lookout.sdk.test import mixins
+
+
+class DummyDataServicer(pb.DataServicer):
+
+    def GetChanges(self, request, context):
+        for i in range(3):
+            yield pb.Change(head=pb.File(path=str(i)))
+
+    def GetFiles(self, request, context):
+        if request.include_pattern == "unavailable":
+            context.abort(grpc.StatusCode.UNAVAILABLE, "unavailable")
+        for i in range(3):
+            yield pb.File(path=str(i))
+
+
+class TestDataStubWithPool(mixins.TestWithRunningServicerMixin,
+                           unittest.TestCase):
+
+    def build_server(self):
+        server = create_server(10)
+        pb.add_dataservicer_to_server(DummyDataServicer(), server)
+
+        return server
+
+    def test_stream_releases_channel(self):
+        with ChannelPool(self._target, max_concurrent_streams=1) as pool:
+            stub = DataStub(pool)
+
+            changes = stub.get_changes(None, pb.ChangesRequest())
+            files = stub.get_files(None, pb.FilesRequest())
+            self.assertEqual(len(pool), 2)
+
+            self.assertEqual([c.head.path for c in changes], ["0", "1", "2"])
+            self.assertEqual([f.path for f in files], ["0", "1", "2"])
+
+            stub.get_files(None, pb.FilesRequest()).cancel()
+            self.assertEqual([f.path for f in stub.get_files(
+                None, pb.FilesRequest())], ["0", "1", "2"])
+            self.assertEqual(len(pool), 2)
+            self.assertEqual([p.streams for p in pool._channels], [0, 0])
+
+    def test_unavailable_channel_replaced(self):
+        with ChannelPool(self._target) as pool:
+            stub = DataStub(pool)
+            changes = stub.get_changes(None, pb.ChangesRequest())
+            self.assertEqual(next(changes).head.path, "0")
+            channel = pool._channels[0].channel
+
+            files = stub.get_files(None, pb.FilesRequest(
+                include_pattern="unavailable"))
+            with self.assertRaises(grpc.RpcError):
+                list(files)
+            self.assertFalse(pool._channels[0].healthy)
+
+            # closed once the other stream is over
+            self.assertEqual(len(list(changes)), 2)
+            self.assertEqual(len(pool), 0)
+            self.assertEqual(len(list(stub.get_files(
+                None, pb.FilesRequest()))), 3)
+            self.assertIsNot(pool._channels[0].channel, channel)
+
+    def test_prefetch(self):
+        with ChannelPool(self._target) as pool:
+            stub = DataStub(pool)
+            changes = stub.get_changes(None, pb.ChangesRequest(),
+                                       prefetch_messages=1)
+            self.assertEqual([c.head.path for c in changes], ["0", "1", "2"])
+
+            files = stub.get_files(None, pb.FilesRequest(),
+                                   prefetch_bytes=1)
+            self.assertEqual([f.path for f in files], ["0", "1", "2"])
+            self.assertEqual(files.code(), grpc.StatusCode.OK)
+
+            for kwargs in (dict(prefetch_messages=0),
+                           dict(prefetch_messages=None, prefetch_bytes=0)):
+                with self.assertRaises(ValueError):
+                    stub.get_files(None, pb.FilesRequest(), **kwargs)
+            # no stream was opened
+            self.assertEqual([p.streams for p in pool._channels], [0])
+
+    def test_raw(self):
+        with ChannelPool(self._target) as pool:
+            stub = DataStub(pool)
+            changes = list(stub.get_changes(None, pb.ChangesRequest(),
+                                            raw=True, prefetch_messages=2))
+            self.assertTrue(all(isinstance(c, bytes) for c in changes))
+            self.assertEqual([pb.Change.FromString(c).head.path
+                              for c in changes], ["0", "1", "2"])
+
+            files = list(stub.get_files(None, pb.FilesRequest(), raw=True))
+            self.assertEqual([pb.File.FromString(f).path for f in files],
+                             ["0", "1", "2"])
+
+
+class RepoDataServicer(pb.DataServicer):
+    """Serves the same files at each revision, recording the requests"""
+
+    files = {
+        "a.py": ("h1", b"print(1)"),
+        "b.py": ("h2", b"print(2)"),
+        "c (copy).py": ("h1", b"print(1)"),
+    }
+
+    def __init__(self):
+        self.requests = []
+
+    def _files(self, request):
+        self.requests.append(request)
+        for path, (blob_hash, content) in sorted(self.files.items()):
+            if request.include_pattern and \
+                    not re.search(request.include_pattern, path):
+                continue
+
+            yield pb.File(path=path, hash=blob_hash, language="Python",
+                          content=content if request.want_contents else b"")
+
+    def GetChanges(self, request, context):
+        for f in self._files(request):
+            yield pb.Change(head=f)
+
+    def GetFiles(self, request, context):
+        yield from self._files(request)
+
+
+class TestDataStubWithFileCache(mixins.TestWithRunningServicerMixin,
+                                unittest.TestCase):
+
+    def build_server(self):
+        server = create_server(10)
+        self._servicer = RepoDataServicer()
+        pb.add_dataservicer_to_server(self._servicer, server)
+
+        return server
+
+    def test_get_files(self):
+        cache = FileCache(max_bytes=1024)
+        with create_channel(self._target) as channel:
+            stub = DataStub(channel, file_cache=cache)
+            req = pb.FilesRequest(want_contents=True, want_language=True)
+
+            first = list(stub.get_files(None, req))
+            self.assertEqual([(f.path, f.content) for f in first], [
+                ("a.py", b"print(1)"),
+                ("b.py", b"print(2)"),
+                ("c (copy).py", b"print(1)"),
+            ])
+            # metadata request, then a request for the missing files only
+            self.assertEqual(len(self._servicer.requests), 2)
+            self.assertFalse(self._servicer.requests[0].want_contents)
+            self.assertEqual(self._servicer.requests[1].include_pattern,
+                             r"^(?:a\.py|b\.py|c \(copy\)\.py)$")
+            self.assertEqual(cache.misses, 3)
+
+            second = list(stub.get_files(None, req))
+            self.assertEqual(len(self._servicer.requests), 3)
+            self.assertEqual([(f.path, f.content) for f in second],
+                             [(f.path, f.content) for f in first])
+            self.assertEqual(cache.hits, 3)
+
+    def test_get_changes(self):
+        cache = FileCache(max_bytes=1024)
+        with create_channel(self._target) as channel:
+            stub = DataStub(channel, file_cache=cache)
+            req = pb.ChangesRequest(want_contents=True)
+
+            first = list(stub.get_changes(None, req))
+            second = list(stub.get_changes(None, req))
+
+        self.assertEqual(first, second)
+        self.assertEqual([c.head.content for c in first],
+                         [b"print(1)", b"print(2)", b"print(1)"])
+        self.assertFalse(any(c.HasField("base") for c in first))
+        self.assertEqual(len(self._servicer.requests), 3)
+        self.assertEqual((cache.hits, cache.misses), (3, 3))
+
+    def test_resolved_in_batches(self):
+        cache = FileCache(max_bytes=1024)
+        with create_channel(self._target) as channel, \
+                mock.patch.object(service_data, "_RESOLVE_BATCH_SIZE", 2):
+            stub = DataStub(channel, file_cache=cache)
+            files = stub.get_files(None, pb.FilesRequest(want_contents=True))
+            self.assertEqual(next(files).content, b"print(1)")
+            # the metadata stream, and the misses of the first batch only
+            self.assertEqual(len(self._servicer.requests), 2)
+            self.assertEqual(self._servicer.requests[1].include_pattern,
+                             r"^(?:a\.py|b\.py)$")
+
+            # the blob of the second batch was cached by the first one
+            self.assertEqual([f.content for f in files],
+                             [b"print(2)", b"print(1)"])
+            self.assertEqual(len(self._servicer.requests), 2)
+            self.assertEqual(cache.hits, 1)
+
+    def test_metadata_only_not_cached(self):
+        cache = FileCache(max_bytes=1024)
+        with create_channel(self._target) as channel:
+            stub = DataStub(channel, file_cache=cache)
+            list(stub.get_files(None, pb.FilesRequest()))
+
+        self.assertEqual(len(self._servicer.requests), 1)
+        self.assertEqual(len(cache), 0)
+
+
+class TestFileCache(unittest.TestCase):
+
+    def test_lru_eviction_by_size(self):
+        files = [pb.File(hash=str(i), content=b"x" * 10) for i in range(3)]
+        size = files[0].ByteSize()
+        cache = FileCache(max_bytes=2 * size)
+        keys = [FileCache.key(f, False, True) for f in files]
+
+        cache.put(keys[0], files[0])
+        cache.put(keys[1], files[1])
+        self.assertIs(cache.get(keys[0]), files[0])
+
+        cache.put(keys[2], files[2])
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.size, 2 * size)
+        self.assertIsNone(cache.get(keys[1]))
+        self.assertIs(cache.get(keys[2]), files[2])
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+
+    def test_too_big(self):
+        cache = FileCache(max_bytes=1)
+        f = pb.File(hash="h", content=b"xx")
+        cache.put(FileCache.key(f, False, True), f)
+        self.assertEqual(len(cache), 0)
+
+    def test_key(self):
+        f = pb.File(hash="h", language="Go", path="p")
+        self.assertNotEqual(FileCache.key(f, True, False),
+                            FileCache.key(f, False, True))
+        self.assertEqual(FileCache.key(f, True, False),
+                         FileCache.key(pb.File(hash="h", language="Go"),
+                                       True, False))
+
+
+class GatedDataServicer(pb.DataServicer):
+
+    def __init__(self):
+        self.requests = 0
+        self.gate = threading.Event()
+
+    def GetChanges(self, request, context):
+        self.requests += 1
+        yield pb.Change(head=pb.File(path="0"))
+        self.gate.wait(5)
+        yield pb.Change(head=pb.File(path="1"))
+
+
+class TestDataStubWithCoalescer(mixins.TestWithRunningServicerMixin,
+                                unittest.TestCase):
+
+    def build_server(self):
+        server = create_server(10)
+        self._servicer = GatedDataServicer()
+        pb.add_dataservicer_to_server(self._servicer, server)
+
+        return server
+
+    def test_identical_requests_coalesced(self):
+        coalescer = StreamCoalescer()
+        req = pb.ChangesRequest(head=pb.ReferencePointer(hash="h"))
+        with create_channel(self._target) as channel:
+            s1 = DataStub(channel, coalescer=coalescer).get_changes(None, req)
+            s2 = DataStub(channel, coalescer=coalescer).get_changes(None, req)
+            self.assertEqual(next(s1).head.path, "0")
+            self._servicer.gate.set()
+
+            self.assertEqual([c.head.path for c in s1], ["1"])
+            self.assertEqual([c.head.path for c in s2], ["0", "1"])
+
+        self.assertEqual(self._servicer.requests, 1)
+        self.assertEqual(coalescer.coalesced, 1)
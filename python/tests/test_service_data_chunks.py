@@ -0,0 +1,144 @@
+import unittest
+
+import grpc
+
+from lookout.sdk import pb
+from lookout.sdk.git_data import GitDataServicer
+from lookout.sdk.grpc import create_channel, create_server
+from lookout.sdk.service_data import DataStub
+from lookout.sdk.service_data_chunks import ChunkedFile, data_chunks, \
+    file_chunks, Node
+from lookout.sdk.test import mixins
+
+from tests.test_git_data import GitRepoMixin, commit
+
+
+class TestChunkedFile(unittest.TestCase):
+
+    def file(self):
+        f = pb.File(path="big.py", mode=0o100644, hash="abc",
+                    language="Python", content=bytes(range(256)) * 40)
+        f.uast.CopyFrom(Node(internal_type="File", token="x" * 3000))
+        return f
+
+    def test_round_trip(self):
+        f = self.file()
+        chunks = list(file_chunks(f, 1000))
+        self.assertEqual(len(chunks), 11 + 4)
+        self.assertTrue(chunks[0].HasField("file"))
+        self.assertFalse(any(c.HasField("file") for c in chunks[1:]))
+        self.assertEqual(chunks[0].file.content, b"")
+        self.assertTrue(all(len(c.data) <= 1000 for c in chunks))
+
+        for max_memory_bytes in (1 << 20, 100):
+            with ChunkedFile.read(iter(chunks), max_memory_bytes) as chunked:
+                self.assertEqual(chunked.file.path, "big.py")
+                self.assertEqual(chunked.file.language, "Python")
+                self.assertEqual(bytes(chunked.content), f.content)
+                self.assertEqual(chunked.uast(), f.uast)
+                self.assertEqual(chunked.to_file(), f)
+
+    def test_data_chunks(self):
+        f = self.file()
+        meta = pb.File(path=f.path, mode=f.mode, hash=f.hash,
+                       language=f.language)
+        self.assertEqual(
+            list(data_chunks(meta, f.content, f.uast.SerializeToString(), 1000)),
+            list(file_chunks(f, 1000)))
+
+    def test_empty(self):
+        f = pb.File(path="empty")
+        chunks = list(file_chunks(f))
+        self.assertEqual(len(chunks), 1)
+        with ChunkedFile.read(chunks) as chunked:
+            self.assertEqual(bytes(chunked.content), b"")
+            self.assertIsNone(chunked.uast())
+            self.assertEqual(chunked.to_file(), f)
+
+    def test_invalid(self):
+        chunks = list(file_chunks(self.file(), 1000))
+        with self.assertRaises(ValueError):
+            ChunkedFile.read(chunks[:3] + chunks[4:])
+        with self.assertRaises(ValueError):
+            ChunkedFile.read(chunks[:-1])
+        with self.assertRaises(ValueError):
+            ChunkedFile.read(chunks[1:])
+        with self.assertRaises(ValueError):
+            ChunkedFile.read([])
+
+
+class TestGitDataChunks(GitRepoMixin, mixins.TestWithRunningServicerMixin,
+                        unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.channel = create_channel(self._target)
+        self.stub = DataStub(self.channel)
+
+    def tearDown(self):
+        self.channel.close()
+        super().tearDown()
+
+    def build_server(self):
+        self.big = b"package main\n" + b"// padding\n" * 1000
+        self.head = commit(self.path, {"main.go": self.big}, "big")
+        servicer = GitDataServicer(self.repo, uast_fn=lambda f: Node(
+            internal_type="File", token=f.content.decode()))
+        server = create_server(10)
+        pb.add_dataservicer_to_server(servicer, server)
+        pb.add_datachunksservicer_to_server(servicer, server)
+        return server
+
+    def test_get_file_chunks(self):
+        request = pb.FileChunksRequest(
+            revision=pb.ReferencePointer(hash=self.head), path="main.go",
+            want_contents=True, want_uast=True, chunk_size=512)
+        with self.stub.get_file_chunks(None, request,
+                                       max_memory_bytes=1024) as f:
+            self.assertEqual(f.file.language, "Go")
+            self.assertEqual(bytes(f.content), self.big)
+            self.assertEqual(f.uast().token, self.big.decode())
+
+        request.path = "nope"
+        with self.assertRaises(grpc.RpcError) as cm:
+            self.stub.get_file_chunks(None, request)
+        self.assertEqual(cm.exception.code(), grpc.StatusCode.NOT_FOUND)
+
+        request.revision.hash = "1" * 40
+        with self.assertRaises(grpc.RpcError) as cm:
+            self.stub.get_file_chunks(None, request)
+        self.assertEqual(cm.exception.code(), grpc.StatusCode.NOT_FOUND)
+        self.assertIn("unknown revision", cm.exception.details())
+
+    def test_get_chunked_files(self):
+        files = list(self.stub.get_chunked_files(None, pb.FilesRequest(
+            revision=pb.ReferencePointer(hash=self.head),
+            include_pattern=r"\.go$", want_contents=True), chunk_size=100))
+        self.assertEqual([f.file.path for f in files], ["main.go"])
+        self.assertEqual(bytes(files[0].content), self.big)
+        self.assertEqual(files[0].uast_data, b"")
+        for f in files:
+            f.close()
+
+    def test_get_chunked_changes(self):
+        changes = list(self.stub.get_chunked_changes(None, pb.ChangesRequest(
+            base=pb.ReferencePointer(hash=self.base),
+            head=pb.ReferencePointer(hash=self.head),
+            want_contents=True), chunk_size=100))
+        contents = {(base and base.file.path, head and head.file.path):
+                    (base and bytes(base.content), head and bytes(head.content))
+                    for base, head in changes}
+        self.assertEqual(contents, {
+            ("README.md", None): (b"# readme\n", None),
+            (None, "lib/new.py"): (None, b"y = 1\n"),
+            ("lib/util.py", "lib/util.py"): (b"x = 1\n", b"x = 2\n"),
+            ("main.go", "main.go"): (b"package main\n", self.big),
+        })
+        for change in changes:
+            for f in change:
+                if f is not None:
+                    f.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
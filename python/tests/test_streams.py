@@ -0,0 +1,238 @@
+import threading
+import unittest
+
+from lookout.sdk.grpc.streams import PrefetchIterator, StreamCoalescer, \
+    message_size
+
+
+class TestPrefetchIterator(unittest.TestCase):
+
+    def test_iteration(self):
+        it = PrefetchIterator(iter([b"a", b"bb", b"ccc"]), max_messages=1)
+        self.assertEqual(list(it), [b"a", b"bb", b"ccc"])
+
+    def test_bounded_by_messages(self):
+        consumed = threading.Event()
+        produced = []
+
+        def stream():
+            for i in range(10):
+                produced.append(i)
+                yield i
+                if i == 3:
+                    consumed.wait(5)
+
+        it = PrefetchIterator(stream(), max_messages=2,
+                              size_fn=lambda _: 1)
+        self.assertEqual(next(it), 0)
+        # the producer stops ahead of the consumer until there is room
+        buf = it._buffer
+        with buf.cond:
+            self.assertTrue(buf.cond.wait_for(lambda: len(buf.items) >= 2,
+                                              timeout=5))
+            self.assertEqual(len(buf.items), 2)
+        self.assertLessEqual(len(produced), 4)
+
+        consumed.set()
+        self.assertEqual(list(it), list(range(1, 10)))
+
+    def test_bounded_by_bytes(self):
+        gate = threading.Event()
+
+        def stream():
+            yield b"x" * 10
+            yield b"y" * 10
+            gate.wait(5)
+            yield b"z"
+
+        it = PrefetchIterator(stream(), max_messages=10, max_bytes=15)
+        self.assertEqual(next(it), b"x" * 10)
+        gate.set()
+        self.assertEqual(list(it), [b"y" * 10, b"z"])
+        self.assertEqual(it._buffer.size, 0)
+
+    def test_error_propagated_after_messages(self):
+        def stream():
+            yield b"a"
+            raise RuntimeError("boom")
+
+        it = PrefetchIterator(stream())
+        self.assertEqual(next(it), b"a")
+        with self.assertRaises(RuntimeError):
+            next(it)
+
+    def test_cancel(self):
+        class Stream:
+            cancelled = False
+            count = 0
+
+            def __iter__(self):
+                return self
+
+            def __next__(self):
+                if self.cancelled:
+                    raise StopIteration()
+                self.count += 1
+                return self.count
+
+            def cancel(self):
+                self.cancelled = True
+                return True
+
+            def code(self):
+                return "CANCELLED"
+
+        stream = Stream()
+        it = PrefetchIterator(stream, max_messages=1, size_fn=lambda _: 1)
+        self.assertEqual(next(it), 1)
+        self.assertTrue(it.cancel())
+        self.assertTrue(stream.cancelled)
+        self.assertEqual(list(it), [])
+        self.assertEqual(it.code(), "CANCELLED")
+        it._thread.join(5)
+        self.assertFalse(it._thread.is_alive())
+
+    def test_message_size(self):
+        self.assertEqual(message_size(b"abc"), 3)
+
+
+class BlockingStream:
+
+    def __init__(self, n, gate):
+        self.n = n
+        self.gate = gate
+        self.cancelled = False
+
+    def __iter__(self):
+        for i in range(self.n):
+            if i == 1:
+                self.gate.wait(5)
+            if self.cancelled:
+                raise RuntimeError("cancelled")
+            yield i
+
+    def cancel(self):
+        self.cancelled = True
+        self.gate.set()
+        return True
+
+
+class TestStreamCoalescer(unittest.TestCase):
+
+    def test_identical_streams_shared(self):
+        gate = threading.Event()
+        started = []
+
+        def start():
+            stream = BlockingStream(3, gate)
+            started.append(stream)
+            return iter(stream)
+
+        coalescer = StreamCoalescer()
+        s1 = coalescer.subscribe("k", start)
+        s2 = coalescer.subscribe("k", start)
+        self.assertEqual(next(s1), 0)
+        s3 = coalescer.subscribe("other", lambda: iter([10]))
+        gate.set()
+
+        self.assertEqual(list(s1), [1, 2])
+        self.assertEqual(list(s2), [0, 1, 2])
+        self.assertEqual(list(s3), [10])
+        self.assertEqual(len(started), 1)
+        self.assertEqual((coalescer.started, coalescer.coalesced), (2, 1))
+        self.assertEqual(len(coalescer), 0)
+
+        # once over, the same request starts a new stream
+        self.assertEqual(list(coalescer.subscribe("k", start)), [0, 1, 2])
+        self.assertEqual(len(started), 2)
+
+    def test_late_consumer(self):
+        gate = threading.Event()
+        started = []
+
+        def start():
+            stream = BlockingStream(3, gate)
+            started.append(stream)
+            return iter(stream)
+
+        coalescer = StreamCoalescer()
+        s1 = coalescer.subscribe("k", start)
+        s2 = coalescer.subscribe("k", start)
+        self.assertEqual(next(s1), 0)
+        # the first message is still buffered for s2
+        s3 = coalescer.subscribe("k", start)
+        self.assertEqual(next(s2), 0)
+        self.assertEqual(next(s3), 0)
+        # the first message is dropped, the consumers can't attach anymore
+        s4 = coalescer.subscribe("k", start)
+        self.assertEqual(len(started), 2)
+        self.assertEqual((coalescer.started, coalescer.coalesced), (2, 2))
+        gate.set()
+        for s in (s1, s2, s3, s4):
+            self.assertEqual(list(s), [1, 2] if s is not s4 else [0, 1, 2])
+
+    def test_bounded_buffer(self):
+        produced = []
+        done = threading.Event()
+
+        def start():
+            for i in range(10):
+                produced.append(i)
+                yield i
+            done.set()
+
+        coalescer = StreamCoalescer(max_messages=2)
+        s1 = coalescer.subscribe("k", start)
+        s2 = coalescer.subscribe("k", start)
+        self.assertEqual([next(s1) for _ in range(2)], [0, 1])
+        shared = s1._shared
+        with shared.cond:
+            # the producer waits for s2, which hasn't read anything
+            self.assertEqual(len(shared.messages), 2)
+            self.assertEqual(shared.base, 0)
+            self.assertLessEqual(len(produced), 3)
+            self.assertFalse(done.is_set())
+
+        self.assertEqual(next(s2), 0)
+        with shared.cond:
+            self.assertEqual(shared.base, 1)
+
+        # the consumers must be read concurrently
+        rest = []
+        thread = threading.Thread(target=lambda: rest.extend(s1))
+        thread.start()
+        self.assertEqual(list(s2), list(range(1, 10)))
+        thread.join(5)
+        self.assertEqual(rest, list(range(2, 10)))
+        self.assertEqual(len(shared.messages), 0)
+        with self.assertRaises(ValueError):
+            StreamCoalescer(max_messages=0)
+
+    def test_error_propagated(self):
+        def start():
+            yield 1
+            raise RuntimeError("boom")
+
+        coalescer = StreamCoalescer()
+        s1 = coalescer.subscribe("k", start)
+        s2 = coalescer.subscribe("k", start)
+        for s in (s1, s2):
+            self.assertEqual(next(s), 1)
+            with self.assertRaises(RuntimeError):
+                next(s)
+
+    def test_cancel_last_consumer(self):
+        gate = threading.Event()
+        stream = BlockingStream(3, gate)
+        coalescer = StreamCoalescer()
+        s1 = coalescer.subscribe("k", lambda: stream)
+        s2 = coalescer.subscribe("k", lambda: stream)
+        self.assertEqual(next(s1), 0)
+
+        self.assertFalse(s1.cancel())
+        self.assertFalse(stream.cancelled)
+        self.assertEqual(list(s1), [])
+
+        self.assertTrue(s2.cancel())
+        self.assertTrue(stream.cancelled)
+        self.assertEqual(len(coalescer), 0)
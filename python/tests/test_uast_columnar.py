@@ -0,0 +1,77 @@
+import os
+import tempfile
+import unittest
+
+try:
+    import numpy as np
+    from lookout.sdk.uast_columnar import ColumnarUAST
+except ImportError:
+    np = None
+
+from tests.test_uast_query import UAST
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestColumnarUAST(unittest.TestCase):
+
+    def test_from_uast(self):
+        uast = ColumnarUAST.from_uast(UAST)
+        self.assertEqual(len(uast), 8)
+        self.assertEqual(uast.internal_types,
+                         ["File", "FuncDecl", "Ident", "Block", "CallExpr"])
+        # breadth-first order
+        self.assertEqual([uast.internal_types[t] for t in uast.internal_type], [
+            "File", "FuncDecl", "FuncDecl", "Ident", "Block", "Ident",
+            "CallExpr", "Ident"])
+        self.assertEqual(list(uast.parent), [-1, 0, 0, 1, 1, 2, 4, 6])
+        self.assertEqual(list(uast.children(0)), [1, 2])
+        self.assertEqual(list(uast.children(1)), [3, 4])
+        self.assertEqual(list(uast.children(7)), [])
+        self.assertEqual(list(uast.start_line), [0, 1, 5, 1, 0, 5, 2, 2])
+        self.assertEqual(uast.get_token(3), "main")
+        self.assertEqual(uast.get_tokens([3, 5, 7]), ["main", "helper", "println"])
+        self.assertEqual(uast.get_tokens()[0], "")
+
+    def test_select(self):
+        uast = ColumnarUAST.from_uast(UAST)
+        self.assertEqual(list(uast.select(roles=["FUNCTION"])), [1, 2])
+        self.assertEqual(list(uast.select(roles=["IDENTIFIER", "NAME"])), [3, 5])
+        self.assertEqual(list(uast.select(internal_types=["Ident", "Block"])),
+                         [3, 4, 5, 7])
+        self.assertEqual(list(uast.select(internal_types=["Ident"], roles=[84])), [])
+        self.assertEqual(list(np.flatnonzero(uast.has_role("CALL"))), [6])
+        self.assertEqual(list(np.flatnonzero(uast.has_type("Block"))), [4])
+        self.assertFalse(uast.has_type("Nope").any())
+        self.assertEqual(len(uast.select()), 8)
+
+    def test_empty(self):
+        for node in (None, UAST.__class__()):
+            uast = ColumnarUAST.from_uast(node)
+            self.assertEqual(len(uast), 0)
+            self.assertEqual(len(uast.select(roles=["FUNCTION"])), 0)
+
+    def test_save_load(self):
+        uast = ColumnarUAST.from_uast(UAST)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "uast.bin")
+            uast.save(path)
+            for mmap_mode in (True, False):
+                loaded = ColumnarUAST.load(path, mmap_mode=mmap_mode)
+                self.assertEqual(loaded.internal_types, uast.internal_types)
+                np.testing.assert_array_equal(loaded.roles, uast.roles)
+                np.testing.assert_array_equal(loaded.child_end, uast.child_end)
+                self.assertEqual(loaded.get_tokens(), uast.get_tokens())
+                self.assertEqual(list(loaded.select(roles=["NAME"])), [3, 5])
+                del loaded
+
+            ColumnarUAST.from_uast(None).save(path)
+            self.assertEqual(len(ColumnarUAST.load(path)), 0)
+
+            with open(path, "wb") as f:
+                f.write(b"garbage")
+            with self.assertRaises(ValueError):
+                ColumnarUAST.load(path)
+
+
+if __name__ == "__main__":
+    unittest.main()
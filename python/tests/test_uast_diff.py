@@ -0,0 +1,103 @@
+import unittest
+
+from lookout.sdk.uast_diff import diff_subtrees, Node, subtree_hashes
+
+from tests.test_uast_query import node, UAST
+
+
+def copy(uast):
+    n = Node()
+    n.CopyFrom(uast)
+    return n
+
+
+class Transient:
+    """Node wrapper returning new wrappers of the children on each access,
+    like the C++ and upb backends of protobuf do"""
+
+    def __init__(self, node):
+        self._node = node
+
+    def __getattr__(self, name):
+        return getattr(self._node, name)
+
+    @property
+    def children(self):
+        return [Transient(child) for child in self._node.children]
+
+
+class TestUASTDiff(unittest.TestCase):
+
+    def tokens(self, nodes):
+        return [n.token or n.internal_type for n in nodes]
+
+    def root_hash(self, uast):
+        return subtree_hashes(uast).digests[0]
+
+    def test_hashes(self):
+        hashes = subtree_hashes(UAST)
+        self.assertEqual(len(hashes.digests), 8)
+        self.assertEqual(len(set(hashes.digests)), 8)
+        self.assertEqual(hashes.sizes, [8, 5, 1, 3, 2, 1, 2, 1])
+        head = copy(UAST)
+        self.assertEqual(subtree_hashes(head), hashes)
+        # the positions are ignored
+        head.children[0].start_position.line = 10
+        self.assertEqual(self.root_hash(head), hashes.digests[0])
+        head.children[1].children[0].roles.append(2)
+        self.assertNotEqual(self.root_hash(head), hashes.digests[0])
+        self.assertEqual(subtree_hashes(None), ([], []))
+        self.assertEqual(subtree_hashes(Node()), ([], []))
+
+    def test_transient_wrappers(self):
+        head = copy(UAST)
+        head.children[1].children[0].token = "helper2"
+        self.assertEqual(subtree_hashes(Transient(UAST)), subtree_hashes(UAST))
+        self.assertNotEqual(self.root_hash(Transient(head)), self.root_hash(Transient(UAST)))
+        diff = diff_subtrees(Transient(UAST), Transient(head))
+        self.assertEqual(self.tokens(diff.changed), ["File", "FuncDecl", "helper2"])
+        self.assertEqual(self.tokens(diff.unchanged), ["FuncDecl"])
+
+    def test_unchanged(self):
+        diff = diff_subtrees(UAST, copy(UAST))
+        self.assertEqual(diff.changed, [])
+        self.assertEqual(self.tokens(diff.unchanged), ["File"])
+
+    def test_modified(self):
+        head = copy(UAST)
+        head.children[1].children[0].token = "helper2"
+        head.children[0].start_position.line = 3
+        diff = diff_subtrees(UAST, head)
+        self.assertEqual(self.tokens(diff.changed), ["File", "FuncDecl", "helper2"])
+        self.assertEqual(self.tokens(diff.unchanged), ["FuncDecl"])
+        self.assertEqual(diff.unchanged[0], head.children[0])
+
+    def test_inserted(self):
+        head = copy(UAST)
+        head.children.add().CopyFrom(node("FuncDecl", roles=[45, 41], children=[
+            node("Ident", roles=[1, 47], token="other")]))
+        head.children[1].properties["internalRole"] = "Decls"
+        diff = diff_subtrees(UAST, head)
+        self.assertEqual(self.tokens(diff.changed),
+                         ["File", "FuncDecl", "FuncDecl", "other"])
+        self.assertEqual(self.tokens(diff.unchanged), ["FuncDecl", "helper"])
+
+    def test_copied(self):
+        # each base subtree matches a single head subtree
+        head = copy(UAST)
+        head.children.add().CopyFrom(UAST.children[1])
+        diff = diff_subtrees(UAST, head)
+        self.assertEqual(self.tokens(diff.changed), ["File", "FuncDecl", "helper"])
+        self.assertEqual(len(diff.unchanged), 2)
+
+    def test_added(self):
+        for base in (None, Node()):
+            diff = diff_subtrees(base, UAST)
+            self.assertEqual(len(diff.changed), 8)
+            self.assertEqual(diff.unchanged, [])
+        self.assertEqual(diff_subtrees(UAST, None), ([], []))
+        self.assertEqual(diff_subtrees(UAST, Node()), ([], []))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+
+from lookout.sdk.uast_query import compile_query, filter_uast, Node, \
+    QuerySet
+
+
+def node(internal_type, roles=(), token="", children=(), line=0, **props):
+    n = Node(internal_type=internal_type, roles=roles, token=token,
+             children=children, properties=props)
+    if line:
+        n.start_position.line = line
+    return n
+
+
+# roles: FUNCTION=45, DECLARATION=41, IDENTIFIER=1, NAME=47, CALL=84
+UAST = node("File", children=[
+    node("FuncDecl", roles=[45, 41], line=1, children=[
+        node("Ident", roles=[1, 47], token="main", line=1),
+        node("Block", children=[
+            node("CallExpr", roles=[84], line=2, children=[
+                node("Ident", roles=[1], token="println", line=2,
+                     internalRole="Fun"),
+            ]),
+        ]),
+    ]),
+    node("FuncDecl", roles=[45, 41], line=5, children=[
+        node("Ident", roles=[1, 47], token="helper", line=5),
+    ]),
+])
+
+
+class TestQuerySet(unittest.TestCase):
+
+    def tokens(self, nodes):
+        return [n.token or n.internal_type for n in nodes]
+
+    def test_filter(self):
+        queries = QuerySet({
+            "functions": "//*[@roleFunction]",
+            "identifiers": "//Ident",
+            "names": "//FuncDecl/Ident[@roleName]",
+            "root": "/File",
+            "top": "/File/*",
+            "nested": "/File//Ident",
+            "calls": "//*[@roleCall]//*[@internalRole='Fun']",
+        })
+        results = queries.filter(UAST)
+        self.assertEqual(self.tokens(results["functions"]),
+                         ["FuncDecl", "FuncDecl"])
+        self.assertEqual(self.tokens(results["identifiers"]),
+                         ["main", "println", "helper"])
+        self.assertEqual(self.tokens(results["names"]), ["main", "helper"])
+        self.assertEqual(self.tokens(results["root"]), ["File"])
+        self.assertEqual(len(results["top"]), 2)
+        self.assertEqual(len(results["nested"]), 3)
+        self.assertEqual(self.tokens(results["calls"]), ["println"])
+
+    def test_predicates(self):
+        queries = QuerySet([
+            "//*[@token='main' or @token=\"helper\"]",
+            "//Ident[not(@roleName)]",
+            "//*[@roleIdentifier and @startLine>=2]",
+            "//*[@startLine!=1 and (@roleCall or @roleFunction)]",
+            "//*[@token]",
+            "//*[@internalRole]",
+        ])
+        self.assertEqual(list(queries.count(UAST).values()),
+                         [2, 1, 2, 2, 3, 1])
+
+    def test_union(self):
+        # a node matched by both paths is reported once
+        self.assertEqual(self.tokens(filter_uast(
+            UAST, "//Ident[@roleName] | //*[@token='main'] | /File")),
+            ["File", "main", "helper"])
+
+    def test_empty(self):
+        queries = QuerySet(["//*"])
+        self.assertEqual(queries.count(None), {"//*": 0})
+        self.assertEqual(queries.count(Node()), {"//*": 0})
+        self.assertEqual(queries.count(UAST), {"//*": 8})
+
+    def test_compile(self):
+        self.assertIs(compile_query("//*[@roleFunction]"),
+                      compile_query("//*[@roleFunction]"))
+        for query in ["", "Ident", "//*[1]", "//*[@roleNope]", "//*[@token=]",
+                      "//Ident]", "//*[@token='x'", "//a/count(b)"]:
+            with self.assertRaises(ValueError, msg=query):
+                compile_query(query)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import re
+import unittest
+
+from lookout.sdk.vendored import is_vendored, VENDOR_PATTERNS, \
+    VendoredMatcher
+
+from benchmarks.bench_vendored import make_paths
+
+
+class TestVendoredMatcher(unittest.TestCase):
+
+    def test_is_vendored(self):
+        for path in ["vendor/github.com/x/y.go", "a/b/node_modules/../dist/c",
+                     "static/js/jquery.min.js", "web/third_party/lib.c",
+                     "types/index.d.ts", "gradlew", "a/.gitignore",
+                     "app/Carthage/Build/x.swift", "debian/control"]:
+            self.assertTrue(is_vendored(path), path)
+
+        for path in ["main.go", "src/vendors.go", "lib/minimal.js",
+                     "docs/index.md", "a/debian/control", "web/app.js"]:
+            self.assertFalse(is_vendored(path), path)
+
+    def test_same_as_naive(self):
+        regexes = [re.compile(p) for p in VENDOR_PATTERNS]
+        matcher = VendoredMatcher(max_cached_dirs=100)
+        paths = make_paths(5000, seed=1) + [
+            "jquery.js", "a/b.min.css", "x.JS", "cache/", "configure",
+            "CodeMirror/5.1/lib/a", "packages/foo.1.2/bar", "foundation.js"]
+        for path in paths:
+            self.assertEqual(matcher(path),
+                             any(r.search(path) for r in regexes), path)
+
+    def test_custom_patterns(self):
+        matcher = VendoredMatcher([r"(^|/)gen/", r"_pb2\.py$", r"a|b\.go$"])
+        self.assertTrue(matcher("x/gen/y.go"))
+        self.assertTrue(matcher.is_vendored_dir("x/gen"))
+        self.assertFalse(matcher.is_vendored_dir("x/general"))
+        self.assertTrue(matcher("x/y_pb2.py"))
+        self.assertFalse(matcher("x/y.py"))
+        self.assertTrue(matcher("x/a.txt"))
+        with self.assertRaises(re.error):
+            VendoredMatcher(["("])
+
+
+if __name__ == "__main__":
+    unittest.main()